@@ -319,6 +319,12 @@ class GlideinParams(cWParams.CommonParams):
         process_log_defaults["msg_types"] = ["INFO, WARN, ERR", "string", "types of log messages", None]
         process_log_defaults["backup_count"] = ["5", "string", "Number of backup logs to keep", None]
         process_log_defaults["compression"] = ["", "string", "Compression for backup log files", None]
+        process_log_defaults["asynchronous"] = [
+            "False",
+            "Bool",
+            "True to write the log from a separate thread, not blocking the logging calls (Python 3.7+)",
+            None,
+        ]
 
         log_retention_defaults = cWParams.CommentedOrderedDict()
         log_retention_defaults["process_logs"] = (
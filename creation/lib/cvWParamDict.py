@@ -870,10 +870,12 @@ def populate_frontend_descript(work_dir, frontend_dict, active_sub_list, params)
     frontend_dict.add("LoopDelay", params.loop_delay)
     frontend_dict.add("AdvertiseDelay", params.advertise_delay)
     frontend_dict.add("GroupParallelWorkers", params.group_parallel_workers)
+    frontend_dict.add("QueryCacheMaxAge", params.query_cache_max_age)
     frontend_dict.add("RestartAttempts", params.restart_attempts)
     frontend_dict.add("RestartInterval", params.restart_interval)
     frontend_dict.add("AdvertiseWithTCP", params.advertise_with_tcp)
     frontend_dict.add("AdvertiseWithMultiple", params.advertise_with_multiple)
+    frontend_dict.add("AdvertiseTimeout", params.advertise_timeout)
 
     frontend_dict.add("MonitorDisplayText", params.monitor_footer.display_txt)
     frontend_dict.add("MonitorLink", params.monitor_footer.href_link)
@@ -921,6 +923,9 @@ def populate_group_descript(work_dir, group_descript_dict, sub_name, sub_params)
     group_descript_dict.add("MaxRunningTotal", sub_params.config.running_glideins_total.max)
     group_descript_dict.add("CurbRunningTotal", sub_params.config.running_glideins_total.curb)
     group_descript_dict.add("MaxMatchmakers", sub_params.config.processing_workers.matchmakers)
+    group_descript_dict.add("MatchEngine", sub_params.config.processing_workers.match_engine)
+    group_descript_dict.add("MatchWorkerPool", sub_params.config.processing_workers.worker_pool)
+    group_descript_dict.add("ScheddQueryTimeout", sub_params.config.processing_workers.schedd_query_timeout)
     group_descript_dict.add("RemovalType", sub_params.config.glideins_removal.type)
     group_descript_dict.add("RemovalWait", sub_params.config.glideins_removal.wait)
     group_descript_dict.add("RemovalRequestsTracking", sub_params.config.glideins_removal.requests_tracking)
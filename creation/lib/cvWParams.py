@@ -170,6 +170,27 @@ class VOFrontendParams(cWParams.CommonParams):
             "Max number of worker processes that will be doing the matchmaking",
             None,
         ]
+        group_config_proc_work_defaults["match_engine"] = [
+            "loop",
+            "loop|matrix",
+            "Algorithm used to count the jobs matching each entry."
+            " 'matrix' evaluates the match once per (entry, job cluster) and derives all counts from the match matrix",
+            None,
+        ]
+        group_config_proc_work_defaults["worker_pool"] = [
+            "False",
+            "Bool",
+            "If True, the matchmaking is done by a pool of 'matchmakers' long lived workers"
+            " receiving the work in chunks sized from the measured matching cost, instead of one fork per chunk",
+            None,
+        ]
+        group_config_proc_work_defaults["schedd_query_timeout"] = [
+            "300",
+            "seconds",
+            "Max time for the query of each schedd, the schedds not answering in time are skipped for the iteration."
+            " It is extended for the schedds that were slow in the previous iterations. 0 means no timeout",
+            None,
+        ]
         group_config_defaults["processing_workers"] = group_config_proc_work_defaults
 
         group_config_removal_defaults = cWParams.CommentedOrderedDict()
@@ -415,6 +436,12 @@ class VOFrontendParams(cWParams.CommonParams):
         process_log_defaults["msg_types"] = ["INFO, WARN, ERR", "string", "types of log messages", None]
         process_log_defaults["backup_count"] = ["5", "string", "Number of backup logs to keep", None]
         process_log_defaults["compression"] = ["", "string", "Compression for backup log files", None]
+        process_log_defaults["asynchronous"] = [
+            "False",
+            "Bool",
+            "True to write the log from a separate thread, not blocking the logging calls (Python 3.7+)",
+            None,
+        ]
 
         log_retention_defaults = cWParams.CommentedOrderedDict()
         log_retention_defaults["process_logs"] = (
@@ -439,6 +466,12 @@ class VOFrontendParams(cWParams.CommonParams):
         self.defaults["advertise_delay"] = ("5", "NR", "Advertise event NR loops", None)
         self.defaults["advertise_with_tcp"] = ("True", "Bool", "Should condor_advertise use TCP connections?", None)
         self.defaults["advertise_with_multiple"] = ("True", "Bool", "Should condor_advertise use -multiple?", None)
+        self.defaults["advertise_timeout"] = (
+            "300",
+            "seconds",
+            "Max time to advertise the requests to one Factory pool (0 for no limit)",
+            None,
+        )
         self.defaults["enable_attribute_expansion"] = (
             "False",
             "Bool",
@@ -446,6 +479,12 @@ class VOFrontendParams(cWParams.CommonParams):
             None,
         )
 
+        self.defaults["query_cache_max_age"] = (
+            "60",
+            "seconds",
+            "Max age of the collector, schedd and factory query results shared by the groups in an iteration (0 to disable)",
+            None,
+        )
         self.defaults["group_parallel_workers"] = (
             "2",
             "NR",
@@ -70,16 +70,18 @@ def aggregate_stats(in_downtime):
         dict: Dictionary containing aggregated statistics.
     """
     stats = {}
-    try:
-        _ = glideFactoryMonitorAggregator.aggregateStatus(in_downtime)
-    except Exception:
-        # protect and report
-        logSupport.log.exception("aggregateStatus failed: ")
-    try:
-        stats["LogSummary"] = glideFactoryMonitorAggregator.aggregateLogSummary()
-    except Exception:
-        # protect and report
-        logSupport.log.exception("aggregateLogStatus failed: ")
+    # Write all the RRD updates at once, before aggregateRRDStats reads them
+    with glideFactoryMonitoring.monitoringConfig.rrd_batch():
+        try:
+            _ = glideFactoryMonitorAggregator.aggregateStatus(in_downtime)
+        except Exception:
+            # protect and report
+            logSupport.log.exception("aggregateStatus failed: ")
+        try:
+            stats["LogSummary"] = glideFactoryMonitorAggregator.aggregateLogSummary()
+        except Exception:
+            # protect and report
+            logSupport.log.exception("aggregateLogStatus failed: ")
     try:
         glideFactoryMonitorAggregator.aggregateRRDStats(log=logSupport.log)
     except Exception:
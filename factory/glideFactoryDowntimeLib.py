@@ -3,12 +3,18 @@
 
 """This module implements the functions needed to handle the downtimes."""
 
+import bisect
 import fcntl
 import os.path
 import time
 
 from glideinwms.lib import timeConversion
 
+# Downtime indexes of the files already read, keyed by file name: (file stamp, DowntimeIndex)
+# The Factory reads the downtimes before forking the entry workers, the children inherit the indexes
+# and parse again the file only if it changed
+_downtime_indexes = {}
+
 
 class DowntimeFile:
     """Handle a downtime file.
@@ -325,6 +331,107 @@ def _print_downtime(fname, entry="Any", check_time=None):
                 print("%-30s Up  \tAll:All" % (entry))
 
 
+class DowntimeIndex:
+    """Downtime periods of a downtime file, indexed by scope.
+
+    The periods are grouped by their (entry, frontend, security_class) values.
+    A check looks up the groups that can apply to the requested scope, i.e. the exact names and the "All"
+    wildcards, and uses binary searches within each group:
+    - periods with an end time are sorted by end time, only the ones not ended yet are checked
+    - periods without an end time are sorted by start time, with the first one in the file among the started ones
+    The result is the same as checking the periods one by one in file order: if multiple periods are active
+    the comment of the first one in the file is returned.
+    """
+
+    def __init__(self, time_list):
+        """Build the index.
+
+        Args:
+            time_list (list): Downtime periods, as returned by `_read`.
+        """
+        groups = {}
+        for lnr, time_tuple in enumerate(time_list):
+            comment = " ".join(time_tuple[5][1:])
+            groups.setdefault(time_tuple[2:5], []).append((time_tuple[0], time_tuple[1], lnr, comment))
+        # self.groups[(entry, frontend, security_class)] =
+        #   (end times, periods sorted by end time, start times of the endless periods,
+        #    first endless period in the file among the ones started so far)
+        self.groups = {}
+        for scope, periods in groups.items():
+            ending = sorted((i for i in periods if i[1] is not None), key=lambda x: x[1])
+            endless = sorted((i for i in periods if i[1] is None), key=lambda x: x[0])
+            first_endless = []
+            for period in endless:
+                if not first_endless or period[2] < first_endless[-1][0]:
+                    first_endless.append((period[2], period[3]))
+                else:
+                    first_endless.append(first_endless[-1])
+            self.groups[scope] = ([i[1] for i in ending], ending, [i[0] for i in endless], first_endless)
+
+    def check(self, entry, frontend, security_class, check_time):
+        """Check if a downtime period is active at the specified time.
+
+        "All" periods apply to all entries but "factory", and to all Frontends and security classes.
+
+        Args:
+            entry (str): The entry name to check, or "All".
+            frontend (str): The frontend name to check, or "All".
+            security_class (str): The security class to check, or "All".
+            check_time (int): The time to check (in seconds since epoch).
+
+        Returns:
+            tuple: A tuple containing:
+                - comment (str): The downtime comment or an empty string.
+                - bool: True if a downtime period is active, False otherwise.
+        """
+        entries = (entry,) if entry in ("All", "factory") else (entry, "All")
+        frontends = (frontend,) if frontend == "All" else (frontend, "All")
+        security_classes = (security_class,) if security_class == "All" else (security_class, "All")
+        found = None  # (line, comment) of the first active period in the file
+        for scope_entry in entries:
+            for scope_frontend in frontends:
+                for scope_security_class in security_classes:
+                    group = self.groups.get((scope_entry, scope_frontend, scope_security_class))
+                    if group is None:
+                        continue
+                    end_times, ending, endless_start_times, first_endless = group
+                    for start_time, _, lnr, comment in ending[bisect.bisect_left(end_times, check_time) :]:
+                        if start_time <= check_time and (found is None or lnr < found[0]):
+                            found = (lnr, comment)
+                    started = bisect.bisect_right(endless_start_times, check_time)
+                    if started > 0 and (found is None or first_endless[started - 1][0] < found[0]):
+                        found = first_endless[started - 1]
+        if found is None:
+            return "", False  # not found a downtime window
+        return found[1], True
+
+
+def _get_index(fname):
+    """Return the DowntimeIndex of a downtime file, parsing it only if it changed since the last call.
+
+    The file is considered changed if its inode, modification time, or size changed.
+    A missing file has no downtimes.
+
+    Args:
+        fname (str or Path): The downtime file.
+
+    Returns:
+        DowntimeIndex: The index of the downtime periods in the file.
+    """
+    try:
+        st = os.stat(fname)
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    cached = _downtime_indexes.get(fname)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    # The stamp is taken before reading, a change while reading will trigger a new parsing at the next call
+    index = DowntimeIndex(_read(fname))
+    _downtime_indexes[fname] = (stamp, index)
+    return index
+
+
 def _check_downtime(fname, entry="Any", frontend="Any", security_class="Any", check_time=None):
     """Check if a downtime period is active at the specified time.
 
@@ -332,6 +439,7 @@ def _check_downtime(fname, entry="Any", frontend="Any", security_class="Any", ch
     `entry`, `frontend`, and `security_class` can be used to restrict the scope.
     "All" is used as a wildcard for `entry`, `frontend`, and `security_class`,
     to avoid scope restrictions.
+    The file is parsed only if it changed since the last check (see `_get_index`).
 
     Args:
         fname (str or Path): The downtime file.
@@ -348,30 +456,7 @@ def _check_downtime(fname, entry="Any", frontend="Any", security_class="Any", ch
     """
     if check_time is None:
         check_time = int(time.time())
-    time_list = _read(fname)
-    for time_tuple in time_list:
-        # make sure this is for the right entry
-        if (time_tuple[2] != "All") and (entry != time_tuple[2]):
-            continue
-        if (time_tuple[2] == "All") and (entry == "factory"):
-            continue
-        # make sure that this time tuple applies to this security_class
-        # If the security class does not match the downtime entry,
-        #   this is not a relevant downtime
-        #   UNLESS the downtime says All
-        if (time_tuple[3] != "All") and (frontend != time_tuple[3]):
-            continue
-        if (time_tuple[4] != "All") and (security_class != time_tuple[4]):
-            continue
-        if check_time < time_tuple[0]:
-            continue  # check_time before start
-        comment = " ".join(time_tuple[5][1:])
-        if time_tuple[1] is None:
-            return comment, True  # downtime valid until the end of times, so here we go
-        if check_time <= time_tuple[1]:
-            return comment, True  # within limit
-
-    return "", False  # not found a downtime window
+    return _get_index(fname).check(entry, frontend, security_class, check_time)
 
 
 def _add_period(
@@ -404,6 +489,7 @@ def _add_period(
 
     comment = comment.replace("\n", " ")
     comment = comment.replace("\r", " ")
+    _downtime_indexes.pop(fname, None)
     with open(fname, "a+") as fd:
         fcntl.flock(fd, fcntl.LOCK_EX)
         if not exists:  # new file, create header
@@ -463,6 +549,7 @@ def _purge_old_periods(fname, cut_time=None, raise_on_error=False):
             raise  # re-rise the exact same exception like no except
         else:
             return 0  # no file -> nothing to purge
+    _downtime_indexes.pop(fname, None)
     with fd:
         fcntl.flock(fd, fcntl.LOCK_EX)
         # read the old info
@@ -549,6 +636,7 @@ def _end_downtime(fname, end_time=None, entry="All", frontend="All", security_cl
     except OSError:
         return 0  # no file -> nothing to end
 
+    _downtime_indexes.pop(fname, None)
     with fd:
         fcntl.flock(fd, fcntl.LOCK_EX)
         # read the old info
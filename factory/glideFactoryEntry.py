@@ -151,6 +151,8 @@ class Entry:
             cleanupSupport.cleaners.add_cleaner(cleaner)
 
         self.glideinTotals = None
+        # Glidein queue snapshot of the current cycle, set by the entry group (see setQueuedGlideins)
+        self.queuedGlideins = None
 
         # Load initial context for whitelist and downtimes
         self.loadWhitelist()
@@ -351,9 +353,14 @@ class Entry:
         Consists of a fetched dictionary with jobs (keyed by job cluster, ID) in .stored_data,
         some query attributes and the ability to reload (load/fetch)
 
+        If the entry group already retrieved the glideins of this entry for the current cycle (setQueuedGlideins),
+        that snapshot is returned and the schedd is not queried again.
+
         Returns:
             condorMonitor.CondorQ: A loaded CondorQ object with job information.
         """
+        if self.queuedGlideins is not None:
+            return self.queuedGlideins
         try:
             return glideFactoryLib.getCondorQData(self.name, None, self.scheddName, factoryConfig=self.gflFactoryConfig)
         except Exception:
@@ -362,6 +369,15 @@ class Entry:
             self.log.warning("getCondorQData failed, traceback: %s" % "".join(tb))
             raise
 
+    def setQueuedGlideins(self, condorQ):
+        """Set the glidein queue snapshot returned by queryQueuedGlideins in this cycle.
+
+        Args:
+            condorQ (condorMonitor.SubQuery): Loaded CondorQ-compatible object with the glideins of this entry,
+                e.g. from `glideFactoryLib.getCondorQGroupData`. None to query the schedd again.
+        """
+        self.queuedGlideins = condorQ
+
     def glideinsWithinLimits(self, condorQ):
         """Check if glidein submission is within allowed limits.
 
@@ -692,22 +708,24 @@ class Entry:
         self.gflFactoryConfig.log_stats.computeDiff()
         self.log.info("log_stats diff computed")
 
-        self.log.info("Writing log_stats for %s" % self.name)
-        self.gflFactoryConfig.log_stats.write_file(monitoringConfig=self.monitoringConfig)
-        self.log.info("log_stats written")
+        # Write all the RRD updates at once, before rrd_stats reads them
+        with self.monitoringConfig.rrd_batch():
+            self.log.info("Writing log_stats for %s" % self.name)
+            self.gflFactoryConfig.log_stats.write_file(monitoringConfig=self.monitoringConfig)
+            self.log.info("log_stats written")
 
-        self.log.info("Writing glidein job info for %s" % self.name)
-        self.gflFactoryConfig.log_stats.write_job_info(
-            scheddName=self.scheddName, collectorName=self.gfiFactoryConfig.factory_collector
-        )
-        self.log.info("glidein job info written")
+            self.log.info("Writing glidein job info for %s" % self.name)
+            self.gflFactoryConfig.log_stats.write_job_info(
+                scheddName=self.scheddName, collectorName=self.gfiFactoryConfig.factory_collector
+            )
+            self.log.info("glidein job info written")
 
-        self.gflFactoryConfig.qc_stats.finalizeClientMonitor()
-        self.log.info("Writing qc_stats for %s" % self.name)
-        self.gflFactoryConfig.qc_stats.write_file(
-            monitoringConfig=self.monitoringConfig, alt_stats=self.gflFactoryConfig.client_stats
-        )
-        self.log.info("qc_stats written")
+            self.gflFactoryConfig.qc_stats.finalizeClientMonitor()
+            self.log.info("Writing qc_stats for %s" % self.name)
+            self.gflFactoryConfig.qc_stats.write_file(
+                monitoringConfig=self.monitoringConfig, alt_stats=self.gflFactoryConfig.client_stats
+            )
+            self.log.info("qc_stats written")
 
         self.log.info("Writing rrd_stats for %s" % self.name)
         self.gflFactoryConfig.rrd_stats.writeFiles(monitoringConfig=self.monitoringConfig)
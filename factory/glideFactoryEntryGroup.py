@@ -227,6 +227,34 @@ def forked_update_entries_stats(factory_in_downtime, entries_list):
     return return_dict
 
 
+def query_queued_glideins(my_entries, entry_names):
+    """Retrieve the glidein queue of the entries with one condor_q per schedd.
+
+    The snapshot of each entry is set in the entry object (Entry.setQueuedGlideins) and
+    used by the forked children instead of one condor_q per entry.
+    If the query of a schedd fails, its entries query the schedd on their own, as before.
+
+    Args:
+        my_entries (dict): Dictionary of entry objects (`glideFactoryEntry.Entry`) keyed by entry name.
+        entry_names (list): Names of the entries to query.
+    """
+    schedd_entries = {}
+    for ent in entry_names:
+        schedd_entries.setdefault(my_entries[ent].scheddName, []).append(ent)
+
+    for schedd_name, schedd_entry_names in schedd_entries.items():
+        factory_config = my_entries[schedd_entry_names[0]].gflFactoryConfig
+        try:
+            entries_condorQ = gfl.getCondorQGroupData(schedd_entry_names, schedd_name, factoryConfig=factory_config)
+        except Exception:
+            logSupport.log.exception(
+                f"Schedd {schedd_name} not responding, its {len(schedd_entry_names)} entries will query it separately: "
+            )
+            entries_condorQ = {}
+        for ent in schedd_entry_names:
+            my_entries[ent].setQueuedGlideins(entries_condorQ.get(ent))
+
+
 ##############################################
 # Functions managing the Entries life-cycle
 
@@ -295,7 +323,8 @@ def find_and_perform_work(do_advertize, factory_in_downtime, glideinDescript, fr
 
     logSupport.log.debug("Setting parallel_workers limit of %s" % parallel_workers)
 
-    forkm_obj = ForkManager()
+    # The entries state returned by the children can be large, return it via shared memory
+    forkm_obj = ForkManager(use_shm=True)
     # Only fork of child processes for entries that have corresponding
     # work to do, ie glideclient classads.
     # TODO: #22163, change in 3.5 coordinate w/ find_work():
@@ -313,6 +342,10 @@ def find_and_perform_work(do_advertize, factory_in_downtime, glideinDescript, fr
     # TODO: #22163, check if this is causing too much load
     # Since glideins only decrease for entries not receiving requests, a more efficient way
     # could be to advertise entries that had non 0 # of glideins at the previous round
+    queried_entries = [ent for ent in my_entries if work.get(ent)]
+    if do_advertize:
+        queried_entries += entries_without_work
+    query_queued_glideins(my_entries, queried_entries)
     if do_advertize and len(entries_without_work) > 0:
         forkm_obj.add_fork(
             "GWMS_ENTRIES_WITHOUT_WORK",
@@ -348,6 +381,7 @@ def find_and_perform_work(do_advertize, factory_in_downtime, glideinDescript, fr
         "All children forked for glideFactoryEntry.check_and_perform_work terminated - took %s seconds. Loading post work state for the entry."
         % t_end
     )
+    logSupport.log.debug("Post work state transfer: %s" % forkm_obj.fork_stats_summary())
 
     for entry in my_entries:
         # Update the entry object from the post_work_info
@@ -356,6 +390,8 @@ def find_and_perform_work(do_advertize, factory_in_downtime, glideinDescript, fr
             (my_entries[entry]).setState(post_work_info[entry])
         else:
             logSupport.log.debug("No work found for entry %s from any frontends" % entry)
+        # The glidein queue snapshot is valid only for this cycle
+        (my_entries[entry]).setQueuedGlideins(None)
 
     if (
         "GWMS_ENTRIES_WITHOUT_WORK" in post_work_info
@@ -557,6 +593,8 @@ def iterate(parent_pid, sleep_time, advertize_rate, glideinDescript, frontendDes
                         os.close(w)
                         # Exit without triggering SystemExit exception
                         # Note that this is skippihg also all the cleanup (files closing, finally clauses)
+                        # Write the queued log records before
+                        logSupport.stop_async_logs()
                         os._exit(0)
 
                 try:
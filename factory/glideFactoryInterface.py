@@ -11,7 +11,7 @@ import fcntl
 import os
 import time
 
-from glideinwms.lib import classadSupport, condorExe, condorManager, condorMonitor, logSupport
+from glideinwms.lib import classadSupport, condorExe, condorManager, condorMonitor, logSupport, symCrypto
 
 ############################################################
 #
@@ -27,6 +27,9 @@ advertizeGFCounter = {}
 advertizeGFCCounter = {}
 # Advertise counter for glidefactoryglobal classad
 advertizeGlobalCounter = 0
+# Decrypted identities and parameters of the requests
+# The Frontends encrypt the same values with the same symkey for all the entries and until they change symkey
+decryption_cache = symCrypto.SymKeyCache()
 
 
 ############################################################
@@ -261,6 +264,8 @@ def findGroupWork(
     # Output is now in the format of
     # out[entry_name][frontend]
     out = {}
+    # Symkeys already extracted, the Frontends use the same for all the entries
+    sym_keys = {}
 
     # Copy over requests and parameters
 
@@ -289,7 +294,7 @@ def findGroupWork(
         sym_key_obj = None
         if (pub_key_obj is not None) and ("ReqPubKeyID" in kel):
             try:
-                sym_key_obj = pub_key_obj.extract_sym_key(kel["ReqEncKeyCode"])
+                sym_key_obj = extract_sym_key(pub_key_obj, kel["ReqEncKeyCode"], sym_keys)
             except Exception:
                 continue
 
@@ -297,7 +302,7 @@ def findGroupWork(
             # Verify that the identity the client claims to be is the
             # identity that Condor thinks it is
             try:
-                enc_identity = sym_key_obj.decrypt_hex(kel["ReqEncIdentity"]).decode("utf-8")
+                enc_identity = decryption_cache.decrypt_hex(sym_key_obj, kel["ReqEncIdentity"]).decode("utf-8")
             except Exception:
                 logSupport.log.warning(
                     "Client %s provided invalid ReqEncIdentity, could not decode. Skipping for security reasons." % k
@@ -325,7 +330,7 @@ def findGroupWork(
                     el[key][attr[plen:]] = None
                     if sym_key_obj is not None:
                         try:
-                            el[key][attr[plen:]] = sym_key_obj.decrypt_hex(kel[attr])
+                            el[key][attr[plen:]] = decryption_cache.decrypt_hex(sym_key_obj, kel[attr])
                         except Exception:
                             # I don't understand it -> invalid
                             invalid_classad = True
@@ -353,9 +358,42 @@ def findGroupWork(
 
         out[k] = el
 
+    log_decryption_stats()
     return workGroupByEntries(out)
 
 
+def extract_sym_key(pub_key_obj, enc_sym_key, sym_keys):
+    """Extract the symmetric key of a request, decrypting it only once per encrypted value.
+
+    Args:
+        pub_key_obj (PubRSAKey): Factory key used to decrypt the symmetric key.
+        enc_sym_key (str): Encrypted symmetric key of the request (ReqEncKeyCode).
+        sym_keys (dict): Symmetric keys already extracted, keyed by encrypted value. Updated in place.
+
+    Returns:
+        SymKey: The symmetric key of the request.
+
+    Raises:
+        Exception: If the symmetric key cannot be extracted, failures are not cached.
+    """
+    try:
+        return sym_keys[enc_sym_key]
+    except KeyError:
+        sym_key_obj = pub_key_obj.extract_sym_key(enc_sym_key)
+        sym_keys[enc_sym_key] = sym_key_obj
+        return sym_key_obj
+
+
+def log_decryption_stats():
+    """Log and reset the counters of the decryption cache."""
+    stats = decryption_cache.get_stats()
+    logSupport.log.debug(
+        "Decryption cache: %i hits, %i misses (hit rate %.1f%%), %i bytes not decrypted again"
+        % (stats["hits"], stats["misses"], 100 * stats["hit_rate"], stats["bytes_saved"])
+    )
+    decryption_cache.reset_stats()
+
+
 def workGroupByEntries(work):
     """Group work items by entry.
 
@@ -478,6 +516,8 @@ def findWork(
     )
 
     out = {}
+    # Symkeys already extracted, the Frontends use the same for all the entries
+    sym_keys = {}
 
     # copy over requests and parameters
     for k in list(data.keys()):
@@ -498,7 +538,7 @@ def findWork(
         if pub_key_obj is not None:
             if "ReqPubKeyID" in kel:
                 try:
-                    sym_key_obj = pub_key_obj.extract_sym_key(kel["ReqEncKeyCode"])
+                    sym_key_obj = extract_sym_key(pub_key_obj, kel["ReqEncKeyCode"], sym_keys)
                 except Exception:
                     continue  # bad key, ignore entry
             else:
@@ -509,7 +549,7 @@ def findWork(
         if sym_key_obj is not None:
             # this is verifying that the identity that the client claims to be is the identity that Condor thinks it is
             try:
-                enc_identity = sym_key_obj.decrypt_hex(kel["ReqEncIdentity"])
+                enc_identity = decryption_cache.decrypt_hex(sym_key_obj, kel["ReqEncIdentity"])
             except Exception:
                 logSupport.log.warning(
                     "Client %s provided invalid ReqEncIdentity, could not decode. Skipping for security reasons." % k
@@ -532,7 +572,7 @@ def findWork(
                     el[key][attr[plen:]] = None  # define it even if I don't understand the content
                     if sym_key_obj is not None:
                         try:
-                            el[key][attr[plen:]] = sym_key_obj.decrypt_hex(kel[attr])
+                            el[key][attr[plen:]] = decryption_cache.decrypt_hex(sym_key_obj, kel[attr])
                         except Exception:
                             invalid_classad = True
                             break  # I don't understand it -> invalid
@@ -557,6 +597,7 @@ def findWork(
 
         out[k] = el
 
+    log_decryption_stats()
     return out
 
 
@@ -221,6 +221,35 @@ def secClass2Name(client_security_name, proxy_security_class):
 ############################################################
 
 
+def getCondorQFormatList(factoryConfig=None):
+    """Return the attributes retrieved by the glidein queue queries.
+
+    Args:
+        factoryConfig (FactoryConfig, optional): Factory configuration. Defaults to global configuration.
+
+    Returns:
+        list: List of (attribute name, type) tuples.
+    """
+    if factoryConfig is None:
+        factoryConfig = globals()["factoryConfig"]
+
+    return [
+        ("JobStatus", "i"),
+        ("GridJobStatus", "s"),
+        ("ServerTime", "i"),
+        ("EnteredCurrentStatus", "i"),
+        ("GlideinEntrySubmitFile", "s"),
+        (factoryConfig.credential_id_schedd_attribute, "s"),
+        ("HoldReasonCode", "i"),
+        ("HoldReasonSubCode", "i"),
+        ("HoldReason", "s"),
+        ("NumSystemHolds", "i"),
+        (factoryConfig.frontend_name_attribute, "s"),
+        (factoryConfig.client_schedd_attribute, "s"),
+        (factoryConfig.credential_secclass_schedd_attribute, "s"),
+    ]
+
+
 def getCondorQData(entry_name, client_name, schedd_name, factoryConfig=None):
     """Get Condor queue data for a specific entry and client.
 
@@ -251,21 +280,7 @@ def getCondorQData(entry_name, client_name, schedd_name, factoryConfig=None):
         client_constraint,
         factoryConfig.credential_id_schedd_attribute,
     )
-    q_glidein_format_list = [
-        ("JobStatus", "i"),
-        ("GridJobStatus", "s"),
-        ("ServerTime", "i"),
-        ("EnteredCurrentStatus", "i"),
-        ("GlideinEntrySubmitFile", "s"),
-        (factoryConfig.credential_id_schedd_attribute, "s"),
-        ("HoldReasonCode", "i"),
-        ("HoldReasonSubCode", "i"),
-        ("HoldReason", "s"),
-        ("NumSystemHolds", "i"),
-        (factoryConfig.frontend_name_attribute, "s"),
-        (factoryConfig.client_schedd_attribute, "s"),
-        (factoryConfig.credential_secclass_schedd_attribute, "s"),
-    ]
+    q_glidein_format_list = getCondorQFormatList(factoryConfig)
 
     q = condorMonitor.CondorQ(schedd_name)
     q.factory_name = factoryConfig.factory_name
@@ -276,6 +291,64 @@ def getCondorQData(entry_name, client_name, schedd_name, factoryConfig=None):
     return q
 
 
+def getCondorQGroupData(entry_names, schedd_name, factoryConfig=None):
+    """Get the Condor queue data of many entries on the same schedd with a single query.
+
+    The glideins of all the entries are retrieved with one condor_q and split by entry name.
+    The per-entry objects can be used in place of the ones returned by `getCondorQData` (with client_name None).
+
+    Args:
+        entry_names (list): Names of the entries, all using `schedd_name`.
+        schedd_name (str): HTCondor schedd name.
+        factoryConfig (FactoryConfig, optional): Factory configuration. Defaults to global configuration.
+
+    Returns:
+        dict: Loaded condorMonitor.SubQuery of each entry, keyed by entry name.
+            Entries with no glideins have an empty one.
+    """
+    if factoryConfig is None:
+        factoryConfig = globals()["factoryConfig"]
+
+    entry_sa = factoryConfig.entry_schedd_attribute
+    q_glidein_constraint = '({} =?= "{}") && ({} =?= "{}") && stringListMember({}, "{}") && ({} =!= UNDEFINED)'.format(
+        factoryConfig.factory_schedd_attribute,
+        factoryConfig.factory_name,
+        factoryConfig.glidein_schedd_attribute,
+        factoryConfig.glidein_name,
+        entry_sa,
+        ",".join(entry_names),
+        factoryConfig.credential_id_schedd_attribute,
+    )
+    q_glidein_format_list = getCondorQFormatList(factoryConfig) + [(entry_sa, "s")]
+
+    q = condorMonitor.CondorQ(schedd_name)
+    q.factory_name = factoryConfig.factory_name
+    q.glidein_name = factoryConfig.glidein_name
+    q.entry_name = None
+    q.client_name = None
+    q.load(q_glidein_constraint, q_glidein_format_list)
+
+    # Split the snapshot in one pass
+    entries_data = {entry_name: {} for entry_name in entry_names}
+    for jid, el in q.fetchStored().items():
+        entry_data = entries_data.get(el.get(entry_sa))
+        if entry_data is not None:
+            entry_data[jid] = el
+
+    out = {}
+    for entry_name, entry_data in entries_data.items():
+        entry_condorQ = condorMonitor.SubQuery(q, lambda d, entry_name=entry_name: d.get(entry_sa) == entry_name)
+        entry_condorQ.schedd_name = schedd_name
+        entry_condorQ.factory_name = q.factory_name
+        entry_condorQ.glidein_name = q.glidein_name
+        entry_condorQ.entry_name = entry_name
+        entry_condorQ.client_name = None
+        # Same as entry_condorQ.load(), without scanning the whole snapshot for each entry
+        entry_condorQ.stored_data = entry_data
+        out[entry_name] = entry_condorQ
+    return out
+
+
 def getCondorQCredentialList(factoryConfig=None):
     """Return a list of currently used credentials (proxies, ...) based on the glideins in the queue.
 
@@ -2017,6 +2090,8 @@ def removeGlideins(schedd_name, jid_list, force=False, log=logSupport.log, facto
     This function attempts to remove glidein jobs from the schedd.
     We are assuming gfactory (the Factory user) to be a HTCondor superuser or the only user owning jobs (Glideins)
     and thus does not need identity switching to remove jobs.
+    The jobs are removed in batches, with one condor_rm per batch, up to `factoryConfig.max_removes` jobs.
+    If some removals fail, more jobs from the list are tried until the limit is reached.
 
     Args:
         schedd_name (str): HTCondor schedd name.
@@ -2024,40 +2099,49 @@ def removeGlideins(schedd_name, jid_list, force=False, log=logSupport.log, facto
         force (bool, optional): If True, force removal. Defaults to False.
         log (logging.Logger): Logger. Defaults to the global logger.
         factoryConfig (FactoryConfig, optional): Factory configuration.
+
+    Returns:
+        list: List of the job IDs (tuples) removed.
     """
     if factoryConfig is None:
         factoryConfig = globals()["factoryConfig"]
 
     removed_jids = []
 
-    is_not_first = 0
-    for jid in jid_list:
+    start = 0
+    while start < len(jid_list):
         # Respect the max_removes limit and exit right away if required
-        if len(removed_jids) >= factoryConfig.max_removes:
+        nr_remaining = factoryConfig.max_removes - len(removed_jids)
+        if nr_remaining <= 0:
             break  # limit reached, stop
 
-        if is_not_first:
-            is_not_first = 1
+        if start > 0:
             time.sleep(factoryConfig.remove_sleep)
 
-        try:
-            # this will put a job in X state so that the next condor_rm --forcex below should work
-            condorManager.condorRemoveOne("%li.%li" % (jid[0], jid[1]), schedd_name)
-            removed_jids.append(jid)
-
-            # Force the removal if requested
-            if force is True:
-                try:
-                    log.info("Forcing the removal of glideins in X state")
-                    condorManager.condorRemoveOne("%li.%li" % (jid[0], jid[1]), schedd_name, do_forcex=True)
-                except condorExe.ExeError:
+        batch = jid_list[start : start + nr_remaining]
+        start += len(batch)
+        # this will put the jobs in X state so that the next condor_rm --forcex below should work
+        outcomes = condorManager.condorRemoveMany(batch, schedd_name)
+        batch_removed = []
+        for jid in batch:
+            err = outcomes.get((jid[0], jid[1]))
+            if err is None:
+                batch_removed.append(jid)
+            else:
+                # silently ignore errors, and try next one
+                log.warning("removeGlidein(%s,%li.%li): %s" % (schedd_name, jid[0], jid[1], err))
+        removed_jids += batch_removed
+
+        # Force the removal if requested
+        if force is True and batch_removed:
+            log.info("Forcing the removal of %i glideins in X state" % len(batch_removed))
+            outcomes = condorManager.condorRemoveMany(batch_removed, schedd_name, do_forcex=True)
+            for jid in batch_removed:
+                if outcomes.get((jid[0], jid[1])) is not None:
                     log.warning(f"Forcing the removal of glideins in {jid[0]}.{jid[1]} state failed")
 
-        except condorExe.ExeError as e:
-            # silently ignore errors, and try next one
-            log.warning("removeGlidein(%s,%li.%li): %s" % (schedd_name, jid[0], jid[1], e))
-
     log.info("Removed %i glideins on %s: %s" % (len(removed_jids), schedd_name, removed_jids))
+    return removed_jids
 
 
 def releaseGlideins(schedd_name, jid_list, log=logSupport.log, factoryConfig=None):
@@ -2065,33 +2149,44 @@ def releaseGlideins(schedd_name, jid_list, log=logSupport.log, factoryConfig=Non
 
     We are assuming gfactory (the Factory user) to be a HTCondor superuser or the only user owning jobs (Glideins)
     and thus does not need identity switching to release jobs.
+    The jobs are released in batches, with one condor_release per batch, within `factoryConfig.max_releases`.
 
     Args:
         schedd_name (str): HTCondor schedd name.
         jid_list (list): List of job IDs (tuples) to release.
         log (logging.Logger): Logger.
         factoryConfig (FactoryConfig, optional): Factory configuration.
+
+    Returns:
+        list: List of the job IDs (tuples) released.
     """
     if factoryConfig is None:
         factoryConfig = globals()["factoryConfig"]
 
     released_jids = []
 
-    is_not_first = 0
-    for jid in jid_list:
-        if len(released_jids) > factoryConfig.max_releases:
+    start = 0
+    while start < len(jid_list):
+        # The limit check used to happen before each release: up to max_releases+1 jobs are released
+        nr_remaining = factoryConfig.max_releases + 1 - len(released_jids)
+        if nr_remaining <= 0:
             break  # limit reached, stop
 
-        if is_not_first:
-            is_not_first = 1
+        if start > 0:
             time.sleep(factoryConfig.release_sleep)
-        try:
-            condorManager.condorReleaseOne("%li.%li" % (jid[0], jid[1]), schedd_name)
-            released_jids.append(jid)
-        except condorExe.ExeError as e:
-            log.warning("releaseGlidein(%s,%li.%li): %s" % (schedd_name, jid[0], jid[1], e))
+
+        batch = jid_list[start : start + nr_remaining]
+        start += len(batch)
+        outcomes = condorManager.condorReleaseMany(batch, schedd_name)
+        for jid in batch:
+            err = outcomes.get((jid[0], jid[1]))
+            if err is None:
+                released_jids.append(jid)
+            else:
+                log.warning("releaseGlidein(%s,%li.%li): %s" % (schedd_name, jid[0], jid[1], err))
 
     log.info("Released %i glideins on %s: %s" % (len(released_jids), schedd_name, released_jids))
+    return released_jids
 
 
 def in_submit_environment(entry_name, exe_env):
@@ -76,6 +76,172 @@ def rrd_site(name):
     return "rrd_%s.xml" % sname
 
 
+###########################################################
+#
+# Incremental aggregation
+#
+###########################################################
+
+
+class MonitorFileCache:
+    """Cache of the parsed monitoring files of the entries.
+
+    The aggregation runs periodically in the long-lived Factory process.
+    A file is parsed again only if its signature (modification time, size and inode) changed since the last pass,
+    otherwise the object returned by the previous parse is reused.
+    The monitoring files are replaced atomically (see `util.file_tmp2final`), so a new version has a new inode.
+
+    Attributes:
+        files (dict): File name -> (signature, parsed data).
+        parsed (int): Number of files parsed.
+        reused (int): Number of times a parsed file was reused.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.parsed = 0
+        self.reused = 0
+
+    def load(self, fname, parse_func):
+        """Return the parsed content of a file, parsing it only if it changed.
+
+        The objects returned are shared across the aggregation passes and must not be modified.
+
+        Args:
+            fname (str): File name.
+            parse_func (function): Function parsing the file, invoked with the file name.
+
+        Returns:
+            object: The value returned by `parse_func`, possibly from a previous pass.
+
+        Raises:
+            OSError: If the file cannot be read. Exceptions of `parse_func` are propagated.
+        """
+        try:
+            st = os.stat(fname)
+        except OSError:
+            self.files.pop(fname, None)
+            raise
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cached = self.files.get(fname)
+        if cached is not None and cached[0] == signature:
+            self.reused += 1
+            return cached[1]
+        data = parse_func(fname)
+        self.files[fname] = (signature, data)
+        self.parsed += 1
+        return data
+
+
+class IncrementalTotal:
+    """Sum of the nested dictionaries of numbers contributed by the entries.
+
+    When the contribution of an entry changes, the old values are subtracted and the new ones are added.
+    The cost of an update is proportional to the size of the contribution, not to the number of entries.
+    The totals are kept by path (tuple of keys), together with the number of contributions having each path.
+
+    Attributes:
+        contributions (dict): Contribution of each entry.
+        sums (dict): Path of a number -> sum of all the contributions.
+        counts (dict): Path of a number or dictionary -> number of contributions having it.
+    """
+
+    def __init__(self):
+        self.contributions = {}
+        self.sums = {}
+        self.counts = {}
+
+    def _add(self, contribution, sign, path=()):
+        for key, val in contribution.items():
+            key_path = path + (key,)
+            count = self.counts.get(key_path, 0) + sign
+            if isinstance(val, dict):
+                self._add(val, sign, key_path)
+            else:
+                self.sums[key_path] = self.sums.get(key_path, 0) + sign * val
+            if count == 0:
+                del self.counts[key_path]
+                self.sums.pop(key_path, None)
+            else:
+                self.counts[key_path] = count
+
+    def update(self, key, contribution):
+        """Set the contribution of an entry, replacing the previous one.
+
+        Nothing is done if the contribution is the same object already set.
+
+        Args:
+            key (str): Entry name.
+            contribution (dict): Nested dictionaries of numbers. It must not be modified afterwards.
+        """
+        old_contribution = self.contributions.get(key)
+        if old_contribution is contribution:
+            return
+        if old_contribution is not None:
+            self._add(old_contribution, -1)
+        self.contributions[key] = contribution
+        self._add(contribution, 1)
+
+    def remove(self, key):
+        """Remove the contribution of an entry, if any.
+
+        Args:
+            key (str): Entry name.
+        """
+        old_contribution = self.contributions.pop(key, None)
+        if old_contribution is not None:
+            self._add(old_contribution, -1)
+
+    def retain(self, keys):
+        """Remove the contributions of all the entries not in `keys`.
+
+        Args:
+            keys (set): Entry names to keep.
+        """
+        for key in [i for i in self.contributions if i not in keys]:
+            self.remove(key)
+
+    def count(self, path):
+        """Return the number of contributions having a path.
+
+        Args:
+            path (tuple): Path of a number or dictionary.
+
+        Returns:
+            int: Number of contributions having `path`.
+        """
+        return self.counts.get(path, 0)
+
+    def nested(self, path=()):
+        """Return the sums below a path as nested dictionaries, like the contributions.
+
+        Args:
+            path (tuple): Path of the dictionary to return, the whole total by default.
+
+        Returns:
+            dict: New nested dictionaries with the sums. Empty if no contribution has `path`.
+        """
+        out = {}
+        depth = len(path)
+        for key_path in self.counts:
+            if len(key_path) <= depth or key_path[:depth] != path:
+                continue
+            el = out
+            for key in key_path[depth:-1]:
+                el = el.setdefault(key, {})
+            if key_path in self.sums:
+                el[key_path[-1]] = self.sums[key_path]
+            else:
+                el.setdefault(key_path[-1], {})
+        return out
+
+
+# parsed entry files and running totals, kept across the aggregation passes
+monitorFileCache = MonitorFileCache()
+statusTotals = IncrementalTotal()
+logSummaryTotals = IncrementalTotal()
+
+
 ###########################################################
 #
 # Functions
@@ -167,6 +333,58 @@ def verifyRRD(fix_rrd=False, backup=True):
 
 
 ##############################################################################
+def parseJSONFile(fname):
+    """Load a JSON file.
+
+    Args:
+        fname (str): File name.
+
+    Returns:
+        object: The decoded JSON content.
+    """
+    with open(fname) as fp:
+        return json.load(fp)
+
+
+def parseStatusFile(status_fname):
+    """Parse the status file of an entry and extract its contribution to the totals.
+
+    Args:
+        status_fname (str): Name of the entry status file.
+
+    Returns:
+        tuple: The dictionary parsed from the XML file and the entry contribution to the totals,
+            with "total" (only if the entry has a total) and "frontends". All the values of the contribution
+            are integers, the Downtime status of the frontends is 1 if True and 0 if False.
+    """
+    # entry_data is a regular dictionary of nested dictionaries/lists returned form the XML parsed
+    entry_data = xmlParse.xmlsnapshot2dict(status_fname)
+    contribution = {"frontends": {}}
+    if "total" in entry_data:
+        contribution["total"] = {}
+        for w in ("Status", "Requested", "ClientMonitor"):
+            if w in entry_data["total"]:
+                el = entry_data["total"][w]
+                # coming from XML, everything is a string
+                contribution["total"][w] = {a: int(el[a]) for a in el}
+    if "frontends" in entry_data:
+        for fe in entry_data["frontends"]:
+            fe_el = contribution["frontends"][fe] = {}
+            for w in entry_data["frontends"][fe]:
+                ela = entry_data["frontends"][fe][w]
+                tela = fe_el[w] = {}
+                for a in ela:
+                    if w == "Downtime" and a == "status":
+                        # Check if 'True' or 'False' but default to True if neither
+                        tela[a] = int(ela[a] != "False")
+                    else:
+                        try:
+                            tela[a] = int(ela[a])
+                        except Exception:
+                            pass  # not an int, not Downtime, so do nothing
+    return entry_data, contribution
+
+
 def aggregateStatus(in_downtime):
     """Aggregate status files and return overall status information.
 
@@ -201,8 +419,7 @@ def aggregateStatus(in_downtime):
         for a in attributes_tp:
             val_dict[f"{tp_str}{a}"] = None
 
-    nr_entries = 0
-    nr_feentries = {}  # dictionary for nr entries per fe
+    nr_parsed = monitorFileCache.parsed
     for entry in monitorAggregatorConfig.entries:
         # load entry status file
         status_fname = os.path.join(
@@ -214,117 +431,61 @@ def aggregateStatus(in_downtime):
             f"entry_{entry}",
             monitorAggregatorConfig.completed_data_relname,
         )
-        completed_data_fp = None
         try:
-            # entry_data is a regular dictionary of nested dictionaries/lists returned form the XML parsed
-            entry_data = xmlParse.xmlfile2dict(status_fname)
-            completed_data_fp = open(completed_data_fname)
-            completed_data = json.load(completed_data_fp)
+            # only the files changed since the last pass are parsed
+            entry_data, contribution = monitorFileCache.load(status_fname, parseStatusFile)
+            completed_data = monitorFileCache.load(completed_data_fname, parseJSONFile)
         except OSError:
             continue  # file not found, ignore
-        finally:
-            if completed_data_fp:
-                completed_data_fp.close()
 
         # update entry
         status["entries"][entry] = {"downtime": entry_data["downtime"], "frontends": entry_data["frontends"]}
+        if "total" in entry_data:
+            status["entries"][entry]["total"] = entry_data["total"]
 
         # update completed data
         completed_data_tot["entries"][entry] = completed_data["stats"]
 
-        # to log when total dictionary is modified (in update total/frontend)
-        tmp_list_removed = []
-
-        # update total
-        if "total" in entry_data:
-            nr_entries += 1
-            status["entries"][entry]["total"] = entry_data["total"]
+        # replace the old contribution of the entry to the totals, if it changed
+        statusTotals.update(entry, contribution)
+    # forget the entries removed or without status files
+    statusTotals.retain(status["entries"])
+    logSupport.log.debug(
+        "aggregateStatus: %s entries, %s files parsed" % (len(status["entries"]), monitorFileCache.parsed - nr_parsed)
+    )
 
-            for w in list(global_total):  # making a copy of the keys because the dict is being modified (keys are not!)
-                tel = global_total[w]
-                if w not in entry_data["total"]:
-                    continue
-                el = entry_data["total"][w]
-                if tel is None:
-                    # new one, just copy over
-                    tel = {}
-                    for a in el:
-                        # coming from XML, everything is a string
-                        tel[a] = int(el[a])
-                    global_total[w] = tel
-                else:
-                    # successive, sum
-                    for a in el:
-                        if a in tel:  # pylint: disable=unsupported-membership-test
-                            tel[a] += int(el[a])  # pylint: disable=unsupported-assignment-operation
-                    # if any attribute from prev. frontends is not in the current one, remove from total
-                    for a in list(tel):  # making a copy of the keys because the dict is being modified
-                        if a not in el:
-                            del tel[a]  # pylint: disable=unsupported-delete-operation
-                            tmp_list_removed.append(a)
-                    if tmp_list_removed:
-                        logSupport.log.debug(
-                            "Elements removed from total status (%s: %s) because of %s: %s"
-                            % (w, len(tel), entry, tmp_list_removed)
-                        )
-                        tmp_list_removed = []
-
-        # update frontends
-        if "frontends" in entry_data:
-            # loop on fe's in this entry
-            for fe in entry_data["frontends"]:
-                # compare each to the list of fe's accumulated so far
-                if fe not in status_fe["frontends"]:
-                    status_fe["frontends"][fe] = {}
-                    fe_first = True
-                else:
-                    fe_first = False
-                # number of entries with this frontend
-                if fe not in nr_feentries:
-                    nr_feentries[fe] = 1  # first occurrence of frontend
-                else:
-                    nr_feentries[fe] += 1  # already found one
-                for w in entry_data["frontends"][fe]:
-                    # w is the entry name of the entry using the frontend
-                    if w not in status_fe["frontends"][fe]:
-                        status_fe["frontends"][fe][w] = {}
-                    tela = status_fe["frontends"][fe][w]
-                    ela = entry_data["frontends"][fe][w]
-                    for a in ela:
-                        # for the 'Downtime' field (only bool), do logical AND of all site downtimes
-                        #  'w' is frontend attribute name, ie 'ClientMonitor' or 'Downtime'
-                        #  'a' is sub-field, such as 'GlideIdle' or 'status'
-                        if w == "Downtime" and a == "status":
-                            ela_val = ela[a] != "False"  # Check if 'True' or 'False' but default to True if neither
-                            try:
-                                tela[a] = tela[a] and ela_val
-                            except KeyError:
-                                tela[a] = ela_val
-                            except Exception:
-                                pass  # just protect
-                        else:
-                            # All other fields could be numbers or something else
-                            try:
-                                # if is there already, sum
-                                if a in tela:
-                                    tela[a] += int(ela[a])
-                                else:
-                                    if fe_first:  # to avoid adding back attributes that were not in other frontends
-                                        tela[a] = int(ela[a])
-                            except Exception:
-                                pass  # not an int, not Downtime, so do nothing
-                    # if any attribute from prev. frontends is not in the current one, remove from total
-                    if not fe_first and w != "Downtime":
-                        for a in list(tela):  # making a copy of the keys because the dict is being modified
-                            if a not in ela:
-                                del tela[a]
-                                tmp_list_removed.append(a)
-                        if tmp_list_removed:
-                            logSupport.log.debug(
-                                "Elements removed from Frontend %s total status (%s: %s) because of %s: %s"
-                                % (fe, w, len(tela), entry, tmp_list_removed)
-                            )
-                            tmp_list_removed = []
+    # update total
+    # an attribute is in the total only if all the entries with that type of values (e.g. Status) have it
+    nr_entries = statusTotals.count(("total",))
+    for w in list(global_total):  # making a copy of the keys because the dict is being modified (keys are not!)
+        nr_w = statusTotals.count(("total", w))
+        if nr_w == 0:
+            continue
+        tel = {}
+        for a, val in statusTotals.nested(("total", w)).items():
+            if statusTotals.count(("total", w, a)) == nr_w:
+                tel[a] = val
+        global_total[w] = tel
+
+    # update frontends
+    # an attribute is in the frontend total only if all the entries of the frontend with that type of values have it
+    for fe, fe_el in statusTotals.nested(("frontends",)).items():
+        status_fe["frontends"][fe] = {}
+        # number of entries with this frontend
+        nr_feentries = statusTotals.count(("frontends", fe))
+        for w, ela in fe_el.items():
+            nr_w = statusTotals.count(("frontends", fe, w))
+            tela = status_fe["frontends"][fe][w] = {}
+            for a, val in ela.items():
+                nr_a = statusTotals.count(("frontends", fe, w, a))
+                if w == "Downtime" and a == "status":
+                    # for the 'Downtime' field (only bool), do logical AND of all site downtimes
+                    tela[a] = val == nr_a
+                elif nr_a == nr_w:
+                    tela[a] = val
+                    # do average for per-fe stat--'InfoAge' only
+                    if a in avgEntries:
+                        tela[a] = tela[a] // nr_feentries  # divide per fe
 
     for w in list(global_total):  # making a copy of the keys because the dict is being modified
         if global_total[w] is None:
@@ -338,28 +499,22 @@ def aggregateStatus(in_downtime):
                         tel[a] // nr_entries
                     )  # pylint: disable=unsupported-assignment-operation,unsubscriptable-object
 
-    # do average for per-fe stat--'InfoAge' only
-    for fe in list(status_fe["frontends"].keys()):
-        for w in list(status_fe["frontends"][fe].keys()):
-            tel = status_fe["frontends"][fe][w]
-            for a in list(tel.keys()):
-                if a in avgEntries and fe in nr_feentries:
-                    tel[a] = tel[a] // nr_feentries[fe]  # divide per fe
-
-    xml_downtime = xmlFormat.dict2string(
-        {}, dict_name="downtime", el_name="", params={"status": str(in_downtime)}, leading_tab=xmlFormat.DEFAULT_TAB
-    )
-
     # Write xml files
     updated = time.time()
-    xml_str = (
-        '<?xml version="1.0" encoding="ISO-8859-1"?>\n\n'
-        + "<glideFactoryQStats>\n"
-        + xmlFormat.time2xml(updated, "updated", indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-        + "\n"
-        + xml_downtime
-        + "\n"
-        + xmlFormat.dict2string(
+
+    def write_xml(fd):
+        fd.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n\n<glideFactoryQStats>\n')
+        xmlFormat.time2file(fd, updated, "updated", leading_tab=xmlFormat.DEFAULT_TAB)
+        xmlFormat.dict2file(
+            fd,
+            {},
+            dict_name="downtime",
+            el_name="",
+            params={"status": str(in_downtime)},
+            leading_tab=xmlFormat.DEFAULT_TAB,
+        )
+        xmlFormat.dict2file(
+            fd,
             status["entries"],
             dict_name="entries",
             el_name="entry",
@@ -385,10 +540,9 @@ def aggregateStatus(in_downtime):
             },
             leading_tab=xmlFormat.DEFAULT_TAB,
         )
-        + "\n"
-        + xmlFormat.class2string(status["total"], inst_name="total", leading_tab=xmlFormat.DEFAULT_TAB)
-        + "\n"
-        + xmlFormat.dict2string(
+        xmlFormat.class2file(fd, status["total"], inst_name="total", leading_tab=xmlFormat.DEFAULT_TAB)
+        xmlFormat.dict2file(
+            fd,
             status_fe["frontends"],
             dict_name="frontends",
             el_name="frontend",
@@ -403,10 +557,9 @@ def aggregateStatus(in_downtime):
             },
             leading_tab=xmlFormat.DEFAULT_TAB,
         )
-        + "\n"
-        + "</glideFactoryQStats>\n"
-    )
-    glideFactoryMonitoring.monitoringConfig.write_file(monitorAggregatorConfig.status_relname, xml_str)
+        fd.write("</glideFactoryQStats>\n")
+
+    glideFactoryMonitoring.monitoringConfig.write_xml_file(monitorAggregatorConfig.status_relname, write_xml)
 
     # write json
     glideFactoryMonitoring.monitoringConfig.write_completed_json(
@@ -512,18 +665,12 @@ def aggregateJobsSummary():
 
 
 ######################################################################################
-def aggregateLogSummary():
-    """Aggregate log summary files and write an aggregate log summary.
-
-    This function creates an aggregate of log summary files from all entries, writes the aggregate log summary XML file,
-    and returns the aggregated log summary dictionary.
+def initLogSummaryTotal():
+    """Return the log summary total with all the counters set to 0.
 
     Returns:
-        dict: Dictionary containing aggregated log summary information.
+        dict: Log summary total, with "Current", "Entered", "Exited" and "CompletedCounts".
     """
-    global monitorAggregatorConfig
-
-    # initialize global counters
     global_total = {
         "Current": {},
         "Entered": {},
@@ -572,12 +719,122 @@ def aggregateLogSummary():
         "JobsTerminated": 0,
         "CondorLasted": 0,
     }
+    return global_total
+
+
+def parseLogSummaryFile(status_fname):
+    """Parse the log summary file of an entry and convert its counters to integers.
+
+    Args:
+        status_fname (str): Name of the entry log summary file.
+
+    Returns:
+        dict: Entry log summary, with "frontends" and "total" (only if the entry has a total).
+            It is also the entry contribution to the totals.
+    """
+    entry_data = xmlParse.xmlsnapshot2dict(
+        status_fname, always_singular_list=glideFactoryMonitoring.LOG_SUMMARY_SINGULAR_LIST
+    )
+    # the total has the same states of the global total
+    total_keys = initLogSummaryTotal()
+
+    out_data = {}
+    for frontend in list(entry_data["frontends"].keys()):
+        fe_el = entry_data["frontends"][frontend]
+        out_fe_el = {}
+        for k in ["Current", "Entered", "Exited"]:
+            out_fe_el[k] = {}
+            for s in list(fe_el[k].keys()):
+                out_fe_el[k][s] = int(fe_el[k][s])
+        out_fe_el["CompletedCounts"] = {
+            "Waste": {},
+            "WasteTime": {},
+            "Lasted": {},
+            "JobsNr": {},
+            "JobsDuration": {},
+            "Sum": {},
+        }
+        for tkey in list(fe_el["CompletedCounts"]["Sum"].keys()):
+            out_fe_el["CompletedCounts"]["Sum"][tkey] = int(fe_el["CompletedCounts"]["Sum"][tkey])
+        for k in glideFactoryMonitoring.getAllJobTypes():
+            for w in ("Waste", "WasteTime"):
+                out_fe_el["CompletedCounts"][w][k] = {}
+                for t in glideFactoryMonitoring.getAllMillRanges():
+                    out_fe_el["CompletedCounts"][w][k][t] = int(fe_el["CompletedCounts"][w][k][t]["val"])
+        for t in glideFactoryMonitoring.getAllTimeRanges():
+            out_fe_el["CompletedCounts"]["Lasted"][t] = int(fe_el["CompletedCounts"]["Lasted"][t]["val"])
+        out_fe_el["CompletedCounts"]["JobsDuration"] = {}
+        for t in glideFactoryMonitoring.getAllTimeRanges():
+            out_fe_el["CompletedCounts"]["JobsDuration"][t] = int(fe_el["CompletedCounts"]["JobsDuration"][t]["val"])
+        for t in glideFactoryMonitoring.getAllJobRanges():
+            out_fe_el["CompletedCounts"]["JobsNr"][t] = int(fe_el["CompletedCounts"]["JobsNr"][t]["val"])
+        out_data[frontend] = out_fe_el
+
+    entry_el = {"frontends": out_data}
+
+    if "total" in entry_data:
+        local_total = {}
+
+        for k in ["Current", "Entered", "Exited"]:
+            local_total[k] = {}
+            for s in list(total_keys[k].keys()):
+                local_total[k][s] = int(entry_data["total"][k][s])
+        local_total["CompletedCounts"] = {
+            "Sum": {},
+            "Waste": {},
+            "WasteTime": {},
+            "Lasted": {},
+            "JobsNr": {},
+            "JobsDuration": {},
+        }
+        for tkey in list(entry_data["total"]["CompletedCounts"]["Sum"].keys()):
+            local_total["CompletedCounts"]["Sum"][tkey] = int(entry_data["total"]["CompletedCounts"]["Sum"][tkey])
+        for k in glideFactoryMonitoring.getAllJobTypes():
+            for w in ("Waste", "WasteTime"):
+                local_total["CompletedCounts"][w][k] = {}
+                for t in glideFactoryMonitoring.getAllMillRanges():
+                    local_total["CompletedCounts"][w][k][t] = int(
+                        entry_data["total"]["CompletedCounts"][w][k][t]["val"]
+                    )
+
+        for t in glideFactoryMonitoring.getAllTimeRanges():
+            local_total["CompletedCounts"]["Lasted"][t] = int(
+                entry_data["total"]["CompletedCounts"]["Lasted"][t]["val"]
+            )
+        local_total["CompletedCounts"]["JobsDuration"] = {}
+        for t in glideFactoryMonitoring.getAllTimeRanges():
+            local_total["CompletedCounts"]["JobsDuration"][t] = int(
+                entry_data["total"]["CompletedCounts"]["JobsDuration"][t]["val"]
+            )
+
+        for t in glideFactoryMonitoring.getAllJobRanges():
+            local_total["CompletedCounts"]["JobsNr"][t] = int(
+                entry_data["total"]["CompletedCounts"]["JobsNr"][t]["val"]
+            )
+
+        entry_el["total"] = local_total
+
+    return entry_el
+
+
+def aggregateLogSummary():
+    """Aggregate log summary files and write an aggregate log summary.
+
+    This function creates an aggregate of log summary files from all entries, writes the aggregate log summary XML file,
+    and returns the aggregated log summary dictionary.
+
+    Returns:
+        dict: Dictionary containing aggregated log summary information.
+    """
+    global monitorAggregatorConfig
+
+    # initialize global counters
+    global_total = initLogSummaryTotal()
 
     status = {"entries": {}, "total": global_total}
     status_fe = {"frontends": {}}  # analogous to above but for frontend totals
 
-    nr_entries = 0
-    nr_feentries = {}  # dictionary for nr entries per fe
+    nr_parsed = monitorFileCache.parsed
     for entry in monitorAggregatorConfig.entries:
         # load entry log summary file
         status_fname = os.path.join(
@@ -587,128 +844,39 @@ def aggregateLogSummary():
         )
 
         try:
-            entry_data = xmlParse.xmlfile2dict(status_fname, always_singular_list=["Fraction", "TimeRange", "Range"])
+            # only the files changed since the last pass are parsed
+            entry_el = monitorFileCache.load(status_fname, parseLogSummaryFile)
         except OSError:
             logSupport.log.debug(f"Missing file {status_fname}: ignoring and continuing")
             continue  # file not found, ignore
 
         # update entry
-        out_data = {}
-        for frontend in list(entry_data["frontends"].keys()):
-            fe_el = entry_data["frontends"][frontend]
-            out_fe_el = {}
-            for k in ["Current", "Entered", "Exited"]:
-                out_fe_el[k] = {}
-                for s in list(fe_el[k].keys()):
-                    out_fe_el[k][s] = int(fe_el[k][s])
-            out_fe_el["CompletedCounts"] = {
-                "Waste": {},
-                "WasteTime": {},
-                "Lasted": {},
-                "JobsNr": {},
-                "JobsDuration": {},
-                "Sum": {},
-            }
-            for tkey in list(fe_el["CompletedCounts"]["Sum"].keys()):
-                out_fe_el["CompletedCounts"]["Sum"][tkey] = int(fe_el["CompletedCounts"]["Sum"][tkey])
-            for k in glideFactoryMonitoring.getAllJobTypes():
-                for w in ("Waste", "WasteTime"):
-                    out_fe_el["CompletedCounts"][w][k] = {}
-                    for t in glideFactoryMonitoring.getAllMillRanges():
-                        out_fe_el["CompletedCounts"][w][k][t] = int(fe_el["CompletedCounts"][w][k][t]["val"])
-            for t in glideFactoryMonitoring.getAllTimeRanges():
-                out_fe_el["CompletedCounts"]["Lasted"][t] = int(fe_el["CompletedCounts"]["Lasted"][t]["val"])
-            out_fe_el["CompletedCounts"]["JobsDuration"] = {}
-            for t in glideFactoryMonitoring.getAllTimeRanges():
-                out_fe_el["CompletedCounts"]["JobsDuration"][t] = int(
-                    fe_el["CompletedCounts"]["JobsDuration"][t]["val"]
-                )
-            for t in glideFactoryMonitoring.getAllJobRanges():
-                out_fe_el["CompletedCounts"]["JobsNr"][t] = int(fe_el["CompletedCounts"]["JobsNr"][t]["val"])
-            out_data[frontend] = out_fe_el
-
-        status["entries"][entry] = {"frontends": out_data}
-
-        # update total
-        if "total" in entry_data:
-            nr_entries += 1
-            local_total = {}
-
-            for k in ["Current", "Entered", "Exited"]:
-                local_total[k] = {}
-                for s in list(global_total[k].keys()):
-                    local_total[k][s] = int(entry_data["total"][k][s])
-                    global_total[k][s] += int(entry_data["total"][k][s])
-            local_total["CompletedCounts"] = {
-                "Sum": {},
-                "Waste": {},
-                "WasteTime": {},
-                "Lasted": {},
-                "JobsNr": {},
-                "JobsDuration": {},
-            }
-            for tkey in list(entry_data["total"]["CompletedCounts"]["Sum"].keys()):
-                local_total["CompletedCounts"]["Sum"][tkey] = int(entry_data["total"]["CompletedCounts"]["Sum"][tkey])
-                global_total["CompletedCounts"]["Sum"][tkey] += int(entry_data["total"]["CompletedCounts"]["Sum"][tkey])
-            for k in glideFactoryMonitoring.getAllJobTypes():
-                for w in ("Waste", "WasteTime"):
-                    local_total["CompletedCounts"][w][k] = {}
-                    for t in glideFactoryMonitoring.getAllMillRanges():
-                        local_total["CompletedCounts"][w][k][t] = int(
-                            entry_data["total"]["CompletedCounts"][w][k][t]["val"]
-                        )
-                        global_total["CompletedCounts"][w][k][t] += int(
-                            entry_data["total"]["CompletedCounts"][w][k][t]["val"]
-                        )
-
-            for t in glideFactoryMonitoring.getAllTimeRanges():
-                local_total["CompletedCounts"]["Lasted"][t] = int(
-                    entry_data["total"]["CompletedCounts"]["Lasted"][t]["val"]
-                )
-                global_total["CompletedCounts"]["Lasted"][t] += int(
-                    entry_data["total"]["CompletedCounts"]["Lasted"][t]["val"]
-                )
-            local_total["CompletedCounts"]["JobsDuration"] = {}
-            for t in glideFactoryMonitoring.getAllTimeRanges():
-                local_total["CompletedCounts"]["JobsDuration"][t] = int(
-                    entry_data["total"]["CompletedCounts"]["JobsDuration"][t]["val"]
-                )
-                global_total["CompletedCounts"]["JobsDuration"][t] += int(
-                    entry_data["total"]["CompletedCounts"]["JobsDuration"][t]["val"]
-                )
-
-            for t in glideFactoryMonitoring.getAllJobRanges():
-                local_total["CompletedCounts"]["JobsNr"][t] = int(
-                    entry_data["total"]["CompletedCounts"]["JobsNr"][t]["val"]
-                )
-                global_total["CompletedCounts"]["JobsNr"][t] += int(
-                    entry_data["total"]["CompletedCounts"]["JobsNr"][t]["val"]
-                )
-
-            status["entries"][entry]["total"] = local_total
+        status["entries"][entry] = entry_el
+
+        # replace the old contribution of the entry to the totals, if it changed
+        logSummaryTotals.update(entry, entry_el)
+    # forget the entries removed or without log summary files
+    logSummaryTotals.retain(status["entries"])
+    logSupport.log.debug(
+        "aggregateLogSummary: %s entries, %s files parsed"
+        % (len(status["entries"]), monitorFileCache.parsed - nr_parsed)
+    )
 
-        # update frontends
-        for fe in out_data:
-            # compare each to the list of fe's accumulated so far
-            if fe not in status_fe["frontends"]:
-                status_fe["frontends"][fe] = {}
-            if fe not in nr_feentries:
-                nr_feentries[fe] = 1  # already found one
-            else:
-                nr_feentries[fe] += 1
+    # update total
+    sumDictInt(logSummaryTotals.nested(("total",)), global_total)
 
-            # sum them up
-            sumDictInt(out_data[fe], status_fe["frontends"][fe])
+    # update frontends
+    status_fe["frontends"] = logSummaryTotals.nested(("frontends",))
 
     # Write xml files
     # To do - Igor: Consider adding status_fe to the XML file
     updated = time.time()
-    xml_str = (
-        '<?xml version="1.0" encoding="ISO-8859-1"?>\n\n'
-        + "<glideFactoryLogSummary>\n"
-        + xmlFormat.time2xml(updated, "updated", indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-        + "\n"
-        + xmlFormat.dict2string(
+
+    def write_xml(fd):
+        fd.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n\n<glideFactoryLogSummary>\n')
+        xmlFormat.time2file(fd, updated, "updated", leading_tab=xmlFormat.DEFAULT_TAB)
+        xmlFormat.dict2file(
+            fd,
             status["entries"],
             dict_name="entries",
             el_name="entry",
@@ -737,17 +905,16 @@ def aggregateLogSummary():
             },
             leading_tab=xmlFormat.DEFAULT_TAB,
         )
-        + "\n"
-        + xmlFormat.class2string(
+        xmlFormat.class2file(
+            fd,
             status["total"],
             inst_name="total",
             subclass_params={"CompletedCounts": glideFactoryMonitoring.get_completed_stats_xml_desc()},
             leading_tab=xmlFormat.DEFAULT_TAB,
         )
-        + "\n"
-        + "</glideFactoryLogSummary>\n"
-    )
-    glideFactoryMonitoring.monitoringConfig.write_file(monitorAggregatorConfig.logsummary_relname, xml_str)
+        fd.write("</glideFactoryLogSummary>\n")
+
+    glideFactoryMonitoring.monitoringConfig.write_xml_file(monitorAggregatorConfig.logsummary_relname, write_xml)
 
     # Write rrds
     writeLogSummaryRRDs("total", status["total"])
@@ -866,6 +1033,30 @@ def writeLogSummaryRRDs(fe_dir, status_el):
     )
 
 
+def parseRRDStatsFile(rrd_fname):
+    """Parse the RRD statistics XML file of an entry.
+
+    Args:
+        rrd_fname (str): Name of the entry RRD statistics file.
+
+    Returns:
+        dict: Dictionary parsed from the XML file.
+    """
+    return xmlParse.xmlsnapshot2dict(rrd_fname, always_singular_list=glideFactoryMonitoring.RRD_STATS_SINGULAR_LIST)
+
+
+def periods2xmldict(periods):
+    """Return the dictionary corresponding to the XML of a periods dictionary in the RRD statistics files.
+
+    Args:
+        periods (dict): Values by resolution and data set.
+
+    Returns:
+        dict: The dictionary `xmlParse` returns for the XML.
+    """
+    return xmlFormat.dict2xmldict(periods, subtypes_params={"class": {}})
+
+
 def aggregateRRDStats(log=logSupport.log):
     """Aggregate RRD statistics from monitoring and write the aggregate files.
 
@@ -886,7 +1077,8 @@ def aggregateRRDStats(log=logSupport.log):
         for entry in monitorAggregatorConfig.entries:
             rrd_fname = os.path.join(monitorAggregatorConfig.monitor_dir, f"entry_{entry}", rrd_site(rrd))
             try:
-                stats[entry] = xmlParse.xmlfile2dict(rrd_fname, always_singular_list={"timezone": {}})
+                # only the files changed since the last pass are parsed
+                stats[entry] = monitorFileCache.load(rrd_fname, parseRRDStatsFile)
             except FileNotFoundError:
                 log.debug(
                     f"aggregateRRDStats {rrd_fname} exception: parse_xml, IOError, File not found (OK if first time)"
@@ -1078,5 +1270,31 @@ def aggregateRRDStats(log=logSupport.log):
             glideFactoryMonitoring.monitoringConfig.write_file(rrd_site(rrd), xml_str)
         except OSError:
             log.debug("write_file %s, IOError" % rrd_site(rrd))
+            continue
+
+        # binary snapshot with the same content, for the tools reading the aggregate
+        snapshot = {
+            "updated": xmlFormat.time2xmldict(updated, glideFactoryMonitoring.RRD_STATS_SINGULAR_LIST),
+            "entries": {},
+            "total": {"total": {"periods": periods2xmldict(aggregate_output["total"])}, "frontends": {}},
+        }
+        for entry in stats_entries:
+            entry_el = {"total": {"periods": periods2xmldict(stats[entry]["total"]["periods"])}, "frontends": {}}
+            for frontend in stats[entry]["frontends"]:
+                try:
+                    entry_el["frontends"][frontend] = {
+                        "periods": periods2xmldict(stats[entry]["frontends"][frontend]["periods"])
+                    }
+                except KeyError:
+                    entry_el["frontends"][frontend] = {}
+            snapshot["entries"][entry.split("/")[-1]] = entry_el
+        for frontend in frontends:
+            snapshot["total"]["frontends"][frontend] = {"periods": periods2xmldict(aggregate_output[frontend])}
+        try:
+            glideFactoryMonitoring.monitoringConfig.write_snapshot(
+                rrd_site(rrd), snapshot, glideFactoryMonitoring.RRD_STATS_SINGULAR_LIST
+            )
+        except OSError:
+            log.debug("write_snapshot %s, IOError" % rrd_site(rrd))
 
     return
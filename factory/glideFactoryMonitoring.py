@@ -11,7 +11,7 @@ import pickle
 import re
 import time
 
-from glideinwms.lib import cleanupSupport, logSupport, rrdSupport, timeConversion, util, xmlFormat
+from glideinwms.lib import cleanupSupport, logSupport, rrdSupport, timeConversion, util, xmlFormat, xmlParse
 
 # list of rrd files that each site has
 RRD_LIST = (
@@ -22,6 +22,10 @@ RRD_LIST = (
     "Log_Counts.rrd",
 )
 
+# always_singular_list used to parse the log summary and RRD stats XML files (and to write their snapshots)
+LOG_SUMMARY_SINGULAR_LIST = ["Fraction", "TimeRange", "Range"]
+RRD_STATS_SINGULAR_LIST = ["timezone"]
+
 
 ############################################################
 #
@@ -44,6 +48,8 @@ class MonitoringConfig:
         log_dir (str): The directory where log files are stored. Default is "log/".
         logCleanupObj: An object for cleaning up log files (initially None).
         rrd_obj: An instance of rrdSupport.rrdSupport() for creating/updating RRD files.
+        rrd_batch_obj: rrdSupport.BatchRRDSupport used in place of rrd_obj in rrd_batch() contexts.
+        write_snapshots (bool): If True, write_snapshot writes the binary snapshots of the XML files. Default is True.
         my_name (str): The name of the monitor (default "Unknown").
         log: The logger to use.
     """
@@ -67,6 +73,10 @@ class MonitoringConfig:
         self.logCleanupObj = None
 
         self.rrd_obj = rrdSupport.rrdSupport()
+        # Created and reused by rrd_batch
+        self.rrd_batch_obj = None
+        # Binary snapshots of the XML files, read by the aggregators and tools instead of the XML
+        self.write_snapshots = True
         """@ivar: The name of the attribute that identifies the glidein """
         self.my_name = "Unknown"
         self.log = log
@@ -178,6 +188,36 @@ class MonitoringConfig:
         util.file_tmp2final(fname, mask_exceptions=(self.log.error, "Failed rename/write into %s" % fname))
         return
 
+    def write_xml_file(self, relative_fname, write_func, compress=False):
+        """Write a file incrementally, without building its content in memory.
+
+        Args:
+            relative_fname (str): The relative file path to write to.
+            write_func (callable): Function writing the content into the open file passed as argument,
+                e.g. with the `xmlFormat` *2file functions.
+            compress (bool): If True, the file is gzip compressed. Defaults to False.
+        """
+        fname = os.path.join(self.monitor_dir, relative_fname)
+        with xmlFormat.open_xml_file(fname + ".tmp", compress) as fd:
+            write_func(fd)
+
+        util.file_tmp2final(fname, mask_exceptions=(self.log.error, "Failed rename/write into %s" % fname))
+        return
+
+    def write_snapshot(self, relative_fname, data, always_singular_list=[]):
+        """Write the binary snapshot of an XML file, if enabled.
+
+        The snapshot is written after the XML file, for the consumers using `xmlParse.xmlsnapshot2dict`.
+
+        Args:
+            relative_fname (str): The relative path of the XML file.
+            data (dict): The dictionary `xmlParse.xmlfile2dict` returns for the XML file.
+            always_singular_list (list): The always_singular_list used by the consumers to parse the XML file.
+        """
+        if not self.write_snapshots:
+            return
+        self.write_file(xmlParse.snapshot_fname(relative_fname), xmlParse.snapshot_dumps(data, always_singular_list))
+
     def write_completed_json(self, relative_fname, time, val_dict):
         """Write a dictionary to a JSON file.
 
@@ -307,6 +347,14 @@ class MonitoringConfig:
                 self.log.exception("Failed to update %s: " % fname)
         return
 
+    def rrd_batch(self):
+        """Context manager queuing the RRD updates and writing them all at the end, see `rrdSupport.rrd_batch`.
+
+        The RRD files are updated only when exiting the context: do not read them (e.g. fetch) inside it.
+        Nested contexts are part of the outer batch.
+        """
+        return rrdSupport.rrd_batch(self, self.log)
+
 
 #######################################################################################################################
 #
@@ -334,6 +382,11 @@ class condorQStats:
         expected_cores (int): Expected number of cores per glidein.
     """
 
+    # XML format of the frontends data, also used for the snapshot
+    xml_data_subtypes_params = {
+        "class": {"subclass_params": {"Requested": {"dicts_params": {"Parameters": {"el_name": "Parameter"}}}}}
+    }
+
     def __init__(self, log=logSupport.log, cores=1):
         """Initialize condorQStats object with empty data and default values.
 
@@ -640,9 +693,7 @@ class condorQStats:
             data,
             dict_name="frontends",
             el_name="frontend",
-            subtypes_params={
-                "class": {"subclass_params": {"Requested": {"dicts_params": {"Parameters": {"el_name": "Parameter"}}}}}
-            },
+            subtypes_params=condorQStats.xml_data_subtypes_params,
             indent_tab=indent_tab,
             leading_tab=leading_tab,
         )
@@ -784,20 +835,38 @@ class condorQStats:
             total_el = self.get_total()
 
         # write snapshot file
-        xml_str = (
-            '<?xml version="1.0" encoding="ISO-8859-1"?>\n\n'
-            + "<glideFactoryEntryQStats>\n"
-            + self.get_xml_updated(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_downtime(leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_data(data, indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_total(total_el, indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + "</glideFactoryEntryQStats>\n"
+        def write_xml(fd):
+            fd.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n\n<glideFactoryEntryQStats>\n')
+            xmlFormat.time2file(fd, self.updated, "updated", leading_tab=xmlFormat.DEFAULT_TAB)
+            xmlFormat.dict2file(
+                fd,
+                {},
+                dict_name="downtime",
+                el_name="",
+                params={"status": self.downtime},
+                leading_tab=xmlFormat.DEFAULT_TAB,
+            )
+            xmlFormat.dict2file(
+                fd,
+                data,
+                dict_name="frontends",
+                el_name="frontend",
+                subtypes_params=self.xml_data_subtypes_params,
+                leading_tab=xmlFormat.DEFAULT_TAB,
+            )
+            xmlFormat.class2file(fd, total_el, inst_name="total", leading_tab=xmlFormat.DEFAULT_TAB)
+            fd.write("</glideFactoryEntryQStats>\n")
+
+        monitoringConfig.write_xml_file("schedd_status.xml", write_xml)
+        monitoringConfig.write_snapshot(
+            "schedd_status.xml",
+            {
+                "updated": xmlFormat.time2xmldict(self.updated),
+                "downtime": {"status": xmlFormat.xml_attr_text(self.downtime)},
+                "frontends": xmlFormat.dict2xmldict(data, subtypes_params=self.xml_data_subtypes_params),
+                "total": xmlFormat.class2xmldict(total_el),
+            },
         )
-        monitoringConfig.write_file("schedd_status.xml", xml_str)
 
         # update RRDs
         type_strings = {"Status": "Status", "Requested": "Req", "ClientMonitor": "Client"}
@@ -1316,17 +1385,19 @@ class condorLogSummary:
             stats_data[client_name] = out_el
         return stats_data
 
-    def get_xml_data(self, indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=""):
+    def get_xml_data(self, indent_tab=xmlFormat.DEFAULT_TAB, leading_tab="", data=None):
         """Convert the summarized differential data to an XML formatted string.
 
         Args:
             indent_tab (str, optional): Indentation string. Defaults to xmlFormat.DEFAULT_TAB.
             leading_tab (str, optional): Leading indentation string. Defaults to "".
+            data (dict, optional): The summarized data, if already calculated (`self.get_data_summary()`).
 
         Returns:
             str: XML formatted string of the summarized data.
         """
-        data = self.get_data_summary()
+        if data is None:
+            data = self.get_data_summary()
         return xmlFormat.dict2string(
             data,
             dict_name="frontends",
@@ -1452,17 +1523,19 @@ class condorLogSummary:
 
         return out_total
 
-    def get_xml_total(self, indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=""):
+    def get_xml_total(self, indent_tab=xmlFormat.DEFAULT_TAB, leading_tab="", total=None):
         """Convert the total summary to an XML formatted string.
 
         Args:
             indent_tab (str, optional): Indentation string. Defaults to xmlFormat.DEFAULT_TAB.
             leading_tab (str, optional): Leading indentation string. Defaults to "".
+            total (dict, optional): The total summary, if already calculated (`self.get_total_summary()`).
 
         Returns:
             str: XML formatted total summary.
         """
-        total = self.get_total_summary()
+        if total is None:
+            total = self.get_total_summary()
         return xmlFormat.class2string(
             total,
             inst_name="total",
@@ -1498,18 +1571,42 @@ class condorLogSummary:
             return
 
         # write snapshot file
-        xml_str = (
-            '<?xml version="1.0" encoding="ISO-8859-1"?>\n\n'
-            + "<glideFactoryEntryLogSummary>\n"
-            + self.get_xml_updated(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_data(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_total(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + "</glideFactoryEntryLogSummary>\n"
+        data = self.get_data_summary()
+        total = self.get_total_summary()
+        completed_stats_desc = get_completed_stats_xml_desc()
+
+        def write_xml(fd):
+            fd.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n\n<glideFactoryEntryLogSummary>\n')
+            xmlFormat.time2file(fd, self.updated, "updated", leading_tab=xmlFormat.DEFAULT_TAB)
+            xmlFormat.dict2file(
+                fd,
+                data,
+                dict_name="frontends",
+                el_name="frontend",
+                subtypes_params={"class": {"subclass_params": {"CompletedCounts": completed_stats_desc}}},
+                leading_tab=xmlFormat.DEFAULT_TAB,
+            )
+            xmlFormat.class2file(
+                fd,
+                total,
+                inst_name="total",
+                subclass_params={"CompletedCounts": completed_stats_desc},
+                leading_tab=xmlFormat.DEFAULT_TAB,
+            )
+            fd.write("</glideFactoryEntryLogSummary>\n")
+
+        monitoringConfig.write_xml_file("log_summary.xml", write_xml)
+        monitoringConfig.write_snapshot(
+            "log_summary.xml",
+            {
+                "updated": xmlFormat.time2xmldict(self.updated),
+                "frontends": xmlFormat.dict2xmldict(
+                    data, subtypes_params={"class": {"subclass_params": {"CompletedCounts": completed_stats_desc}}}
+                ),
+                "total": xmlFormat.class2xmldict(total, subclass_params={"CompletedCounts": completed_stats_desc}),
+            },
+            LOG_SUMMARY_SINGULAR_LIST,
         )
-        monitoringConfig.write_file("log_summary.xml", xml_str)
 
         # update rrds
         stats_data_summary = self.get_stats_data_summary()
@@ -1966,6 +2063,29 @@ class FactoryStatusData:
         data_str = total_xml_str + frontend_xml_str
         return data_str
 
+    def getSnapshotData(self, rrd):
+        """Return the dictionary corresponding to the XML file of the specified RRD data, for its snapshot.
+
+        It must be called after `getXMLData`, which updates the total data.
+
+        Args:
+            rrd (str): The RRD file name.
+
+        Returns:
+            dict: The dictionary returned by `xmlParse` for the XML file, parsed with RRD_STATS_SINGULAR_LIST.
+        """
+        data = {
+            "updated": xmlFormat.time2xmldict(self.updated, RRD_STATS_SINGULAR_LIST),
+            "total": {"periods": xmlFormat.dict2xmldict(self.data[rrd][self.total], subtypes_params={"class": {}})},
+            "frontends": {},
+        }
+        for frontend in self.frontends:
+            fe_name = frontend.split("/")[0]
+            data["frontends"][fe_name] = {
+                "periods": xmlFormat.dict2xmldict(self.data[rrd][frontend], subtypes_params={"class": {}})
+            }
+        return data
+
     def writeFiles(self, monitoringConfig=None):
         """Write XML and RRD files for the site (Factory entry) status data.
 
@@ -1991,6 +2111,7 @@ class FactoryStatusData:
             )
             try:
                 monitoringConfig.write_file(file_name, xml_str)
+                monitoringConfig.write_snapshot(file_name, self.getSnapshotData(rrd), RRD_STATS_SINGULAR_LIST)
             except OSError:
                 self.log.exception("FactoryStatusData:write_file: ")
         return
@@ -44,7 +44,8 @@ def aggregate_stats():
     Returns:
         dict: Aggregated statistics for the frontend.
     """
-    return glideinFrontendMonitorAggregator.aggregateStatus()
+    with glideinFrontendMonitoring.monitoringConfig.rrd_batch():
+        return glideinFrontendMonitorAggregator.aggregateStatus()
 
 
 ############################################################
@@ -184,6 +185,7 @@ def spawn_iteration(work_dir, frontendDescript, groups, max_active, failure_dict
 
     max_num_failures = 0
     logSupport.log.info("Starting iteration")
+    clear_query_cache_dir(work_dir)
     try:
         while groups_tofinish > 0:
             done_something = False
@@ -566,6 +568,23 @@ def clear_diskcache_dir(work_dir):
     os.mkdir(cache_dir)
 
 
+def clear_query_cache_dir(work_dir):
+    """Empty the directory with the query results shared by the groups.
+
+    Called at the beginning of each iteration, so that the groups share the query results only
+    within the same iteration. The cache is an optimization, errors are logged and ignored.
+
+    Args:
+        work_dir (str): The working directory for the frontend.
+    """
+    cache_dir = os.path.join(work_dir, glideinFrontendConfig.frontendConfig.query_cache_dir)
+    try:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.mkdir(cache_dir)
+    except OSError:
+        logSupport.log.exception(f"Error clearing the query cache directory {cache_dir}")
+
+
 def set_frontend_htcondor_env(work_dir, frontendDescript, element=None):
     """Set the HTCondor environment for the frontend.
 
@@ -34,6 +34,7 @@ class FrontendConfig:
         signature_type (str): The type of signature used for the frontend. Default is "sha1".
         history_file (str): Path to the history file. Default is "history.pk".
         cache_dir (str): Directory for caching schedd advertisement data. Default is "schedd_ads_cache".
+        query_cache_dir (str): Directory for the query results shared by the groups. Default is "query_cache".
 
     Methods:
         __init__(self):
@@ -53,6 +54,7 @@ class FrontendConfig:
         self.signature_type = "sha1"
         self.history_file = "history.pk"
         self.cache_dir = "schedd_ads_cache"
+        self.query_cache_dir = "query_cache"
 
 
 # global configuration of the module
@@ -16,7 +16,10 @@ Args:
 """
 
 import copy
+import gc
 import getpass
+import hashlib
+import math
 import os
 import re
 import socket
@@ -40,8 +43,8 @@ from glideinwms.frontend import (
 
 # from glideinwms.lib.util import file_tmp2final
 from glideinwms.lib import cleanupSupport, condorMonitor, logSupport, pubCrypto, servicePerformance, token_util
-from glideinwms.lib.disk_cache import DiskCache
-from glideinwms.lib.fork import fork_in_bg, ForkManager, wait_for_pids
+from glideinwms.lib.disk_cache import CachedError, DiskCache
+from glideinwms.lib.fork import fetch_fork_result_list, fork_in_bg, ForkManager, ForkResultError, wait_for_pids
 from glideinwms.lib.pidSupport import register_sighandler
 from glideinwms.lib.util import safe_boolcomp
 
@@ -209,6 +212,14 @@ class glideinFrontendElement:
 
         self.p_glidein_min_memory = int(self.elementDescript.element_data["PartGlideinMinMemory"])
         self.max_matchmakers = int(self.elementDescript.element_data["MaxMatchmakers"])
+        # Groups configured before MatchEngine was introduced use the original loop
+        self.match_engine = self.elementDescript.element_data.get("MatchEngine", "loop")
+        self.match_worker_pool = self.elementDescript.element_data.get("MatchWorkerPool", "False") == "True"
+        # 0 (no timeout) for groups configured before ScheddQueryTimeout was introduced
+        self.schedd_query_timeout = int(self.elementDescript.element_data.get("ScheddQueryTimeout", "0"))
+        self.schedd_query_status = {}
+        # Slot counts by request, credential and state, built from self.status_dict when needed
+        self.slot_status_index = None
 
         self.removal_type = self.elementDescript.element_data["RemovalType"]
         self.removal_wait = int(self.elementDescript.element_data["RemovalWait"])
@@ -236,6 +247,15 @@ class glideinFrontendElement:
         cache_dir = os.path.join(work_dir, glideinFrontendConfig.frontendConfig.cache_dir)
         condorMonitor.disk_cache = DiskCache(cache_dir)
 
+        # Initialize the cache of the query results shared with the other groups of the same iteration
+        # 0 (no sharing) for Frontends configured before QueryCacheMaxAge was introduced
+        self.query_cache = None
+        query_cache_max_age = int(self.elementDescript.frontend_data.get("QueryCacheMaxAge", "0"))
+        if query_cache_max_age > 0:
+            self.query_cache = DiskCache(
+                os.path.join(work_dir, glideinFrontendConfig.frontendConfig.query_cache_dir), query_cache_max_age
+            )
+
     def configure(self):
         """Perform initial configuration of the element.
 
@@ -266,6 +286,10 @@ class glideinFrontendElement:
         glideinFrontendInterface.frontendConfig.advertise_use_multi = self.elementDescript.frontend_data[
             "AdvertiseWithMultiple"
         ] in ("True", "1")
+        # No timeout for Frontends configured before AdvertiseTimeout was introduced
+        glideinFrontendInterface.frontendConfig.advertise_timeout = int(
+            self.elementDescript.frontend_data.get("AdvertiseTimeout", "0")
+        )
 
         if self.elementDescript.merged_data["Proxies"]:
             proxy_plugins = glideinFrontendPlugins.proxy_plugins
@@ -470,18 +494,31 @@ class glideinFrontendElement:
             forkm_obj.add_fork(("factory", idx), self.query_factory, factory_pool)
 
         ## schedd
+        # The slowest schedds are queried first, each one with its own timeout
         idx = 0
-        for schedd_name in self.getScheddList():
+        schedd_keys = {}
+        timeouts = {}
+        for schedd_name in self.get_schedd_query_order():
             idx += 1
             forkm_obj.add_fork(("schedd", idx), self.get_condor_q, schedd_name)
+            schedd_keys[("schedd", idx)] = schedd_name
+            timeouts[("schedd", idx)] = self.get_schedd_query_timeout(schedd_name)
 
         ## resource
         forkm_obj.add_fork(("collector", 0), self.get_condor_status)
 
         logSupport.log.debug("%i child query processes started" % len(forkm_obj))
+        failed_keys = []
         try:
             servicePerformance.startPerfMetricEvent(self.group_name, "condor_queries")
-            pipe_out = forkm_obj.fork_and_collect()
+            try:
+                pipe_out = forkm_obj.fork_and_collect(timeouts=timeouts)
+            except ForkResultError as e:
+                if [i for i in e.failed if i not in schedd_keys]:
+                    raise
+                # Only some schedds are missing, continue with the partial results
+                failed_keys = e.failed
+                pipe_out = e.good_results
             servicePerformance.endPerfMetricEvent(self.group_name, "condor_queries")
         except RuntimeError:
             # expect all errors logged already
@@ -491,6 +528,7 @@ class glideinFrontendElement:
             )
             return
         logSupport.log.info("All children terminated")
+        self.update_schedd_query_status(schedd_keys, forkm_obj.fork_stats, failed_keys)
         del forkm_obj
 
         self.globals_dict = {}
@@ -999,6 +1037,8 @@ class glideinFrontendElement:
         self.log_and_print_unmatched(total_down_stats_arr)
 
         pids = []
+        # Pipes of the processes advertising to the Factory pools, keyed by pool
+        ad_pipe_ids = {}
         # Advertise glideclient and glideclient global classads
         ad_file_id_cache = glideinFrontendInterface.CredentialCache()
         advertizer.renew_and_load_credentials()
@@ -1016,7 +1056,10 @@ class glideinFrontendElement:
             s_ads = advertizer.do_advertize_one(
                 ad_factname, ad_file_id_cache, adname=adname, create_files_only=True, reset_unique_id=False
             )
-            pids.append(fork_in_bg(advertizer.do_advertize_batch_one, ad_factname, tuple(set(g_ads) | set(s_ads))))
+            # The files of the next factory are created while this one is advertising
+            ad_pipe_ids[ad_factname] = fork_in_bg(
+                advertizer.do_advertize_batch_one, ad_factname, tuple(set(g_ads) | set(s_ads))
+            )
 
         del ad_file_id_cache
 
@@ -1026,12 +1069,47 @@ class glideinFrontendElement:
         )
         pids.append(fork_in_bg(resource_advertiser.advertiseAllClassads))
 
+        try:
+            ad_stats = fetch_fork_result_list(ad_pipe_ids)
+        except ForkResultError as e:
+            ad_stats = e.good_results
+            logSupport.log.warning(
+                "Advertising to factory pools %s did not complete" % ", ".join(str(i) for i in e.failed)
+            )
         wait_for_pids(pids)
+        self.log_advertize_stats(ad_stats)
         logSupport.log.info("Done advertising")
         servicePerformance.endPerfMetricEvent(self.group_name, "advertize_classads")
 
         return
 
+    def log_advertize_stats(self, ad_stats):
+        """Log the latency and the failures of the advertisement to each Factory pool
+        Log also and reset the counters of the encryption cache
+
+        Args:
+            ad_stats (dict): Statistics returned by MultiAdvertizeWork.do_advertize_batch_one, keyed by factory pool
+        """
+        for factory_pool in sorted(ad_stats, key=str):
+            stats = ad_stats[factory_pool]
+            msg = "Advertised %i files to factory pool %s in %.2f seconds" % (
+                stats["files"] - stats["failed"],
+                factory_pool,
+                stats["latency"],
+            )
+            if stats["failed"] == 0:
+                logSupport.log.info(msg)
+            elif stats["timed_out"]:
+                logSupport.log.warning(f"{msg}, {stats['failed']} failed, timed out")
+            else:
+                logSupport.log.warning(f"{msg}, {stats['failed']} failed")
+        enc_stats = glideinFrontendInterface.encryption_cache.get_stats()
+        logSupport.log.info(
+            "Encryption cache: %i hits, %i misses (hit rate %.1f%%), %i bytes not encrypted again"
+            % (enc_stats["hits"], enc_stats["misses"], 100 * enc_stats["hit_rate"], enc_stats["bytes_saved"])
+        )
+        glideinFrontendInterface.encryption_cache.reset_stats()
+
     def getScheddList(self):
         """Get all the schedds from the collector"""
         # Get the original list from config
@@ -1341,36 +1419,28 @@ class glideinFrontendElement:
 
         Populates self.condorq_dict_types with idle, old idle, voms idle, and running states.
         """
-        # create a dictionary that does not contain the blacklisted schedds
-        good_condorq_dict = self.condorq_dict.copy()  # simple copy enough, will only modify keys
-        for k in self.blacklist_schedds:
-            if k in good_condorq_dict:  # some schedds may not have returned anything
-                del good_condorq_dict[k]
-        # use only the good schedds when considering idle
-        condorq_dict_idle = glideinFrontendLib.getIdleCondorQ(good_condorq_dict)
-        condorq_dict_idle_600 = glideinFrontendLib.getOldCondorQ(condorq_dict_idle, 600)
-        condorq_dict_idle_3600 = glideinFrontendLib.getOldCondorQ(condorq_dict_idle, 3600)
-        condorq_dict_voms = glideinFrontendLib.getIdleVomsCondorQ(condorq_dict_idle)
-
-        # then report how many we really had
-        condorq_dict_idle_all = glideinFrontendLib.getIdleCondorQ(self.condorq_dict)
-
-        self.condorq_dict_running = glideinFrontendLib.getRunningCondorQ(self.condorq_dict)
+        # classify all the jobs once, the dictionaries are selected only when used
+        classifier = glideinFrontendLib.QueryClassifier(self.condorq_dict, glideinFrontendLib.getCondorQJobMask)
+        # use only the good schedds (not blacklisted) when considering idle
+        good_schedds = [k for k in self.condorq_dict if k not in self.blacklist_schedds]
+
+        def job_type(bits, schedds=None):
+            return {"dict": classifier.getQueryDict(bits, schedds), "abs": classifier.count(bits, schedds)}
+
+        self.condorq_dict_running = classifier.getQueryDict(glideinFrontendLib.CONDORQ_RUNNING)
 
         self.condorq_dict_types = {
-            "IdleAll": {"dict": condorq_dict_idle_all, "abs": glideinFrontendLib.countCondorQ(condorq_dict_idle_all)},
-            "Idle": {"dict": condorq_dict_idle, "abs": glideinFrontendLib.countCondorQ(condorq_dict_idle)},
+            # report how many we really had
+            "IdleAll": job_type(glideinFrontendLib.CONDORQ_IDLE),
+            "Idle": job_type(glideinFrontendLib.CONDORQ_IDLE, good_schedds),
             # idle 600s or more
-            "OldIdle": {"dict": condorq_dict_idle_600, "abs": glideinFrontendLib.countCondorQ(condorq_dict_idle_600)},
+            "OldIdle": job_type(glideinFrontendLib.CONDORQ_OLD_IDLE_600, good_schedds),
             # idle 3600s or more
-            "Idle_3600": {
-                "dict": condorq_dict_idle_3600,
-                "abs": glideinFrontendLib.countCondorQ(condorq_dict_idle_3600),
-            },
-            "VomsIdle": {"dict": condorq_dict_voms, "abs": glideinFrontendLib.countCondorQ(condorq_dict_voms)},
+            "Idle_3600": job_type(glideinFrontendLib.CONDORQ_OLD_IDLE_3600, good_schedds),
+            "VomsIdle": job_type(glideinFrontendLib.CONDORQ_VOMS_IDLE, good_schedds),
             "Running": {
                 "dict": self.condorq_dict_running,
-                "abs": glideinFrontendLib.countCondorQ(self.condorq_dict_running),
+                "abs": classifier.count(glideinFrontendLib.CONDORQ_RUNNING),
             },
         }
 
@@ -1380,26 +1450,31 @@ class glideinFrontendElement:
         Populates self.status_dict_types for total, idle, running, failed, and core counts.
 
         """
-        # dict with static + pslot
-        status_dict_non_dynamic = glideinFrontendLib.getCondorStatusNonDynamic(self.status_dict)
+        # The slot counts will be rebuilt from the new status_dict
+        self.slot_status_index = None
+
+        # classify all the slots once, the dictionaries are selected only when used
+        classifier = glideinFrontendLib.QueryClassifier(
+            self.status_dict,
+            lambda el: glideinFrontendLib.getCondorStatusSlotMask(el, self.p_glidein_min_memory),
+            glideinFrontendLib.getCondorStatusSlotCores,
+            3,
+        )
+        total_cores, idle_cores, running_cores = classifier.sum()
 
         # dict with idle static + idle pslot
-        status_dict_idle = glideinFrontendLib.getIdleCondorStatus(self.status_dict, self.p_glidein_min_memory)
+        status_dict_idle = classifier.getQueryDict(glideinFrontendLib.CONDORSTATUS_IDLE)
 
         # dict with static + dynamic + pslot_with_dyanmic_slot
-        status_dict_running = glideinFrontendLib.getRunningCondorStatus(self.status_dict)
-
-        # dict with pslot_with_dyanmic_slot
-        status_dict_running_pslot = glideinFrontendLib.getRunningPSlotCondorStatus(self.status_dict)
-
-        # dict with failed slots
-        status_dict_failed = glideinFrontendLib.getFailedCondorStatus(self.status_dict)
+        status_dict_running = classifier.getQueryDict(
+            glideinFrontendLib.CONDORSTATUS_RUNNING | glideinFrontendLib.CONDORSTATUS_RUNNING_PSLOT
+        )
 
         # Dict of dict containing sub-dicts and counts for slots in
         # different states
         self.status_dict_types = {
-            "Total": {"dict": self.status_dict, "abs": glideinFrontendLib.countCondorStatus(self.status_dict)},
-            "Idle": {"dict": status_dict_idle, "abs": glideinFrontendLib.countCondorStatus(status_dict_idle)},
+            "Total": {"dict": self.status_dict, "abs": classifier.count()},
+            "Idle": {"dict": status_dict_idle, "abs": classifier.count(glideinFrontendLib.CONDORSTATUS_IDLE)},
             # For Running, consider static + dynamic + pslot_with_dyanmic_slot
             # We do this so comparison with the job classad's RemoteHost
             # can be easily done with the p-slot at the later stage in
@@ -1408,22 +1483,22 @@ class glideinFrontendElement:
             # one or more dynamic slots
             "Running": {
                 "dict": status_dict_running,
-                "abs": glideinFrontendLib.countCondorStatus(status_dict_running)
-                - glideinFrontendLib.countCondorStatus(status_dict_running_pslot),
-            },
-            "Failed": {"dict": status_dict_failed, "abs": glideinFrontendLib.countCondorStatus(status_dict_failed)},
-            "TotalCores": {
-                "dict": status_dict_non_dynamic,
-                "abs": glideinFrontendLib.countTotalCoresCondorStatus(status_dict_non_dynamic),
+                "abs": classifier.count(
+                    glideinFrontendLib.CONDORSTATUS_RUNNING | glideinFrontendLib.CONDORSTATUS_RUNNING_PSLOT
+                )
+                - classifier.count(glideinFrontendLib.CONDORSTATUS_RUNNING_PSLOT),
             },
-            "IdleCores": {
-                "dict": status_dict_idle,
-                "abs": glideinFrontendLib.countIdleCoresCondorStatus(status_dict_idle),
+            "Failed": {
+                "dict": classifier.getQueryDict(glideinFrontendLib.CONDORSTATUS_FAILED),
+                "abs": classifier.count(glideinFrontendLib.CONDORSTATUS_FAILED),
             },
-            "RunningCores": {
-                "dict": status_dict_running,
-                "abs": glideinFrontendLib.countRunningCoresCondorStatus(status_dict_running),
+            # static + pslot
+            "TotalCores": {
+                "dict": classifier.getQueryDict(glideinFrontendLib.CONDORSTATUS_NON_DYNAMIC),
+                "abs": total_cores,
             },
+            "IdleCores": {"dict": status_dict_idle, "abs": idle_cores},
+            "RunningCores": {"dict": status_dict_running, "abs": running_cores},
         }
 
     def build_resource_classad(
@@ -2001,20 +2076,7 @@ class glideinFrontendElement:
             if glideid_str in processed_glideid_str_set:
                 continue  # already processed... ignore
 
-            self.count_status_multi[request_name] = {}
-            for st in self.status_dict_types:
-                c = glideinFrontendLib.getClientCondorStatus(
-                    self.status_dict_types[st]["dict"], self.frontend_name, self.group_name, request_name
-                )
-                if st in ("TotalCores", "IdleCores", "RunningCores"):
-                    self.count_status_multi[request_name][st] = glideinFrontendLib.countCoresCondorStatus(c, st)
-                elif st == "Running":
-                    # Running counts are computed differently because of
-                    # the dict composition. Dict also has p-slots
-                    # corresponding to the dynamic slots
-                    self.count_status_multi[request_name][st] = glideinFrontendLib.countRunningCondorStatus(c)
-                else:
-                    self.count_status_multi[request_name][st] = glideinFrontendLib.countCondorStatus(c)
+            self.count_status_multi[request_name] = self.get_slot_status_index().getCounts(request_name)
 
             count_status = self.count_status_multi[request_name]
 
@@ -2056,6 +2118,45 @@ class glideinFrontendElement:
             total_down_stats_arr = log_and_sum_factory_line(glideid_str, True, this_stats_arr, total_down_stats_arr)
         return total_down_stats_arr
 
+    def shared_query(self, key, query_func, *args, **kwargs):
+        """Run a query whose result is shared with the other groups of the Frontend
+
+        The first group running the query (identified by `key`) in an iteration saves the result in the
+        query cache, the others wait for it and use the saved result instead of querying again.
+        The query is run directly if the cache is disabled (QueryCacheMaxAge 0) or not working.
+        A failed query is also shared: the other groups raise CachedError instead of repeating it.
+
+        Args:
+            key (tuple): identifier of the query, the same for all the groups running the same query
+            query_func (function): function running the query, the result must be picklable
+            *args: positional arguments of `query_func`
+            **kwargs: keyword arguments of `query_func`
+
+        Returns:
+            object: the result of the query
+        """
+        if self.query_cache is None:
+            return query_func(*args, **kwargs)
+        query_errors = []
+
+        def run_query():
+            try:
+                return query_func(*args, **kwargs)
+            except Exception as e:
+                query_errors.append(e)
+                raise
+
+        objid = "query_%s" % hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        try:
+            return self.query_cache.get_or_save(objid, run_query)
+        except CachedError:
+            raise
+        except Exception as e:
+            if query_errors:
+                raise
+            logSupport.log.warning(f"Shared query cache not available for {key}, querying directly: {e}")
+        return query_func(*args, **kwargs)
+
     def query_globals(self, factory_pool):
         """Queries the glidefactoryglobal ClassAd and retrieves global attributes from the factory pool.
 
@@ -2080,8 +2181,12 @@ class glideinFrontendElement:
             factory_pool_node = factory_pool[0]
             my_identity_at_factory_pool = factory_pool[2]
             try:
-                factory_globals_dict = glideinFrontendInterface.findGlobals(
-                    factory_pool_node, None, glideinFrontendInterface.frontendConfig.factory_global
+                factory_globals_dict = self.shared_query(
+                    ("globals", factory_pool_node, glideinFrontendInterface.frontendConfig.factory_global),
+                    glideinFrontendInterface.findGlobals,
+                    factory_pool_node,
+                    None,
+                    glideinFrontendInterface.frontendConfig.factory_global,
                 )
             except RuntimeError:
                 # Failed to talk or likely result is empty
@@ -2220,8 +2325,13 @@ class glideinFrontendElement:
             factory_identity = factory_pool[1]
             my_identity_at_factory_pool = factory_pool[2]
             try:
-                factory_glidein_dict = glideinFrontendInterface.findGlideins(
-                    factory_pool_node, None, self.signatureDescript.signature_type, factory_constraint
+                factory_glidein_dict = self.shared_query(
+                    ("entries", factory_pool_node, self.signatureDescript.signature_type, factory_constraint),
+                    glideinFrontendInterface.findGlideins,
+                    factory_pool_node,
+                    None,
+                    self.signatureDescript.signature_type,
+                    factory_constraint,
                 )
             except RuntimeError:
                 # Failed to talk or likely result is empty
@@ -2273,6 +2383,74 @@ class glideinFrontendElement:
             self.query_factoryclients(factory_pool),
         )
 
+    # Weight of the last query time in the average query time of each schedd
+    SCHEDD_LATENCY_WEIGHT = 0.3
+
+    def get_schedd_query_order(self):
+        """Return the schedds of this group, the slowest first according to the average query time
+
+        Returns:
+            list: schedd names
+        """
+        schedd_latency = self.history_obj["schedd_latency"]
+        return sorted(self.getScheddList(), key=lambda x: schedd_latency.get(x, 0), reverse=True)
+
+    def get_schedd_query_timeout(self, schedd_name):
+        """Return the timeout for the query of a schedd
+
+        The configured timeout (ScheddQueryTimeout) is extended, up to 4 times, for the schedds
+        that were slow in the previous iterations: the timeout is at least twice the average query time.
+
+        Args:
+            schedd_name (str): the schedd name
+
+        Returns:
+            float|None: timeout in seconds, None if there is no timeout
+        """
+        if self.schedd_query_timeout <= 0:
+            return None
+        latency = self.history_obj["schedd_latency"].get(schedd_name, 0)
+        return min(max(self.schedd_query_timeout, 2 * latency), 4 * self.schedd_query_timeout)
+
+    def update_schedd_query_status(self, schedd_keys, fork_stats, failed_keys):
+        """Set the status of the schedd queries (self.schedd_query_status) and update the average query times
+
+        Args:
+            schedd_keys (dict): schedd names keyed by fork key
+            fork_stats (dict): statistics of the forks, see ForkManager.bounded_fork_and_collect
+            failed_keys (list): fork keys of the failed or timed out queries
+        """
+        self.schedd_query_status = {}
+        schedd_latency = self.history_obj["schedd_latency"]
+        for key, schedd_name in schedd_keys.items():
+            key_stats = fork_stats.get(key, {})
+            query_time = key_stats.get("wall_time")
+            if key_stats.get("timed_out"):
+                status = "timeout"
+            elif key in failed_keys:
+                status = "failed"
+                query_time = None
+            else:
+                status = "ok"
+            self.schedd_query_status[schedd_name] = {"status": status, "time": key_stats.get("wall_time")}
+            if query_time is not None:
+                old_latency = schedd_latency.get(schedd_name)
+                if old_latency is None:
+                    schedd_latency[schedd_name] = query_time
+                else:
+                    schedd_latency[schedd_name] = old_latency + self.SCHEDD_LATENCY_WEIGHT * (query_time - old_latency)
+        # Forget the schedds not in the configuration anymore
+        for schedd_name in list(schedd_latency.keys()):
+            if schedd_name not in self.schedd_query_status:
+                del schedd_latency[schedd_name]
+        for schedd_name, schedd_status in self.schedd_query_status.items():
+            if schedd_status["status"] != "ok":
+                logSupport.log.warning(
+                    "Query of schedd %s %s, its jobs are not considered in this iteration"
+                    % (schedd_name, "timed out" if schedd_status["status"] == "timeout" else "failed")
+                )
+        logSupport.log.debug("Schedd queries status: %s" % self.schedd_query_status)
+
     def get_condor_q(self, schedd_name):
         """Retrieve the jobs a schedd is requesting
 
@@ -2295,7 +2473,10 @@ class glideinFrontendElement:
             condorq_format_list = list(condorq_format_list) + list((("x509UserProxyFirstFQAN", "s"),))
             condorq_format_list = list(condorq_format_list) + list((("x509UserProxyFQAN", "s"),))
             condorq_format_list = list(condorq_format_list) + list((("x509userproxy", "s"),))
-            condorq_dict = glideinFrontendLib.getCondorQ(
+            # Groups with the same job query and attributes share the result
+            condorq_dict = self.shared_query(
+                ("condor_q", schedd_name, self.elementDescript.merged_data["JobQueryExpr"], condorq_format_list),
+                glideinFrontendLib.getCondorQ,
                 [schedd_name],
                 self.elementDescript.merged_data["JobQueryExpr"],
                 # expand_DD(self.elementDescript.merged_data['JobQueryExpr'], self.attr_dict),
@@ -2364,13 +2545,38 @@ class glideinFrontendElement:
             # constraint = '(GLIDECLIENT_Name=?="%s.%s") && (%s)' % (
             #    self.frontend_name, self.group_name, mc_idle_constraint)
 
-            # Consider all slots for this group irrespective of slot type
-            constraint = f'(GLIDECLIENT_Name=?="{self.frontend_name}.{self.group_name}")'
+            # Slots of all the groups of this Frontend
+            fe_constraint = '(substr(GLIDECLIENT_Name,0,%i)=?="%s.")' % (
+                len(self.frontend_name) + 1,
+                self.frontend_name,
+            )
+            fe_status_dict = None
 
             # use the main collector... all adds must go there
-            status_dict = glideinFrontendLib.getCondorStatus(
-                [None], constraint=constraint, format_list=status_format_list
-            )
+            if self.query_cache is not None:
+                # Query once the slots of all the groups (the ones with the same attributes)
+                # and select the ones of this group. These are also used for the Frontend counts
+                try:
+                    fe_status_dict = self.shared_query(
+                        ("condor_status", fe_constraint, status_format_list),
+                        glideinFrontendLib.getCondorStatus,
+                        [None],
+                        constraint=fe_constraint,
+                        format_list=status_format_list,
+                    )
+                    status_dict = glideinFrontendLib.getGroupCondorStatus(
+                        fe_status_dict, self.frontend_name, self.group_name
+                    )
+                except Exception as e:
+                    # Query only the group slots, as done without the query cache
+                    logSupport.log.warning(f"Error querying the Frontend slots, querying only the group slots: {e}")
+                    fe_status_dict = None
+            if fe_status_dict is None:
+                # Consider all slots for this group irrespective of slot type
+                constraint = f'(GLIDECLIENT_Name=?="{self.frontend_name}.{self.group_name}")'
+                status_dict = glideinFrontendLib.getCondorStatus(
+                    [None], constraint=constraint, format_list=status_format_list
+                )
 
             # Also get all the classads for the whole FE for counting
             # do it in the same thread, as we are hitting the same collector
@@ -2389,14 +2595,10 @@ class glideinFrontendElement:
                 # PM/MM: Feb 09, 2016
                 # Do not filter unusable partitionable slots here.
                 # Filtering is done at a later stage as needed for idle
-                constraint = '(substr(GLIDECLIENT_Name,0,%i)=?="%s.")' % (
-                    len(self.frontend_name) + 1,
-                    self.frontend_name,
-                )
-
-                fe_status_dict = glideinFrontendLib.getCondorStatus(
-                    [None], constraint=constraint, format_list=status_format_list, want_format_completion=False
-                )
+                if fe_status_dict is None:
+                    fe_status_dict = glideinFrontendLib.getCondorStatus(
+                        [None], constraint=fe_constraint, format_list=status_format_list, want_format_completion=False
+                    )
 
                 # fe_counts: PM/MM: Feb 09, 2016
                 # Idle: Number of useful idle slots from this frontend
@@ -2418,7 +2620,9 @@ class glideinFrontendElement:
             try:
                 constraint = "True"
 
-                global_status_dict = glideinFrontendLib.getCondorStatus(
+                global_status_dict = self.shared_query(
+                    ("condor_status", constraint, False, status_format_list),
+                    glideinFrontendLib.getCondorStatus,
                     [None],
                     constraint=constraint,
                     want_glideins_only=False,
@@ -2443,22 +2647,7 @@ class glideinFrontendElement:
 
             # Finally, get also the schedd classads
             try:
-                status_schedd_dict = glideinFrontendLib.getCondorStatusSchedds([None], constraint=None, format_list=[])
-                # Also get the list of schedds that has CurbMatchMaking = True
-                # We need to query this explicitly since CurbMatchMaking
-                # that we get from condor is a condor expression and is not
-                # an evaluated value. So we have to manually filter it out and
-                # adjust the info accordingly
-                status_curb_schedd_dict = glideinFrontendLib.getCondorStatusSchedds(
-                    [None], constraint="CurbMatchmaking=?=True", format_list=[]
-                )
-
-                for c in status_curb_schedd_dict:
-                    c_curb_schedd_dict = status_curb_schedd_dict[c].fetchStored()
-                    for schedd in c_curb_schedd_dict:
-                        if schedd in status_schedd_dict[c].fetchStored():
-                            status_schedd_dict[c].stored_data[schedd]["CurbMatchmaking"] = "True"
-
+                status_schedd_dict = self.shared_query(("schedds",), self.get_condor_status_schedds)
             except Exception:
                 # This is not critical information, do not fail
                 logSupport.log.warning("Error gathering job stats from schedd. Defaulting to %s" % status_schedd_dict)
@@ -2468,6 +2657,30 @@ class glideinFrontendElement:
 
         return (status_dict, fe_counts, global_counts, status_schedd_dict)
 
+    @staticmethod
+    def get_condor_status_schedds():
+        """Retrieve the schedd classads from the user pool, with CurbMatchmaking evaluated
+
+        Returns:
+            dict: Status dictionary of schedd classads, keyed by collector
+        """
+        status_schedd_dict = glideinFrontendLib.getCondorStatusSchedds([None], constraint=None, format_list=[])
+        # Also get the list of schedds that has CurbMatchMaking = True
+        # We need to query this explicitly since CurbMatchMaking
+        # that we get from condor is a condor expression and is not
+        # an evaluated value. So we have to manually filter it out and
+        # adjust the info accordingly
+        status_curb_schedd_dict = glideinFrontendLib.getCondorStatusSchedds(
+            [None], constraint="CurbMatchmaking=?=True", format_list=[]
+        )
+
+        for c in status_curb_schedd_dict:
+            c_curb_schedd_dict = status_curb_schedd_dict[c].fetchStored()
+            for schedd in c_curb_schedd_dict:
+                if schedd in status_schedd_dict[c].fetchStored():
+                    status_schedd_dict[c].stored_data[schedd]["CurbMatchmaking"] = "True"
+        return status_schedd_dict
+
     def do_match(self):
         """Performs the actual job-to-glidein matching process in parallel.
 
@@ -2488,18 +2701,24 @@ class glideinFrontendElement:
             None: This method updates internal attributes with matching results and does not return a value.
         """
 
-        # IS: Heuristics of 100 glideins per fork
-        #     Based on times seen by CMS
-        glideins_per_fork = 100
-
         glidein_list = list(self.glidein_dict.keys())
+        if self.match_worker_pool:
+            glideins_per_fork = self.get_match_chunk_size(len(glidein_list))
+        else:
+            # IS: Heuristics of 100 glideins per fork
+            #     Based on times seen by CMS
+            glideins_per_fork = 100
         # split the list in equal pieces
         # the result is a list of lists
         split_glidein_list = [
             glidein_list[i : i + glideins_per_fork] for i in range(0, len(glidein_list), glideins_per_fork)
         ]
 
-        forkm_obj = ForkManager()
+        # Index the slots once, the glidein counting children inherit it
+        self.get_slot_status_index()
+
+        # The count dictionaries can be large, return them via shared memory
+        forkm_obj = ForkManager(use_shm=True)
 
         for i in range(len(split_glidein_list)):
             forkm_obj.add_fork(("Glidein", i), self.subprocess_count_glidein, split_glidein_list[i])
@@ -2511,13 +2730,28 @@ class glideinFrontendElement:
 
         try:
             t_begin = time.time()
-            pipe_out = forkm_obj.bounded_fork_and_collect(self.max_matchmakers)
+            if self.match_worker_pool:
+                # Move the existing objects out of the GC generations, so that the workers' garbage collections
+                # do not touch (and copy) the pages inherited from this process (gc.freeze is in Python 3.7+)
+                gc_freeze = hasattr(gc, "freeze")
+                if gc_freeze:
+                    gc.freeze()
+                try:
+                    pipe_out = forkm_obj.pool_fork_and_collect(self.max_matchmakers)
+                finally:
+                    if gc_freeze:
+                        gc.unfreeze()
+            else:
+                pipe_out = forkm_obj.bounded_fork_and_collect(self.max_matchmakers)
             t_end = time.time() - t_begin
         except RuntimeError:
             # expect all errors logged already
             logSupport.log.exception("Terminating iteration due to errors:")
             return
         logSupport.log.info("All children terminated - took %s seconds" % t_end)
+        logSupport.log.debug("Matchmaking results transfer: %s" % forkm_obj.fork_stats_summary())
+        if self.match_worker_pool:
+            self.update_match_cost(forkm_obj.fork_stats, split_glidein_list)
 
         for dt, el in self.condorq_dict_types.items():
             # c, p, h, pmc, t returned by  subprocess_count_dt(self, dt)
@@ -2532,8 +2766,50 @@ class glideinFrontendElement:
             tmp_count_status_multi_per_cred = pipe_out[("Glidein", i)][1]
             self.count_status_multi_per_cred.update(tmp_count_status_multi_per_cred)
 
+    # Target run time (in seconds) of each glidein chunk in the matchmaking worker pool
+    MATCH_CHUNK_TARGET_TIME = 2.0
+
+    def get_match_chunk_size(self, nr_glideins):
+        """Returns the number of glideins (entries) per matchmaking task in worker pool mode
+
+        The chunk size is derived from the per-entry cost measured in the previous iterations
+        (saved in the history file) so that each task runs for about MATCH_CHUNK_TARGET_TIME seconds.
+        It is never bigger than what is needed to give one chunk to each worker.
+
+        Args:
+            nr_glideins (int): Number of glideins (entries) to match
+
+        Returns:
+            int: Number of glideins per chunk
+        """
+        max_chunk = max(1, math.ceil(nr_glideins / max(1, self.max_matchmakers)))
+        entry_cost = self.history_obj["match_cost"].get("glidein_entry_time")
+        if not entry_cost:
+            # No measurement yet, use the same heuristics of the fork mode
+            return min(100, max_chunk)
+        return int(min(max(1, self.MATCH_CHUNK_TARGET_TIME / entry_cost), max_chunk))
+
+    def update_match_cost(self, fork_stats, split_glidein_list):
+        """Saves in the history file the per-entry cost of subprocess_count_glidein measured by the worker pool
+
+        Args:
+            fork_stats (dict): Statistics from ForkManager.pool_fork_and_collect
+            split_glidein_list (list): List of glidein chunks, the index is the one in the ("Glidein", i) key
+        """
+        run_time = 0.0
+        nr_glideins = 0
+        for i, glideins in enumerate(split_glidein_list):
+            stats = fork_stats.get(("Glidein", i))
+            if stats and "run_time" in stats:
+                run_time += stats["run_time"]
+                nr_glideins += len(glideins)
+        if nr_glideins > 0:
+            self.history_obj["match_cost"] = {"glidein_entry_time": run_time / nr_glideins}
+            logSupport.log.debug("Matchmaking cost per entry: %.6f seconds" % (run_time / nr_glideins))
+
     def subprocess_count_dt(self, dt):
-        """Counts the matches (glideins matching entries) using glideinFrontendLib.countMatch.
+        """Counts the matches (glideins matching entries) using glideinFrontendLib.countMatch
+        (or glideinFrontendLib.countMatchMatrix if the group match_engine is "matrix").
 
         This method performs calculations in parallel using multiple processes to determine
         the number of matches for a given index within the data dictionary.
@@ -2552,7 +2828,11 @@ class glideinFrontendElement:
 
         out = ()
 
-        c, p, h, pmc = glideinFrontendLib.countMatch(
+        if self.match_engine == "matrix":
+            count_match = glideinFrontendLib.countMatchMatrix
+        else:
+            count_match = glideinFrontendLib.countMatch
+        c, p, h, pmc = count_match(
             self.elementDescript.merged_data["MatchExprCompiledObj"],
             self.condorq_dict_types[dt]["dict"],
             self.glidein_dict,
@@ -2592,6 +2872,18 @@ class glideinFrontendElement:
         )
         return out
 
+    def get_slot_status_index(self):
+        """Returns the slot counts by request, credential and state, building them if needed
+
+        Returns:
+            glideinFrontendLib.SlotStatusIndex: index of the slots in self.status_dict
+        """
+        if self.slot_status_index is None:
+            self.slot_status_index = glideinFrontendLib.SlotStatusIndex(
+                self.status_dict, self.frontend_name, self.group_name, self.p_glidein_min_memory
+            )
+        return self.slot_status_index
+
     def subprocess_count_glidein(self, glidein_list):
         """Counts statistics for glideins in parallel using multiple processes.
 
@@ -2610,62 +2902,17 @@ class glideinFrontendElement:
         count_status_multi = {}
         # Count distribution per credentials
         count_status_multi_per_cred = {}
+        slot_status_index = self.get_slot_status_index()
         for glideid in glidein_list:
             request_name = glideid[1]
 
-            count_status_multi[request_name] = {}
+            count_status_multi[request_name] = slot_status_index.getCounts(request_name)
             count_status_multi_per_cred[request_name] = {}
             for cred in self.x509_proxy_plugin.cred_list:
-                count_status_multi_per_cred[request_name][cred.getId()] = {}
-
-            # It is cheaper to get Idle and Running from request-only
-            # classads then filter out requests from Idle and Running
-            # glideins
-            total_req_dict = glideinFrontendLib.getClientCondorStatus(
-                self.status_dict_types["Total"]["dict"], self.frontend_name, self.group_name, request_name
-            )
-
-            req_dict_types = {
-                "Total": total_req_dict,
-                "Idle": glideinFrontendLib.getIdleCondorStatus(total_req_dict, self.p_glidein_min_memory),
-                "Running": glideinFrontendLib.getRunningCondorStatus(total_req_dict),
-                "Failed": glideinFrontendLib.getFailedCondorStatus(total_req_dict),
-                "TotalCores": glideinFrontendLib.getCondorStatusNonDynamic(total_req_dict),
-                "IdleCores": glideinFrontendLib.getIdleCoresCondorStatus(total_req_dict),
-                "RunningCores": glideinFrontendLib.getRunningCoresCondorStatus(total_req_dict),
-            }
-
-            for st in req_dict_types:
-                req_dict = req_dict_types[st]
-                if st in ("TotalCores", "IdleCores", "RunningCores"):
-                    count_status_multi[request_name][st] = glideinFrontendLib.countCoresCondorStatus(req_dict, st)
-                elif st == "Running":
-                    # Running counts are computed differently because of
-                    # the dict composition. Dict also has p-slots
-                    # corresponding to the dynamic slots
-                    count_status_multi[request_name][st] = glideinFrontendLib.countRunningCondorStatus(req_dict)
-                else:
-                    count_status_multi[request_name][st] = glideinFrontendLib.countCondorStatus(req_dict)
-
-                for cred in self.x509_proxy_plugin.cred_list:
-                    cred_id = cred.getId()
-                    cred_dict = glideinFrontendLib.getClientCondorStatusCredIdOnly(req_dict, cred_id)
-
-                    if st in ("TotalCores", "IdleCores", "RunningCores"):
-                        count_status_multi_per_cred[request_name][cred_id][st] = (
-                            glideinFrontendLib.countCoresCondorStatus(cred_dict, st)
-                        )
-                    elif st == "Running":
-                        # Running counts are computed differently because of
-                        # the dict composition. Dict also has p-slots
-                        # corresponding to the dynamic slots
-                        count_status_multi_per_cred[request_name][cred_id][st] = (
-                            glideinFrontendLib.countRunningCondorStatus(cred_dict)
-                        )
-                    else:
-                        count_status_multi_per_cred[request_name][cred_id][st] = glideinFrontendLib.countCondorStatus(
-                            cred_dict
-                        )
+                cred_id = cred.getId()
+                count_status_multi_per_cred[request_name][cred_id] = slot_status_index.getCredCounts(
+                    request_name, cred_id
+                )
 
         out = (count_status_multi, count_status_multi_per_cred)
 
@@ -2683,8 +2930,9 @@ def check_parent(parent_pid):
 
 ############################################################
 def write_stats(stats):
-    for k in list(stats.keys()):
-        stats[k].write_file()
+    with glideinFrontendMonitoring.monitoringConfig.rrd_batch():
+        for k in list(stats.keys()):
+            stats[k].write_file()
 
 
 ############################################################
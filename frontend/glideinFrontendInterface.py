@@ -54,6 +54,7 @@ class FrontendConfig:
         factory_signtype_id (str): The name of the sign type identifier.
         advertise_use_tcp (bool): Flag indicating whether to use TCP for condor_advertise.
         advertise_use_multi (bool): Flag indicating whether to use the -multiple option for condor_advertise.
+        advertise_timeout (int): Max seconds to advertise the requests to one Factory pool, 0 for no limit.
         condor_reserved_names (tuple): Reserved names for condor-related attributes.
 
     Methods:
@@ -106,6 +107,8 @@ class FrontendConfig:
         self.advertise_use_tcp = False
         # Should we use the new -multiple for condor_advertise?
         self.advertise_use_multi = False
+        # Max time to advertise the requests to one Factory pool, 0 for no limit
+        self.advertise_timeout = 0
 
         self.condor_reserved_names = (
             "MyType",
@@ -124,6 +127,10 @@ class FrontendConfig:
 # global configuration of the module
 frontendConfig = FrontendConfig()
 
+# Encrypted parameters and identities, shared by all the FactoryKeys4Advertise objects
+# The same credentials are encrypted with the same symkey for all the entries of a Factory
+encryption_cache = symCrypto.SymKeyCache()
+
 
 #####################################################
 # Exception thrown when multiple executions are used
@@ -821,6 +828,7 @@ class FactoryKeys4Advertise:
             glidein_symKey = copy.deepcopy(glidein_symKey)
             glidein_symKey.new()
         self.glidein_symKey = glidein_symKey
+        self.enc_key_code = None
 
     # returns a list of strings
     def get_key_attrs(self):
@@ -829,11 +837,15 @@ class FactoryKeys4Advertise:
         Returns:
             list: list of str containing the classads about the key
         """
-        glidein_symKey_str = self.glidein_symKey.get_code()
+        if self.enc_key_code is None:
+            # The symkey does not change, encrypt it with the Factory public key only once
+            glidein_symKey_str = self.glidein_symKey.get_code()
+            self.enc_key_code = self.factory_pub_key.encrypt_hex(glidein_symKey_str).decode(
+                defaults.BINARY_ENCODING_CRYPTO
+            )
         return (
             'ReqPubKeyID = "%s"' % self.factory_pub_key_id,
-            'ReqEncKeyCode = "%s"'
-            % self.factory_pub_key.encrypt_hex(glidein_symKey_str).decode(defaults.BINARY_ENCODING_CRYPTO),
+            'ReqEncKeyCode = "%s"' % self.enc_key_code,
             # this attribute will be checked against the AuthenticatedIdentity
             # this will prevent replay attacks, as only who knows the symkey can change this field
             # no other changes needed, as HTCondor provides integrity of the whole classAd
@@ -842,6 +854,7 @@ class FactoryKeys4Advertise:
 
     def encrypt_hex(self, data):
         """Encrypt the input data
+        Results are cached in encryption_cache, the data already encrypted with this symkey is not encrypted again
 
         Args:
             data (AnyStr): data to encrypt
@@ -849,7 +862,7 @@ class FactoryKeys4Advertise:
         Returns:
             bytes: encrypted data
         """
-        return self.glidein_symKey.encrypt_hex(data)
+        return encryption_cache.encrypt_hex(self.glidein_symKey, data)
 
 
 class Key4AdvertizeBuilder:
@@ -1048,10 +1061,10 @@ class AdvertizeParams:
 
 
 # Given a file, advertise
-# Can throw a CondorExe/ExeError exception
-def advertizeWorkFromFile(factory_pool, fname, remove_file=True, is_multi=False):
+# Can throw a CondorExe/ExeError exception (also if condor_advertise runs longer than timeout seconds)
+def advertizeWorkFromFile(factory_pool, fname, remove_file=True, is_multi=False, timeout=None):
     try:
-        exe_condor_advertise(fname, "UPDATE_MASTER_AD", factory_pool, is_multi=is_multi)
+        exe_condor_advertise(fname, "UPDATE_MASTER_AD", factory_pool, is_multi=is_multi, timeout=timeout)
     finally:
         if remove_file:
             os.remove(fname)
@@ -1263,23 +1276,54 @@ class MultiAdvertizeWork:
         Advertise the classad files in the dictionary provided
          The keys are the factory names, while the elements are lists of files
         Safe to run in parallel, guaranteed to not modify the self object state.
+        Returns the statistics of do_advertize_batch_one, keyed by factory pool
         """
+        stats = {}
         for factory_pool in filename_dict:
-            self.do_advertize_batch_one(factory_pool, filename_dict[factory_pool], remove_files)
+            stats[factory_pool] = self.do_advertize_batch_one(factory_pool, filename_dict[factory_pool], remove_files)
+        return stats
 
     def do_advertize_batch_one(self, factory_pool, filename_arr, remove_files=True):
         """
         Advertise to a Factory the ClassAd files provided
         Safe to run in parallel, guaranteed to not modify the self object state.
-        """
+        If frontendConfig.advertise_timeout is set, all the files must be advertised within that time:
+         condor_advertise is killed when the time is over and the files left are not advertised.
+        Returns a dictionary with the statistics of the advertisement:
+         files (number of files), failed (number of files not advertised),
+         timed_out (True if the timeout expired) and latency (seconds spent advertising)
+        """
+        stats = {"files": len(filename_arr), "failed": 0, "timed_out": False}
+        t_begin = time.time()
+        deadline = None
+        if frontendConfig.advertise_timeout:
+            deadline = t_begin + frontendConfig.advertise_timeout
         # Advertise all the files
         for filename in filename_arr:
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    stats["timed_out"] = True
+                    stats["failed"] += 1
+                    if remove_files:
+                        os.remove(filename)
+                    continue
             try:
                 advertizeWorkFromFile(
-                    factory_pool, filename, remove_file=remove_files, is_multi=frontendConfig.advertise_use_multi
+                    factory_pool,
+                    filename,
+                    remove_file=remove_files,
+                    is_multi=frontendConfig.advertise_use_multi,
+                    timeout=timeout,
                 )
             except condorExe.ExeError:
+                stats["failed"] += 1
+                if deadline is not None and time.time() >= deadline:
+                    stats["timed_out"] = True
                 logSupport.log.exception("Advertising failed for factory pool %s: " % factory_pool)
+        stats["latency"] = time.time() - t_begin
+        return stats
 
     def get_advertize_factory_list(self):
         return tuple(set(self.global_pool).union(set(self.factory_queue.keys())))
@@ -2310,9 +2354,11 @@ class FrontendMonitorClassadAdvertiser(classadSupport.ClassadAdvertiser):
 ############################################################
 
 
-def exe_condor_advertise(fname, command, pool, is_multi=False):
+def exe_condor_advertise(fname, command, pool, is_multi=False, timeout=None):
     logSupport.log.debug(f"CONDOR ADVERTISE {fname} {command} {pool} {is_multi}")
-    return condorManager.condorAdvertise(fname, command, frontendConfig.advertise_use_tcp, is_multi, pool)
+    return condorManager.condorAdvertise(
+        fname, command, frontendConfig.advertise_use_tcp, is_multi, pool, timeout=timeout
+    )
 
 
 class NoCredentialException(Exception):
@@ -6,6 +6,7 @@ This module implements the functions needed to keep the
 required number of idle glideins plus other miscellaneous functions
 """
 
+import copy
 import math
 import os
 import os.path
@@ -26,7 +27,14 @@ from glideinwms.lib.xmlParse import OrderedDict  # noqa: F401   # needed for eva
 # If not all the jobs of the schedd has to be considered,
 # specify the appropriate constraint
 #
-def getCondorQ(schedd_names, constraint=None, format_list=None, want_format_completion=True, job_status_filter=(1, 2)):
+def getCondorQ(
+    schedd_names,
+    constraint=None,
+    format_list=None,
+    want_format_completion=True,
+    job_status_filter=(1, 2),
+    use_bindings=None,
+):
     """Return a dictionary of schedds containing interesting jobs
     Each element is a condorQ
 
@@ -39,6 +47,8 @@ def getCondorQ(schedd_names, constraint=None, format_list=None, want_format_comp
         format_list:
         want_format_completion (bool):
         job_status_filter:
+        use_bindings (bool, None): query with the python bindings (True) or condor_q (False).
+            Defaults to None, use the bindings if available
 
     Returns:
 
@@ -59,7 +69,7 @@ def getCondorQ(schedd_names, constraint=None, format_list=None, want_format_comp
             js_arr.append("(JobStatus=?=%i)" % n)
         js_constraint = "||".join(js_arr)
 
-    return getCondorQConstrained(schedd_names, js_constraint, constraint, format_list)
+    return getCondorQConstrained(schedd_names, js_constraint, constraint, format_list, use_bindings)
 
 
 def getIdleVomsCondorQ(condorq_dict):
@@ -184,6 +194,176 @@ def getRunningCondorQ(condorq_dict):
     return out
 
 
+class QueryClassifier:
+    """Classifies in a single pass the elements of a dictionary of queries, like the output of getCondorQ
+    or getCondorStatus, tagging each element with the bitmask of the categories it belongs to.
+
+    The dictionaries of a category, like the ones returned by getIdleCondorQ, contain MaskedSubQuery
+    objects that select their elements only when used. The counts are computed in the classification pass.
+
+    Attributes:
+        query_dict (dict): The classified dictionary of queries.
+        masks (dict): Bitmasks of the elements of each query, keyed by query name and element key.
+        mask_counts (dict): Number of elements with each bitmask, keyed by query name and bitmask.
+        values (dict): Sums of the values returned by `value_func`, keyed by query name.
+    """
+
+    def __init__(self, query_dict, mask_func, value_func=None, nr_values=0):
+        """Classifies all the elements of the queries.
+
+        Args:
+            query_dict (dict): Dictionary of loaded queries, e.g. the output of getCondorQ.
+            mask_func (function): Returns the bitmask of an element. One argument: the element (classad dictionary).
+            value_func (function): Returns a tuple of `nr_values` numbers to sum for each element.
+                Two arguments: the element and its bitmask. Defaults to None (no sums).
+            nr_values (int): Number of values returned by `value_func`. Defaults to 0.
+        """
+        self.query_dict = query_dict
+        self.nr_values = nr_values
+        self.masks = {}
+        self.mask_counts = {}
+        self.values = {}
+        for query_name, query in query_dict.items():
+            masks = {}
+            mask_counts = {}
+            values = [0] * nr_values
+            for key, el in query.fetchStored().items():
+                mask = mask_func(el)
+                masks[key] = mask
+                try:
+                    mask_counts[mask] += 1
+                except KeyError:
+                    # there are only few possible values, using exceptions is faster
+                    mask_counts[mask] = 1
+                if value_func is not None:
+                    for i, value in enumerate(value_func(el, mask)):
+                        values[i] += value
+            self.masks[query_name] = masks
+            self.mask_counts[query_name] = mask_counts
+            self.values[query_name] = values
+
+    def getQueryDict(self, bits, query_names=None):
+        """Returns the dictionary of sub-queries with the elements having at least one of `bits` set.
+
+        Args:
+            bits (int): Bits of the categories to select.
+            query_names (list): Names of the queries to include. Defaults to None (all).
+
+        Returns:
+            dict: Dictionary of condorMonitor.MaskedSubQuery, keyed by query name.
+        """
+        if query_names is None:
+            query_names = self.query_dict.keys()
+        return {n: condorMonitor.MaskedSubQuery(self.query_dict[n], self.masks[n], bits) for n in query_names}
+
+    def count(self, bits=None, query_names=None):
+        """Returns the number of elements having at least one of `bits` set.
+
+        Args:
+            bits (int): Bits of the categories to count. Defaults to None (all the elements).
+            query_names (list): Names of the queries to include. Defaults to None (all).
+
+        Returns:
+            int: Number of elements.
+        """
+        if query_names is None:
+            query_names = self.query_dict.keys()
+        count = 0
+        for query_name in query_names:
+            for mask, mask_count in self.mask_counts[query_name].items():
+                if bits is None or mask & bits:
+                    count += mask_count
+        return count
+
+    def sum(self, query_names=None):
+        """Returns the sums of the values of all the elements.
+
+        Args:
+            query_names (list): Names of the queries to include. Defaults to None (all).
+
+        Returns:
+            list: Sums of the values returned by `value_func`.
+        """
+        if query_names is None:
+            query_names = self.query_dict.keys()
+        out = [0] * self.nr_values
+        for query_name in query_names:
+            out = [a + b for a, b in zip(out, self.values[query_name])]
+        return out
+
+
+# Bits of the job categories returned by getCondorQJobMask
+CONDORQ_IDLE = 1
+CONDORQ_OLD_IDLE_600 = 2
+CONDORQ_OLD_IDLE_3600 = 4
+CONDORQ_VOMS_IDLE = 8
+CONDORQ_RUNNING = 16
+
+
+def getCondorQJobMask(el):
+    """Returns the bitmask of the categories of a job, for QueryClassifier
+
+    The categories select the same jobs of getIdleCondorQ (CONDORQ_IDLE), getOldCondorQ on the idle jobs
+    (CONDORQ_OLD_IDLE_600 and CONDORQ_OLD_IDLE_3600), getIdleVomsCondorQ (CONDORQ_VOMS_IDLE)
+    and getRunningCondorQ (CONDORQ_RUNNING).
+
+    Args:
+        el (dict): job classad
+
+    Returns:
+        int: bitmask of the categories
+    """
+    job_status = el.get("JobStatus")
+    if job_status == 1:
+        mask = CONDORQ_IDLE
+        if "ServerTime" in el and "EnteredCurrentStatus" in el:
+            age = el["ServerTime"] - el["EnteredCurrentStatus"]
+            if age >= 600:
+                mask |= CONDORQ_OLD_IDLE_600
+            if age >= 3600:
+                mask |= CONDORQ_OLD_IDLE_3600
+        if "x509UserProxyFirstFQAN" in el:
+            mask |= CONDORQ_VOMS_IDLE
+        return mask
+    elif job_status == 2:
+        return CONDORQ_RUNNING
+    return 0
+
+
+def getRunningOnIndex(status_dict):
+    """Index the slots of all the collectors by name, with the entry they belong to.
+
+    The value is the string used for the 'RunningOn' job attribute: the four Glidein attributes entry name,
+    name, factory name, and the factory pool, separated by "@".
+    There is currently no way to get the factory collector from condor_status, the hostname of GLIDEIN_Schedd,
+    without port number, is used as factory pool.
+    If the same slot is in multiple collectors, the first one is used.
+    Slots missing any of the GLIDEIN_Entry_Name, GLIDEIN_Name, GLIDEIN_Factory, or GLIDEIN_Schedd attributes
+    are not indexed.
+
+    Args:
+        status_dict (dict): A dictionary where each key is a collector name and the value is a
+                             Condor status object, e.g. the output of getRunningCondorStatus.
+
+    Returns:
+        dict: The RunningOn string of each slot, keyed by slot name (the RemoteHost of the jobs running there).
+    """
+    out = {}
+    for collector_name in status_dict:
+        for slot_name, el in status_dict[collector_name].fetchStored().items():
+            if slot_name in out:
+                continue
+            try:
+                # split by : to remove port number if there
+                fact_pool = el["GLIDEIN_Schedd"].split("@")[-1].split(":")[0]
+                out[slot_name] = "{}@{}@{}@{}".format(
+                    el["GLIDEIN_Entry_Name"], el["GLIDEIN_Name"], el["GLIDEIN_Factory"], fact_pool
+                )
+            except (KeyError, AttributeError):
+                continue
+    return out
+
+
 def appendRealRunning(condorq_dict, status_dict):
     """Adds provenance information from condor_status to the condor_q dictionary.
 
@@ -191,6 +371,8 @@ def appendRealRunning(condorq_dict, status_dict):
     information from `status_dict`. The value of 'RunningOn' is a formatted string
     containing the job's associated four Glidein attributes: entry name, name,
     factory name, and the factory pool.
+    The slots of all the collectors are indexed once (getRunningOnIndex), then each job
+    is looked up by RemoteHost. Jobs not running on a known slot get "UNKNOWN".
 
     The name of static or pslots is the value of RemoteHost.
 
@@ -213,37 +395,14 @@ def appendRealRunning(condorq_dict, status_dict):
         appendRealRunning(condorq_dict, status_dict)
         # The 'RunningOn' field will be added to each job in the condorq_dict.
     """
+    running_on_index = getRunningOnIndex(status_dict)
+
     for schedd_name in condorq_dict:
         condorq = condorq_dict[schedd_name].fetchStored()
 
         for jid in condorq:
-            found = False
-
-            if "RemoteHost" in condorq[jid]:
-                remote_host = condorq[jid]["RemoteHost"]
-
-                for collector_name in status_dict:
-                    condor_status = status_dict[collector_name].fetchStored()
-                    if remote_host in condor_status:
-                        # there is currently no way to get the factory
-                        # collector from condor status so this hack grabs
-                        # the hostname of the schedd
-                        schedd = condor_status[remote_host]["GLIDEIN_Schedd"].split("@")
-
-                        # split by : to remove port number if there
-                        fact_pool = schedd[-1].split(":")[0]
-
-                        condorq[jid]["RunningOn"] = "{}@{}@{}@{}".format(
-                            condor_status[remote_host]["GLIDEIN_Entry_Name"],
-                            condor_status[remote_host]["GLIDEIN_Name"],
-                            condor_status[remote_host]["GLIDEIN_Factory"],
-                            fact_pool,
-                        )
-                        found = True
-                        break
-
-            if not found:
-                condorq[jid]["RunningOn"] = "UNKNOWN"
+            job = condorq[jid]
+            job["RunningOn"] = running_on_index.get(job.get("RemoteHost"), "UNKNOWN")
 
 
 #
@@ -371,6 +530,35 @@ def getCondorQUsers(condorq_dict):
 #    return schedd_count, cpu_schedd_count, first_t
 
 
+def dumpMatchData(group_name, condorq_dict, glidein_dict, attr_dict, condorq_match_list):
+    """Save the input of the matching functions in /tmp/frontend_dump/<group_name>
+
+    The pickle files can be loaded by unittests/profile_frontend.py to profile
+    countMatch and countMatchMatrix with real data.
+
+    Args:
+        group_name (str): name of the group, used as subdirectory
+        condorq_dict (dict): dictionary of CondorQ objects keyed by schedd name
+        glidein_dict (dict): dictionary of entries keyed by glidein name
+        attr_dict (dict): dictionary of constant attributes
+        condorq_match_list (list): list of job attributes used for clustering
+    """
+    mydir = "/tmp/frontend_dump/" + group_name
+    try:
+        os.mkdir(mydir)
+    except (FileExistsError, FileNotFoundError):
+        pass
+    with open(mydir + "/glidein_dict.pickle", "wb") as fd:
+        pickle.dump(glidein_dict, fd)
+    with open(mydir + "/attr_dict.pickle", "wb") as fd:
+        pickle.dump(attr_dict, fd)
+    with open(mydir + "/condorq_match_list.pickle", "wb") as fd:
+        pickle.dump(condorq_match_list, fd)
+    for schedd in list(condorq_dict.keys()):
+        with open(mydir + "/condorq_dict_%s.pickle" % schedd, "wb") as fd:
+            pickle.dump(condorq_dict[schedd].fetchStored(), fd)
+
+
 def countMatch(
     match_obj,
     condorq_dict,
@@ -417,19 +605,7 @@ def countMatch(
     # This was used to save real data from the CMS frontend and improve the speed of this function
     # See https://cdcvs.fnal.gov/redmine/issues/20302
     if group_name:
-        mydir = "/tmp/frontend_dump/" + group_name
-        try:
-            os.mkdir(mydir)
-        except (FileExistsError, FileNotFoundError):
-            pass
-        with open(mydir + "/glidein_dict.pickle", "wb") as fd:
-            pickle.dump(glidein_dict, fd)
-        with open(mydir + "/attr_dict.pickle", "wb") as fd:
-            pickle.dump(attr_dict, fd)
-        with open(mydir + "/condorq_match_list.pickle", "wb") as fd:
-            pickle.dump(condorq_match_list, fd)
-        for schedd in list(condorq_dict.keys()):
-            pickle.dump(condorq_dict[schedd].fetchStored(), open(mydir + "/condorq_dict_%s.pickle" % schedd, "wb"))
+        dumpMatchData(group_name, condorq_dict, glidein_dict, attr_dict, condorq_match_list)
 
     out_glidein_counts = {}
     out_cpu_counts = {}
@@ -625,7 +801,7 @@ def countMatch(
     # outvals_cl contains the new list of unique sets:
     #  each element is a tuple: (set of Entries with the same jobs, set of jobs)
     # jrange_cl contains the set of all the job clusters
-    (outvals_cl, jrange_cl) = uniqueSets(list_of_all_jobs)
+    (outvals_cl, jrange_cl) = uniqueSetsBySignature(list_of_all_jobs)
     del list_of_all_jobs
 
     # Convert from clusters back to jobs
@@ -653,14 +829,16 @@ def countMatch(
     # this loop necessary to avoid key error
     for vtuple in outvals:
         for site_index in vtuple[0]:
-            new_out_counts[site_index] = 0.0
+            new_out_counts[site_index] = []
             unique_to_site[site_index] = 0
     # for every tuple of([site_index],jobs), cycle through each site index
     # new_out_counts[site_index] is the number of jobs over the number
     # of indexes, may not be an integer.
+    # The terms are summed with math.fsum, so the result does not depend on the order of the unique sets
+    # (e.g. 2 + 0.2 + 0.6 + 0.2 would be 3.0000000000000004 and be rounded up to 4)
     for vtuple in outvals:
         for site_index in vtuple[0]:
-            new_out_counts[site_index] = new_out_counts[site_index] + (1.0 * len(vtuple[1]) / len(vtuple[0]))
+            new_out_counts[site_index].append(1.0 * len(vtuple[1]) / len(vtuple[0]))
         # if the site has jobs unique to it
         if len(vtuple[0]) == 1:
             temp_sites = vtuple[0]
@@ -683,6 +861,7 @@ def countMatch(
         final_out_cpu_counts[glidename] = 0
         final_unique[glidename] = 0
     for site_index in new_out_counts:
+        new_out_counts[site_index] = math.fsum(new_out_counts[site_index])
         site = list_of_sites[site_index]
         final_out_counts[site] = math.ceil(new_out_counts[site_index])
         if out_glidein_counts[site] > 0:
@@ -711,6 +890,221 @@ def countMatch(
     return (out_glidein_counts, final_out_counts, final_unique, final_out_cpu_counts)
 
 
+class MatchMatrix:
+    """Boolean match matrix between the job clusters and the entries (glideins)
+
+    Jobs are grouped in clusters of equivalent jobs (same values for the attributes in condorq_match_list)
+    and the match expression and policies are evaluated once for each (entry, cluster) pair.
+    The matrix is stored sparse: for each cluster the tuple of the indexes (in glidein_list)
+    of the matching entries. The tuple is also the signature used to partition the jobs
+    in sets of jobs matching exactly the same entries.
+    All the counts of countMatch are then derived from reductions over the clusters,
+    without per-job bookkeeping.
+    """
+
+    def __init__(
+        self,
+        match_obj,
+        condorq_dict,
+        glidein_dict,
+        attr_dict,
+        ignore_down_entries,
+        condorq_match_list=None,
+        match_policies=[],
+    ):
+        """Cluster the jobs and build the match matrix
+
+        Args:
+            match_obj: compiled match expression (`compile(match_string, "<string>", "eval")`)
+            condorq_dict (dict): CondorQ objects keyed by schedd name
+            glidein_dict (dict): entries keyed by glidein name (output of `interface.findGlideins`)
+            attr_dict (dict): constant attributes, visible to the match expression
+            ignore_down_entries (bool): if True, entries in downtime do not match any job
+            condorq_match_list (list): job attributes used to cluster the jobs
+            match_policies (list): match policies ANDed to the match expression
+        """
+        self.glidein_dict = glidein_dict
+        self.glidein_list = list(glidein_dict.keys())
+        # One element per cluster: first job of the cluster (all jobs are equivalent) and number of jobs
+        self.cluster_jobs = []
+        self.cluster_sizes = []
+        # One element per cluster: tuple of the indexes of the matching entries (the matrix row)
+        self.cluster_rows = []
+        self._build_clusters(condorq_dict, condorq_match_list)
+        self._build_matrix(match_obj, attr_dict, ignore_down_entries, match_policies)
+
+    def _build_clusters(self, condorq_dict, condorq_match_list):
+        for schedd in condorq_dict:
+            schedd_clusters = {}
+            condorq_data = condorq_dict[schedd].fetchStored()
+            for jid in condorq_data:
+                job = condorq_data[jid]
+                jh = hashJob(job, condorq_match_list)
+                cluster = schedd_clusters.get(jh)
+                if cluster is None:
+                    schedd_clusters[jh] = [job, 1]
+                else:
+                    cluster[1] += 1
+            for job, size in schedd_clusters.values():
+                self.cluster_jobs.append(job)
+                self.cluster_sizes.append(size)
+
+    def _build_matrix(self, match_obj, attr_dict, ignore_down_entries, match_policies):
+        # attr_dict is a local variable so that it is visible in eval(match_obj)
+        rows = [[] for _ in self.cluster_jobs]
+        for glidein_idx, glidename in enumerate(self.glidein_list):
+            glidein = self.glidein_dict[glidename]
+            # Entry-side checks are evaluated once per entry, not once per cluster
+            if ignore_down_entries and safe_boolcomp(glidein["attrs"].get("GLIDEIN_In_Downtime", False), True):
+                # Do not match downtime entries
+                continue
+
+            missing_keys = set()
+            tb_count = 0
+            recent_tb = None
+            for cluster_idx, job in enumerate(self.cluster_jobs):
+                try:
+                    match = eval(match_obj)
+                    for policy in match_policies:
+                        if match is True:
+                            # Policies are supposed to be ANDed: match AND policy == policy because match is True
+                            match = policy.pyObject.match(job, glidein)
+                        else:
+                            if match != False:  # noqa: E712
+                                # Non boolean results should be discarded
+                                # and logged
+                                logSupport.log.warning(
+                                    "Match expression from policy file '%s' evaluated to non boolean result; assuming False"
+                                    % policy.file
+                                )
+                            break
+                    if match == True:  # noqa: E712
+                        rows[cluster_idx].append(glidein_idx)
+                except KeyError:
+                    tb = traceback.format_exception(sys.exc_info()[0], sys.exc_info()[1], sys.exc_info()[2])
+                    key = ((tb[-1].split(":"))[1]).strip()
+                    missing_keys.add(key)
+                except Exception:
+                    tb_count = tb_count + 1
+                    recent_tb = traceback.format_exception(sys.exc_info()[0], sys.exc_info()[1], sys.exc_info()[2])
+
+            if missing_keys:
+                logSupport.log.debug(
+                    "Failed to evaluate resource match in countMatchMatrix. Possibly match_expr has errors and trying to reference job or site attribute(s) '%s' in an inappropriate way."
+                    % (",".join(missing_keys))
+                )
+            if tb_count > 0:
+                logSupport.log.debug(
+                    "There were %s exceptions in countMatchMatrix subprocess. Most recent traceback: %s "
+                    % (tb_count, recent_tb)
+                )
+        # Entries are visited in order, so the rows are already sorted and can be used as signatures
+        self.cluster_rows = [tuple(row) for row in rows]
+
+    def counts(self):
+        """Reduce the match matrix to the counts returned by countMatch
+
+        Returns:
+            tuple: count, prop, hereonly, prop_mc dictionaries, same as countMatch
+        """
+        nr_glideins = len(self.glidein_list)
+        glidein_counts = [0] * nr_glideins
+        cpu_counts = [0] * nr_glideins
+        # Partition of the jobs by set of matching entries: signature -> number of jobs
+        unique_sets = {}
+        count_unmatched = 0
+        for cluster_idx, row in enumerate(self.cluster_rows):
+            size = self.cluster_sizes[cluster_idx]
+            if not row:
+                count_unmatched += size
+                continue
+            # Since all jobs are same figure out how many cpus
+            # are required for this cluster based on one job
+            cluster_cpus = self.cluster_jobs[cluster_idx].get("RequestCpus", 1) * size
+            for glidein_idx in row:
+                glidein_counts[glidein_idx] += size
+                cpu_counts[glidein_idx] += cluster_cpus
+            unique_sets[row] = unique_sets.get(row, 0) + size
+
+        # Jobs matching multiple entries are split evenly among them
+        prop_terms = {}
+        unique_to_site = {}
+        for row, size in unique_sets.items():
+            share = 1.0 * size / len(row)
+            for glidein_idx in row:
+                prop_terms.setdefault(glidein_idx, []).append(share)
+                unique_to_site.setdefault(glidein_idx, 0)
+            if len(row) == 1:
+                # the site has jobs unique to it
+                unique_to_site[row[0]] = size
+
+        out_glidein_counts = {}
+        out_cpu_counts = {}
+        final_out_counts = {}
+        final_out_cpu_counts = {}
+        final_unique = {}
+        for glidein_idx, glidename in enumerate(self.glidein_list):
+            out_glidein_counts[glidename] = glidein_counts[glidein_idx]
+            out_cpu_counts[glidename] = cpu_counts[glidein_idx]
+            final_out_counts[glidename] = 0
+            final_out_cpu_counts[glidename] = 0
+            final_unique[glidename] = unique_to_site.get(glidein_idx, 0)
+            if glidein_idx not in prop_terms:
+                continue
+            prop_count = math.fsum(prop_terms[glidein_idx])
+            final_out_counts[glidename] = math.ceil(prop_count)
+            if glidein_counts[glidein_idx] > 0:
+                glidein = self.glidein_dict[glidename]
+                glidein_cpus_nodes = 1.0 * getGlideinCpusNum(glidein) * getGlideinNodesNum(glidein)
+                # prop_count is based on 1 cpu jobs, scale it using the cpus required by the matching jobs
+                # and the ones provided by a single submission to the entry
+                prop_cpus = (cpu_counts[glidein_idx] * prop_count) / glidein_counts[glidein_idx]
+                final_out_cpu_counts[glidename] = math.ceil(prop_cpus / glidein_cpus_nodes)
+
+        out_glidein_counts[(None, None, None)] = count_unmatched
+        final_out_counts[(None, None, None)] = count_unmatched
+        final_unique[(None, None, None)] = count_unmatched
+        final_out_cpu_counts[(None, None, None)] = count_unmatched
+        return (out_glidein_counts, final_out_counts, final_unique, final_out_cpu_counts)
+
+
+def countMatchMatrix(
+    match_obj,
+    condorq_dict,
+    glidein_dict,
+    attr_dict,
+    ignore_down_entries,
+    condorq_match_list=None,
+    match_policies=[],
+    group_name=None,
+):
+    """Get the number of jobs that match each glidein, using a match matrix.
+
+    Drop-in replacement of countMatch (same arguments and same return value).
+    The match expression is evaluated once for each (entry, job cluster) pair to build a MatchMatrix
+    and all the counts are derived from it, instead of tracking the single jobs.
+
+    Args:
+        match_obj: compiled match expression (`compile(match_string, "<string>", "eval")`)
+        condorq_dict (dict): CondorQ objects keyed by schedd name
+        glidein_dict (dict): entries keyed by glidein name (output of `interface.findGlideins`)
+        attr_dict (dict): constant attributes
+        ignore_down_entries (bool): if True, entries in downtime do not match any job
+        condorq_match_list (list): job attributes used to cluster the jobs
+        match_policies (list, optional): policies to match against the glidein
+        group_name (str, optional): if set, dump the input data in /tmp/frontend_dump/<group_name>
+
+    Returns:
+        tuple: count, prop, hereonly, prop_mc dictionaries, see countMatch
+    """
+    if group_name:
+        dumpMatchData(group_name, condorq_dict, glidein_dict, attr_dict, condorq_match_list)
+    match_matrix = MatchMatrix(
+        match_obj, condorq_dict, glidein_dict, attr_dict, ignore_down_entries, condorq_match_list, match_policies
+    )
+    return match_matrix.counts()
+
+
 def countRealRunning(match_obj, condorq_dict, glidein_dict, attr_dict, condorq_match_list=None, match_policies=[]):
     """Counts all the running jobs on an entry
 
@@ -737,120 +1131,136 @@ def countRealRunning(match_obj, condorq_dict, glidein_dict, attr_dict, condorq_m
     schedds = list(condorq_dict.keys())
     nr_schedds = len(schedds)
 
-    # dict of job clusters
+    missing_keys = set()
+    tb_count = 0
+    recent_tb = None
+
+    # dict of job clusters, indexed by the entry they are running on
     # group together those that have the same attributes
-    cq_dict_clusters = {}
+    # A cluster can match only the entry in the RunningOn of its first job (set by appendRealRunning):
+    # the match expression and policies are evaluated only for that entry, not for all the entries
+    # running_clusters[RunningOn] = list of (scheddIdx, cluster job ids)
+    running_clusters = {}
     for scheddIdx in range(nr_schedds):
         schedd = schedds[scheddIdx]
-        cq_dict_clusters[scheddIdx] = {}
-        cq_dict_clusters_el = cq_dict_clusters[scheddIdx]
         condorq = condorq_dict[schedd]
         condorq_data = condorq.fetchStored()
+        cq_dict_clusters_el = {}
         for jid in list(condorq_data.keys()):
             jh = hashJob(condorq_data[jid], condorq_match_list)
             if jh not in cq_dict_clusters_el:
                 cq_dict_clusters_el[jh] = []
             cq_dict_clusters_el[jh].append(jid)
-
+        for jh in cq_dict_clusters_el:
+            # get the first job... they are all the same
+            first_jid = cq_dict_clusters_el[jh][0]
+            try:
+                running_on = condorq_data[first_jid]["RunningOn"]
+            except KeyError:
+                missing_keys.add("'RunningOn'")
+                continue
+            if running_on not in running_clusters:
+                running_clusters[running_on] = []
+            running_clusters[running_on].append((scheddIdx, cq_dict_clusters_el[jh]))
+
+    # Sets are necessary to remove duplicates
+    # job_ids counts all the jobs running on the current entry (Running here stats)
+    #   job_ID+schedd_ID identifies a job, set() is used to merge jobs matched by multiple auto-clusters
+    # glidein_ids counts the glideins: multiple jobs could run on the same glidein, RemoteHost
+    #   (without the initial slotN@ part) identifies the glidein
+    #   i.e. multiple jobs with same RemoteHost run on the same slot, removing slotN@ gives all the slots
+    #        running on the same glidein
+    #   The slot part will change in HTCondor 8.5, where dynamic slots will have their name instead of the
+    #   pslot name but removing slotN_N@ will still identify the glidein (so this code is robust to the change)
+    job_ids = {}
+    glidein_ids = {}
+    glidein_counts = {}
     for glidename in glidein_dict:
+        job_ids[glidename] = set()
+        glidein_ids[glidename] = set()
+        glidein_counts[glidename] = 0
         # split by : to remove port number if there
         glide_str = "{}@{}".format(glidename[1], glidename[0].split(":")[0])
+
         glidein = glidein_dict[glidename]
-        glidein_count = 0
-        # Sets are necessary to remove duplicates
-        # job_ids counts all the jobs running on the current entry (Running here stats)
-        #   job_ID+schedd_ID identifies a job, set() is used to merge jobs matched by multiple auto-clusters
-        # glidein_ids counts the glideins: multiple jobs could run on the same glidein, RemoteHost
-        #   (without the initial slotN@ part) identifies the glidein
-        #   i.e. multiple jobs with same RemoteHost run on the same slot, removing slotN@ gives all the slots
-        #        running on the same glidein
-        #   The slot part will change in HTCondor 8.5, where dynamic slots will have their name instead of the
-        #   pslot name but removing slotN_N@ will still identify the glidein (so this code is robust to the change)
-        job_ids = set()
-        glidein_ids = set()
-        for scheddIdx in range(nr_schedds):
+        for scheddIdx, cluster_jids in running_clusters.get(glide_str, ()):
             schedd = schedds[scheddIdx]
-            cq_dict_clusters_el = cq_dict_clusters[scheddIdx]
-            condorq = condorq_dict[schedd]
-            condorq_data = condorq.fetchStored()
-            schedd_count = 0
-
-            missing_keys = set()
-            tb_count = 0
-            recent_tb = None
+            condorq_data = condorq_dict[schedd].fetchStored()
+            job = condorq_data[cluster_jids[0]]
+            try:
+                # The RunningOn of the job is glide_str, only the match expression is left to evaluate
+                match = eval(match_obj)
+                for policy in match_policies:
+                    if match == True:  # noqa: E712
+                        # Policies are supposed to be ANDed
+                        match = match and policy.pyObject.match(job, glidein)
+                    else:
+                        if match != False:  # noqa: E712
+                            # Non boolean results should be discarded
+                            # and logged
+                            logSupport.log.warning(
+                                "Match expression from policy file '%s' evaluated to non boolean result; assuming False"
+                                % policy.file
+                            )
+                        break
 
-            for jh in list(cq_dict_clusters_el.keys()):
-                # get the first job... they are all the same
-                first_jid = cq_dict_clusters_el[jh][0]
-                job = condorq_data[first_jid]
-                try:
-                    # Evaluate the Compiled object first.
-                    # Evaluation order does not really matter.
-                    match = (job["RunningOn"] == glide_str) and eval(match_obj)
-                    for policy in match_policies:
-                        if match == True:  # noqa: E712
-                            # Policies are supposed to be ANDed
-                            match = match and policy.pyObject.match(job, glidein)
-                        else:
-                            if match != False:  # noqa: E712
-                                # Non boolean results should be discarded
-                                # and logged
-                                logSupport.log.warning(
-                                    "Match expression from policy file '%s' evaluated to non boolean result; assuming False"
-                                    % policy.file
-                                )
-                            break
+                if match == True:  # noqa: E712
+                    glidein_counts[glidename] += len(cluster_jids)
+                    for jid in cluster_jids:
+                        job = condorq_data[jid]
+                        job_ids[glidename].add("%d %s" % (scheddIdx, jid))
+                        # glidein ID is just glidein_XXXXX_XXXXX@fqdn
+                        # RemoteHost has following valid formats
+                        #
+                        # Static slots
+                        # ------------
+                        # 1 core: glidein_XXXXX_XXXXX@fqdn
+                        # N core: slotN@glidein_XXXXX_XXXXX@fqdn
+                        #
+                        # Dynamic slots
+                        # -------------
+                        # N core: slotN_M@glidein_XXXXX_XXXXX@fqdn
+                        try:
+                            token = job["RemoteHost"].split("@")
+                            glidein_id = f"{token[-2]}@{token[-1]}"
+                        except (KeyError, IndexError):
+                            # If RemoteHost is missing or has a different
+                            # format just identify it with the uniq jobid
+                            # for accounting purposes. Here we assume that
+                            # the job is running in a glidein with 1 slot
+                            glidein_id = "%d %s" % (scheddIdx, jid)
+                        glidein_ids[glidename].add(glidein_id)
+            except KeyError:
+                tb = traceback.format_exception(sys.exc_info()[0], sys.exc_info()[1], sys.exc_info()[2])
+                key = ((tb[-1].split(":"))[1]).strip()
+                missing_keys.add(key)
+            except Exception:
+                tb_count = tb_count + 1
+                recent_tb = traceback.format_exception(sys.exc_info()[0], sys.exc_info()[1], sys.exc_info()[2])
+
+    if missing_keys and glidein_dict:
+        logSupport.log.debug(
+            "Failed to evaluate resource match in countRealRunning. Possibly match_expr has errors and trying to reference job or site attribute(s) '%s' in an inappropriate way."
+            % (",".join(missing_keys))
+        )
+    if tb_count > 0:
+        logSupport.log.debug(
+            "There were %s exceptions in countRealRunning subprocess. Most recent traceback: %s" % (tb_count, recent_tb)
+        )
 
-                    if match == True:  # noqa: E712
-                        schedd_count += len(cq_dict_clusters_el[jh])
-                        for jid in cq_dict_clusters_el[jh]:
-                            job = condorq_data[jid]
-                            job_ids.add("%d %s" % (scheddIdx, jid))
-                            # glidein ID is just glidein_XXXXX_XXXXX@fqdn
-                            # RemoteHost has following valid formats
-                            #
-                            # Static slots
-                            # ------------
-                            # 1 core: glidein_XXXXX_XXXXX@fqdn
-                            # N core: slotN@glidein_XXXXX_XXXXX@fqdn
-                            #
-                            # Dynamic slots
-                            # -------------
-                            # N core: slotN_M@glidein_XXXXX_XXXXX@fqdn
-                            try:
-                                token = job["RemoteHost"].split("@")
-                                glidein_id = f"{token[-2]}@{token[-1]}"
-                            except (KeyError, IndexError):
-                                # If RemoteHost is missing or has a different
-                                # format just identify it with the uniq jobid
-                                # for accounting purposes. Here we assume that
-                                # the job is running in a glidein with 1 slot
-                                glidein_id = "%d %s" % (scheddIdx, jid)
-                            glidein_ids.add(glidein_id)
-                except KeyError:
-                    tb = traceback.format_exception(sys.exc_info()[0], sys.exc_info()[1], sys.exc_info()[2])
-                    key = ((tb[-1].split(":"))[1]).strip()
-                    missing_keys.add(key)
-                except Exception:
-                    tb_count = tb_count + 1
-                    recent_tb = traceback.format_exception(sys.exc_info()[0], sys.exc_info()[1], sys.exc_info()[2])
-            if missing_keys:
-                logSupport.log.debug(
-                    "Failed to evaluate resource match in countRealRunning. Possibly match_expr has errors and trying to reference job or site attribute(s) '%s' in an inappropriate way."
-                    % (",".join(missing_keys))
-                )
-            if tb_count > 0:
-                logSupport.log.debug(
-                    "There were %s exceptions in countRealRunning subprocess. Most recent traceback: %s"
-                    % (tb_count, recent_tb)
-                )
-            glidein_count += schedd_count
+    for glidename in glidein_dict:
         logSupport.log.debug(
             "Running glidein ids at %s (total glideins: %d, total jobs %d, cluster matches: %d): %s"
-            % (glidename, len(glidein_ids), len(job_ids), glidein_count, ", ".join(list(glidein_ids)[:5]))
+            % (
+                glidename,
+                len(glidein_ids[glidename]),
+                len(job_ids[glidename]),
+                glidein_counts[glidename],
+                ", ".join(list(glidein_ids[glidename])[:5]),
+            )
         )
-        out_job_counts[glidename] = len(job_ids)
-        out_glidein_counts[glidename] = len(glidein_ids)
+        out_job_counts[glidename] = len(job_ids[glidename])
+        out_glidein_counts[glidename] = len(glidein_ids[glidename])
     return out_job_counts, out_glidein_counts
 
 
@@ -1203,6 +1613,32 @@ def getRunningCoresCondorStatus(status_dict):
     return getRunningCondorStatus(status_dict)
 
 
+def getGroupCondorStatus(status_dict, frontend_name, group_name):
+    """Return a dictionary of collectors containing all slots of a Frontend group
+    Each element is a condorStatus
+
+    Use the output of getCondorStatus, e.g. with the slots of all the groups of the Frontend
+
+    Args:
+        status_dict (dict): output of getCondorStatus
+        frontend_name (str): frontend name
+        group_name (str): group name
+
+    Returns:
+        dict: dictionary of collectors containing the slots with GLIDECLIENT_Name "frontend_name.group_name".
+            The elements are copies of the input query objects, picklable if those are
+    """
+    client_name = f"{frontend_name}.{group_name}"
+    out = {}
+    for collector_name, query in status_dict.items():
+        group_query = copy.copy(query)
+        group_query.stored_data = {
+            k: el for k, el in query.fetchStored().items() if el.get("GLIDECLIENT_Name") == client_name
+        }
+        out[collector_name] = group_query
+    return out
+
+
 def getClientCondorStatus(status_dict, frontend_name, group_name, request_name):
     """Return a dictionary of collectors containing all slots for a request (idle, running, ...)
     Each element is a condorStatus
@@ -1291,6 +1727,188 @@ def getClientCondorStatusPerCredId(status_dict, frontend_name, group_name, reque
     return out
 
 
+# Bits of the slot categories returned by getCondorStatusSlotMask
+CONDORSTATUS_NON_DYNAMIC = 1
+CONDORSTATUS_IDLE = 2
+CONDORSTATUS_RUNNING = 4
+CONDORSTATUS_RUNNING_PSLOT = 8
+CONDORSTATUS_FAILED = 16
+
+
+def getCondorStatusSlotMask(el, min_memory=2500):
+    """Returns the bitmask of the categories of a slot, for QueryClassifier
+
+    The categories select the same slots of getCondorStatusNonDynamic (CONDORSTATUS_NON_DYNAMIC),
+    getIdleCondorStatus (CONDORSTATUS_IDLE), getRunningJobsCondorStatus (CONDORSTATUS_RUNNING),
+    getRunningPSlotCondorStatus (CONDORSTATUS_RUNNING_PSLOT) and getFailedCondorStatus (CONDORSTATUS_FAILED).
+    getRunningCondorStatus selects CONDORSTATUS_RUNNING | CONDORSTATUS_RUNNING_PSLOT.
+
+    Args:
+        el (dict): slot classad
+        min_memory (int): minimum memory in MB for idle partitionable slots, as in getIdleCondorStatus
+
+    Returns:
+        int: bitmask of the categories
+    """
+    mask = 0
+    is_pslot = el.get("PartitionableSlot")
+    state = el.get("State")
+    activity = el.get("Activity")
+    if el.get("SlotType") != "Dynamic":
+        mask |= CONDORSTATUS_NON_DYNAMIC
+    if (
+        (state == "Unclaimed")
+        and (activity == "Idle")
+        and (
+            not is_pslot
+            or (el.get("TotalSlots") == 1)
+            or (
+                el.get("Cpus", 0) > 0
+                and el.get("Memory", 2501) > min_memory
+                and (el.get("TotalGpus", 0) == 0 or el.get("Gpus", 0) > 0)
+            )
+        )
+    ):
+        mask |= CONDORSTATUS_IDLE
+    if (state == "Claimed") and (activity in ("Busy", "Retiring")):
+        mask |= CONDORSTATUS_RUNNING
+    if is_pslot and (el.get("TotalSlots", 1) > 1):
+        mask |= CONDORSTATUS_RUNNING_PSLOT
+    if (state == "Drained") and (activity == "Retiring"):
+        mask |= CONDORSTATUS_FAILED
+    return mask
+
+
+def getCondorStatusSlotCores(el, mask):
+    """Returns the cores of a slot counted in TotalCores, IdleCores and RunningCores, for QueryClassifier
+
+    Same as countTotalCoresCondorStatus, countIdleCoresCondorStatus and countRunningCoresCondorStatus
+    on the dictionaries of the slot categories.
+
+    Args:
+        el (dict): slot classad
+        mask (int): bitmask of the slot, from getCondorStatusSlotMask
+
+    Returns:
+        tuple: total cores, idle cores, running cores
+    """
+    is_pslot = el.get("PartitionableSlot", False)
+    cpus = el.get("Cpus", 0)
+    total_cores = idle_cores = running_cores = 0
+    if mask & CONDORSTATUS_NON_DYNAMIC:
+        total_cores = el.get("TotalSlotCpus", 0) if is_pslot else cpus
+    if mask & CONDORSTATUS_IDLE:
+        idle_cores = cpus
+    # Running p-slots are selected only to be skipped when counting
+    if (mask & CONDORSTATUS_RUNNING) and not is_pslot:
+        running_cores = cpus
+    return total_cores, idle_cores, running_cores
+
+
+class SlotStatusIndex:
+    """Slot counts of a Frontend group indexed by request name, credential ID and slot state.
+
+    It is built with a single pass over the slots returned by getCondorStatus and gives the same counts
+    of getClientCondorStatus (and getClientCondorStatusCredIdOnly) followed by the selection and count
+    functions of each state, e.g. getIdleCondorStatus and countCondorStatus for "Idle",
+    getRunningCondorStatus and countRunningCondorStatus for "Running".
+    As getIdleCoresCondorStatus, "IdleCores" selects the idle slots with the default minimum memory,
+    not the group one.
+
+    Attributes:
+        request_counts (dict): Counts per request name, each a list in the order of STATES.
+        cred_counts (dict): Counts per (request name, credential ID), each a list in the order of STATES.
+    """
+
+    STATES = ("Total", "Idle", "Running", "Failed", "TotalCores", "IdleCores", "RunningCores")
+
+    def __init__(self, status_dict, frontend_name, group_name, min_memory=2500):
+        """Counts the slots of the group in all the collectors.
+
+        Args:
+            status_dict (dict): output of getCondorStatus
+            frontend_name (str): frontend name
+            group_name (str): group name
+            min_memory (int): minimum memory in MB for idle partitionable slots, as in getIdleCondorStatus
+        """
+        client_name_new = f"{frontend_name}.{group_name}"
+        client_suffix_old = f"@{frontend_name}.{group_name}"
+        self.request_counts = {}
+        self.cred_counts = {}
+        for collector_status in status_dict.values():
+            for el in collector_status.fetchStored().values():
+                client_name = el.get("GLIDECLIENT_Name")
+                if client_name == client_name_new:
+                    try:
+                        request_name = "{}@{}@{}".format(
+                            el["GLIDEIN_Entry_Name"], el["GLIDEIN_Name"], el["GLIDEIN_Factory"]
+                        )
+                    except KeyError:
+                        continue  # no factory info, cannot be a slot of any request
+                elif client_name is not None and client_name.endswith(client_suffix_old):
+                    request_name = client_name[: -len(client_suffix_old)]
+                else:
+                    continue  # slot of another client
+                slot_counts = self.slotCounts(el, min_memory)
+                self._add(self.request_counts, request_name, slot_counts)
+                if "GLIDEIN_CredentialIdentifier" in el:
+                    self._add(self.cred_counts, (request_name, el["GLIDEIN_CredentialIdentifier"]), slot_counts)
+
+    @staticmethod
+    def slotCounts(el, min_memory):
+        """Returns the contribution of a slot to the counts of each state.
+
+        Args:
+            el (dict): slot classad
+            min_memory (int): minimum memory in MB for idle partitionable slots
+
+        Returns:
+            tuple: counts in the same order of STATES
+        """
+        mask = getCondorStatusSlotMask(el, min_memory)
+        total_cores, idle_cores, running_cores = getCondorStatusSlotCores(el, mask)
+        # getIdleCoresCondorStatus uses the default minimum memory
+        default_mask = getCondorStatusSlotMask(el)
+        if default_mask != mask:
+            idle_cores = getCondorStatusSlotCores(el, default_mask)[1]
+        idle = 1 if mask & CONDORSTATUS_IDLE else 0
+        # Running p-slots are selected only to be skipped when counting
+        running = 1 if (mask & CONDORSTATUS_RUNNING) and not el.get("PartitionableSlot", False) else 0
+        failed = 1 if mask & CONDORSTATUS_FAILED else 0
+        return 1, idle, running, failed, total_cores, idle_cores, running_cores
+
+    def _add(self, counts_dict, key, slot_counts):
+        try:
+            counts = counts_dict[key]
+        except KeyError:
+            counts = counts_dict[key] = [0] * len(self.STATES)
+        for i, count in enumerate(slot_counts):
+            counts[i] += count
+
+    def getCounts(self, request_name):
+        """Returns the counts of the slots of a request.
+
+        Args:
+            request_name (str): request name
+
+        Returns:
+            dict: counts for each state in STATES
+        """
+        return dict(zip(self.STATES, self.request_counts.get(request_name, (0,) * len(self.STATES))))
+
+    def getCredCounts(self, request_name, cred_id):
+        """Returns the counts of the slots of a request with a specific credential.
+
+        Args:
+            request_name (str): request name
+            cred_id (str): credential ID
+
+        Returns:
+            dict: counts for each state in STATES
+        """
+        return dict(zip(self.STATES, self.cred_counts.get((request_name, cred_id), (0,) * len(self.STATES))))
+
+
 def countCondorStatus(status_dict):
     """Return the number of items (slots) in the dictionary
     Use the output of getCondorStatus
@@ -1469,7 +2087,9 @@ def getFactoryEntryList(status_dict):
     return list(out)
 
 
-def getCondorStatusSchedds(collector_names, constraint=None, format_list=None, want_format_completion=True):
+def getCondorStatusSchedds(
+    collector_names, constraint=None, format_list=None, want_format_completion=True, use_bindings=None
+):
     """Return a dictionary of collectors containing interesting classads
     Each element is a condorStatus
 
@@ -1480,6 +2100,8 @@ def getCondorStatusSchedds(collector_names, constraint=None, format_list=None, w
         constraint (str, None):
         format_list (list, None):
         want_format_completion (bool): add default elements to the format_list if True (default)
+        use_bindings (bool, None): query with the python bindings (True) or condor_status (False).
+            Defaults to None, use the bindings if available
 
     Returns:
 
@@ -1500,7 +2122,7 @@ def getCondorStatusSchedds(collector_names, constraint=None, format_list=None, w
 
     type_constraint = "True"
     return getCondorStatusConstrained(
-        collector_names, type_constraint, constraint, format_list, subsystem_name="schedd"
+        collector_names, type_constraint, constraint, format_list, subsystem_name="schedd", use_bindings=use_bindings
     )
 
 
@@ -1518,19 +2140,33 @@ def getCondorStatusSchedds(collector_names, constraint=None, format_list=None, w
 # If not all the jobs of the schedd has to be considered,
 # specify the appropriate additional constraint
 #
-def getCondorQConstrained(schedd_names, type_constraint, constraint=None, format_list=None):
+# When using the python bindings the schedds are queried concurrently (see condorMonitor.load_concurrently)
+#
+def getCondorQConstrained(schedd_names, type_constraint, constraint=None, format_list=None, use_bindings=None):
     out_condorq_dict = {}
+    full_constraint = type_constraint[0:]  # make copy
+    if constraint is not None:
+        full_constraint = f"({full_constraint}) && ({constraint})"
+
+    # [schedd, condorq, error] for each schedd
+    condorq_list = []
     for schedd in schedd_names:
         if schedd == "":
             logSupport.log.warning("Skipping empty schedd name")
             continue
-        full_constraint = type_constraint[0:]  # make copy
-        if constraint is not None:
-            full_constraint = f"({full_constraint}) && ({constraint})"
-
         try:
-            condorq = condorMonitor.CondorQ(schedd)
-            condorq.load(full_constraint, format_list)
+            condorq_list.append([schedd, condorMonitor.CondorQ(schedd, use_bindings=use_bindings), None])
+        except Exception as e:
+            condorq_list.append([schedd, None, e])
+    to_load = [i for i in condorq_list if i[1] is not None]
+    load_errors = condorMonitor.load_concurrently([i[1] for i in to_load], full_constraint, format_list)
+    for condorq_el, load_error in zip(to_load, load_errors):
+        condorq_el[2] = load_error
+
+    for schedd, condorq, load_error in condorq_list:
+        try:
+            if load_error is not None:
+                raise load_error
             if len(condorq.fetchStored()) > 0:
                 out_condorq_dict[schedd] = condorq
         except condorMonitor.QueryError:
@@ -1552,7 +2188,7 @@ def getCondorQConstrained(schedd_names, type_constraint, constraint=None, format
 
 
 def getCondorStatusConstrained(
-    collector_names, type_constraint, constraint=None, format_list=None, subsystem_name=None
+    collector_names, type_constraint, constraint=None, format_list=None, subsystem_name=None, use_bindings=None
 ):
     """Return a dictionary of collectors containing the ClassAds selected by the constraints
     and with the attributes specified in `format_list`.
@@ -1567,19 +2203,29 @@ def getCondorStatusConstrained(
         constraint (str, None): HTCondor constraint for condor_status
         format_list (list, None): HTCondor format list for condor_status
         subsystem_name (str, None): HTCondor subsystem name
+        use_bindings (bool, None): query with the python bindings (True) or condor_status (False).
+            Defaults to None, use the bindings if available. With the bindings, the collectors are queried concurrently
 
     Returns:
         dict: Status dictionary keyed by collector name
     """
     out_status_dict = {}
+    full_constraint = type_constraint[0:]  # make copy
+    if constraint is not None:
+        full_constraint = f"({full_constraint}) && ({constraint})"
+
+    status_list = []
     for collector in collector_names:
-        full_constraint = type_constraint[0:]  # make copy
-        if constraint is not None:
-            full_constraint = f"({full_constraint}) && ({constraint})"
+        status = condorMonitor.CondorStatus(
+            subsystem_name=subsystem_name, pool_name=collector, use_bindings=use_bindings
+        )
+        status_list.append((collector, status))
+    load_errors = condorMonitor.load_concurrently([i[1] for i in status_list], full_constraint, format_list)
 
+    for (collector, status), load_error in zip(status_list, load_errors):
         try:
-            status = condorMonitor.CondorStatus(subsystem_name=subsystem_name, pool_name=collector)
-            status.load(full_constraint, format_list)
+            if load_error is not None:
+                raise load_error
         except condorMonitor.QueryError:
             if collector is not None:
                 msg = "Condor Error. Failed to talk to collector %s: " % collector
@@ -1690,6 +2336,43 @@ def uniqueSets(in_sets):
     return (outvals, sorted_sets[-1])
 
 
+def uniqueSetsBySignature(in_sets):
+    """Extract unique subsets from a list of sets, in linear time
+
+    Same input and output of uniqueSets. Each element gets a signature, the tuple of the indexes
+    of the input sets containing it, and the elements are grouped by signature in one pass.
+    The cost is proportional to the total size of the input sets, while uniqueSets is quadratic
+    in the number of sets.
+    The order of the output list is not the same as in uniqueSets.
+
+    Args:
+        in_sets (list): list of sets
+
+    Returns:
+        tuple: list of (index set, value subset) pairs, set that is the union of all input sets
+    """
+    signatures = {}
+    for idx, in_set in enumerate(in_sets):
+        for el in in_set:
+            sig = signatures.get(el)
+            if sig is None:
+                signatures[el] = [idx]
+            else:
+                sig.append(idx)
+
+    partition = {}
+    for el, sig in signatures.items():
+        sig = tuple(sig)
+        subset = partition.get(sig)
+        if subset is None:
+            partition[sig] = {el}
+        else:
+            subset.add(el)
+
+    outvals = [(set(sig), subset) for sig, subset in partition.items()]
+    return (outvals, set(signatures))
+
+
 def hashJob(condorq_el, condorq_match_list=None):
     out = []
     keys = sorted(condorq_el.keys())
@@ -36,6 +36,7 @@ class MonitoringConfig:
                              (aggregation method, storage factor, number of steps, retention period).
         monitor_dir (str): The directory where monitoring data is stored. Default is "monitor/".
         rrd_obj (object): An instance of the `rrdSupport` class for handling RRD operations.
+        rrd_batch_obj (rrdSupport.BatchRRDSupport): Used in place of `rrd_obj` in `rrd_batch()` contexts.
         my_name (str): A string to store the name associated with the monitoring configuration. Default is "Unknown".
 
     Example:
@@ -60,6 +61,8 @@ class MonitoringConfig:
         self.monitor_dir = "monitor/"
 
         self.rrd_obj = rrdSupport.rrdSupport()
+        # Created and reused by rrd_batch
+        self.rrd_batch_obj = None
 
         self.my_name = "Unknown"
 
@@ -89,6 +92,27 @@ class MonitoringConfig:
         util.file_tmp2final(fname, mask_exceptions=(logSupport.log.error, f"Failed rename/write into {fname}"))
         return
 
+    def write_xml_file(self, relative_fname, write_func, compress=False):
+        """Writes a file in the monitoring directory incrementally, without building its content in memory.
+
+        Like `write_file`, the content is written to a temporary file renamed to the final file name.
+
+        Args:
+            relative_fname (str): The relative path and file name within the monitoring directory.
+            write_func (callable): Function writing the content into the open file passed as argument,
+                e.g. with the `xmlFormat` *2file functions.
+            compress (bool): If True, the file is gzip compressed. Defaults to False.
+
+        Returns:
+            None: This method does not return a value, but writes the content to the specified file.
+        """
+        fname = os.path.join(self.monitor_dir, relative_fname)
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+        with xmlFormat.open_xml_file(fname + ".tmp", compress) as fd:
+            write_func(fd)
+        util.file_tmp2final(fname, mask_exceptions=(logSupport.log.error, f"Failed rename/write into {fname}"))
+        return
+
     def establish_dir(self, relative_dname):
         """Creates a directory within the monitoring directory.
 
@@ -142,6 +166,14 @@ class MonitoringConfig:
                 # logSupport.log.exception(traceback.format_exc())
         return
 
+    def rrd_batch(self):
+        """Context manager queuing the RRD updates and writing them all at the end, see `rrdSupport.rrd_batch`.
+
+        The RRD files are updated only when exiting the context: do not read them (e.g. fetch) inside it.
+        Nested contexts are part of the outer batch.
+        """
+        return rrdSupport.rrd_batch(self, logSupport.log)
+
 
 #########################################################################################################################################
 #
@@ -174,6 +206,11 @@ class groupStats:
         # stats.attributes contains the job, glidein, matched job, core, and requested attributes.
     """
 
+    # Parameters of the XML formatting of the data dictionaries
+    xml_data_subtypes_params = {
+        "class": {"subclass_params": {"Requested": {"dicts_params": {"Parameters": {"el_name": "Parameter"}}}}}
+    }
+
     def __init__(self):
         self.data = {"factories": {}, "states": {}, "totals": {}}
         self.updated = time.time()
@@ -279,9 +316,7 @@ class groupStats:
             data,
             dict_name="factories",
             el_name="factory",
-            subtypes_params={
-                "class": {"subclass_params": {"Requested": {"dicts_params": {"Parameters": {"el_name": "Parameter"}}}}}
-            },
+            subtypes_params=self.xml_data_subtypes_params,
             indent_tab=indent_tab,
             leading_tab=leading_tab,
         )
@@ -295,9 +330,7 @@ class groupStats:
             data,
             dict_name="states",
             el_name="state",
-            subtypes_params={
-                "class": {"subclass_params": {"Requested": {"dicts_params": {"Parameters": {"el_name": "Parameter"}}}}}
-            },
+            subtypes_params=self.xml_data_subtypes_params,
             indent_tab=indent_tab,
             leading_tab=leading_tab,
         )
@@ -361,21 +394,25 @@ class groupStats:
             return
 
         # write snapshot file
-        xml_str = (
-            '<?xml version="1.0" encoding="ISO-8859-1"?>\n\n'
-            + "<VOFrontendGroupStats>\n"
-            + self.get_xml_updated(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_factories_data(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_states_data(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_total(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + "</VOFrontendGroupStats>\n"
-        )
-
-        monitoringConfig.write_file("frontend_status.xml", xml_str)
+        def write_xml(fd):
+            fd.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n\n<VOFrontendGroupStats>\n')
+            xmlFormat.time2file(fd, self.updated, "updated")
+            for dict_name, el_name, data in (
+                ("factories", "factory", self.get_factories_data()),
+                ("states", "state", self.get_states_data()),
+            ):
+                xmlFormat.dict2file(
+                    fd,
+                    data,
+                    dict_name=dict_name,
+                    el_name=el_name,
+                    subtypes_params=self.xml_data_subtypes_params,
+                    leading_tab=xmlFormat.DEFAULT_TAB,
+                )
+            xmlFormat.class2file(fd, self.get_total(), inst_name="total", leading_tab=xmlFormat.DEFAULT_TAB)
+            fd.write("</VOFrontendGroupStats>\n")
+
+        monitoringConfig.write_xml_file("frontend_status.xml", write_xml)
 
         # update RRDs
         total_el = self.get_total()
@@ -484,6 +521,11 @@ class factoryStats:
         # Logs the job status for client "client1" with the respective counts for "Idle", "Running", etc.
     """
 
+    # Parameters of the XML formatting of the data dictionaries
+    xml_data_subtypes_params = {
+        "class": {"subclass_params": {"Requested": {"dicts_params": {"Parameters": {"el_name": "Parameter"}}}}}
+    }
+
     def __init__(self):
         self.data = {}
         self.updated = time.time()
@@ -608,9 +650,7 @@ class factoryStats:
             data,
             dict_name="frontends",
             el_name="frontend",
-            subtypes_params={
-                "class": {"subclass_params": {"Requested": {"dicts_params": {"Parameters": {"el_name": "Parameter"}}}}}
-            },
+            subtypes_params=self.xml_data_subtypes_params,
             indent_tab=indent_tab,
             leading_tab=leading_tab,
         )
@@ -696,23 +736,26 @@ class factoryStats:
             # files updated recently, no need to redo it
             return
 
-        # write snapshot file
-        xml_str = (
-            '<?xml version="1.0" encoding="ISO-8859-1"?>\n\n'
-            + "<glideFactoryEntryQStats>\n"
-            + self.get_xml_updated(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_data(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + self.get_xml_total(indent_tab=xmlFormat.DEFAULT_TAB, leading_tab=xmlFormat.DEFAULT_TAB)
-            + "\n"
-            + "</glideFactoryEntryQStats>\n"
-        )
-        monitoringConfig.write_file("schedd_status.xml", xml_str)
-
         data = self.get_data()
         total_el = self.get_total()
 
+        # write snapshot file
+        def write_xml(fd):
+            fd.write('<?xml version="1.0" encoding="ISO-8859-1"?>\n\n<glideFactoryEntryQStats>\n')
+            xmlFormat.time2file(fd, self.updated, "updated")
+            xmlFormat.dict2file(
+                fd,
+                data,
+                dict_name="frontends",
+                el_name="frontend",
+                subtypes_params=self.xml_data_subtypes_params,
+                leading_tab=xmlFormat.DEFAULT_TAB,
+            )
+            xmlFormat.class2file(fd, total_el, inst_name="total", leading_tab=xmlFormat.DEFAULT_TAB)
+            fd.write("</glideFactoryEntryQStats>\n")
+
+        monitoringConfig.write_xml_file("schedd_status.xml", write_xml)
+
         # update RRDs
         type_strings = {"Status": "Status", "Requested": "Req", "ClientMonitor": "Client"}
         for fe in [None] + list(data.keys()):
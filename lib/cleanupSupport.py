@@ -51,6 +51,7 @@ class Cleanup:
                 else:
                     for cleaner in cleanup_lists[i]:
                         cleaner.cleanup()
+                    logSupport.stop_async_logs()
                     os._exit(0)
             logSupport.log.debug("Forked cleanup PIDS %s" % self.cleanup_pids)
             del cleanup_lists
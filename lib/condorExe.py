@@ -4,6 +4,9 @@
 """This module implements the functions to execute condor commands."""
 
 import os
+import shlex
+import subprocess
+import tempfile
 
 from subprocess import CalledProcessError
 
@@ -37,13 +40,15 @@ class UnconfigError(CondorExeError):
 class ExeError(CondorExeError):
     """Exception raised when there is an error executing a condor command."""
 
-    def __init__(self, err_str):
+    def __init__(self, err_str, stdout=None):
         """Initializes the ExeError with an error message.
 
         Args:
             err_str (str): The error message.
+            stdout (str, optional): Standard output of the failed command, if available. Defaults to None.
         """
         CondorExeError.__init__(self, err_str)
+        self.stdout = stdout
 
 
 #
@@ -93,7 +98,7 @@ def exe_cmd(condor_exe, args, stdin_data=None, env={}):
     return iexe_cmd(cmd, stdin_data, env)
 
 
-def exe_cmd_sbin(condor_exe, args, stdin_data=None, env={}):
+def exe_cmd_sbin(condor_exe, args, stdin_data=None, env={}, timeout=None):
     """Execute an arbitrary condor system command and return its output as a list of lines.
 
     Fails if stderr is not empty.
@@ -103,6 +108,7 @@ def exe_cmd_sbin(condor_exe, args, stdin_data=None, env={}):
         args (str): Arguments for the command.
         stdin_data (str, optional): Data that will be fed to the command via stdin. Defaults to None.
         env (dict, optional): Environment to be set before execution. Defaults to {}.
+        timeout (float, optional): Seconds after which the command is killed and ExeError raised. Defaults to None.
 
     Returns:
         list: Lines of stdout from the command.
@@ -119,7 +125,37 @@ def exe_cmd_sbin(condor_exe, args, stdin_data=None, env={}):
 
     cmd = f"{condor_exe_path} {args}"
 
-    return iexe_cmd(cmd, stdin_data, env)
+    return iexe_cmd(cmd, stdin_data, env, timeout=timeout)
+
+
+def exe_cmd_iter(condor_exe, args, env={}, chunk_size=1024 * 1024):
+    """Execute an arbitrary condor command and iterate over its stdout, in chunks of bytes.
+
+    The output is not accumulated in memory, so it can be parsed while the command is still running.
+    The command is started when the iteration begins.
+
+    Args:
+        condor_exe (str): Condor executable, uses a relative path to $CONDOR_BIN.
+        args (str): Arguments for the command.
+        env (dict, optional): Environment to be set before execution. Defaults to {}.
+        chunk_size (int, optional): Maximum size of each chunk. Defaults to 1MB.
+
+    Yields:
+        bytes: Chunks of stdout from the command.
+
+    Raises:
+        UnconfigError: If condor_bin_path is undefined.
+        ExeError: If there is an error executing the command.
+    """
+    global condor_bin_path
+
+    if condor_bin_path is None:
+        raise UnconfigError("condor_bin_path is undefined!")
+    condor_exe_path = os.path.join(condor_bin_path, condor_exe)
+
+    cmd = f"{condor_exe_path} {args}"
+
+    yield from iexe_cmd_iter(cmd, env, chunk_size=chunk_size)
 
 
 ############################################################
@@ -157,7 +193,7 @@ def generate_bash_script(cmd, environment):
     return "\n".join(script)
 
 
-def iexe_cmd(cmd, stdin_data=None, child_env=None, log=None):
+def iexe_cmd(cmd, stdin_data=None, child_env=None, log=None, timeout=None):
     """Fork a process and execute cmd - rewritten to use select to avoid filling up stderr and stdout queues.
 
     Args:
@@ -165,6 +201,7 @@ def iexe_cmd(cmd, stdin_data=None, child_env=None, log=None):
         stdin_data (str, optional): Data that will be fed to the command via stdin. Defaults to None.
         child_env (dict, optional): Environment to be set before execution. Defaults to None.
         log (optional): Logger instance. Defaults to None.
+        timeout (float, optional): Seconds after which the command is killed and ExeError raised. Defaults to None.
 
     Returns:
         list: list of str. Lines of stdout from the command.
@@ -177,7 +214,7 @@ def iexe_cmd(cmd, stdin_data=None, child_env=None, log=None):
         log = logSupport.log
     try:
         # invoking subprocessSupport.iexe_cmd w/ text=True (default), stdin_data and returned output are str
-        stdout_data = subprocessSupport.iexe_cmd(cmd, stdin_data=stdin_data, child_env=child_env)
+        stdout_data = subprocessSupport.iexe_cmd(cmd, stdin_data=stdin_data, child_env=child_env, timeout=timeout)
     except CalledProcessError as ex:
         msg = f"Failed condor command '{cmd}'. Exit code: {ex.returncode}. Stdout: {ex.stdout}. Stderr: {ex.stderr}"
         try:
@@ -187,7 +224,7 @@ def iexe_cmd(cmd, stdin_data=None, child_env=None, log=None):
         except Exception:
             # log may be missing
             pass
-        raise ExeError(msg) from ex
+        raise ExeError(msg, stdout=ex.stdout) from ex
     except Exception as ex:
         msg = f"Unexpected Error running '{cmd}'. Details: {ex}. Stdout: {stdout_data}"
         try:
@@ -202,6 +239,74 @@ def iexe_cmd(cmd, stdin_data=None, child_env=None, log=None):
     return stdout_data.splitlines()
 
 
+def iexe_cmd_iter(cmd, child_env=None, log=None, chunk_size=1024 * 1024):
+    """Fork a process executing cmd and yield its stdout in chunks, as soon as they are available.
+
+    stderr is spooled to a temporary file, so that it cannot block the command.
+
+    Args:
+        cmd (str): Command string containing the entire command including all arguments.
+        child_env (dict, optional): Environment to be set before execution, added to the current one. Defaults to None.
+        log (optional): Logger instance. Defaults to None.
+        chunk_size (int, optional): Maximum size of each chunk. Defaults to 1MB.
+
+    Yields:
+        bytes: Chunks of stdout from the command.
+
+    Raises:
+        ExeError: If there is an error executing the command.
+    """
+    if log is None:
+        log = logSupport.log
+    if child_env:
+        env = dict(os.environ)
+        env.update(child_env)
+    else:
+        env = os.environ
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            process = subprocess.Popen(
+                shlex.split(cmd), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr_file, env=env
+            )
+        except Exception as ex:
+            msg = f"Unexpected Error running '{cmd}'. Details: {ex}."
+            try:
+                if log is not None:
+                    log.error(msg)
+            except Exception:
+                # log may be missing
+                pass
+            raise ExeError(msg) from ex
+
+        completed = False
+        try:
+            while True:
+                chunk = process.stdout.read1(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            completed = True
+        finally:
+            process.stdout.close()
+            if not completed:
+                # The consumer stopped early (or failed), do not leave the command running
+                process.kill()
+            process.wait()
+
+        if process.returncode != 0:
+            stderr_file.seek(0)
+            stderr_data = stderr_file.read().decode(errors="replace")
+            msg = f"Failed condor command '{cmd}'. Exit code: {process.returncode}. Stderr: {stderr_data}"
+            try:
+                if log is not None:
+                    log.error(msg)
+                    log.debug(generate_bash_script(cmd, os.environ))
+            except Exception:
+                # log may be missing
+                pass
+            raise ExeError(msg)
+
+
 #########################
 # Module initialization
 #
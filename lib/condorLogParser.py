@@ -26,11 +26,18 @@ class cachedLogClass:
     The Constructor for inherited classes needs to define logname and cachename
     (possibly by using clInit) as well as the methods loadFromLog, merge, and isActive.
 
+    In incremental mode, the parse state of the log is saved next to the cache
+    and loadFromLog parses only the events appended since the previous parse.
+
     Attributes:
         logname (str): The name of the log file.
         cachename (str): The name of the cache file.
+        statename (str): The name of the parse state file, used in incremental mode.
+        incremental (bool): True to parse only the part of the log appended since the previous parse.
     """
 
+    incremental = True
+
     def clInit(self, logname, cache_dir, cache_ext):
         """Initializes the log and cache names.
 
@@ -44,6 +51,8 @@ class cachedLogClass:
             self.cachename = logname + cache_ext
         else:
             self.cachename = os.path.join(cache_dir, os.path.basename(logname) + cache_ext)
+        self.statename = self.cachename + ".state"
+        self.parse_state = None
 
     def has_changed(self):
         """Compares to cache, and tells if the log file has changed since last cached.
@@ -107,10 +116,36 @@ class cachedLogClass:
         """
         raise RuntimeError("loadFromLog not implemented!")
 
+    def parseLog(self, parse_function):
+        """Parses the log file with one of the incremental parse functions.
+
+        In incremental mode, resumes from the parse state saved by the previous load,
+        otherwise parses the whole file.
+
+        Args:
+            parse_function (function): Incremental parse function,
+                e.g. parseSubmitLogFastRawIncremental or parseSubmitLogFastRawTimingsIncremental.
+
+        Returns:
+            Any: The parse result, same as the one of the non incremental parse function.
+        """
+        state = None
+        if self.incremental and os.path.isfile(self.statename):
+            try:
+                state = loadCache(self.statename)
+            except RuntimeError:
+                state = None  # corrupted state, parse all the file
+        result, state = parse_function(self.logname, state)
+        if self.incremental:
+            self.parse_state = state
+        return result
+
     ####### PRIVATE ###########
     def saveCache(self):
-        """Saves data to the cache file."""
+        """Saves data to the cache file, and the parse state in incremental mode."""
         saveCache(self.cachename, self.data)
+        if self.parse_state is not None:
+            saveCache(self.statename, self.parse_state)
         return
 
 
@@ -135,7 +170,7 @@ class logSummary(cachedLogClass):
 
         Stores the result in `self.data`.
         """
-        jobs = parseSubmitLogFastRaw(self.logname)
+        jobs = self.parseLog(parseSubmitLogFastRawIncremental)
         self.data = listAndInterpretRawStatuses(jobs, listStatuses)
         return
 
@@ -253,7 +288,7 @@ class logCompleted(cachedLogClass):
         Stores the result in `self.data`.
         """
         tmpdata = {}
-        jobs = parseSubmitLogFastRaw(self.logname)
+        jobs = self.parseLog(parseSubmitLogFastRawIncremental)
         status = listAndInterpretRawStatuses(jobs, listStatuses)
         counts = {}
         for s in list(status.keys()):
@@ -384,7 +419,7 @@ class logCounts(cachedLogClass):
 
         Stores the result in `self.data`.
         """
-        jobs = parseSubmitLogFastRaw(self.logname)
+        jobs = self.parseLog(parseSubmitLogFastRawIncremental)
         self.data = countAndInterpretRawStatuses(jobs)
         return
 
@@ -485,7 +520,7 @@ class logSummaryTimings(cachedLogClass):
 
         Stores the result in `self.data`.
         """
-        jobs, self.startTime, self.endTime = parseSubmitLogFastRawTimings(self.logname)
+        jobs, self.startTime, self.endTime = self.parseLog(parseSubmitLogFastRawTimingsIncremental)
         self.data = listAndInterpretRawStatuses(jobs, listStatusesTimings)
         return
 
@@ -1023,101 +1058,183 @@ def parseSubmitLogFastRaw(fname):
         dict: A dictionary where keys are job IDs and values are their corresponding statuses (statusString).
               For example, {'1583.004': '000', '3616.008': '009'}
     """
-    jobs = {}
+    return parseSubmitLogFastRawIncremental(fname)[0]
 
-    size = os.path.getsize(fname)
-    if size == 0:
-        # nothing to read, if empty
-        return jobs
 
-    with open(fname) as fd:
-        buf = mmap.mmap(fd.fileno(), size, access=mmap.ACCESS_READ)
+def parseSubmitLogFastRawTimings(fname):
+    """Parses a HTCondor submit log file and extracts job statuses along with timing information.
 
-        idx = 0
+    It returns a dictionary of jobStrings each having the last statusString, firstTime, runningTime, lastTime.
+    It also returns the first and last date in the file.
+
+    Args:
+        fname (str): Filename of the log to parse.
+
+    Returns:
+        tuple: A tuple containing:
+                - dict: A dictionary of jobStrings, where keys are job IDs and values are tuples with
+                        Job ID, start time, running time (if completed), end time.
+                - str: The timestamp of the first log entry.
+                - str: The timestamp of the last log entry.
+               For example:
+               ```
+                    ({'9568.001': ('000', '09/28 01:38:53', '', '09/28 01:38:53'),
+                      '9868.003': ('005', '09/28 01:48:52', '09/28 16:11:23', '09/28 20:31:53')},
+                      '09/28 01:38:53', '09/28 20:31:53')
+               ```
+    """
+    return parseSubmitLogFastRawTimingsIncremental(fname)[0]
+
+
+# Number of bytes at the beginning of the log saved in the parse state to recognize the same file
+PARSE_STATE_HEAD_LEN = 256
+
+
+def _check_parse_state(state, fstat, buf, timings):
+    """Returns the parse state to resume from, or a new (empty) one if the log was rotated or truncated.
+
+    HTCondor event logs are append-only. The log is the same if it has the same device and inode,
+    it is not shorter than the parsed part and it starts with the same bytes.
+
+    Args:
+        state (dict): Parse state returned by a previous parse, or None.
+        fstat (os.stat_result): Status of the log file.
+        buf (mmap.mmap): Content of the log file, None if the file is empty.
+        timings (bool): True if the state is for the parser with timings.
+
+    Returns:
+        dict: The parse state.
+    """
+    if (
+        state is not None
+        and state.get("timings") == timings
+        and state["inode"] == (fstat.st_dev, fstat.st_ino)
+        and state["offset"] <= fstat.st_size
+        and (buf is None or buf[: len(state["head"])] == state["head"])
+    ):
+        return state
+    new_state = {"timings": timings, "inode": (fstat.st_dev, fstat.st_ino), "offset": 0, "head": b"", "jobs": {}}
+    if timings:
+        new_state["first_time"] = None
+        new_state["last_time"] = None
+    return new_state
+
+
+def parseSubmitLogFastRawIncremental(fname, state=None):
+    """Parses the events appended to a HTCondor submit log file since the parse that returned `state`.
+
+    The returned state holds the job statuses, the inode and the offset of the last complete event.
+    If the log was rotated or truncated, the whole file is parsed again.
+    An event still being written is counted in the returned statuses but not in the state,
+    so it will be parsed again, complete, next time.
+
+    Args:
+        fname (str): Filename of the log to parse.
+        state (dict, optional): Parse state returned by the previous invocation. Defaults to None (parse all).
+
+    Returns:
+        tuple: A tuple containing:
+                - dict: A dictionary where keys are job IDs and values are their statuses,
+                        like the one returned by parseSubmitLogFastRaw.
+                - dict: The new parse state.
+    """
+    with open(fname, "rb") as fd:
+        fstat = os.fstat(fd.fileno())
+        size = fstat.st_size
+        if size == 0:
+            # nothing to read, if empty
+            state = _check_parse_state(state, fstat, None, False)
+            return state["jobs"], state
+
+        buf = mmap.mmap(fd.fileno(), size, access=mmap.ACCESS_READ)
+        state = _check_parse_state(state, fstat, buf, False)
+        jobs = state["jobs"]
+        idx = state["offset"]
 
         while (idx + 5) < size:  # else we are at the end of the file
             # format
             # 023 (123.2332.000) Bla
+            # ...
 
             # first 3 chars are status
             status = buf[idx : idx + 3]
-            idx += 5
             # extract job id
-            i1 = buf.find(b")", idx)
+            i1 = buf.find(b")", idx + 5)
             if i1 < 0:
                 break
-            jobid = buf[idx : i1 - 4]
-            idx = i1 + 1
+            jobid = buf[idx + 5 : i1 - 4]
+
+            i2 = buf.find(b"...", i1 + 1)
+            if (i2 < 0) or (i2 + 4 > size):
+                # event still being written, count it without changing the state
+                jobs = dict(jobs)
 
             if jobid in jobs:
                 jobs[jobid] = get_new_status(jobs[jobid], status)
             else:
                 jobs[jobid] = status
 
-            i1 = buf.find(b"...", idx)
-            if i1 < 0:
+            if jobs is not state["jobs"]:
                 break
-            idx = i1 + 4  # the 3 dots plus newline
+            idx = i2 + 4  # the 3 dots plus newline
 
+        state["offset"] = idx
+        state["head"] = buf[: min(idx, PARSE_STATE_HEAD_LEN)]
         buf.close()
 
-    return jobs
+    return jobs, state
 
 
-def parseSubmitLogFastRawTimings(fname):
-    """Parses a HTCondor submit log file and extracts job statuses along with timing information.
+def parseSubmitLogFastRawTimingsIncremental(fname, state=None):
+    """Parses the events appended to a HTCondor submit log file since the parse that returned `state`,
+    keeping also the timing information.
 
-    It returns a dictionary of jobStrings each having the last statusString, firstTime, runningTime, lastTime.
-    It also returns the first and last date in the file.
+    Same as parseSubmitLogFastRawIncremental, for parseSubmitLogFastRawTimings.
 
     Args:
         fname (str): Filename of the log to parse.
+        state (dict, optional): Parse state returned by the previous invocation. Defaults to None (parse all).
 
     Returns:
         tuple: A tuple containing:
-                - dict: A dictionary of jobStrings, where keys are job IDs and values are tuples with
-                        Job ID, start time, running time (if completed), end time.
-                - str: The timestamp of the first log entry.
-                - str: The timestamp of the last log entry.
-               For example:
-               ```
-                    ({'9568.001': ('000', '09/28 01:38:53', '', '09/28 01:38:53'),
-                      '9868.003': ('005', '09/28 01:48:52', '09/28 16:11:23', '09/28 20:31:53')},
-                      '09/28 01:38:53', '09/28 20:31:53')
-               ```
+                - tuple: The job statuses with timings, the first and the last timestamp,
+                         like the ones returned by parseSubmitLogFastRawTimings.
+                - dict: The new parse state.
     """
-    jobs = {}
+    with open(fname, "rb") as fd:
+        fstat = os.fstat(fd.fileno())
+        size = fstat.st_size
+        if size == 0:
+            # nothing to read, if empty
+            state = _check_parse_state(state, fstat, None, True)
+            return (state["jobs"], state["first_time"], state["last_time"]), state
 
-    first_time = None
-    last_time = None
-
-    size = os.path.getsize(fname)
-    if size == 0:
-        # nothing to read, if empty
-        return jobs, first_time, last_time
-
-    with open(fname) as fd:
         buf = mmap.mmap(fd.fileno(), size, access=mmap.ACCESS_READ)
-
-        idx = 0
+        state = _check_parse_state(state, fstat, buf, True)
+        jobs = state["jobs"]
+        first_time = state["first_time"]
+        last_time = state["last_time"]
+        idx = state["offset"]
 
         while (idx + 5) < size:  # else we are at the end of the file
             # format
             # 023 (123.2332.000) MM/DD HH:MM:SS
+            # ...
 
             # first 3 chars are status
             status = buf[idx : idx + 3]
-            idx += 5
             # extract job id
-            i1 = buf.find(b")", idx)
+            i1 = buf.find(b")", idx + 5)
             if i1 < 0:
                 break
-            jobid = buf[idx : i1 - 4]
-            idx = i1 + 2
+            jobid = buf[idx + 5 : i1 - 4]
             # extract time
-            line_time = buf[idx : idx + 14]
-            idx += 16
+            line_time = buf[i1 + 2 : i1 + 16]
 
+            i2 = buf.find(b"...", i1 + 18)
+            if (i2 < 0) or (i2 + 4 > size):
+                # event still being written, count it without changing the state
+                jobs = dict(jobs)
             if first_time is None:
                 first_time = line_time
             last_time = line_time
@@ -1136,13 +1253,17 @@ def parseSubmitLogFastRawTimings(fname):
             else:
                 jobs[jobid] = (status, line_time, b"", line_time)
 
-            i1 = buf.find(b"...", idx)
-            if i1 < 0:
+            if jobs is not state["jobs"]:
                 break
-            idx = i1 + 4  # the 3 dots plus newline
+            state["first_time"] = first_time
+            state["last_time"] = last_time
+            idx = i2 + 4  # the 3 dots plus newline
 
+        state["offset"] = idx
+        state["head"] = buf[: min(idx, PARSE_STATE_HEAD_LEN)]
         buf.close()
-    return jobs, first_time, last_time
+
+    return (jobs, first_time, last_time), state
 
 
 def parseSubmitLogFastRawCallback(fname, callback):
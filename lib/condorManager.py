@@ -7,6 +7,13 @@ import re
 
 from . import condorExe, condorMonitor
 
+# Maximum number of job IDs passed on a single condor_rm/condor_release command line
+JOB_BATCH_SIZE = 500
+
+# Per-job lines printed by condor_rm, condor_release, ... e.g. "Job 123.0 marked for removal", "Job 123.1 not found"
+JOB_ACTION_RE = re.compile(r"^\s*Job (\d+)\.(\d+) (.*)$")
+JOB_ACTION_FAILED_RE = re.compile(r"\bnot\b|couldn't|could not|fail|denied", re.IGNORECASE)
+
 
 ##############################################
 # Helper functions
@@ -205,6 +212,112 @@ def condorReleaseOne(
     return cached_exe_cmd("condor_release", opts, schedd_name, pool_name, schedd_lookup_cache)
 
 
+def parse_job_action_output(lines):
+    """Parse the per-job lines printed by the HTCondor job actions (condor_rm, condor_release, ...).
+
+    Args:
+        lines (list): Lines of output of the command.
+
+    Returns:
+        dict: Dictionary with the job ID tuples (ClusterId, ProcId) as keys and
+            `None` (success) or the error message as values.
+    """
+    outcomes = {}
+    for line in lines:
+        m = JOB_ACTION_RE.match(line)
+        if m is None:
+            continue
+        jid = (int(m.group(1)), int(m.group(2)))
+        msg = m.group(3).strip()
+        outcomes[jid] = msg if JOB_ACTION_FAILED_RE.search(msg) else None
+    return outcomes
+
+
+def condorActOnMany(
+    cmd, jid_list, opts="", schedd_name=None, pool_name=None, batch_size=None, schedd_lookup_cache=None
+):
+    """Run a job action command (condor_rm, condor_release, ...) on a list of jobs.
+
+    Instead of one command per job, the job IDs are passed to a single command line,
+    at most `batch_size` IDs per command.
+    The outcome of each job is taken from the output of the command.
+    Jobs not mentioned in the output succeeded if the command succeeded and failed otherwise.
+
+    Args:
+        cmd (str): The HTCondor command to execute, e.g. condor_rm.
+        jid_list (list): List of job IDs (ClusterId, ProcId) tuples.
+        opts (str, optional): Additional options for the command. Defaults to "".
+        schedd_name (str, optional): The name of the schedd. Defaults to None.
+        pool_name (str, optional): The name of the pool. Defaults to None.
+        batch_size (int, optional): Maximum number of jobs per command. Defaults to JOB_BATCH_SIZE.
+        schedd_lookup_cache (optional): The cache for schedd lookups. Defaults to None.
+
+    Returns:
+        dict: Dictionary with the job ID tuples as keys and `None` (success) or the error message as values.
+    """
+    if batch_size is None or batch_size <= 0:
+        batch_size = JOB_BATCH_SIZE
+    outcomes = {}
+    for i in range(0, len(jid_list), batch_size):
+        batch = jid_list[i : i + batch_size]
+        arg_str = "%s %s" % (" ".join("%li.%li" % (jid[0], jid[1]) for jid in batch), opts)
+        err_str = None
+        try:
+            lines = cached_exe_cmd(cmd, arg_str, schedd_name, pool_name, schedd_lookup_cache)
+        except condorExe.ExeError as e:
+            # Some of the jobs may have succeeded, the output tells which ones
+            err_str = str(e)
+            lines = e.stdout.splitlines() if e.stdout else []
+        batch_outcomes = parse_job_action_output(lines)
+        for jid in batch:
+            jid = (int(jid[0]), int(jid[1]))
+            outcomes[jid] = batch_outcomes.get(jid, err_str)
+    return outcomes
+
+
+def condorRemoveMany(
+    jid_list,
+    schedd_name=None,
+    pool_name=None,
+    do_forcex=False,
+    batch_size=None,
+    schedd_lookup_cache=condorMonitor.local_schedd_cache,
+):
+    """Remove a list of jobs from the queue, using one condor_rm for each batch of jobs.
+
+    Args:
+        jid_list (list): List of job IDs (ClusterId, ProcId) tuples.
+        schedd_name (str, optional): The name of the schedd. Defaults to None.
+        pool_name (str, optional): The name of the pool. Defaults to None.
+        do_forcex (bool, optional): If True, force removal. Defaults to False.
+        batch_size (int, optional): Maximum number of jobs per command. Defaults to JOB_BATCH_SIZE.
+        schedd_lookup_cache (optional): The cache for schedd lookups. Defaults to condorMonitor.local_schedd_cache.
+
+    Returns:
+        dict: Dictionary with the job ID tuples as keys and `None` (success) or the error message as values.
+    """
+    opts = "-forcex " if do_forcex else ""
+    return condorActOnMany("condor_rm", jid_list, opts, schedd_name, pool_name, batch_size, schedd_lookup_cache)
+
+
+def condorReleaseMany(
+    jid_list, schedd_name=None, pool_name=None, batch_size=None, schedd_lookup_cache=condorMonitor.local_schedd_cache
+):
+    """Release a list of jobs from hold in the queue, using one condor_release for each batch of jobs.
+
+    Args:
+        jid_list (list): List of job IDs (ClusterId, ProcId) tuples.
+        schedd_name (str, optional): The name of the schedd. Defaults to None.
+        pool_name (str, optional): The name of the pool. Defaults to None.
+        batch_size (int, optional): Maximum number of jobs per command. Defaults to JOB_BATCH_SIZE.
+        schedd_lookup_cache (optional): The cache for schedd lookups. Defaults to condorMonitor.local_schedd_cache.
+
+    Returns:
+        dict: Dictionary with the job ID tuples as keys and `None` (success) or the error message as values.
+    """
+    return condorActOnMany("condor_release", jid_list, "", schedd_name, pool_name, batch_size, schedd_lookup_cache)
+
+
 def condorReschedule(schedd_name=None, pool_name=None, schedd_lookup_cache=condorMonitor.local_schedd_cache):
     """Issue a condor_reschedule command.
 
@@ -255,7 +368,7 @@ def ismulti2str(is_multi):
 
 #############################################
 # HTCondor Advertise function
-def condorAdvertise(classad_fname, command, use_tcp=False, is_multi=False, pool_name=None):
+def condorAdvertise(classad_fname, command, use_tcp=False, is_multi=False, pool_name=None, timeout=None):
     """Advertise a HTCondor ClassAd to the collector.
 
     Args:
@@ -264,9 +377,13 @@ def condorAdvertise(classad_fname, command, use_tcp=False, is_multi=False, pool_
         use_tcp (bool, optional): If True, use TCP. Defaults to False.
         is_multi (bool, optional): If True, indicate multiple. Defaults to False.
         pool_name (str, optional): The name of the pool. Defaults to None.
+        timeout (float, optional): Seconds after which condor_advertise is killed. Defaults to None (no timeout).
 
     Returns:
         str: The output of the condor_advertise command.
+
+    Raises:
+        ExeError: If condor_advertise fails or times out.
     """
     cmd_opts = f"{pool2str(pool_name)}{usetcp2str(use_tcp)}{ismulti2str(is_multi)}{command} {classad_fname}"
-    return condorExe.exe_cmd_sbin("condor_advertise", cmd_opts)
+    return condorExe.exe_cmd_sbin("condor_advertise", cmd_opts, timeout=timeout)
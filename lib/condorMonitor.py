@@ -8,8 +8,10 @@ Please notice that it also converts \" into "
 import copy
 import os
 import socket
+import sys
 import xml.parsers.expat
 
+from concurrent.futures import ThreadPoolExecutor
 from itertools import groupby
 
 from . import condorExe, condorSecurity
@@ -476,7 +478,9 @@ class CondorQEdit:
 class CondorQuery(StoredQuery):
     """Fully implemented class that executes condor commands."""
 
-    def __init__(self, exe_name, resource_str, group_attribute, pool_name=None, security_obj=None, env={}):
+    def __init__(
+        self, exe_name, resource_str, group_attribute, pool_name=None, security_obj=None, env={}, use_bindings=None
+    ):
         """Initializes a new instance of the class.
 
         Args:
@@ -486,7 +490,10 @@ class CondorQuery(StoredQuery):
             pool_name (str, optional): The name of the pool. Defaults to None.
             security_obj (object, optional): The security object. Defaults to None.
             env (dict, optional): The environment variables. Defaults to an empty dictionary.
+            use_bindings (bool, optional): True to use the htcondor python bindings, False to use the HTCondor
+                commands, None (default) to use the bindings if available (USE_HTCONDOR_PYTHON_BINDINGS).
         """
+        self.use_bindings = use_bindings
         self.exe_name = exe_name
         self.env = env
         self.resource_str = resource_str
@@ -556,6 +563,16 @@ class CondorQuery(StoredQuery):
             return None
         return condor_val == "REQUIRED"
 
+    def uses_bindings(self):
+        """Tell if this query is using the htcondor python bindings or the HTCondor commands.
+
+        Returns:
+            bool: True if the bindings are used. False if they are not available or disabled for this query.
+        """
+        if self.use_bindings is None:
+            return USE_HTCONDOR_PYTHON_BINDINGS
+        return self.use_bindings and USE_HTCONDOR_PYTHON_BINDINGS
+
     def fetch(self, constraint=None, format_list=None):
         """Return the results obtained using HTCondor commands or python bindings.
 
@@ -571,7 +588,7 @@ class CondorQuery(StoredQuery):
             QueryError: If an error occurs during the query execution.
         """
         try:
-            if USE_HTCONDOR_PYTHON_BINDINGS:
+            if self.uses_bindings():
                 return self.fetch_using_bindings(constraint=constraint, format_list=format_list)
             else:
                 return self.fetch_using_exe(constraint=constraint, format_list=format_list)
@@ -614,28 +631,29 @@ class CondorQuery(StoredQuery):
             self.security_obj.enforce_requests()
 
             if full_xml:
-                xml_data = condorExe.exe_cmd(
+                xml_chunks = condorExe.exe_cmd_iter(
                     self.exe_name, f"{self.resource_str} -xml {self.pool_str} {constraint_str}", env=self.env
                 )
             else:
                 # format_str is defined because full_xml False means (format_list is not None)
-                xml_data = condorExe.exe_cmd(
+                xml_chunks = condorExe.exe_cmd_iter(
                     self.exe_name,
                     f"{self.resource_str} {format_str} -xml {self.pool_str} {constraint_str}",  # pylint: disable=E0606
                     env=self.env,
                 )
+            # The command runs while its output is parsed, still in the security context
+            dict_data = xml2dict(xml_chunks, self.group_attribute, format_list)
         finally:
             # restore old security context
             self.security_obj.restore_state()
 
-        list_data = xml2list(xml_data)
-        del xml_data
-        dict_data = list2dict(list_data, self.group_attribute)
         return dict_data
 
     def fetch_using_bindings(self, constraint=None, format_list=None):
         """Fetch the results using htcondor-python bindings.
 
+        The security requests are enforced and the HTCondor configuration reloaded before the query.
+
         Args:
             constraint (str, optional): Constraints to be applied to the query. Defaults to None.
             format_list (list, optional): Classad attr & type. Defaults to None.
@@ -645,10 +663,33 @@ class CondorQuery(StoredQuery):
             dict: Dictionary containing the results.
 
         Raises:
-            NotImplementedError: The operation is not implemented using bindings.
+            PBError: If the query fails.
+        """
+        self.security_obj.save_state()
+        try:
+            self.security_obj.enforce_requests()
+            htcondor_full_reload()
+            return self.query_bindings(constraint, format_list)
+        finally:
+            self.security_obj.restore_state()
+
+    def query_bindings(self, constraint=None, format_list=None):
+        """Query using htcondor-python bindings, with the current HTCondor configuration.
+
+        Does not change the environment or the configuration, so it can run in multiple threads at the same time,
+        see load_concurrently.
+
+        Args:
+            constraint (str, optional): Constraints to be applied to the query. Defaults to None.
+            format_list (list, optional): Classad attr & type. Defaults to None.
 
+        Returns:
+            dict: Dictionary containing the results.
+
+        Raises:
+            NotImplementedError: The operation is not implemented using bindings.
         """
-        raise NotImplementedError("fetch_using_bindings() not implemented")
+        raise NotImplementedError("query_bindings() not implemented")
 
     def load(self, constraint=None, format_list=None):
         """Fetch the results and cache it in self.stored_data.
@@ -676,7 +717,7 @@ class CondorQuery(StoredQuery):
         output += "pool_name = %s\n" % str(self.pool_name)
         output += "pool_str = %s\n" % str(self.pool_str)
         output += "security_obj = %s\n" % str(self.security_obj)
-        output += "used_python_bindings = %s\n" % USE_HTCONDOR_PYTHON_BINDINGS
+        output += "used_python_bindings = %s\n" % self.uses_bindings()
         output += "stored_data = %s" % str(self.stored_data)
         return output
 
@@ -684,7 +725,14 @@ class CondorQuery(StoredQuery):
 class CondorQ(CondorQuery):
     """Class to implement condor_q. Uses htcondor-python bindings if possible."""
 
-    def __init__(self, schedd_name=None, pool_name=None, security_obj=None, schedd_lookup_cache=local_schedd_cache):
+    def __init__(
+        self,
+        schedd_name=None,
+        pool_name=None,
+        security_obj=None,
+        schedd_lookup_cache=local_schedd_cache,
+        use_bindings=None,
+    ):
         """Initializes a new instance of the class.
 
         Args:
@@ -693,6 +741,8 @@ class CondorQ(CondorQuery):
             security_obj (object, optional): The security object. Defaults to None.
             schedd_lookup_cache (object, optional): The cache object used for schedd lookup.
                                                     Defaults to local_schedd_cache if not provided.
+            use_bindings (bool, optional): Use the python bindings (True) or condor_q (False).
+                Defaults to None, use the bindings if available.
         """
         self.schedd_name = schedd_name
 
@@ -700,7 +750,9 @@ class CondorQ(CondorQuery):
             schedd_lookup_cache = NoneScheddCache()
 
         schedd_str, env = schedd_lookup_cache.getScheddId(schedd_name, pool_name)
-        CondorQuery.__init__(self, "condor_q", schedd_str, ["ClusterId", "ProcId"], pool_name, security_obj, env)
+        CondorQuery.__init__(
+            self, "condor_q", schedd_str, ["ClusterId", "ProcId"], pool_name, security_obj, env, use_bindings
+        )
 
     def fetch(self, constraint=None, format_list=None):
         """Fetches data from the Condor query.
@@ -718,8 +770,8 @@ class CondorQ(CondorQuery):
             format_list = complete_format_list(format_list, [("ClusterId", "i"), ("ProcId", "i")])
         return CondorQuery.fetch(self, constraint=constraint, format_list=format_list)
 
-    def fetch_using_bindings(self, constraint=None, format_list=None):
-        """Fetch the condor_q results using htcondor-python bindings.
+    def query_bindings(self, constraint=None, format_list=None):
+        """Query the schedd using htcondor-python bindings, with the current HTCondor configuration.
 
         Args:
             constraint (str, optional): Constraints to be applied to the query. Defaults to None.
@@ -728,16 +780,16 @@ class CondorQ(CondorQuery):
 
         Returns:
             dict: Dictionary containing the results.
+
+        Raises:
+            PBError: If the query fails.
         """
         global disk_cache
         results_dict = {}  # defined here in case of exception
         constraint = bindings_friendly_constraint(constraint)
         attrs = bindings_friendly_attrs(format_list)
 
-        self.security_obj.save_state()
         try:
-            self.security_obj.enforce_requests()
-            htcondor_full_reload()
             if self.pool_name:
                 collector = htcondor.Collector(str(self.pool_name))
             else:
@@ -762,8 +814,6 @@ class CondorQ(CondorQuery):
                 p = self.pool_name
             err_str = f"Error querying schedd {s} in pool {p} using python bindings: {ex}"
             raise PBError(err_str) from ex
-        finally:
-            self.security_obj.restore_state()
 
         return results_dict
 
@@ -771,19 +821,21 @@ class CondorQ(CondorQuery):
 class CondorStatus(CondorQuery):
     """Class to implement the condor_status command. Uses htcondor-python bindings if possible."""
 
-    def __init__(self, subsystem_name=None, pool_name=None, security_obj=None):
+    def __init__(self, subsystem_name=None, pool_name=None, security_obj=None, use_bindings=None):
         """Constructor.
 
         Args:
             subsystem_name (str, optional): Subsystem name. Defaults to "" (None).
             pool_name (str, optional): Pool name. Defaults to the local pool (None).
             security_obj (object, optional): The security object. Defaults to None.
+            use_bindings (bool, optional): Use the python bindings (True) or condor_status (False).
+                Defaults to None, use the bindings if available.
         """
         if subsystem_name is None:
             subsystem_str = ""
         else:
             subsystem_str = "-%s" % subsystem_name
-        CondorQuery.__init__(self, "condor_status", subsystem_str, "Name", pool_name, security_obj, {})
+        CondorQuery.__init__(self, "condor_status", subsystem_str, "Name", pool_name, security_obj, {}, use_bindings)
 
     def fetch(self, constraint=None, format_list=None):
         """Fetch the condor_status results using htcondor-python bindings if available, the command otherwise.
@@ -801,8 +853,8 @@ class CondorStatus(CondorQuery):
             format_list = complete_format_list(format_list, [("Name", "s")])
         return CondorQuery.fetch(self, constraint=constraint, format_list=format_list)
 
-    def fetch_using_bindings(self, constraint=None, format_list=None):
-        """Fetch the results using htcondor-python bindings.
+    def query_bindings(self, constraint=None, format_list=None):
+        """Query the collector using htcondor-python bindings, with the current HTCondor configuration.
 
         Args:
             constraint (str, optional): Constraints to be applied to the query. Defaults to None.
@@ -811,16 +863,16 @@ class CondorStatus(CondorQuery):
 
         Returns:
             dict: Dictionary containing the results.
+
+        Raises:
+            PBError: If the query fails.
         """
         results_dict = {}  # defined here in case of exception
         constraint = bindings_friendly_constraint(constraint)
         attrs = bindings_friendly_attrs(format_list)
 
         adtype = resource_str_to_py_adtype(self.resource_str)
-        self.security_obj.save_state()
         try:
-            self.security_obj.enforce_requests()
-            htcondor_full_reload()
             if self.pool_name:
                 collector = htcondor.Collector(str(self.pool_name))
             else:
@@ -834,12 +886,80 @@ class CondorStatus(CondorQuery):
                 p = self.pool_name
             err_str = f"Error querying pool {p} using python bindings: {ex}"
             raise PBError(err_str) from ex
-        finally:
-            self.security_obj.restore_state()
 
         return results_dict
 
 
+def _security_key(security_obj):
+    """Return a hashable key identifying the environment set by enforce_requests()"""
+    requests = tuple(sorted((c, tuple(sorted(f.items()))) for c, f in security_obj.requests.items()))
+    return security_obj.__class__.__name__, requests, getattr(security_obj, "x509_proxy", None)
+
+
+def load_concurrently(queries, constraint=None, format_list=None, max_threads=8):
+    """Load (see CondorQuery.load) multiple queries, running the python bindings queries concurrently in threads
+
+    The queries using the bindings are grouped by security requests. For each group the security environment
+    is enforced and the HTCondor configuration reloaded once, then all the queries of the group run in parallel.
+    The queries using the HTCondor commands are loaded sequentially.
+
+    Args:
+        queries (list): CondorQuery objects, e.g. CondorQ for different schedds
+        constraint (str, optional): Query constraint. Defaults to None.
+        format_list (list, optional): Classad attr & type. Defaults to None.
+        max_threads (int, optional): Maximum number of concurrent queries. Defaults to 8.
+
+    Returns:
+        list: For each query, None if it was successful, the exception (QueryError) otherwise
+    """
+    errors = [None] * len(queries)
+    bindings_groups = {}
+    for idx, query in enumerate(queries):
+        if query.uses_bindings():
+            bindings_groups.setdefault(_security_key(query.security_obj), []).append(idx)
+        else:
+            try:
+                query.load(constraint, format_list)
+            except Exception as ex:
+                errors[idx] = ex
+
+    for group in bindings_groups.values():
+        security_obj = queries[group[0]].security_obj
+        security_obj.save_state()
+        try:
+            security_obj.enforce_requests()
+            htcondor_full_reload()
+
+            def query_one(idx):
+                query = queries[idx]
+                if format_list is not None:
+                    # Only the names are used by the bindings, the key attributes are needed by list2dict
+                    keys = query.group_attribute
+                    if not isinstance(keys, (list, tuple)):
+                        keys = [keys]
+                    query_format_list = complete_format_list(format_list, [(i, "s") for i in keys])
+                else:
+                    query_format_list = None
+                try:
+                    query.stored_data = query.query_bindings(constraint, query_format_list)
+                except Exception as ex:
+                    err_str = "Error executing htcondor query to pool %s with constraint %s and format_list %s: %s" % (
+                        query.pool_name,
+                        constraint,
+                        format_list,
+                        ex,
+                    )
+                    qerr = QueryError(err_str)
+                    qerr.__cause__ = ex
+                    errors[idx] = qerr
+
+            with ThreadPoolExecutor(max_workers=max(1, min(max_threads, len(group)))) as executor:
+                list(executor.map(query_one, group))
+        finally:
+            security_obj.restore_state()
+    return errors
+
+
 #
 # Subquery classes
 #
@@ -917,6 +1037,67 @@ class SubQuery(BaseSubQuery):
         return output
 
 
+class MaskedSubQuery(StoredQuery):
+    """Sub-query selecting the elements of a query that have some bits set in a precomputed mask.
+
+    The masks are computed once for many sub-queries (see `glideinFrontendLib.QueryClassifier`).
+    The selection is done only when the data is used the first time.
+    """
+
+    def __init__(self, query, masks, bits):
+        """Initializes a new instance of the class.
+
+        Args:
+            query (StoredQuery): The query object, already loaded.
+            masks (dict): Masks of the elements of the query, same keys as the query data.
+            bits (int): The elements with at least one of these bits set in their mask are selected.
+        """
+        self.query = query
+        self.masks = masks
+        self.bits = bits
+        self._stored_data = None
+
+    @property
+    def stored_data(self):
+        """dict: The selected elements of the query."""
+        if self._stored_data is None:
+            masks = self.masks
+            bits = self.bits
+            self._stored_data = {k: el for k, el in self.query.fetchStored().items() if masks.get(k, 0) & bits}
+        return self._stored_data
+
+    @stored_data.setter
+    def stored_data(self, value):
+        self._stored_data = value
+
+    def fetch(self, constraint=None):
+        """Returns the selected elements, the query is not run again.
+
+        Args:
+            constraint (str, optional): Ignored, kept for compatibility with the other queries.
+
+        Returns:
+            dict: The selected elements of the query.
+        """
+        return self.stored_data
+
+    def load(self, constraint=None):
+        """Selects again the elements of the query, the next time they are used.
+
+        Args:
+            constraint (str, optional): Ignored, kept for compatibility with the other queries.
+        """
+        self._stored_data = None
+
+    def __repr__(self):
+        """Returns a string representation of the object.
+
+        Returns:
+            str: A string representation of the object.
+        """
+        return f"{self.__class__.__name__}:\nstored_data = {self.stored_data}"
+
+
 class Group(BaseSubQuery):
     """Sub Query class with grouping functionality.
     Each element has a value that is the summary of the values in a group.
@@ -1377,6 +1558,207 @@ def list2dict(list_data, attr_name):
     return dict_data
 
 
+class ClassadXMLParser:
+    """Streaming parser of the HTCondor classads XML, building directly the dictionary returned by list2dict
+
+    Equivalent to list2dict(xml2list(xml_data), group_attribute), but:
+    - the XML is consumed incrementally (feed), so the whole output does not need to be in memory as a string
+    - if a format_list is given, only its attributes (and the group attributes) are kept
+    - attribute names are interned, so they are shared by all the classads
+    - the state is in the object, so multiple parsers can be used concurrently (e.g. in threads)
+    The values are typed using the XML markup (i, r, b, s, e, un) as in xml2list.
+    """
+
+    # XML elements containing the attribute value
+    VALUE_ELEMENTS = ("s", "e", "i", "r", "b")
+
+    def __init__(self, group_attribute, format_list=None):
+        """Create a parser
+
+        Args:
+            group_attribute (str|list|tuple): Attribute(s) used as key, see list2dict
+            format_list (list, optional): Classad attr & type, attributes not in the list are dropped.
+                Defaults to None (keep all the attributes). Example: `[(attr1, 'i'), ('attr2', 's')]`
+        """
+        if type(group_attribute) in (type([]), type((1, 2))):
+            self.key_list = group_attribute
+            self.multi_key = True
+        else:
+            self.key_list = [group_attribute]
+            self.multi_key = False
+        self.group_attribute = group_attribute
+        if format_list is None:
+            self.projection = None
+        else:
+            # HTCondor attribute names are case insensitive
+            self.projection = {i[0].lower() for i in format_list} | {i.lower() for i in self.key_list}
+        # attribute name -> (interned name, keep)
+        self._names = {}
+        self.data = {}
+        self._classad = None
+        self._attr = None
+        self._keep = False
+        self._type = None
+        self._val = None
+        self._text = None
+        self._started = False
+        self._pending = b""
+        self._parser = xml.parsers.expat.ParserCreate()
+        # Character data is passed in one call instead of many fragments
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._parser.CharacterDataHandler = self._char_data
+
+    def _start_element(self, name, attrs):
+        if name == "a":
+            self._attr, self._keep = self._get_name(attrs["n"])
+            self._type = "s"
+            self._val = None
+        elif name in self.VALUE_ELEMENTS:
+            self._type = name
+            self._text = []
+            if name == "b" and "v" in attrs:
+                self._val = attrs["v"] in ("T", "t", "1")
+        elif name == "un":
+            self._type = name
+        elif name == "c":
+            self._classad = {}
+        elif name == "classads":
+            pass  # top element, nothing to do
+        else:
+            raise TypeError("Unsupported type: %s" % name)
+
+    def _end_element(self, name):
+        if name in self.VALUE_ELEMENTS:
+            if self._keep:
+                text = "".join(self._text)
+                if name == "i":
+                    self._val = int(text)
+                elif name == "r":
+                    self._val = float(text)
+                elif name == "b":
+                    if self._val is None:
+                        # extended syntax... value in text area
+                        self._val = text[:1] in ("T", "t", "1")
+                else:
+                    self._val = text.replace('\\"', '"')
+            self._text = None
+        elif name == "a":
+            if self._keep:
+                self._classad[self._attr] = "" if self._type == "s" and self._val is None else self._val
+            self._attr = None
+        elif name == "c":
+            self._add_classad(self._classad)
+            self._classad = None
+        elif name in ("un", "classads"):
+            pass  # nothing to do
+        else:
+            raise TypeError("Unexpected type: %s" % name)
+
+    def _char_data(self, data):
+        if self._text is not None and self._keep:
+            self._text.append(data)
+
+    def _get_name(self, name):
+        try:
+            return self._names[name]
+        except KeyError:
+            interned = sys.intern(name)
+            keep = self.projection is None or name.lower() in self.projection
+            self._names[name] = (interned, keep)
+            return interned, keep
+
+    def _add_classad(self, classad):
+        """Add the classad to the result with the same key and content list2dict would use"""
+        if self.multi_key:
+            dict_name = []
+            for an in self.key_list:
+                if an in classad:
+                    dict_name.append(classad[an])
+                else:
+                    # Try lower cases
+                    for k in classad:
+                        if an.lower() == k.lower():
+                            dict_name.append(classad[k])
+                            break
+            dict_name = tuple(dict_name)
+        else:
+            dict_name = classad[self.group_attribute]
+        for an in self.key_list:
+            classad.pop(an, None)
+        self.data[dict_name] = classad
+
+    def feed(self, xml_chunk):
+        """Parse a chunk of XML. Anything preceding the XML header is ignored (like in xml2list)
+
+        Args:
+            xml_chunk (bytes|str): Next chunk of the XML document
+
+        Raises:
+            RuntimeError: If there's an error parsing the XML data.
+        """
+        if isinstance(xml_chunk, str):
+            xml_chunk = xml_chunk.encode()
+        if not self._started:
+            xml_chunk = self._pending + xml_chunk
+            header_idx = xml_chunk.find(b"<?xml")
+            if header_idx < 0:
+                # Keep what could be the beginning of a header split between chunks
+                self._pending = xml_chunk[-4:]
+                return
+            self._started = True
+            self._pending = b""
+            xml_chunk = xml_chunk[header_idx:]
+        self._parse(xml_chunk, False)
+
+    def close(self):
+        """Finish parsing and return the result
+
+        Returns:
+            dict: dictionary of dictionaries, see list2dict. Empty if there was no XML
+
+        Raises:
+            RuntimeError: If there's an error parsing the XML data.
+        """
+        if self._started:
+            self._parse(b"", True)
+        # else no xml, so return an empty dictionary
+        return self.data
+
+    def _parse(self, data, is_final):
+        try:
+            self._parser.Parse(data, is_final)
+        except TypeError as e:
+            raise RuntimeError("Failed to parse XML data, TypeError: %s" % e) from e
+        except Exception as e:
+            raise RuntimeError("Failed to parse XML data, generic error") from e
+
+
+def xml2dict(xml_chunks, group_attribute, format_list=None):
+    """Parse the HTCondor classads XML in xml_chunks and return a dictionary keyed by group_attribute.
+
+    Equivalent to list2dict(xml2list(xml_chunks), group_attribute) but parsing incrementally the chunks,
+    and keeping only the attributes in format_list, if provided. See ClassadXMLParser.
+
+    Args:
+        xml_chunks (iterable): chunks (bytes or str) of XML data, e.g. from condorExe.exe_cmd_iter,
+            or lines from condorExe.exe_cmd
+        group_attribute (str|list|tuple): Attribute(s) used as key, see list2dict
+        format_list (list, optional): Classad attr & type to keep. Defaults to None (keep all).
+
+    Returns:
+        dict: dictionary of dictionaries.
+
+    Raises:
+        RuntimeError: If there's an error parsing the XML data.
+    """
+    parser = ClassadXMLParser(group_attribute, format_list)
+    for xml_chunk in xml_chunks:
+        parser.feed(xml_chunk)
+    return parser.close()
+
+
 def applyConstraint(data, constraint_func):
     """Return a subset of data that satisfies constraint_function.
     If constraint_func is None, return back entire data.
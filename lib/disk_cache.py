@@ -32,6 +32,12 @@ def get_lock(name):
         yield fdesc
 
 
+class CachedError(Exception):
+    """Raised by `DiskCache.get_or_save` when computing the object failed, in this or another process,
+    less than `cache_duration` seconds ago. The message is the one of the original exception.
+    """
+
+
 class DiskCache:
     """Manages the cache. Objects expire after a `cache_duration` time (defaults to one hour).
     Objects are pickled into a file. The directory to save those files has to be specified.
@@ -84,11 +90,34 @@ class DiskCache:
                 with open(fname, "rb") as fdesc:
                     saved_time, obj = pickle.load(fdesc)
             self.mem_cache[objid] = (saved_time, obj)
-        if time() - saved_time < self.cache_duration:
+        if time() - saved_time < self.cache_duration and not isinstance(obj, CachedError):
             return obj
         else:
             return None
 
+    def _write(self, objid, fname, obj):
+        """Write an object with the current time into its cache file and in memory. The cache file must be locked.
+
+        The object is written to a temporary file renamed into place, so that an interrupted writer
+        does not leave a truncated cache file.
+
+        Args:
+            objid (str): The ID of the object you are saving.
+            fname (str): The cache filename.
+            obj (object): The Python object that you want to save.
+        """
+        tmp_fname = f"{fname}.{os.getpid()}.tmp"
+        save_time = time()
+        try:
+            with open(tmp_fname, "wb") as fdesc:
+                pickle.dump((save_time, obj), fdesc)
+            os.replace(tmp_fname, fname)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_fname)
+            raise
+        self.mem_cache[objid] = (save_time, obj)
+
     def save(self, objid, obj):
         """Save an object into the cache.
 
@@ -102,7 +131,54 @@ class DiskCache:
         """
         fname = self.get_fname(objid)
         with get_lock(fname):
-            with open(fname, "wb") as fdesc:
-                save_time = time()
-                pickle.dump((save_time, obj), fdesc)
-                self.mem_cache[objid] = (save_time, obj)
+            self._write(objid, fname, obj)
+
+    def get_or_save(self, objid, compute_func):
+        """Returns the cached object given its object ID `objid`, computing and saving it if missing or expired.
+
+        The cache file stays locked while `compute_func` runs, so that when multiple processes ask for
+        the same missing object, only the first one computes it and the others wait and use the saved one.
+        Exceptions raised by `compute_func` are propagated and the failure is saved like an object:
+        until it expires the other calls fail fast raising `CachedError`, without running `compute_func` again.
+        An unreadable cache file is considered missing.
+
+        Args:
+            objid (str): The string representing the object ID you want to get.
+            compute_func (function): Function without arguments returning the object when it is not in the cache.
+
+        Returns:
+            object: The cached object, or the one just returned by `compute_func`.
+
+        Raises:
+            CachedError: If computing the object failed less than `cache_duration` seconds ago.
+        """
+        if objid in self.mem_cache:
+            saved_time, obj = self.mem_cache[objid]
+            if time() - saved_time < self.cache_duration:
+                return self._cached(obj)
+        fname = self.get_fname(objid)
+        with get_lock(fname):
+            if os.path.isfile(fname):
+                try:
+                    with open(fname, "rb") as fdesc:
+                        saved_time, obj = pickle.load(fdesc)
+                except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+                    saved_time = 0
+                if time() - saved_time < self.cache_duration:
+                    self.mem_cache[objid] = (saved_time, obj)
+                    return self._cached(obj)
+            try:
+                obj = compute_func()
+            except Exception as e:
+                with contextlib.suppress(OSError):
+                    self._write(objid, fname, CachedError(f"{e.__class__.__name__}: {e}"))
+                raise
+            self._write(objid, fname, obj)
+        return obj
+
+    @staticmethod
+    def _cached(obj):
+        """Returns a cached object, raising `CachedError` if it is a saved failure."""
+        if isinstance(obj, CachedError):
+            raise CachedError(*obj.args)
+        return obj
@@ -3,13 +3,13 @@
 
 """This module implements functions and classes to handle forking of processes and the collection of results."""
 
-# TODO: This could be rewritten so that the polling lists are registered once and the fd are removed only when
-#       not needed anymore (currently there is an external structure and the poll object is a new one each time)
-
 import errno
+import mmap
 import os
 import pickle
 import select
+import signal
+import struct
 import subprocess
 import sys
 import time
@@ -49,11 +49,58 @@ class ForkResultError(ForkError):
 # Low level fork and collect functions
 
 
-def fork_in_bg(function_torun, *args):
+def create_shm():
+    """Create an anonymous shared memory file to transfer the result of a forked process
+
+    The file (memfd) is created before forking, so it is inherited by the child.
+    The child writes the pickled result in it and the parent maps it in memory,
+    without copying the data through a pipe.
+
+    Returns:
+        int|None: file descriptor of the shared memory file, None if not supported (not Linux or Python < 3.8)
+    """
+    if not hasattr(os, "memfd_create"):
+        return None
+    try:
+        return os.memfd_create("gwms_fork_result", os.MFD_CLOEXEC)
+    except OSError as err:
+        logSupport.log.debug(f"Shared memory not available, using the pipe for the fork results: {err}")
+        return None
+
+
+def _write_result(w, out, shm=None):
+    """Pickle the result of the forked function and send it to the parent
+
+    With the pipe transport the pickled result is written in the pipe.
+    With the shared memory transport the pickled result is written in the shared memory file
+    and only a small header with the size and the timings is written in the pipe.
+
+    Args:
+        w (int): write end of the pipe
+        out: object to send
+        shm (int|None): shared memory file descriptor, None to use the pipe
+    """
+    t_begin = time.time()
+    data = pickle.dumps(out, protocol=pickle.HIGHEST_PROTOCOL)
+    if shm is None:
+        os.write(w, data)
+        return
+    t_serialized = time.time()
+    data_view = memoryview(data)
+    written = 0
+    while written < len(data):
+        written += os.write(shm, data_view[written:])
+    header = {"size": len(data), "serialize": t_serialized - t_begin, "transfer": time.time() - t_serialized}
+    os.write(w, pickle.dumps(header))
+
+
+def fork_in_bg(function_torun, *args, use_shm=False):
     """Forks and calls a function with args.
 
     This function returns right away, returning the pid and a pipe to the stdout of the function process
     where the output of the function will be pickled.
+    If use_shm is True and shared memory is available, the output is written in an anonymous shared memory
+    file instead and only a handle (size and timings) is written in the pipe.
 
     Example:
         def add(i, j): return i + j
@@ -62,10 +109,13 @@ def fork_in_bg(function_torun, *args):
     Args:
         function_torun (function): Function to call after forking the process.
         *args: Arguments list to pass to the function.
+        use_shm (bool): Use the shared memory transport for the result, if available. Defaults to False.
 
     Returns:
         dict: Dictionary with {'r': fd, 'pid': pid} where fd is the stdout from a pipe.
+            With the shared memory transport there is also 'shm', the shared memory file descriptor.
     """
+    shm = create_shm() if use_shm else None
     r, w = os.pipe()
     unregister_sighandler()
     pid = os.fork()
@@ -74,22 +124,47 @@ def fork_in_bg(function_torun, *args):
         os.close(r)
         try:
             out = function_torun(*args)
-            os.write(w, pickle.dumps(out))
+            _write_result(w, out, shm)
         except Exception:
             logSupport.log.warning(f"Forked process '{function_torun}' failed")
             logSupport.log.exception(f"Forked process '{function_torun}' failed")
         finally:
             os.close(w)
             # Exit, immediately. Don't want any cleanup, since I was created just for performing the work
+            # but write the queued log records
+            logSupport.stop_async_logs()
             os._exit(0)
     else:
         register_sighandler()
         os.close(w)
 
-    return {"r": r, "pid": pid}
+    if shm is None:
+        return {"r": r, "pid": pid}
+    return {"r": r, "pid": pid, "shm": shm}
+
+
+def _read_pipe(r):
+    """Read all the content of a pipe, until EOF
 
+    Args:
+        r (int): Input pipe.
 
-def fetch_fork_result(r, pid):
+    Returns:
+        bytes: content of the pipe
+    """
+    chunks = []
+    try:
+        s = os.read(r, 1024 * 1024)
+        while s != b"":  # "" means EOF
+            chunks.append(s)
+            s = os.read(r, 1024 * 1024)
+    except BlockingIOError:
+        # Non-blocking pipe (set when the writer is known to be dead) with no more data
+        pass
+    return b"".join(chunks)
+
+
+def fetch_fork_result(r, pid, shm=None, stats=None):
     """Used with fork clients to retrieve results.
 
     Can raise OSError and FetchError.
@@ -102,6 +177,11 @@ def fetch_fork_result(r, pid):
     Args:
         r (int): Input pipe.
         pid (int): PID of the child.
+        shm (int|None): Shared memory file descriptor, if the child used the shared memory transport.
+            It is closed after reading the result.
+        stats (dict|None): If a dictionary is provided, it is filled with the transfer statistics:
+            transport, size (bytes), serialize, transfer, deserialize (seconds).
+            serialize is None with the pipe transport, where it is not measured by the child.
 
     Returns:
         object: Unpickled object.
@@ -114,17 +194,27 @@ def fetch_fork_result(r, pid):
         OSError: Other system-related error (includes both former OSError and IOError since Py3.4).
         pickle.UnpicklingError: Incomplete pickled data.
     """
-    r_in = b""
     out = None
     try:
-        s = os.read(r, 1024 * 1024)
-        while s != b"":  # "" means EOF
-            r_in += s
-            s = os.read(r, 1024 * 1024)
+        t_begin = time.time()
+        r_in = _read_pipe(r)
+        t_read = time.time()
         # pickle can fail w/ EOFError if r_in is empty.
         # Any output from pickle is never an empty string, e.g. None is 'N.'
-        out = pickle.loads(r_in)
-    except (OSError, EOFError, pickle.UnpicklingError) as err:
+        if shm is None:
+            out = pickle.loads(r_in)
+            result_stats = {"transport": "pipe", "size": len(r_in), "serialize": None, "transfer": t_read - t_begin}
+        else:
+            # The pipe contains only the header, the result is in the shared memory file
+            result_stats = pickle.loads(r_in)
+            result_stats["transport"] = "shm"
+            t_read = time.time()
+            with mmap.mmap(shm, result_stats["size"], access=mmap.ACCESS_READ) as shm_map:
+                out = pickle.loads(shm_map)
+        if stats is not None:
+            result_stats["deserialize"] = time.time() - t_read
+            stats.update(result_stats)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError) as err:
         etype, evalue, etraceback = sys.exc_info()
         # Adding message in case close/waitpid fail and preempt raise
         logSupport.log.exception(f"Re-raising exception during read: {err}")
@@ -134,15 +224,37 @@ def fetch_fork_result(r, pid):
         ) from err
     finally:
         os.close(r)
+        if shm is not None:
+            os.close(shm)
         os.waitpid(pid, 0)
     return out
 
 
-def fetch_fork_result_list(pipe_ids):
+def _fetch_pipe_id_result(key, pipe_id, stats=None):
+    """Fetch the result of the child described by pipe_id (as returned by fork_in_bg)
+
+    Args:
+        key: key of the fork, used to store the statistics
+        pipe_id (dict): Dictionary with pipe, pid and optionally the shared memory file descriptor
+        stats (dict|None): If a dictionary is provided, the transfer statistics are added as stats[key]
+
+    Returns:
+        object: Unpickled object.
+    """
+    key_stats = None if stats is None else {}
+    out = fetch_fork_result(pipe_id["r"], pipe_id["pid"], pipe_id.get("shm"), key_stats)
+    if stats is not None:
+        stats[key] = key_stats
+    return out
+
+
+def fetch_fork_result_list(pipe_ids, stats=None):
     """Read the output pipe of the children, used after forking to perform work and after forking to entry.writeStats().
 
     Args:
         pipe_ids (dict): Dictionary of pipe and pid.
+        stats (dict|None): If a dictionary is provided, the transfer statistics of each child are added to it
+            (keyed by the same key used in pipe_ids)
 
     Returns:
         dict: Dictionary of fork results.
@@ -156,7 +268,7 @@ def fetch_fork_result_list(pipe_ids):
     for key in pipe_ids:
         try:
             # Collect the results
-            out[key] = fetch_fork_result(pipe_ids[key]["r"], pipe_ids[key]["pid"])
+            out[key] = _fetch_pipe_id_result(key, pipe_ids[key], stats)
         except (KeyError, OSError, FetchError) as err:
             # fetch_fork_result can raise OSError and FetchError
             errmsg = f"Failed to extract info from child '{key}': {err}"
@@ -172,12 +284,14 @@ def fetch_fork_result_list(pipe_ids):
     return out
 
 
-def fetch_ready_fork_result_list(pipe_ids):
+def fetch_ready_fork_result_list(pipe_ids, stats=None):
     """Read the output pipe of the children, used after forking. If there is data
     on the pipes to consume, read the data and close the pipe.
 
     Args:
         pipe_ids (dict): Dictionary of pipe and pid.
+        stats (dict|None): If a dictionary is provided, the transfer statistics of each child are added to it
+            (keyed by the same key used in pipe_ids)
 
     Returns:
         dict: Dictionary of work done.
@@ -261,7 +375,7 @@ def fetch_ready_fork_result_list(pipe_ids):
         try:
             key = fds_to_entry[fd]
             pid = pipe_ids[key]["pid"]
-            out = fetch_fork_result(fd, pid)
+            out = _fetch_pipe_id_result(key, pipe_ids[key], stats)
             try:
                 if poll_obj:
                     poll_obj.unregister(fd)  # Is this needed? Lots of hoops to jump through here
@@ -302,6 +416,475 @@ def fetch_ready_fork_result_list(pipe_ids):
     return work_info
 
 
+class ForkPoller:
+    """Persistent set of file descriptors to watch for readability
+
+    Uses epoll if available (Linux, supports > 1024 fds), otherwise poll, otherwise select.
+    File descriptors are registered once and unregistered when not needed anymore.
+    """
+
+    def __init__(self):
+        self.fds = set()
+        try:
+            # Level Trigger behavior (default)
+            self.poll_obj = select.epoll()
+            self.poll_type = "epoll"
+            self.events = select.EPOLLIN | select.EPOLLHUP | select.EPOLLERR | select.EPOLLRDBAND | select.EPOLLRDNORM
+        except (AttributeError, OSError) as err:
+            logSupport.log.warning(f"Failed to load select.epoll(): {err}")
+            try:
+                self.poll_obj = select.poll()
+                self.poll_type = "poll"
+                self.events = select.POLLIN | select.POLLHUP | select.POLLERR
+            except (AttributeError, OSError) as err:
+                logSupport.log.warning(f"Failed to load select.poll(): {err}")
+                # no epoll() or poll(), use select()
+                self.poll_obj = None
+                self.poll_type = "select"
+
+    def register(self, fd):
+        if self.poll_obj is not None:
+            self.poll_obj.register(fd, self.events)
+        self.fds.add(fd)
+
+    def unregister(self, fd):
+        """Unregister a file descriptor. Must be called before closing it"""
+        self.fds.discard(fd)
+        if self.poll_obj is not None:
+            try:
+                self.poll_obj.unregister(fd)
+            except (OSError, KeyError) as err:
+                logSupport.log.debug(f"Ignoring failed unregister of fd {fd} from {self.poll_type}(): {err}")
+
+    def poll(self, timeout):
+        """Wait for at least one file descriptor to be ready
+
+        Args:
+            timeout (float): Maximum time to wait, in seconds. None waits indefinitely
+
+        Returns:
+            list: list of ready file descriptors (empty if the timeout expired)
+        """
+        if self.poll_type == "epoll":
+            return [i[0] for i in self.poll_obj.poll(-1 if timeout is None else timeout)]
+        if self.poll_type == "poll":
+            return [i[0] for i in self.poll_obj.poll(None if timeout is None else timeout * 1000)]
+        return select.select(list(self.fds), [], [], timeout)[0]
+
+    def close(self):
+        if self.poll_type == "epoll":
+            self.poll_obj.close()
+        self.fds = set()
+
+
+class ForkScheduler:
+    """Runs a batch of functions in forked processes, with a bound on the number of concurrent processes
+
+    A single ForkPoller is used for the whole batch. The scheduler waits for events (no sleep polling):
+    as soon as a child writes its result or exits, the result is collected and the next queued function
+    is forked in the same wakeup.
+    Children are watched both via their result pipe and, if available (Linux >= 5.3, Python >= 3.9),
+    via a pidfd, so that a child dying while its pipe is still held open (e.g. by a grandchild)
+    is detected as well.
+
+    Children can have a deadline: if they are still running after their timeout they are killed
+    and counted as failed.
+
+    Attributes:
+        fork_stats (dict): Statistics keyed by fork key: the transfer statistics (see fetch_fork_result)
+            plus queue_wait (time from the start of the batch to the fork) and wall_time (time from the fork
+            to the collection of the result), in seconds, and timed_out (True) for the children killed
+            because of their timeout
+    """
+
+    # Maximum wait in poll(), it is not needed for correctness, only to avoid hanging if something goes wrong
+    POLL_TIMEOUT = 10
+
+    def __init__(self, max_forks, use_shm=False, log_progress=True, fork_stats=None):
+        """Create the scheduler
+
+        Args:
+            max_forks (int): Maximum number of concurrent forks
+            use_shm (bool): Use the shared memory transport for the results (see fork_in_bg)
+            log_progress (bool): Log the number of active forks and forks to finish
+            fork_stats (dict|None): Dictionary where to add the statistics. Defaults to a new dictionary
+        """
+        self.max_forks = max(1, max_forks)
+        self.use_shm = use_shm
+        self.log_progress = log_progress
+        self.fork_stats = {} if fork_stats is None else fork_stats
+
+    def run(self, functions_tofork, key_list, timeouts=None):
+        """Fork all the functions and collect the results
+
+        Args:
+            functions_tofork (dict): (function, arg1, arg2, ...) tuples keyed by fork key
+            key_list (list): fork keys, in the order they should be forked
+            timeouts (dict|None): Maximum run time in seconds, keyed by fork key. Missing keys,
+                None or 0 values mean no timeout. Defaults to None (no timeouts)
+
+        Returns:
+            dict: Dictionary of results, keyed by fork key
+
+        Raises:
+            ForkResultError: If there are errors in the forked processes (the good results are in the exception)
+        """
+        if timeouts is None:
+            timeouts = {}
+        results = {}
+        failed = []
+        queue = list(key_list)
+        queue.reverse()  # pop() from the end
+        running = {}  # key -> pipe_id from fork_in_bg, plus start time and pidfd
+        fd_to_key = {}
+        t_batch = time.time()
+        log_now = self.log_progress
+        poller = ForkPoller()
+        try:
+            while queue or running:
+                # Fork as many functions as allowed
+                while queue and len(running) < self.max_forks:
+                    key = queue.pop()
+                    t_fork = time.time()
+                    pipe_id = fork_in_bg(*functions_tofork[key], use_shm=self.use_shm)
+                    pipe_id["t_fork"] = t_fork
+                    pipe_id["queue_wait"] = t_fork - t_batch
+                    pipe_id["pidfd"] = self._open_pidfd(pipe_id["pid"])
+                    if timeouts.get(key):
+                        pipe_id["deadline"] = t_fork + timeouts[key]
+                    running[key] = pipe_id
+                    for fd in (pipe_id["r"], pipe_id["pidfd"]):
+                        if fd is not None:
+                            poller.register(fd)
+                            fd_to_key[fd] = key
+                if log_now:
+                    logSupport.log.info(f"Active forks = {len(running)}, Forks to finish = {len(running) + len(queue)}")
+                    log_now = False
+
+                # Keys of the children with a readable pipe or that exited, and the ready fds
+                ready_keys = {}
+                poll_timeout = self.POLL_TIMEOUT
+                deadlines = [i["deadline"] for i in running.values() if "deadline" in i]
+                if deadlines:
+                    poll_timeout = max(0, min(poll_timeout, min(deadlines) - time.time()))
+                for fd in poller.poll(poll_timeout):
+                    key = fd_to_key.get(fd)
+                    if key is not None:
+                        ready_keys.setdefault(key, set()).add(fd)
+                for key, ready_fds in ready_keys.items():
+                    pipe_id = running.pop(key)
+                    for fd in (pipe_id["r"], pipe_id["pidfd"]):
+                        if fd is not None:
+                            poller.unregister(fd)
+                            del fd_to_key[fd]
+                    if pipe_id["r"] not in ready_fds:
+                        # Only the pidfd is ready: the child exited but the pipe is still held open by
+                        # another process (e.g. a grandchild). Read only what is already in the pipe
+                        os.set_blocking(pipe_id["r"], False)
+                    key_stats = {}
+                    try:
+                        results[key] = fetch_fork_result(pipe_id["r"], pipe_id["pid"], pipe_id.get("shm"), key_stats)
+                    except (OSError, FetchError) as err:
+                        errmsg = f"Failed to extract info from child '{key}': {err}"
+                        logSupport.log.warning(errmsg)
+                        logSupport.log.exception(errmsg)
+                        failed.append(key)
+                    finally:
+                        if pipe_id["pidfd"] is not None:
+                            os.close(pipe_id["pidfd"])
+                    key_stats["queue_wait"] = pipe_id["queue_wait"]
+                    key_stats["wall_time"] = time.time() - pipe_id["t_fork"]
+                    self.fork_stats[key] = key_stats
+                now = time.time()
+                expired_keys = [k for k, v in running.items() if "deadline" in v and v["deadline"] <= now]
+                for key in expired_keys:
+                    pipe_id = running.pop(key)
+                    for fd in (pipe_id["r"], pipe_id["pidfd"]):
+                        if fd is not None:
+                            poller.unregister(fd)
+                            del fd_to_key[fd]
+                    self._kill_child(pipe_id)
+                    wall_time = time.time() - pipe_id["t_fork"]
+                    logSupport.log.warning(f"Child '{key}' timed out after {wall_time:.1f} seconds, killed")
+                    failed.append(key)
+                    self.fork_stats[key] = {
+                        "queue_wait": pipe_id["queue_wait"],
+                        "wall_time": wall_time,
+                        "timed_out": True,
+                    }
+                # Log the progress after forking the next functions
+                log_now = self.log_progress and len(ready_keys) + len(expired_keys) > 0
+        finally:
+            poller.close()
+
+        if failed:
+            raise ForkResultError(len(failed), results, failed=failed)
+        return results
+
+    @staticmethod
+    def _kill_child(pipe_id):
+        """Kill a child that exceeded its timeout and release its resources"""
+        try:
+            os.kill(pipe_id["pid"], signal.SIGKILL)
+        except OSError:
+            pass  # already exited
+        for fd in (pipe_id["r"], pipe_id["pidfd"], pipe_id.get("shm")):
+            if fd is not None:
+                os.close(fd)
+        os.waitpid(pipe_id["pid"], 0)
+
+    @staticmethod
+    def _open_pidfd(pid):
+        """Return a pidfd for the process or None if pidfd is not supported"""
+        if not hasattr(os, "pidfd_open"):
+            return None
+        try:
+            return os.pidfd_open(pid)
+        except OSError:
+            # The kernel may not support it (< 5.3)
+            return None
+
+
+def _write_frame(fd, obj):
+    """Write a length-prefixed pickled object to a pipe
+
+    Args:
+        fd (int): file descriptor to write to
+        obj: object to send
+
+    Returns:
+        int: size of the pickled object
+    """
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    frame = memoryview(struct.pack("!Q", len(data)) + data)
+    written = 0
+    while written < len(frame):
+        written += os.write(fd, frame[written:])
+    return len(data)
+
+
+def _read_exact(fd, size):
+    chunks = []
+    while size > 0:
+        s = os.read(fd, min(size, 1024 * 1024))
+        if s == b"":
+            raise EOFError("Pipe closed while reading a frame")
+        chunks.append(s)
+        size -= len(s)
+    return b"".join(chunks)
+
+
+def _read_frame(fd):
+    """Read a length-prefixed pickled object from a pipe
+
+    Args:
+        fd (int): file descriptor to read from
+
+    Returns:
+        tuple: unpickled object, size of the pickled object
+
+    Raises:
+        EOFError: if the pipe is closed
+    """
+    (size,) = struct.unpack("!Q", _read_exact(fd, 8))
+    return pickle.loads(_read_exact(fd, size)), size
+
+
+def _pool_worker_loop(task_r, result_w, functions_tofork):
+    """Loop of a ForkWorkerPool worker: read a key, run the corresponding function, send back the result
+
+    The functions and their arguments are inherited at fork time, only the keys are sent to the worker.
+    The loop ends when the task pipe is closed by the parent.
+    """
+    while True:
+        try:
+            key, _ = _read_frame(task_r)
+        except EOFError:
+            return
+        t_begin = time.time()
+        try:
+            out = (True, functions_tofork[key][0](*functions_tofork[key][1:]))
+        except Exception:
+            logSupport.log.warning(f"Pool worker failed running '{key}'")
+            logSupport.log.exception(f"Pool worker failed running '{key}'")
+            out = (False, None)
+        try:
+            _write_frame(result_w, (key, out, time.time() - t_begin))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            logSupport.log.exception(f"Pool worker failed to send the result of '{key}'")
+            _write_frame(result_w, (key, (False, None), time.time() - t_begin))
+
+
+class ForkWorkerPool:
+    """Runs a batch of functions in a fixed set of forked worker processes
+
+    Instead of forking one process per function, nr_workers processes are forked once
+    and receive the keys of the functions to run, one at a time, as soon as they are idle.
+    The functions and their arguments are inherited by the workers at fork time, so only the keys
+    and the results go through the pipes. This reduces the number of forks and the copy-on-write page faults
+    from the large data structures inherited by each child.
+    A worker that dies is replaced by a new one, the function it was running is counted as failed.
+
+    Attributes:
+        fork_stats (dict): Statistics keyed by fork key: transport ("pool"), size, queue_wait,
+            wall_time (from dispatch to result) and run_time (time spent in the function), in seconds
+    """
+
+    def __init__(self, nr_workers, log_progress=True, fork_stats=None):
+        """Create the pool
+
+        Args:
+            nr_workers (int): Number of worker processes
+            log_progress (bool): Log the number of tasks to finish
+            fork_stats (dict|None): Dictionary where to add the statistics. Defaults to a new dictionary
+        """
+        self.nr_workers = max(1, nr_workers)
+        self.log_progress = log_progress
+        self.fork_stats = {} if fork_stats is None else fork_stats
+
+    @staticmethod
+    def _start_worker(functions_tofork, workers):
+        task_r, task_w = os.pipe()
+        result_r, result_w = os.pipe()
+        unregister_sighandler()
+        pid = os.fork()
+        if pid == 0:
+            logSupport.disable_rotate = True
+            os.close(task_w)
+            os.close(result_r)
+            # Close the parent ends of the other workers, so they can detect the EOF on their task pipe
+            for worker in workers.values():
+                if worker["task_w"] is not None:
+                    os.close(worker["task_w"])
+                os.close(worker["result_r"])
+            try:
+                _pool_worker_loop(task_r, result_w, functions_tofork)
+            except Exception:
+                logSupport.log.exception("Pool worker failed")
+            finally:
+                # Exit, immediately. Don't want any cleanup, since I was created just for performing the work
+                # but write the queued log records
+                logSupport.stop_async_logs()
+                os._exit(0)
+        register_sighandler()
+        os.close(task_r)
+        os.close(result_w)
+        return {"pid": pid, "task_w": task_w, "result_r": result_r, "key": None, "t_dispatch": None}
+
+    @staticmethod
+    def _stop_worker(worker):
+        if worker["task_w"] is not None:
+            os.close(worker["task_w"])
+            worker["task_w"] = None
+        os.close(worker["result_r"])
+        os.waitpid(worker["pid"], 0)
+
+    def run(self, functions_tofork, key_list):
+        """Run all the functions in the worker pool and collect the results
+
+        Args:
+            functions_tofork (dict): (function, arg1, arg2, ...) tuples keyed by fork key
+            key_list (list): fork keys, in the order they should be dispatched
+
+        Returns:
+            dict: Dictionary of results, keyed by fork key
+
+        Raises:
+            ForkResultError: If there are errors in the workers (the good results are in the exception)
+        """
+        results = {}
+        failed = []
+        queue = list(key_list)
+        queue.reverse()  # pop() from the end
+        workers = {}  # result_r fd -> worker
+        t_batch = time.time()
+        poller = ForkPoller()
+        try:
+            for _ in range(min(self.nr_workers, len(queue))):
+                worker = self._start_worker(functions_tofork, workers)
+                workers[worker["result_r"]] = worker
+                poller.register(worker["result_r"])
+            if self.log_progress:
+                logSupport.log.info(f"Pool workers = {len(workers)}, Tasks to finish = {len(queue)}")
+
+            for worker in list(workers.values()):
+                self._dispatch(worker, queue, t_batch)
+            while any(worker["key"] is not None for worker in workers.values()):
+                for fd in poller.poll(ForkScheduler.POLL_TIMEOUT):
+                    worker = workers.get(fd)
+                    if worker is None:
+                        continue
+                    if worker["key"] is None:
+                        # Idle worker exiting (task pipe closed)
+                        poller.unregister(fd)
+                        del workers[fd]
+                        self._stop_worker(worker)
+                        continue
+                    key = worker["key"]
+                    worker["key"] = None
+                    try:
+                        (result_key, (success, out), run_time), size = _read_frame(fd)
+                    except (OSError, EOFError, pickle.UnpicklingError) as err:
+                        errmsg = f"Failed to extract info from pool worker running '{key}': {err}"
+                        logSupport.log.warning(errmsg)
+                        logSupport.log.exception(errmsg)
+                        failed.append(key)
+                        # The worker is not usable anymore, replace it if there are tasks left
+                        poller.unregister(fd)
+                        del workers[fd]
+                        self._stop_worker(worker)
+                        if queue:
+                            try:
+                                worker = self._start_worker(functions_tofork, workers)
+                            except OSError:
+                                logSupport.log.exception("Failed to replace the pool worker")
+                                continue
+                            workers[worker["result_r"]] = worker
+                            poller.register(worker["result_r"])
+                            self._dispatch(worker, queue, t_batch)
+                        continue
+                    if success and result_key == key:
+                        results[key] = out
+                    else:
+                        logSupport.log.warning(f"Failed to extract info from pool worker running '{key}'")
+                        failed.append(key)
+                    self.fork_stats[key] = {
+                        "transport": "pool",
+                        "size": size,
+                        "queue_wait": worker["t_dispatch"] - t_batch,
+                        "wall_time": time.time() - worker["t_dispatch"],
+                        "run_time": run_time,
+                    }
+                    self._dispatch(worker, queue, t_batch)
+                    if self.log_progress:
+                        tasks_to_finish = len(queue) + sum(1 for i in workers.values() if i["key"] is not None)
+                        logSupport.log.debug(f"Pool workers = {len(workers)}, Tasks to finish = {tasks_to_finish}")
+                if not workers:
+                    break
+        finally:
+            for fd, worker in workers.items():
+                poller.unregister(fd)
+                self._stop_worker(worker)
+            poller.close()
+
+        # Keys never dispatched because the workers could not be restarted
+        failed += list(reversed(queue))
+        if failed:
+            raise ForkResultError(len(failed), results, failed=failed)
+        return results
+
+    @staticmethod
+    def _dispatch(worker, queue, t_batch):
+        """Send the next key to an idle worker, or close its task pipe if there is nothing left to do"""
+        if queue:
+            worker["key"] = queue.pop()
+            worker["t_dispatch"] = time.time()
+            _write_frame(worker["task_w"], worker["key"])
+        elif worker["task_w"] is not None:
+            os.close(worker["task_w"])
+            worker["task_w"] = None
+
+
 def wait_for_pids(pid_list):
     """Wait for all pids to finish and discard any stdout or stderr.
 
@@ -318,16 +901,26 @@ def wait_for_pids(pid_list):
                 s = os.read(r, 1024)
         finally:
             os.close(r)
+            if pidel.get("shm") is not None:
+                os.close(pidel["shm"])
             os.waitpid(pid, 0)
 
 
 class ForkManager:
-    """Manages the forking of processes and the collection of results."""
+    """Manages the forking of processes and the collection of results.
 
-    def __init__(self):
+    Attributes:
+        use_shm (bool): If True, the children return their results via shared memory (see fork_in_bg)
+        fork_stats (dict): Transfer statistics of the collected results, keyed by fork key.
+            Each value is a dictionary with transport, size, serialize, transfer, deserialize (see fetch_fork_result)
+    """
+
+    def __init__(self, use_shm=False):
         self.functions_tofork = {}
         # Needs a separate list to keep the order
         self.key_list = []
+        self.use_shm = use_shm
+        self.fork_stats = {}
 
     def __len__(self):
         return len(self.functions_tofork)
@@ -348,6 +941,26 @@ class ForkManager:
         self.functions_tofork[key] = (function,) + args
         self.key_list.append(key)
 
+    def fork_stats_summary(self):
+        """Summarize the transfer statistics of the collected results
+
+        Returns:
+            str: number of results, total size and total serialize/transfer/deserialize times
+        """
+        size = serialize = transfer = deserialize = 0
+        for key_stats in self.fork_stats.values():
+            size += key_stats.get("size", 0)
+            serialize += key_stats.get("serialize") or 0
+            transfer += key_stats.get("transfer", 0)
+            deserialize += key_stats.get("deserialize", 0)
+        return "%d results, %d bytes, serialize %.3fs, transfer %.3fs, deserialize %.3fs" % (
+            len(self.fork_stats),
+            size,
+            serialize,
+            transfer,
+            deserialize,
+        )
+
     def fork_and_wait(self):
         """Forks and waits for all functions to complete."""
         pids = []
@@ -355,25 +968,42 @@ class ForkManager:
             pids.append(fork_in_bg(*self.functions_tofork[key]))
         wait_for_pids(pids)
 
-    def fork_and_collect(self):
+    def fork_and_collect(self, timeouts=None):
         """Forks and collects the results of all functions.
 
+        Args:
+            timeouts (dict|None): Maximum run time in seconds, keyed by fork key (missing keys or None values
+                mean no timeout). If provided, all the functions are forked at once using a ForkScheduler,
+                the children running longer are killed and counted as failed and the per-key wall time
+                is added to fork_stats. Defaults to None.
+
         Returns:
             dict: Dictionary of results.
+
+        Raises:
+            ForkResultError: If there are errors in the forked processes.
         """
+        if timeouts is not None:
+            scheduler = ForkScheduler(len(self.key_list), self.use_shm, False, self.fork_stats)
+            return scheduler.run(self.functions_tofork, self.key_list, timeouts)
         pipe_ids = {}
         for key in self.key_list:
-            pipe_ids[key] = fork_in_bg(*self.functions_tofork[key])
-        results = fetch_fork_result_list(pipe_ids)
+            pipe_ids[key] = fork_in_bg(*self.functions_tofork[key], use_shm=self.use_shm)
+        results = fetch_fork_result_list(pipe_ids, self.fork_stats)
         return results
 
-    def bounded_fork_and_collect(self, max_forks, log_progress=True, sleep_time=0.01):
+    def bounded_fork_and_collect(self, max_forks, log_progress=True, sleep_time=0.01, timeouts=None):
         """Forks and collects results with a limit on the number of concurrent forks.
 
+        Uses a ForkScheduler: the next function is forked as soon as a running child completes,
+        without sleep polling. Per-key statistics (including queue wait and wall time) are added to fork_stats.
+
         Args:
             max_forks (int): Maximum number of concurrent forks.
             log_progress (bool): Whether to log progress.
-            sleep_time (float): Time to sleep between checks.
+            sleep_time (float): Not used anymore, the scheduler is event driven. Kept for compatibility.
+            timeouts (dict|None): Maximum run time in seconds, keyed by fork key. The children running longer
+                are killed and counted as failed (timed_out is set in their fork_stats). Defaults to no timeouts.
 
         Returns:
             dict: Dictionary of results.
@@ -381,91 +1011,26 @@ class ForkManager:
         Raises:
             ForkResultError: If there are errors in the forked processes.
         """
-        post_work_info = {}
-        nr_errors = 0
-        pipe_ids = {}
-        forks_remaining = max_forks
-        functions_remaining = len(self.functions_tofork)
+        scheduler = ForkScheduler(max_forks, self.use_shm, log_progress, self.fork_stats)
+        return scheduler.run(self.functions_tofork, self.key_list, timeouts)
 
-        # Try to fork all the functions
-        for key in self.key_list:
-            # Check if we can fork more
-            if forks_remaining == 0:
-                if log_progress:
-                    # Log here, since we will have to wait
-                    logSupport.log.info(f"Active forks = {max_forks}, Forks to finish = {functions_remaining}")
-            while forks_remaining == 0:
-                failed_keys = []
-                # Give some time for the processes to finish the work
-                # logSupport.log.debug("Reached parallel_workers limit of %s" % parallel_workers)
-                time.sleep(sleep_time)
-
-                # Wait and gather results for work done so far before forking more
-                try:
-                    # logSupport.log.debug("Checking finished workers")
-                    post_work_info_subset = fetch_ready_fork_result_list(pipe_ids)
-                except ForkResultError as e:
-                    # Collect the partial result
-                    post_work_info_subset = e.good_results
-                    # Expect all errors logged already, just count
-                    nr_errors += e.nr_errors
-                    functions_remaining -= e.nr_errors
-                    failed_keys = e.failed
-
-                post_work_info.update(post_work_info_subset)
-                forks_remaining += len(post_work_info_subset)
-                functions_remaining -= len(post_work_info_subset)
-
-                for i in list(post_work_info_subset.keys()) + failed_keys:
-                    if pipe_ids.get(i):
-                        del pipe_ids[i]
-                # end for
-            # end while
-
-            # Yes, we can fork, do it
-            pipe_ids[key] = fork_in_bg(*self.functions_tofork[key])
-            forks_remaining -= 1
-        # end for
-
-        if log_progress:
-            logSupport.log.info(
-                f"Active forks = {max_forks - forks_remaining}, Forks to finish = {functions_remaining}"
-            )
-
-        # now we just have to wait for all to finish
-        while functions_remaining > 0:
-            failed_keys = []
-            # Give some time for the processes to finish the work
-            time.sleep(sleep_time)
-            # Wait and gather results for work done so far before forking more
-            try:
-                # logSupport.log.debug("Checking finished workers")
-                post_work_info_subset = fetch_ready_fork_result_list(pipe_ids)
-            except ForkResultError as e:
-                # Collect the partial result
-                post_work_info_subset = e.good_results
-                # Expect all errors logged already, just count
-                nr_errors += e.nr_errors
-                functions_remaining -= e.nr_errors
-                failed_keys = e.failed
-
-            post_work_info.update(post_work_info_subset)
-            forks_remaining += len(post_work_info_subset)
-            functions_remaining -= len(post_work_info_subset)
-
-            for i in list(post_work_info_subset.keys()) + failed_keys:
-                del pipe_ids[i]
-
-            if len(post_work_info_subset) > 0 and log_progress:
-                logSupport.log.info(
-                    f"Active forks = {max_forks - forks_remaining}, Forks to finish = {functions_remaining}"
-                )
-        # end while
+    def pool_fork_and_collect(self, nr_workers, log_progress=True):
+        """Runs all functions in a pool of nr_workers forked processes and collects the results.
+
+        Each worker runs multiple functions, see ForkWorkerPool. Per-key statistics are added to fork_stats.
+
+        Args:
+            nr_workers (int): Number of worker processes.
+            log_progress (bool): Whether to log progress.
 
-        if nr_errors > 0:
-            raise ForkResultError(nr_errors, post_work_info)
+        Returns:
+            dict: Dictionary of results.
 
-        return post_work_info
+        Raises:
+            ForkResultError: If there are errors in the workers.
+        """
+        pool = ForkWorkerPool(nr_workers, log_progress, self.fork_stats)
+        return pool.run(self.functions_tofork, self.key_list)
 
 
 ####################
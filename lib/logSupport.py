@@ -5,10 +5,13 @@
 #   Uses the Python built-in logging to log anything anywhere
 #   and structlog to improve machine parsing
 
+import atexit
 import logging
 import os
+import queue
 import re
 import sys  # for alternate_log
+import threading
 import time
 
 from logging.handlers import BaseRotatingHandler
@@ -45,6 +48,14 @@ log = None
 log_dir = None
 disable_rotate = False
 handlers = []
+async_handlers = []
+
+# Seconds after which the in-memory size of a log file is synced with the file on disk,
+# to account for the records appended by the forked children
+STREAM_SIZE_REFRESH = 60
+
+# Maximum number of records waiting in the asynchronous log queue, further records are dropped
+ASYNC_QUEUE_SIZE = 10000
 
 DEFAULT_FORMATTER = logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s")
 DEBUG_FORMATTER = logging.Formatter("[%(asctime)s] %(levelname)s: %(module)s:%(lineno)d: %(message)s")
@@ -101,6 +112,10 @@ class GlideinHandler(BaseRotatingHandler):
         extMatch (re.Pattern): Regex pattern to match the suffix of the rotated files.
         rolloverAt (int): Time of the next time-based rollover in seconds from Epoch. 0 to disable.
         rollover_not_before (int): Earliest time (seconds from Epoch) when size-based rollover can happen.
+        track_size (bool): If True, the file size is tracked in memory instead of being measured at each record.
+            Set by `AsyncGlideinHandler` for the handlers written by its thread.
+        stream_size (int): In-memory size of the log file (characters written), None if it must be read from disk.
+        stream_size_time (float): Time when `stream_size` was last synced with the file on disk.
     """
 
     def __init__(self, filename, maxDays=1.0, minDays=0.0, maxMBytes=10.0, backupCount=5, compression=None):
@@ -139,6 +154,9 @@ class GlideinHandler(BaseRotatingHandler):
         self.maxBytes = int(maxMBytes * 1024.0 * 1024.0)  # Convert the MB to bytes as needed by the base class
         self.min_lifetime = int(minDays * 24 * 60 * 60)  # Convert min days to seconds
         self.interval = int(maxDays * 24 * 60 * 60)  # Convert max days (interval) to seconds
+        self.track_size = False
+        self.stream_size = None
+        self.stream_size_time = 0
 
         # We are enforcing a date/time format for rotated log files to include
         # year, month, day, hours, and minutes.  The hours and minutes are to
@@ -211,16 +229,62 @@ class GlideinHandler(BaseRotatingHandler):
 
         do_size_rollover = False
         if self.maxBytes > 0 and t >= self.rollover_not_before:  # are we rolling over for size?
-            if empty_record:
-                msg = ""
+            if self.track_size:
+                # The record is counted once written, see emit()
+                if self.get_stream_size() >= self.maxBytes:
+                    do_size_rollover = True
             else:
-                msg = f"{self.format(record)}\n"
-            self.stream.seek(0, 2)  # due to non-posix-compliant Windows feature
-            if self.stream.tell() + len(msg) >= self.maxBytes:
-                do_size_rollover = True
+                if empty_record:
+                    msg = ""
+                else:
+                    msg = f"{self.format(record)}\n"
+                self.stream.seek(0, 2)  # due to non-posix-compliant Windows feature
+                if self.stream.tell() + len(msg) >= self.maxBytes:
+                    do_size_rollover = True
 
         return do_timed_rollover or do_size_rollover
 
+    def get_stream_size(self):
+        """Returns the in-memory size of the log file, syncing it with the file on disk when stale.
+
+        The size is read from disk the first time, after a rollover, and every `STREAM_SIZE_REFRESH` seconds
+        to include the records appended by forked children, which write with their own file descriptor.
+
+        Returns:
+            int: Size of the log file.
+        """
+        now = time.time()
+        if self.stream_size is None or now - self.stream_size_time >= STREAM_SIZE_REFRESH:
+            self.stream_size = os.fstat(self.stream.fileno()).st_size
+            self.stream_size_time = now
+        return self.stream_size
+
+    def emit(self, record):
+        """Emits a record, rolling over the log file if needed.
+
+        When tracking the size in memory, the record is formatted only once and its length
+        added to the in-memory size, without seeking the stream.
+
+        Args:
+            record (logging.LogRecord): The record to log.
+        """
+        if not self.track_size:
+            BaseRotatingHandler.emit(self, record)
+            return
+        try:
+            if self.shouldRollover(record, empty_record=True):
+                self.doRollover()
+            msg = self.format(record) + self.terminator
+            self.stream.write(msg)
+            self.flush()
+            if self.stream_size is not None:
+                # maxBytes is in bytes, count the encoded message
+                self.stream_size += len(msg.encode(self.stream.encoding, self.stream.errors))
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
     def getFilesToDelete(self):
         """Gets the list of files that should be deleted during rollover.
 
@@ -278,15 +342,18 @@ class GlideinHandler(BaseRotatingHandler):
         # Open a new log file
         self.mode = "w"
         self.stream = self._open()
+        self.stream_size = None
 
         # determine the next rollover time for the timed rollover check
         currentTime = int(time.time())
         if self.min_lifetime > 0:
             self.rollover_not_before = currentTime + self.min_lifetime
-        newRolloverAt = currentTime + self.interval
-        while newRolloverAt <= currentTime:
-            newRolloverAt = newRolloverAt + self.interval
-        self.rolloverAt = newRolloverAt
+        # Timed rollover stays disabled when interval is 0
+        if self.interval > 0:
+            newRolloverAt = currentTime + self.interval
+            while newRolloverAt <= currentTime:
+                newRolloverAt = newRolloverAt + self.interval
+            self.rolloverAt = newRolloverAt
 
         # Compress the log file (if requested)
         if self.compression == "zip":
@@ -311,9 +378,18 @@ class GlideinHandler(BaseRotatingHandler):
                 alternate_log("Log file gzip compression failed: %s" % e)
 
     def check_and_perform_rollover(self):
-        """Checks if rollover conditions are met and performs the rollover if necessary."""
-        if self.shouldRollover(None, empty_record=True):
-            self.doRollover()
+        """Checks if rollover conditions are met and performs the rollover if necessary.
+
+        The handler lock is held, the handler may be written at the same time by an `AsyncGlideinHandler` thread.
+        The in-memory size is synced with the file, this is invoked after the forked children wrote to it.
+        """
+        self.acquire()
+        try:
+            self.stream_size = None
+            if self.shouldRollover(None, empty_record=True):
+                self.doRollover()
+        finally:
+            self.release()
 
 
 def roll_all_logs():
@@ -322,6 +398,235 @@ def roll_all_logs():
         handler.check_and_perform_rollover()
 
 
+class AsyncLogWriter:
+    """Process-wide writer thread of the `AsyncGlideinHandler` handlers.
+
+    A single thread and a bounded queue are shared by all the asynchronous loggers of the process.
+    The queued items are `(AsyncGlideinHandler, LogRecord)` pairs, the thread writes each record
+    to the target handlers of its `AsyncGlideinHandler`.
+
+    When the queue is full the new records are dropped, not to block the logging calls if the disk
+    is slower than the logging. The dropped records are counted by each `AsyncGlideinHandler` and
+    a warning with their number is written to its log before the next record.
+
+    Attributes:
+        maxsize (int): Maximum number of records in the queue.
+        queue (queue.Queue): Queue of the records to write, None before the first start.
+        thread (threading.Thread): The writer thread, None when stopped.
+            When stopped the records are written synchronously.
+    """
+
+    def __init__(self, maxsize=ASYNC_QUEUE_SIZE):
+        """Initializes the writer. The thread is started by `start()`.
+
+        Args:
+            maxsize (int): Maximum number of records in the queue.
+        """
+        self.maxsize = maxsize
+        self.queue = None
+        self.thread = None
+
+    def start(self):
+        """Starts the writer thread with a new queue."""
+        self.queue = queue.Queue(self.maxsize)
+        self.thread = threading.Thread(target=self._run, name="GlideinLogWriter", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Writes all the queued records and stops the writer thread. Next records are written synchronously."""
+        thread = self.thread
+        if thread is None:
+            return
+        self.thread = None
+        self.queue.put(None)  # blocks until the thread frees a slot
+        thread.join()
+        # Records queued while stopping, after the sentinel
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].write(item[1])
+
+    def fork_child(self):
+        """Restarts the writer thread in a forked child. The thread is not running after a fork.
+
+        The records queued by the parent are dropped with the old queue, the parent's thread writes them.
+        """
+        if self.thread is not None:
+            self.start()
+
+    def put(self, handler, record):
+        """Queues a record without blocking. If the queue is full the record is dropped and counted.
+
+        Args:
+            handler (AsyncGlideinHandler): Handler whose targets write the record.
+            record (logging.LogRecord): The record to write.
+        """
+        try:
+            self.queue.put_nowait((handler, record))
+        except queue.Full:
+            handler.dropped += 1
+
+    def _run(self):
+        """Writes the queued records until the `None` sentinel is received."""
+        q = self.queue
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            handler, record = item
+            try:
+                handler.write(record)
+            except Exception:
+                handler.handleError(record)
+
+
+async_writer = AsyncLogWriter()
+
+
+class AsyncGlideinHandler(logging.Handler):
+    """Logging handler queuing the records for the process-wide writer thread (`async_writer`).
+
+    The logging calls only filter and queue the records. The writer thread formats and writes them
+    to the `GlideinHandler` targets, and rotates and compresses the log files, tracking their size in memory.
+    If the queue is full the records are dropped and counted, see `AsyncLogWriter`.
+
+    Forking is supported: the target locks are held while forking, so no record is half written,
+    and the child restarts only the writer thread, dropping the records queued by the parent
+    (the parent's thread writes them). The children keep `disable_rotate`, so only the parent rotates.
+    Records still queued when a process exits with `os._exit()` are lost unless `stop_async_logs()`
+    is invoked before, at the normal exit the queue is drained by an `atexit` hook.
+
+    Attributes:
+        target_handlers (list): `GlideinHandler` handlers written by the writer thread.
+        dropped (int): Number of records dropped because the queue was full.
+        dropped_reported (int): Number of dropped records already reported in the log.
+    """
+
+    def __init__(self, target_handlers):
+        """Initializes the handler and starts the writer thread if not running.
+
+        Args:
+            target_handlers (list): `GlideinHandler` handlers to write asynchronously.
+
+        Raises:
+            ValueError: If the Python version has no `os.register_at_fork` (Python < 3.7),
+                needed to restart the writer thread in the forked children.
+        """
+        if not hasattr(os, "register_at_fork"):
+            raise ValueError("Asynchronous process logs (asynchronous=True) require Python 3.7 or later")
+        logging.Handler.__init__(self)
+        self.target_handlers = list(target_handlers)
+        for handler in self.target_handlers:
+            handler.track_size = True
+        self.dropped = 0
+        self.dropped_reported = 0
+        async_handlers.append(self)
+        if async_writer.thread is None:
+            async_writer.start()
+
+    def filter(self, record):
+        """Queues only the records accepted by at least one of the target handlers.
+
+        Args:
+            record (logging.LogRecord): The record to log.
+
+        Returns:
+            bool: True if the record is logged by at least one target handler, False otherwise.
+        """
+        if not logging.Handler.filter(self, record):
+            return False
+        return any(record.levelno >= handler.level and handler.filter(record) for handler in self.target_handlers)
+
+    def prepare(self, record):
+        """Merges the message arguments, so that later changes to mutable arguments are not logged.
+
+        The formatting is left to the writer thread. The exception information is kept for the target formatters.
+
+        Args:
+            record (logging.LogRecord): The record to log.
+
+        Returns:
+            logging.LogRecord: The record to queue.
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def emit(self, record):
+        """Queues the record for the writer thread, or writes it if the thread is stopped.
+
+        Args:
+            record (logging.LogRecord): The record to log.
+        """
+        if async_writer.thread is None:
+            self.write(record)
+        else:
+            async_writer.put(self, self.prepare(record))
+
+    def write(self, record):
+        """Writes the record to the target handlers, preceded by a warning if records were dropped.
+
+        Args:
+            record (logging.LogRecord): The record to write.
+        """
+        dropped = self.dropped
+        if dropped != self.dropped_reported:
+            warning = logging.LogRecord(
+                record.name,
+                logging.WARNING,
+                __file__,
+                0,
+                "%i log records dropped, the asynchronous log queue was full",
+                (dropped - self.dropped_reported,),
+                None,
+            )
+            self.dropped_reported = dropped
+            self._write_targets(warning)
+        self._write_targets(record)
+
+    def _write_targets(self, record):
+        for handler in self.target_handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def stop_async_logs():
+    """Writes the queued records and stops the writer thread of the `AsyncGlideinHandler` handlers.
+
+    To invoke before exiting with `os._exit()`, which skips the `atexit` hooks.
+    """
+    async_writer.stop()
+
+
+def _before_fork():
+    """Holds the locks of the asynchronous handlers' targets, so that no record is being written while forking."""
+    for handler in async_handlers:
+        for target in handler.target_handlers:
+            target.acquire()
+
+
+def _after_fork_in_parent():
+    """Releases the locks held while forking."""
+    for handler in reversed(async_handlers):
+        for target in reversed(handler.target_handlers):
+            target.release()
+
+
+def _after_fork_in_child():
+    """Restarts the writer thread in the child. The handler locks are reinitialized by logging in the child."""
+    async_writer.fork_child()
+
+
+# os.register_at_fork is in Python 3.7+, AsyncGlideinHandler is refused without it
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent, after_in_child=_after_fork_in_child)
+atexit.register(stop_async_logs)
+
+
 def get_processlog_handler(
     log_file_name, log_dir, msg_types, extension, maxDays, minDays, maxMBytes, backupCount=5, compression=None
 ):
@@ -557,6 +862,7 @@ def get_logger_with_handlers(name, directory, config_data, level=logging.DEBUG):
     process_logs = eval(config_data["ProcessLogs"])
     is_structured = False
     handlers_list = []
+    async_handlers_list = []
     for plog in process_logs:
         # If at least one handler is structured, it will use structured logging
         # All handlers should be consistent and use the same
@@ -572,7 +878,12 @@ def get_logger_with_handlers(name, directory, config_data, level=logging.DEBUG):
             int(float(plog["backup_count"])),
             plog["compression"],
         )
-        handlers_list.append(handler)
+        if util.is_true(plog.get("asynchronous", "False")):
+            async_handlers_list.append(handler)
+        else:
+            handlers_list.append(handler)
+    if async_handlers_list:
+        handlers_list.append(AsyncGlideinHandler(async_handlers_list))
     if is_structured and USE_STRUCTLOG:
         mylog = structlog.get_logger(name)
     else:
@@ -3,7 +3,10 @@
 
 """This module implements the basic functions needed to interface with rrdtool."""
 
+import contextlib
 import os
+import re
+import socket
 import tempfile
 import time
 
@@ -541,6 +544,351 @@ class rrdSupport(BaseRRDSupport):
         super().__init__(rrd_obj)
 
 
+class RRDCachedClient:
+    """Client of the rrdcached daemon, using its text protocol over a persistent connection.
+
+    See https://oss.oetiker.ch/rrdtool/doc/rrdcached.en.html
+    """
+
+    # "ds[<name>].index <type> <index>" lines returned by INFO
+    DS_INDEX_RE = re.compile(r"^ds\[(.+)\]\.index\s+\d+\s+(\d+)\s*$")
+    DEFAULT_PORT = 42217
+
+    def __init__(self, address, timeout=60):
+        """Initialize the RRDCachedClient class. The connection is established when first needed.
+
+        Args:
+            address (str): The address of the rrdcached daemon: "unix:/path/to/socket", "/path/to/socket",
+                "host" or "host:port" (same format as RRDCACHED_ADDRESS).
+            timeout (float, optional): Timeout in seconds of the socket operations. Defaults to 60.
+        """
+        self.address = address
+        self.timeout = timeout
+        self.sock = None
+        self.rfile = None
+        # Data source names of the RRD files, in the order of their index
+        self.ds_names = {}
+
+    def connect(self):
+        """Connect to the daemon, if not connected already."""
+        if self.sock is not None:
+            return
+        address = self.address
+        if address.startswith("unix:"):
+            address = address[5:]
+        if address.startswith("/"):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(address)
+            except OSError:
+                sock.close()
+                raise
+        else:
+            host, _, port = address.partition(":")
+            sock = socket.create_connection((host, int(port) if port else self.DEFAULT_PORT), self.timeout)
+        self.sock = sock
+        self.rfile = sock.makefile("r", encoding=defaults.BINARY_ENCODING_DEFAULT)
+
+    def close(self):
+        """Close the connection to the daemon."""
+        if self.sock is None:
+            return
+        try:
+            self.rfile.close()
+            self.sock.close()
+        finally:
+            self.sock = None
+            self.rfile = None
+
+    def _send(self, data):
+        self.sock.sendall(data.encode(defaults.BINARY_ENCODING_DEFAULT))
+
+    def _read_response(self):
+        """Read a response: a status line "<status> <message>" followed by <status> lines if status is positive.
+
+        Returns:
+            tuple: The status (int, negative for errors), the message (str) and the following lines (list).
+
+        Raises:
+            OSError: If the connection is closed or the response is malformed.
+        """
+        line = self.rfile.readline()
+        if not line:
+            raise OSError("rrdcached closed the connection")
+        status, _, message = line.rstrip("\n").partition(" ")
+        try:
+            status = int(status)
+        except ValueError as e:
+            raise OSError(f"Unexpected response from rrdcached: {line}") from e
+        lines = [self.rfile.readline().rstrip("\n") for _ in range(status)]
+        return status, message, lines
+
+    def command(self, cmdline):
+        """Send a command and return the lines of the response.
+
+        Args:
+            cmdline (str): The command, e.g. "INFO /path/to/file.rrd".
+
+        Returns:
+            list: The lines following the status line.
+
+        Raises:
+            RuntimeError: If the daemon returns an error.
+        """
+        self.connect()
+        self._send(cmdline + "\n")
+        status, message, lines = self._read_response()
+        if status < 0:
+            raise RuntimeError(f"rrdcached error for '{cmdline}': {message}")
+        return lines
+
+    def get_ds_names(self, rrdfname):
+        """Return the data source names of an RRD file, in the order used by UPDATE.
+
+        The names are retrieved with INFO once and then cached.
+
+        Args:
+            rrdfname (str): The file path name of the RRD archive.
+
+        Returns:
+            list: The data source names.
+        """
+        if rrdfname not in self.ds_names:
+            ds_index = {}
+            for line in self.command(f"INFO {rrdfname}"):
+                match = self.DS_INDEX_RE.match(line)
+                if match:
+                    ds_index[int(match.group(2))] = match.group(1)
+            self.ds_names[rrdfname] = [ds_index[i] for i in sorted(ds_index)]
+        return self.ds_names[rrdfname]
+
+    def batch(self, cmdlines):
+        """Send many commands at once, using BATCH.
+
+        Args:
+            cmdlines (list): The commands, e.g. "UPDATE /path/to/file.rrd 1234567890:1:2".
+
+        Returns:
+            dict: The error messages, keyed by the index in `cmdlines` of the failed command.
+
+        Raises:
+            RuntimeError: If the daemon refuses the batch.
+        """
+        if not cmdlines:
+            return {}
+        self.connect()
+        self._send("BATCH\n")
+        status, message, _ = self._read_response()
+        if status < 0:
+            raise RuntimeError(f"rrdcached refused BATCH: {message}")
+        self._send("\n".join(cmdlines) + "\n.\n")
+        # "<number of errors> errors" followed by a line "<command number, from 1> <message>" for each error
+        status, message, lines = self._read_response()
+        errors = {}
+        for line in lines:
+            cmd_nr, _, error = line.partition(" ")
+            errors[int(cmd_nr) - 1] = error
+        return errors
+
+
+class BatchRRDSupport(BaseRRDSupport):
+    """Class queuing the RRD updates and writing them all at once with `flush()`.
+
+    The updates are written using, in order of preference:
+    - the rrdcached daemon, with a single BATCH on a persistent connection,
+      if an address is given or RRDCACHED_ADDRESS is set
+    - a single `rrdtool -` process reading all the updates, if using the rrdtool command-line tool
+    - the rrdtool Python module, in a loop in the same process
+    Creations, graphs and fetches are not queued and use the wrapped RRD support object.
+    """
+
+    def __init__(self, rrd_support=None, rrdcached_address=None):
+        """Initialize the BatchRRDSupport class.
+
+        Args:
+            rrd_support (BaseRRDSupport, optional): The RRD support object used for the operations
+                that are not queued and the local writes. Defaults to a new `rrdSupport()`.
+            rrdcached_address (str, optional): The address of the rrdcached daemon.
+                Defaults to the RRDCACHED_ADDRESS environment variable, if set.
+        """
+        if rrd_support is None:
+            rrd_support = rrdSupport()
+        super().__init__(rrd_support.rrd_obj)
+        self.rrd_support = rrd_support
+        if rrdcached_address is None:
+            rrdcached_address = os.environ.get("RRDCACHED_ADDRESS")
+        self.rrdcached = RRDCachedClient(rrdcached_address) if rrdcached_address else None
+        # Queued updates: (file name, time, data source names or None, values)
+        self.updates = []
+
+    def get_disk_lock(self, fname):
+        """Get a disk lock for the specified file, from the wrapped RRD support object.
+
+        Args:
+            fname (str): The filename to lock.
+
+        Returns:
+            object: The lock object.
+        """
+        return self.rrd_support.get_disk_lock(fname)
+
+    def update_rrd(self, rrdfname, time, val):
+        """Queue the update of an RRD archive with a new value.
+
+        Args:
+            rrdfname (str): The file path name of the RRD archive.
+            time (int): The time at which the value was taken.
+            val (str): The value to update.
+        """
+        if self.rrd_obj is None:
+            return  # nothing to do in this case
+        self.updates.append((str(rrdfname), time, None, ["%s" % val]))
+
+    def update_rrd_multi(self, rrdfname, time, val_dict):
+        """Queue the update of an RRD archive with multiple values.
+
+        Args:
+            rrdfname (str): The file path name of the RRD archive.
+            time (int): The time at which the values were taken.
+            val_dict (dict): A dictionary of data source names to values. None values are not updated.
+        """
+        if self.rrd_obj is None:
+            return  # nothing to do in this case
+        ds_names = [ds_name for ds_name in sorted(val_dict.keys()) if val_dict[ds_name] is not None]
+        if not ds_names:
+            return
+        self.updates.append((str(rrdfname), time, ds_names, ["%s" % val_dict[ds_name] for ds_name in ds_names]))
+
+    def flush(self):
+        """Write all the queued updates.
+
+        Returns:
+            dict: Statistics of the flush: number of "updates" and "files", "errors" (list of (file name, message)),
+                "time" in seconds and "channel" used (rrdcached, rrdtool or module).
+                If rrdcached fails, "rrdcached_error" has the reason and the updates are written locally.
+        """
+        updates = self.updates
+        self.updates = []
+        start_time = time.time()
+        stats = {"updates": len(updates), "files": len({u[0] for u in updates}), "errors": [], "channel": None}
+        if updates:
+            errors = None
+            if self.rrdcached is not None:
+                try:
+                    errors = self._flush_rrdcached(updates)
+                    stats["channel"] = "rrdcached"
+                except (OSError, RuntimeError) as e:
+                    self.rrdcached.close()
+                    stats["rrdcached_error"] = str(e)
+            if errors is None:
+                if isinstance(self.rrd_obj, rrdtool_exe):
+                    errors = self._flush_rrdtool_exe(updates)
+                    stats["channel"] = "rrdtool"
+                else:
+                    errors = self._flush_module(updates)
+                    stats["channel"] = "module"
+            stats["errors"] = [(updates[i][0], errors[i]) for i in sorted(errors)]
+        stats["time"] = time.time() - start_time
+        return stats
+
+    @staticmethod
+    def _update_args(update):
+        """Return the arguments of rrdtool update for a queued update, same as `BaseRRDSupport.update_rrd_multi`."""
+        rrdfname, update_time, ds_names, vals = update
+        args = [rrdfname]
+        if ds_names is not None:
+            args.append("-t")
+            args.append(":".join(ds_names))
+        args.append(("%li:" % update_time) + ":".join(vals))
+        return args
+
+    def _flush_rrdcached(self, updates):
+        """Write the updates with a single rrdcached BATCH. UPDATE has no template, missing values are unknown (U)."""
+        cmdlines = []
+        for rrdfname, update_time, ds_names, vals in updates:
+            if ds_names is not None:
+                val_dict = dict(zip(ds_names, vals))
+                vals = [val_dict.get(ds_name, "U") for ds_name in self.rrdcached.get_ds_names(rrdfname)]
+            cmdlines.append("UPDATE {} {}".format(rrdfname, ("%li:" % update_time) + ":".join(vals)))
+        return self.rrdcached.batch(cmdlines)
+
+    def _flush_rrdtool_exe(self, updates):
+        """Write the updates with a single rrdtool process in pipe mode, one output line per command.
+
+        The disk locks of all the files are held while rrdtool runs, as for the single updates.
+        If the rrdtool process fails, the updates without a response are written with `_flush_module`.
+        """
+        stdin_data = "".join("update %s\n" % string_quote_join(self._update_args(update)) for update in updates)
+        locks = [self.get_disk_lock(fname) for fname in sorted({update[0] for update in updates})]
+        try:
+            output = subprocessSupport.iexe_cmd(f"{self.rrd_obj.rrd_bin} -", stdin_data=stdin_data)
+        except Exception as e:
+            # CalledProcessError has the output of the commands run before the failure
+            output = getattr(e, "output", None) or ""
+        finally:
+            for lck in locks:
+                lck.close()
+        errors = {}
+        responses = [line for line in output.split("\n") if line.startswith("OK") or line.startswith("ERROR")]
+        for i in range(min(len(updates), len(responses))):
+            if responses[i].startswith("ERROR"):
+                errors[i] = responses[i]
+        if len(responses) < len(updates):
+            module_errors = self._flush_module(updates[len(responses) :])
+            for i, error in module_errors.items():
+                errors[len(responses) + i] = error
+        return errors
+
+    def _flush_module(self, updates):
+        """Write the updates one by one with the RRD support object, in the same process."""
+        errors = {}
+        for i, update in enumerate(updates):
+            lck = self.get_disk_lock(update[0])
+            try:
+                self.rrd_obj.update(*self._update_args(update))
+            except Exception as e:
+                errors[i] = str(e)
+            finally:
+                lck.close()
+        return errors
+
+
+@contextlib.contextmanager
+def rrd_batch(monitoring_config, log):
+    """Context manager queuing the RRD updates of a monitoring configuration and writing them all at the end.
+
+    Replaces `monitoring_config.rrd_obj` with a `BatchRRDSupport` (saved in `monitoring_config.rrd_batch_obj`
+    and reused) while in the context, flushes it when exiting and logs the result.
+    The RRD files are updated only when exiting the context: do not read them (e.g. fetch) inside it.
+    Nested contexts are part of the outer batch.
+
+    Args:
+        monitoring_config (object): Monitoring configuration with the `rrd_obj` and `rrd_batch_obj` attributes.
+        log (logging.Logger): Logger for the flush errors and statistics.
+    """
+    if monitoring_config.rrd_obj.isDummy() or isinstance(monitoring_config.rrd_obj, BatchRRDSupport):
+        yield
+        return
+    direct_rrd_obj = monitoring_config.rrd_obj
+    if monitoring_config.rrd_batch_obj is None:
+        monitoring_config.rrd_batch_obj = BatchRRDSupport(direct_rrd_obj)
+    monitoring_config.rrd_obj = monitoring_config.rrd_batch_obj
+    try:
+        yield
+    finally:
+        monitoring_config.rrd_obj = direct_rrd_obj
+        stats = monitoring_config.rrd_batch_obj.flush()
+        if "rrdcached_error" in stats:
+            log.warning("Failed to update the RRDs via rrdcached, updated locally: %s" % stats["rrdcached_error"])
+        for fname, error in stats["errors"]:
+            log.error(f"Failed to update {fname}: {error}")
+        log.info(
+            "Updated %i RRDs (%i updates) via %s in %.2f seconds, %i errors"
+            % (stats["files"], stats["updates"], stats["channel"], stats["time"], len(stats["errors"]))
+        )
+
+
 ##################################################################
 # INTERNAL, do not use directly
 ##################################################################
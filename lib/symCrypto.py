@@ -20,6 +20,8 @@ Note:
 """
 
 import binascii
+import collections
+import hashlib
 
 import M2Crypto.BIO
 import M2Crypto.Rand
@@ -147,6 +149,16 @@ class SymKey:
             self.iv_str.decode(defaults.BINARY_ENCODING_CRYPTO),
         )
 
+    def get_key_id(self):
+        """Returns an identifier of the cipher, key, and IV, without exposing them.
+
+        Two keys have the same id only if they encrypt the same data to the same cipher text.
+
+        Returns:
+            str: SHA-256 HEX digest of the key code.
+        """
+        return hashlib.sha256(self.get_code().encode(defaults.BINARY_ENCODING_CRYPTO)).hexdigest()
+
     def new(self, random_iv=True):
         """Generates a new key and IV.
 
@@ -306,6 +318,125 @@ class MutableSymKey(SymKey):
         return self.cypher_name, self.key_str, self.iv_str
 
 
+##########################################################################
+# Cache of the encryption and decryption results
+
+# Default maximum number of results kept by a SymKeyCache
+DEFAULT_CACHE_ENTRIES = 1024
+
+
+class SymKeyCache:
+    """Bounded LRU cache of the HEX encryption and decryption results of symmetric keys.
+
+    The same data encrypted with the same cipher, key, and IV always gives the same cipher text.
+    Results are keyed by the key id (cipher, key, and IV) and the SHA-256 digest of the input,
+    so a key regenerated with `SymKey.new` never reuses the results of the old one.
+    Failed operations are not cached, the exception is raised every time.
+
+    Attributes:
+        max_entries (int): Maximum number of results kept, the least recently used are evicted first.
+        hits (int): Number of operations served from the cache.
+        misses (int): Number of operations performed by the key.
+        bytes_saved (int): Total length of the inputs that did not need to be encrypted or decrypted.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES):
+        """Initializes an empty SymKeyCache.
+
+        Args:
+            max_entries (int, optional): Maximum number of results kept. Defaults to DEFAULT_CACHE_ENTRIES.
+        """
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.reset_stats()
+
+    def _lookup(self, operation, sym_key, data, func):
+        """Returns the cached result of the operation, or calls func and caches its result.
+
+        Args:
+            operation (str): Name of the operation, part of the cache key.
+            sym_key (SymKey): The key used for the operation.
+            data (AnyStr): The input data.
+            func (callable): Key method performing the operation on data.
+
+        Returns:
+            bytes: The result of func(data).
+        """
+        bdata = defaults.force_bytes(data)
+        if not sym_key.is_valid():
+            # Let the key raise its error
+            return func(bdata)
+        cache_key = (operation, sym_key.get_key_id(), hashlib.sha256(bdata).digest())
+        try:
+            result = self.entries[cache_key]
+        except KeyError:
+            self.misses += 1
+            result = func(bdata)
+            self.entries[cache_key] = result
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            return result
+        self.entries.move_to_end(cache_key)
+        self.hits += 1
+        self.bytes_saved += len(bdata)
+        return result
+
+    def encrypt_hex(self, sym_key, data):
+        """Encrypts data with sym_key, reusing the result of a previous identical encryption.
+
+        Args:
+            sym_key (SymKey): The key used to encrypt.
+            data (AnyStr): The data to encrypt.
+
+        Returns:
+            bytes: The encrypted data as a hex-encoded string.
+
+        Raises:
+            KeyError: If there is no valid key.
+        """
+        return self._lookup("encrypt", sym_key, data, sym_key.encrypt_hex)
+
+    def decrypt_hex(self, sym_key, data):
+        """Decrypts hex-encoded data with sym_key, reusing the result of a previous identical decryption.
+
+        Args:
+            sym_key (SymKey): The key used to decrypt.
+            data (AnyStrASCII): HEX input data. bytes or ASCII encoded Unicode str.
+
+        Returns:
+            bytes: decrypted data.
+
+        Raises:
+            KeyError: If there is no valid key.
+        """
+        return self._lookup("decrypt", sym_key, data, sym_key.decrypt_hex)
+
+    def get_stats(self):
+        """Returns the counters of the cache.
+
+        Returns:
+            dict: Number of "hits", "misses", and cached "entries", "hit_rate" (0 to 1) and "bytes_saved".
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": float(self.hits) / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self.entries),
+        }
+
+    def reset_stats(self):
+        """Resets the hits, misses, and bytes_saved counters, the cached results are kept."""
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def clear(self):
+        """Removes all the cached results."""
+        self.entries.clear()
+
+
 ##########################################################################
 # Parametrized symmetric algorithm classes
 
@@ -24,9 +24,15 @@
 #               no indexes here, only the values are used
 #               in case of a dictionary, keys are used and the values are ignored
 #
+# The *2file functions write the XML incrementally, without building the whole
+# document in memory. open_xml_file opens a buffered (optionally gzip compressed)
+# file to use with them.
+#
 #########################################################################################
 """
 
+import gzip
+import io
 import xml.sax.saxutils
 
 from glideinwms.lib import timeConversion
@@ -52,6 +58,10 @@ from glideinwms.lib import timeConversion
 #               no indexes here, only the values are used
 #               in case of a dictionary, keys are used and the values are ignored
 #
+# The *2file functions write the XML incrementally, without building the whole
+# document in memory. open_xml_file opens a buffered (optionally gzip compressed)
+# file to use with them.
+#
 #########################################################################################
 
 
@@ -77,6 +87,9 @@ DEFAULT_IGNORE_NONES = False
 
 DEFAULT_OVERRIDE_DICT = {"TypeDict": dict}
 
+# size of the write buffer of the files opened by open_xml_file
+DEFAULT_FILE_BUFFERING = 1024 * 1024
+
 ##########################################################
 #
 # End defaults
@@ -1111,8 +1124,9 @@ def tree2file(fd, tree, tree_name, child_element, indent_tab=DEFAULT_TAB, leadin
     return fd
 
 
-def time2xml(the_time, outer_tag, indent_tab=DEFAULT_TAB, leading_tab=""):
-    xml_data = {
+# internal, the time formats written by time2xml and time2file
+def time2dict(the_time):
+    return {
         "UTC": {
             "unixtime": timeConversion.getSeconds(the_time),
             "ISO8601": timeConversion.getISO8601_UTC(the_time),
@@ -1124,11 +1138,116 @@ def time2xml(the_time, outer_tag, indent_tab=DEFAULT_TAB, leading_tab=""):
             "human": timeConversion.getHuman(the_time),
         },
     }
+
+
+def time2xml(the_time, outer_tag, indent_tab=DEFAULT_TAB, leading_tab=""):
     return dict2string(
-        xml_data,
+        time2dict(the_time),
         dict_name=outer_tag,
         el_name="timezone",
         subtypes_params={"class": {}},
         indent_tab=indent_tab,
         leading_tab=leading_tab,
     )
+
+
+# Write the time as XML into an open file, same format as time2xml
+def time2file(fd, the_time, outer_tag, indent_tab=DEFAULT_TAB, leading_tab=""):
+    dict2file(
+        fd,
+        time2dict(the_time),
+        dict_name=outer_tag,
+        el_name="timezone",
+        subtypes_params={"class": {}},
+        indent_tab=indent_tab,
+        leading_tab=leading_tab,
+    )
+    return fd
+
+
+# Open a file to write an XML document incrementally with the *2file functions
+# The many small writes of the *2file functions are buffered
+# If compress is True, the file is gzip compressed
+def open_xml_file(fname, compress=False, buffering=DEFAULT_FILE_BUFFERING):
+    if compress:
+        return io.TextIOWrapper(io.BufferedWriter(gzip.GzipFile(fname, "wb"), buffering))
+    return open(fname, "w", buffering=buffering)
+
+
+######################################################################
+# Conversion to the dictionaries returned by xmlParse
+#
+# The functions below return the same dictionary that xmlParse.xmlstring2dict
+# returns when parsing the XML generated by the corresponding function above
+# with the same parameters, without formatting and parsing the XML.
+# Machine consumers of an XML file can use them to write a snapshot next to it
+# (see xmlParse.xmlsnapshot2dict)
+# The element names must be the singular of the containing element
+# (e.g. frontend in frontends) or listed in always_singular_list.
+# Lists, trees and text attributes are not supported.
+
+
+# Return the value of an XML attribute as read back by xmlParse
+def xml_attr_text(el):
+    if el is None:
+        return "None"
+    elif type(el) in (str, str):  # May need to add bytes depending on Python3
+        return el
+    elif isinstance(el, bool):
+        return "%s" % el
+    elif isinstance(el, float):
+        return "%.12g" % el
+    else:
+        return "%i" % el
+
+
+# Dictionary corresponding to class2string
+def class2xmldict(inst, subclass_params={}, dicts_params=None, debug_str=""):
+    if dicts_params is None:
+        dicts_params = DEFAULT_DICTS_PARAMS
+
+    data = {}
+    for attr in inst:
+        el = inst[attr]
+        if (type(el) in SIMPLE_TYPES) or (el is None):
+            data[attr] = xml_attr_text(el)
+        elif isinstance(el, DEFAULT_OVERRIDE_DICT["TypeDict"]):
+            if attr in dicts_params:
+                sp = complete_dict_params(dicts_params[attr])
+                data[attr] = dict2xmldict(el, sp["el_attr_name"], sp["subtypes_params"], debug_str + f"{attr}.")
+            else:
+                c = complete_class_params(subclass_params.get(attr, {}))
+                data[attr] = class2xmldict(el, c["subclass_params"], c["dicts_params"], debug_str + f"{attr}.")
+        else:
+            raise RuntimeError(f"Unsupported attr {attr} ({type(el)}) ({debug_str})")
+    return data
+
+
+# Dictionary corresponding to dict2string
+def dict2xmldict(dict_data, el_attr_name=None, subtypes_params={}, debug_str=""):
+    if el_attr_name is None:
+        el_attr_name = DEFAULT_EL_ATTR_NAME
+
+    data = {}
+    for idx in dict_data:
+        el = dict_data[idx]
+        if (type(el) in SIMPLE_TYPES) or (el is None):
+            data[f"{idx}"] = {el_attr_name: xml_attr_text(el)}
+        elif isinstance(el, DEFAULT_OVERRIDE_DICT["TypeDict"]) and ("class" in subtypes_params):
+            c = complete_class_params(subtypes_params["class"])
+            # the key is a parameter of the class element
+            data[xml_attr_text(idx)] = class2xmldict(el, c["subclass_params"], c["dicts_params"], debug_str + f"{idx}.")
+        else:
+            raise RuntimeError(f"Unsupported element {idx} ({type(el)}) ({debug_str})")
+    return data
+
+
+# Dictionary corresponding to time2xml
+# Unless timezone is in always_singular_list, the timezone elements have the same key
+# and only the last one (UTC, the keys are sorted) is kept by xmlParse
+def time2xmldict(the_time, always_singular_list=[]):
+    xml_data = time2dict(the_time)
+    xml_data["UTC"]["unixtime"] = xml_attr_text(xml_data["UTC"]["unixtime"])
+    if "timezone" in always_singular_list:
+        return xml_data
+    return {"timezone": dict(xml_data["UTC"], name="UTC")}
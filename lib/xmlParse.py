@@ -3,13 +3,20 @@
 
 # Description: general purpose XML decoder
 
+import os
+import pickle
 import xml.dom.minidom
+import xml.parsers.expat
 
 from collections import UserDict
 
 # from collections import UserDict, OrderedDict
 
 
+# Size of the chunks read from the file objects passed to xmlfile2dict
+PARSE_CHUNK_SIZE = 64 * 1024
+
+
 class CorruptXML(Exception):
     pass
 
@@ -84,17 +91,27 @@ class OrderedDict2(UserDict):
 
 # convert a XML file into a dictionary
 # ignore text sections
+# fname can be a file name or a binary file object
+# The XML is parsed as a stream of events (expat), the dictionary is built without an intermediate DOM
 def xmlfile2dict(
     fname, use_ord_dict=False, always_singular_list=[]  # if true, return OrderedDict instead of a regular dictionary
 ):  # anything id listed here will be considered as a list
+    parser, builder = expat_dict_parser(use_ord_dict, always_singular_list)
     try:
-        doc = xml.dom.minidom.parse(fname)
+        if hasattr(fname, "read"):
+            # Text or binary file object, ParseFile accepts only bytes
+            chunk = fname.read(PARSE_CHUNK_SIZE)
+            while chunk:
+                parser.Parse(chunk, False)
+                chunk = fname.read(PARSE_CHUNK_SIZE)
+            parser.Parse(chunk, True)
+        else:
+            with open(fname, "rb") as fd:
+                parser.ParseFile(fd)
     except xml.parsers.expat.ExpatError as e:
         raise CorruptXML(f"XML corrupt in file {fname}: {e}") from e
 
-    data = domel2dict(doc.documentElement, use_ord_dict, always_singular_list)
-
-    return data
+    return builder.data
 
 
 # convert a XML string into a dictionary
@@ -126,11 +143,48 @@ def xmlfile2dict(
 def xmlstring2dict(
     instr, use_ord_dict=False, always_singular_list=[]  # if true, return OrderedDict instead of a regular dictionary
 ):  # anything id listed here will be considered as a list
-    doc = xml.dom.minidom.parseString(instr)
+    parser, builder = expat_dict_parser(use_ord_dict, always_singular_list)
+    parser.Parse(instr, True)
 
-    data = domel2dict(doc.documentElement, use_ord_dict, always_singular_list)
+    return builder.data
+
+
+# Snapshots
+# A snapshot is a pickle file next to an XML file (same name with SNAPSHOT_EXT instead of .xml)
+# with the dictionary that xmlfile2dict returns for the XML file
+# and the always_singular_list used to obtain it.
+# Writers can build the dictionary with the xmlFormat *2xmldict functions, without parsing the XML
+SNAPSHOT_EXT = ".snapshot.pkl"
 
-    return data
+
+# return the name of the snapshot of an XML file
+def snapshot_fname(fname):
+    return os.path.splitext(fname)[0] + SNAPSHOT_EXT
+
+
+# return the content of a snapshot file
+def snapshot_dumps(data, always_singular_list=[]):
+    return pickle.dumps(
+        {"always_singular_list": sorted(always_singular_list), "data": data}, protocol=pickle.HIGHEST_PROTOCOL
+    )
+
+
+# convert a XML file into a dictionary, like xmlfile2dict
+# but loading the snapshot of the file if it is up to date (not older than the XML file)
+# and it was generated with the same always_singular_list
+# fname must be a file name, OSError is raised if the XML file does not exist
+def xmlsnapshot2dict(fname, always_singular_list=[]):
+    xml_mtime = os.stat(fname).st_mtime_ns
+    try:
+        sname = snapshot_fname(fname)
+        if os.stat(sname).st_mtime_ns >= xml_mtime:
+            with open(sname, "rb") as fd:
+                snapshot = pickle.load(fd)
+            if snapshot["always_singular_list"] == sorted(always_singular_list):
+                return snapshot["data"]
+    except Exception:
+        pass  # missing, old or corrupted snapshot, use the XML file
+    return xmlfile2dict(fname, always_singular_list=always_singular_list)
 
 
 ########################################################
@@ -209,20 +263,73 @@ def domel2dict(doc, use_ord_dict=False, always_singular_list=[]):
         tag = el.tagName
         # print tag
         eldata = domel2dict(el, use_ord_dict, always_singular_list)
-        if is_singular_of(tag, myname, always_singular_list):
-            # subelements, like "param" - "params"
-            if "name" in eldata:
-                data[eldata["name"]] = eldata
-                del eldata["name"]
-            elif (data == {}) or (isinstance(data, list)):  # first element, will define everything  # already a list
-                # most probably one wants a list in this case
-                if data == {}:
-                    data = []
-                data.append(eldata)
-            else:
-                # cannot use it as a list
-                data[tag] = eldata
+        data = add_subelement(myname, data, tag, eldata, always_singular_list)
+    return data
+
+
+def add_subelement(myname, data, tag, eldata, always_singular_list=[]):
+    """Add the content of a subelement to the content of its parent element.
+    If the element is singular of the parent (english word is analyzed):
+      if it has a 'name' attribute or the parent has attributes, a dictionary is added to the parent (name is the key)
+      if if has no name and the parent is empty or a list, then is added to the parent (list)
+    Otherwise it is added to the parent dictionary with the tag as key
+    :param myname: tag of the parent element
+    :param data: content of the parent element so far, dictionary or list
+    :param tag: tag of the subelement
+    :param eldata: content of the subelement, dictionary or list
+    :param always_singular_list: these are considered unique singular even if the word is singular form of a plural
+    :return: the new content of the parent element (an empty dictionary becomes a list when the first item is added)
+    """
+    if is_singular_of(tag, myname, always_singular_list):
+        # subelements, like "param" - "params"
+        if "name" in eldata:
+            data[eldata["name"]] = eldata
+            del eldata["name"]
+        elif (data == {}) or (isinstance(data, list)):  # first element, will define everything  # already a list
+            # most probably one wants a list in this case
+            if data == {}:
+                data = []
+            data.append(eldata)
         else:
-            # just a regular subtree
+            # cannot use it as a list
             data[tag] = eldata
+    else:
+        # just a regular subtree
+        data[tag] = eldata
     return data
+
+
+class ExpatDictBuilder:
+    """Build the same dictionary or list as domel2dict from the expat parser events.
+    Only the elements still open are kept (stack), each one is added to its parent when it ends
+    """
+
+    def __init__(self, use_ord_dict=False, always_singular_list=[]):
+        self.use_ord_dict = use_ord_dict
+        self.always_singular_list = always_singular_list
+        self.stack = []  # [tag, content] of the open elements
+        self.data = None  # content of the document element, once parsed
+
+    def start_element(self, name, attrs):
+        if self.use_ord_dict:
+            attrs = OrderedDict(attrs)
+        self.stack.append([name, attrs])
+
+    def end_element(self, name):
+        eldata = self.stack.pop()[1]
+        if self.stack:
+            parent = self.stack[-1]
+            parent[1] = add_subelement(parent[0], parent[1], name, eldata, self.always_singular_list)
+        else:
+            self.data = eldata
+
+
+def expat_dict_parser(use_ord_dict=False, always_singular_list=[]):
+    """Return an expat parser and the ExpatDictBuilder collecting its events
+    Text sections are ignored, the builder data is the document content once the parsing is complete
+    """
+    builder = ExpatDictBuilder(use_ord_dict, always_singular_list)
+    parser = xml.parsers.expat.ParserCreate()
+    parser.StartElementHandler = builder.start_element
+    parser.EndElementHandler = builder.end_element
+    return parser, builder
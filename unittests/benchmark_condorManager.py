@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+#
+# Project:
+#   glideinWMS
+#
+# Description:
+#   benchmark the job by job removal (condorRemoveOne, condorReleaseOne)
+#   against the batched one (condorRemoveMany, condorReleaseMany)
+#   Uses the stub condor_rm and condor_release in worker_scripts, counting the processes spawned
+#
+
+
+import argparse
+import os
+import tempfile
+import time
+
+from glideinwms.lib import condorExe, condorManager
+
+WORKER_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker_scripts")
+
+
+def job_by_job(jid_list, do_release):
+    for jid in jid_list:
+        job_str = "%li.%li" % jid
+        if do_release:
+            condorManager.condorReleaseOne(job_str, schedd_lookup_cache=None)
+        else:
+            condorManager.condorRemoveOne(job_str, schedd_lookup_cache=None)
+
+
+def batched(jid_list, do_release):
+    if do_release:
+        condorManager.condorReleaseMany(jid_list, schedd_lookup_cache=None)
+    else:
+        condorManager.condorRemoveMany(jid_list, schedd_lookup_cache=None)
+
+
+def timeit(func, jid_list, do_release, stub_log):
+    """Run func and return the number of stub commands spawned and the wall time"""
+    open(stub_log, "w").close()
+    t_begin = time.perf_counter()
+    func(jid_list, do_release)
+    t_wall = time.perf_counter() - t_begin
+    with open(stub_log) as f:
+        return len(f.readlines()), t_wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job by job against batched condor_rm/condor_release")
+    parser.add_argument("--jobs", type=int, default=200, help="number of jobs to remove")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds spent by each stub command")
+    parser.add_argument("--release", action="store_true", help="benchmark condor_release instead of condor_rm")
+    args = parser.parse_args()
+
+    condorExe.condor_bin_path = WORKER_SCRIPTS
+    os.environ["STUB_CONDOR_SLEEP"] = str(args.latency)
+    jid_list = [(1000 + i // 10, i % 10) for i in range(args.jobs)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["STUB_CONDOR_LOG"] = stub_log = os.path.join(tmpdir, "stub.log")
+        spawns_one, t_one = timeit(job_by_job, jid_list, args.release, stub_log)
+        print(f"job by job: {spawns_one} commands, {t_one:.3f}s")
+        spawns_many, t_many = timeit(batched, jid_list, args.release, stub_log)
+        print(f"batched: {spawns_many} commands, {t_many:.3f}s")
+    print("Speedup: %.1fx" % (t_one / max(t_many, 1e-9)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+#
+# Project:
+#   glideinWMS
+#
+# Description:
+#   benchmark the Factory downtime checks on a synthetic downtime file (10k lines by default)
+#   comparing the indexed check (DowntimeFile.check_downtime) with reading and scanning
+#   the whole file at every check, as done before the index
+#   The checks are the ones of an entry cycle: entry, then each Frontend and security class
+#
+
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from glideinwms.factory import glideFactoryDowntimeLib
+
+
+def scan_downtime(fname, entry="Any", frontend="Any", security_class="Any", check_time=None):
+    """Read the whole file and check the periods one by one, the check before the index"""
+    if check_time is None:
+        check_time = int(time.time())
+    for time_tuple in glideFactoryDowntimeLib._read(fname):
+        if (time_tuple[2] != "All") and (entry != time_tuple[2]):
+            continue
+        if (time_tuple[2] == "All") and (entry == "factory"):
+            continue
+        if (time_tuple[3] != "All") and (frontend != time_tuple[3]):
+            continue
+        if (time_tuple[4] != "All") and (security_class != time_tuple[4]):
+            continue
+        if check_time < time_tuple[0]:
+            continue
+        comment = " ".join(time_tuple[5][1:])
+        if time_tuple[1] is None:
+            return comment, True
+        if check_time <= time_tuple[1]:
+            return comment, True
+    return "", False
+
+
+def synthetic_downtimes(fname, nr_lines, nr_entries, nr_frontends):
+    """Write a downtime file with nr_lines periods, mostly expired, over the entries, Frontends and security classes"""
+    now = int(time.time())
+    downtime = glideFactoryDowntimeLib.DowntimeFile(fname)
+    for i in range(nr_lines):
+        start_time = now - random.randint(0, 365 * 86400)
+        end_time = start_time + random.randint(3600, 7 * 86400) if i % 1000 else None
+        downtime.add_period(
+            start_time,
+            end_time,
+            entry=random.choice(["All"] + [f"entry_{n}" for n in range(nr_entries)]),
+            frontend=random.choice(["All"] + [f"frontend_{n}" for n in range(nr_frontends)]),
+            security_class=random.choice(["All", "frontend", "pilot"]),
+            comment=f"maintenance {i}",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the indexed Factory downtime checks")
+    parser.add_argument("--lines", type=int, default=10000, help="number of downtime periods in the file")
+    parser.add_argument("--entries", type=int, default=5, help="number of entries checked")
+    parser.add_argument("--frontends", type=int, default=2, help="number of Frontends checked per entry")
+    args = parser.parse_args()
+
+    random.seed(1)
+    checks = []
+    for entry in range(args.entries):
+        checks.append((f"entry_{entry}", "Any", "Any"))
+        for frontend in range(args.frontends):
+            for security_class in ("frontend", "pilot"):
+                checks.append(("factory", f"frontend_{frontend}", security_class))
+                checks.append((f"entry_{entry}", f"frontend_{frontend}", security_class))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fname = os.path.join(tmpdir, "downtimes.txt")
+        synthetic_downtimes(fname, args.lines, args.entries, args.frontends)
+        now = int(time.time())
+
+        t_begin = time.perf_counter()
+        scanned = [scan_downtime(fname, *i, check_time=now) for i in checks]
+        t_scan = time.perf_counter() - t_begin
+
+        t_begin = time.perf_counter()
+        indexed = [glideFactoryDowntimeLib._check_downtime(fname, *i, check_time=now) for i in checks]
+        t_index = time.perf_counter() - t_begin
+
+        t_begin = time.perf_counter()
+        for i in checks:
+            glideFactoryDowntimeLib._check_downtime(fname, *i, check_time=now)
+        t_cached = time.perf_counter() - t_begin
+
+    print(f"{len(checks)} checks on a {args.lines} lines downtime file")
+    print(f"read and scan: {t_scan:.3f}s, {1e6 * t_scan / len(checks):.1f} us/check")
+    print(f"index (first parsing included): {t_index:.3f}s, {1e6 * t_index / len(checks):.1f} us/check")
+    print(f"index (already parsed): {t_cached:.3f}s, {1e6 * t_cached / len(checks):.1f} us/check")
+    if scanned != indexed:
+        print("ERROR: the results are different")
+        return 1
+    print("Results are identical, %i in downtime" % sum(1 for i in indexed if i[1]))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+#
+# Project:
+#   glideinWMS
+#
+# Description:
+#   benchmark uniqueSets against uniqueSetsBySignature
+#   Replays the data saved in /tmp/frontend_dump/<group> by countMatch (see profile_frontend.py)
+#   or uses synthetic sets if no dump directory is given
+#
+
+
+import argparse
+import random
+import time
+
+from glideinwms.frontend import glideinFrontendLib
+from glideinwms.lib import logSupport
+from glideinwms.unittests.profile_frontend import CMS_MATCH_EXPR, FakeLogger, load_dump
+
+
+def dump_sets(dumpdir, match_expr):
+    """Build the list of sets passed by countMatch to the partitioning function: one set per entry,
+    with the indexes of the job clusters matching the entry
+
+    Args:
+        dumpdir (str): directory with the countMatch dump
+        match_expr (str): match expression
+
+    Returns:
+        list: list of sets of cluster indexes
+    """
+    condorq_dict, glidein_dict, attr_dict, condorq_match_list = load_dump(dumpdir)
+    match_obj = compile(match_expr, "<string>", "eval")
+    matrix = glideinFrontendLib.MatchMatrix(match_obj, condorq_dict, glidein_dict, attr_dict, False, condorq_match_list)
+    in_sets = [set() for _ in matrix.glidein_list]
+    for cluster_idx, row in enumerate(matrix.cluster_rows):
+        for glidein_idx in row:
+            in_sets[glidein_idx].add(cluster_idx)
+    return in_sets
+
+
+def synthetic_sets(nr_entries, nr_clusters, nr_sites, seed=0):
+    """Build overlapping sets: each cluster can run on a few random sites, each site has a few entries
+
+    Args:
+        nr_entries (int): number of entries (sets)
+        nr_clusters (int): number of job clusters (elements)
+        nr_sites (int): number of sites, entries of the same site match the same clusters
+        seed (int): random seed
+
+    Returns:
+        list: list of sets of cluster indexes
+    """
+    rnd = random.Random(seed)
+    site_clusters = [set() for _ in range(nr_sites)]
+    for cluster_idx in range(nr_clusters):
+        for site in rnd.sample(range(nr_sites), rnd.randint(1, min(5, nr_sites))):
+            site_clusters[site].add(cluster_idx)
+    return [set(site_clusters[entry % nr_sites]) for entry in range(nr_entries)]
+
+
+def normalize(partition):
+    outvals, all_values = partition
+    return sorted((sorted(idx), sorted(values)) for idx, values in outvals), all_values
+
+
+def timeit(func, in_sets):
+    t_begin = time.perf_counter()
+    out = func(in_sets)
+    return out, time.perf_counter() - t_begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark uniqueSets against uniqueSetsBySignature")
+    parser.add_argument("--dumpdir", help="countMatch dump directory, e.g. /tmp/frontend_dump/main/")
+    parser.add_argument("--match-expr", default=CMS_MATCH_EXPR, help="match expression (default: CMS one)")
+    parser.add_argument("--entries", type=int, default=500, help="number of synthetic entries")
+    parser.add_argument("--clusters", type=int, default=5000, help="number of synthetic job clusters")
+    parser.add_argument("--sites", type=int, default=100, help="number of synthetic sites")
+    args = parser.parse_args()
+    logSupport.log = FakeLogger()
+
+    if args.dumpdir:
+        in_sets = dump_sets(args.dumpdir, args.match_expr)
+    else:
+        in_sets = synthetic_sets(args.entries, args.clusters, args.sites)
+    print(f"Sets: {len(in_sets)}, total size: {sum(len(i) for i in in_sets)}")
+
+    out_signature, t_signature = timeit(glideinFrontendLib.uniqueSetsBySignature, in_sets)
+    print(f"uniqueSetsBySignature: {t_signature:.3f}s, {len(out_signature[0])} unique sets")
+    out_pairwise, t_pairwise = timeit(glideinFrontendLib.uniqueSets, in_sets)
+    print(f"uniqueSets: {t_pairwise:.3f}s, {len(out_pairwise[0])} unique sets")
+
+    if normalize(out_signature) != normalize(out_pairwise):
+        print("ERROR: the partitions are different")
+        return 1
+    print("Partitions are identical, speedup: %.1fx" % (t_pairwise / max(t_signature, 1e-9)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
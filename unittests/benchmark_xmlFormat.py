@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+#
+# Project:
+#   glideinWMS
+#
+# Description:
+#   benchmark writing the aggregated Factory status (schedd_status.xml) of a synthetic Factory
+#   as a string (dict2string, class2string) against the streaming writers (dict2file, class2file)
+#   Each writer runs in a forked process, the peak RSS increase is measured there
+#
+
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from glideinwms.lib import xmlFormat
+
+FRONTEND_PARAMS = {
+    "class": {
+        "subclass_params": {
+            "Requested": {"dicts_params": {"Parameters": {"el_name": "Parameter", "subtypes_params": {"class": {}}}}}
+        }
+    }
+}
+ENTRIES_PARAMS = {"class": {"dicts_params": {"frontends": {"el_name": "frontend", "subtypes_params": FRONTEND_PARAMS}}}}
+XML_HEADER = '<?xml version="1.0" encoding="ISO-8859-1"?>\n\n<glideFactoryQStats>\n'
+
+
+def synthetic_status(nr_entries, nr_frontends):
+    """Build the aggregated status of a Factory with nr_entries entries, each serving nr_frontends Frontends
+
+    Args:
+        nr_entries (int): number of entries
+        nr_frontends (int): number of Frontends per entry
+
+    Returns:
+        dict: status with the "entries" and "total" keys, as built by aggregateStatus
+    """
+    frontend_el = {
+        "Status": {a: 10 for a in ("Idle", "Running", "Held", "Wait", "Pending", "StageIn", "IdleOther", "StageOut")},
+        "Requested": {"Idle": 5, "MaxGlideins": 100, "Parameters": {f"GLIDEIN_Param{i}": "value" for i in range(5)}},
+        "ClientMonitor": {a: 3 for a in ("InfoAge", "JobsIdle", "JobsRunning", "GlideIdle", "GlideRunning")},
+        "Downtime": {"status": "False"},
+    }
+    entries = {}
+    for entry in range(nr_entries):
+        frontends = {f"frontend_{fe}_group_main": frontend_el for fe in range(nr_frontends)}
+        entries[f"entry_{entry}"] = {"frontends": frontends, "total": {"Status": frontend_el["Status"]}}
+    return {"entries": entries, "total": {"Status": frontend_el["Status"]}}
+
+
+def write_string(fname, status):
+    xml_str = (
+        XML_HEADER
+        + xmlFormat.time2xml(time.time(), "updated", leading_tab=xmlFormat.DEFAULT_TAB)
+        + "\n"
+        + xmlFormat.dict2string(
+            status["entries"], "entries", "entry", subtypes_params=ENTRIES_PARAMS, leading_tab=xmlFormat.DEFAULT_TAB
+        )
+        + "\n"
+        + xmlFormat.class2string(status["total"], "total", leading_tab=xmlFormat.DEFAULT_TAB)
+        + "\n"
+        + "</glideFactoryQStats>\n"
+    )
+    with open(fname, "w") as fd:
+        fd.write(xml_str + "\n")
+
+
+def write_stream(fname, status, compress=False):
+    with xmlFormat.open_xml_file(fname, compress) as fd:
+        fd.write(XML_HEADER)
+        xmlFormat.time2file(fd, time.time(), "updated", leading_tab=xmlFormat.DEFAULT_TAB)
+        xmlFormat.dict2file(
+            fd, status["entries"], "entries", "entry", subtypes_params=ENTRIES_PARAMS, leading_tab=xmlFormat.DEFAULT_TAB
+        )
+        xmlFormat.class2file(fd, status["total"], "total", leading_tab=xmlFormat.DEFAULT_TAB)
+        fd.write("</glideFactoryQStats>\n")
+
+
+def write_stream_gzip(fname, status):
+    write_stream(fname, status, compress=True)
+
+
+def measure(func, fname, status, queue):
+    """Run in the forked process: write the file and return the wall time and the peak RSS increase (KiB)"""
+    rss_begin = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t_begin = time.perf_counter()
+    func(fname, status)
+    t_wall = time.perf_counter() - t_begin
+    queue.put((t_wall, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_begin))
+
+
+def timeit(func, fname, status):
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    process = ctx.Process(target=measure, args=(func, fname, status, queue))
+    process.start()
+    res = queue.get()
+    process.join()
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the string and streaming xmlFormat writers")
+    parser.add_argument("--entries", type=int, default=5000, help="number of synthetic entries")
+    parser.add_argument("--frontends", type=int, default=5, help="number of Frontends per entry")
+    args = parser.parse_args()
+
+    status = synthetic_status(args.entries, args.frontends)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = {}
+        for func, fname in (
+            (write_string, "string.xml"),
+            (write_stream, "stream.xml"),
+            (write_stream_gzip, "stream.xml.gz"),
+        ):
+            fname = os.path.join(tmpdir, fname)
+            t_wall, rss = timeit(func, fname, status)
+            results[func.__name__] = t_wall, rss
+            print(f"{func.__name__}: {t_wall:.3f}s, peak RSS +{rss / 1024.0:.1f} MiB, {os.path.getsize(fname)} bytes")
+
+        with open(os.path.join(tmpdir, "string.xml")) as f_string, open(os.path.join(tmpdir, "stream.xml")) as f_stream:
+            # The updated time differs, compare the rest
+            lines_string = [i for i in f_string if "timezone" not in i]
+            lines_stream = [i for i in f_stream if "timezone" not in i]
+    if lines_string[:-1] != lines_stream:
+        print("ERROR: the XML files are different")
+        return 1
+    t_string, rss_string = results["write_string"]
+    t_stream, rss_stream = results["write_stream"]
+    print(
+        "XML files are identical, speedup: %.1fx, peak RSS: %.1f MiB less"
+        % (t_string / max(t_stream, 1e-9), (rss_string - rss_stream) / 1024.0)
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+#
+# Project:
+#   glideinWMS
+#
+# Description:
+#   benchmark loading the aggregated Factory status (schedd_status.xml) of a synthetic Factory
+#   with the event driven loader (xmlParse.xmlfile2dict) against the DOM based one (minidom + domel2dict)
+#   Each loader runs in a forked process, the peak RSS increase is measured there
+#
+
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+import xml.dom.minidom
+
+from glideinwms.lib import xmlParse
+from glideinwms.unittests.benchmark_xmlFormat import synthetic_status, write_stream
+
+ALWAYS_SINGULAR_LIST = ["Frontend", "Entry"]
+
+
+def load_dom(fname):
+    doc = xml.dom.minidom.parse(fname)
+    return xmlParse.domel2dict(doc.documentElement, always_singular_list=ALWAYS_SINGULAR_LIST)
+
+
+def load_expat(fname):
+    return xmlParse.xmlfile2dict(fname, always_singular_list=ALWAYS_SINGULAR_LIST)
+
+
+def measure(func, fname, queue):
+    """Run in the forked process: load the file and return the wall time, the peak RSS increase (KiB) and the data"""
+    rss_begin = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t_begin = time.perf_counter()
+    data = func(fname)
+    t_wall = time.perf_counter() - t_begin
+    queue.put((t_wall, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_begin, data))
+
+
+def timeit(func, fname):
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    process = ctx.Process(target=measure, args=(func, fname, queue))
+    process.start()
+    res = queue.get()
+    process.join()
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DOM and event driven xmlParse loaders")
+    parser.add_argument("--entries", type=int, default=5000, help="number of synthetic entries")
+    parser.add_argument("--frontends", type=int, default=5, help="number of Frontends per entry")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fname = os.path.join(tmpdir, "schedd_status.xml")
+        write_stream(fname, synthetic_status(args.entries, args.frontends))
+        print(f"{fname}: {os.path.getsize(fname)} bytes")
+        results = {}
+        for func in (load_dom, load_expat):
+            t_wall, rss, data = timeit(func, fname)
+            results[func.__name__] = t_wall, rss, data
+            print(f"{func.__name__}: {t_wall:.3f}s, peak RSS +{rss / 1024.0:.1f} MiB")
+
+    t_dom, rss_dom, data_dom = results["load_dom"]
+    t_expat, rss_expat, data_expat = results["load_expat"]
+    if data_dom != data_expat:
+        print("ERROR: the dictionaries are different")
+        return 1
+    print(
+        "Dictionaries are identical, speedup: %.1fx, peak RSS: %.1f MiB less"
+        % (t_dom / max(t_expat, 1e-9), (rss_dom - rss_expat) / 1024.0)
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
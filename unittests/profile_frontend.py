@@ -89,15 +89,19 @@ class mock_condorq_el:
         return self.obj
 
 
-def main():
-    # Need to be global for cProfile to work
-    global cexpr, condorq_dict, glidein_dict, attr_dict, condorq_match_list
-    dumpdir = "/tmp/frontend_dump/main/"  # This will profile the main group. Change it to profile another one
-    # The CMS matching expression as of April 17th 2019
-    mexpr = """(((glidein["attrs"].get("GLIDEIN_MaxMemMBs", 0) == 0) or (job.get("RequestMemory", 0)<=glidein["attrs"]["GLIDEIN_MaxMemMBs"])) and ((job.get("REQUIRED_OS", "any")=="any") or (glidein["attrs"].get("GLIDEIN_REQUIRED_OS", "any")=="any") or (job.get("REQUIRED_OS")==glidein["attrs"]["GLIDEIN_REQUIRED_OS"])) and ((job.get("MaxWallTimeMins", 0)*60)>=glidein["attrs"].get("GLIDEIN_Job_Min_Time", 0)) and ((job.get("MaxWallTimeMins", 0)+10)<(glidein["attrs"]["GLIDEIN_Max_Walltime"]-glidein["attrs"]["GLIDEIN_Retire_Time_Spread"])/60))"""
-    logSupport.log = FakeLogger()
+# The CMS matching expression as of April 17th 2019
+CMS_MATCH_EXPR = """(((glidein["attrs"].get("GLIDEIN_MaxMemMBs", 0) == 0) or (job.get("RequestMemory", 0)<=glidein["attrs"]["GLIDEIN_MaxMemMBs"])) and ((job.get("REQUIRED_OS", "any")=="any") or (glidein["attrs"].get("GLIDEIN_REQUIRED_OS", "any")=="any") or (job.get("REQUIRED_OS")==glidein["attrs"]["GLIDEIN_REQUIRED_OS"])) and ((job.get("MaxWallTimeMins", 0)*60)>=glidein["attrs"].get("GLIDEIN_Job_Min_Time", 0)) and ((job.get("MaxWallTimeMins", 0)+10)<(glidein["attrs"]["GLIDEIN_Max_Walltime"]-glidein["attrs"]["GLIDEIN_Retire_Time_Spread"])/60))"""
 
-    # Load the saved dictionaries
+
+def load_dump(dumpdir):
+    """Load the data saved by glideinFrontendLib.dumpMatchData
+
+    Args:
+        dumpdir (str): directory with the pickle files, e.g. /tmp/frontend_dump/main/
+
+    Returns:
+        tuple: condorq_dict, glidein_dict, attr_dict, condorq_match_list
+    """
     with open(os.path.join(dumpdir, "glidein_dict.pickle"), "rb") as fd:
         glidein_dict = pickle.load(fd)
     with open(os.path.join(dumpdir, "attr_dict.pickle"), "rb") as fd:
@@ -105,18 +109,23 @@ def main():
     with open(os.path.join(dumpdir, "condorq_match_list.pickle"), "rb") as fd:
         condorq_match_list = pickle.load(fd)
 
-    cexpr = compile(mexpr, "<string>", "eval")
-
     # The condor_q dictionary names depend on the schedd names, use glob to get them
-    cwd = os.getcwd()
-    os.chdir(dumpdir)
-    qdicts = glob.glob("condorq_dict*.pickle")
-    os.chdir(cwd)
-
     condorq_dict = {}
-    for schedd_name in qdicts:
-        with open(os.path.join(dumpdir, schedd_name), "rb") as fd:
-            condorq_dict[schedd_name] = mock_condorq_el(pickle.load(fd))
+    for qdict_fname in glob.glob(os.path.join(dumpdir, "condorq_dict*.pickle")):
+        with open(qdict_fname, "rb") as fd:
+            condorq_dict[os.path.basename(qdict_fname)] = mock_condorq_el(pickle.load(fd))
+
+    return condorq_dict, glidein_dict, attr_dict, condorq_match_list
+
+
+def main():
+    # Need to be global for cProfile to work
+    global cexpr, condorq_dict, glidein_dict, attr_dict, condorq_match_list
+    dumpdir = "/tmp/frontend_dump/main/"  # This will profile the main group. Change it to profile another one
+    logSupport.log = FakeLogger()
+
+    condorq_dict, glidein_dict, attr_dict, condorq_match_list = load_dump(dumpdir)
+    cexpr = compile(CMS_MATCH_EXPR, "<string>", "eval")
 
     print("Frontend dump loaded")
 
@@ -192,11 +192,18 @@ class TestEntry(unittest.TestCase):
         # self.assertEqual(expected, entry.logLogStats(marker))
         assert False  # TODO: implement your test here
 
-    @unittest.skip("for now")
     def test_queryQueuedGlideins(self):
-        # entry = Entry(name, startup_dir, glidein_descript, frontend_descript)
-        # self.assertEqual(expected, entry.queryQueuedGlideins())
-        assert False  # TODO: implement your test here
+        with mock.patch.object(glideinwms.factory.glideFactoryLib, "getCondorQData") as m_getCondorQData:
+            self.assertEqual(m_getCondorQData.return_value, self.entry.queryQueuedGlideins())
+            m_getCondorQData.assert_called_once()
+            # The snapshot retrieved by the entry group is used instead of querying the schedd
+            snapshot = mock.Mock()
+            self.entry.setQueuedGlideins(snapshot)
+            self.assertIs(snapshot, self.entry.queryQueuedGlideins())
+            m_getCondorQData.assert_called_once()
+            self.entry.setQueuedGlideins(None)
+            self.entry.queryQueuedGlideins()
+            self.assertEqual(2, m_getCondorQData.call_count)
 
     def test_setDowntime(self):
         self.entry.loadDowntimes()
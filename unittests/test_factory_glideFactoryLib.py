@@ -58,6 +58,7 @@ from glideinwms.factory.glideFactoryLib import (
     FactoryConfig,
     getCondorQCredentialList,
     getCondorQData,
+    getCondorQGroupData,
     getCondorStatusData,
     getQCredentials,
     getQProxSecClass,
@@ -67,10 +68,13 @@ from glideinwms.factory.glideFactoryLib import (
     hrs2sec,
     is_str_safe,
     isGlideinUnrecoverable,
+    releaseGlideins,
+    removeGlideins,
     secClass2Name,
     set_condor_integrity_checks,
     which,
 )
+from glideinwms.lib import condorMonitor
 from glideinwms.unittests.unittest_utils import FakeLogger, TestImportError
 
 try:
@@ -179,6 +183,39 @@ class TestFactoryConfig(unittest.TestCase):
         self.assertEqual(cd.client_name, client_name)
         self.assertEqual(cd.entry_name, entry_name)
 
+    def test_get_condor_q_group_data(self):
+        self.cnf.config_whoamI("factory_name", "glidein_name")
+        entry_sa = self.cnf.entry_schedd_attribute
+        jobs = {
+            (1, 0): {entry_sa: "entry1", "JobStatus": 1},
+            (1, 1): {entry_sa: "entry1", "JobStatus": 2},
+            (2, 0): {entry_sa: "entry2", "JobStatus": 1},
+            (3, 0): {entry_sa: "other", "JobStatus": 1},
+        }
+        with mock.patch.object(glideinwms.factory.glideFactoryLib, "condorMonitor", condorMonitor):
+            with mock.patch.object(condorMonitor, "CondorQ") as m_CondorQ:
+                m_CondorQ.return_value.fetchStored.return_value = jobs
+                entries_cq = getCondorQGroupData(["entry1", "entry2", "entry3"], "schedd_name", self.cnf)
+
+        # One query for all the entries
+        m_CondorQ.assert_called_once_with("schedd_name")
+        constraint, format_list = m_CondorQ.return_value.load.call_args[0]
+        self.assertIn('stringListMember(%s, "entry1,entry2,entry3")' % entry_sa, constraint)
+        self.assertIn((entry_sa, "s"), format_list)
+        self.assertEqual(["entry1", "entry2", "entry3"], sorted(entries_cq))
+        self.assertEqual([(1, 0), (1, 1)], sorted(entries_cq["entry1"].fetchStored()))
+        self.assertEqual([(2, 0)], list(entries_cq["entry2"].fetchStored()))
+        self.assertEqual({}, entries_cq["entry3"].fetchStored())
+        for entry_name, cq in entries_cq.items():
+            self.assertEqual("schedd_name", cq.schedd_name)
+            self.assertEqual(self.cnf.factory_name, cq.factory_name)
+            self.assertEqual(self.cnf.glidein_name, cq.glidein_name)
+            self.assertEqual(entry_name, cq.entry_name)
+            self.assertIsNone(cq.client_name)
+        # The views can be reloaded like the CondorQ of a single entry
+        entries_cq["entry1"].load()
+        self.assertEqual([(1, 0), (1, 1)], sorted(entries_cq["entry1"].fetchStored()))
+
     def test_get_q_credentials(self):
         glideinwms.factory.glideFactoryLib.logSupport.log = FakeLogger()
         glideinwms.factory.glideFactoryLib.condorMonitor = mock.Mock()
@@ -616,32 +653,48 @@ class TestSubmitGlideins(unittest.TestCase):
 
 
 class TestRemoveGlideins(unittest.TestCase):
-    @unittest.skip("for now")
+    def setUp(self):
+        self.factoryConfig = FactoryConfig()
+        self.factoryConfig.max_removes = 4
+        self.factoryConfig.remove_sleep = 0
+        self.log = FakeLogger()
+
     def test_remove_glideins(self):
-        # self.assertEqual(
-        #     expected,
-        #     removeGlideins(
-        #         schedd_name,
-        #         jid_list,
-        #         force,
-        #         log,
-        #         factoryConfig))
-        # assert False # TODO: implement your test here
-        assert False
+        jid_list = [(12, i) for i in range(10)]
+        with mock.patch("glideinwms.lib.condorManager.condorRemoveMany") as m_remove:
+            m_remove.side_effect = lambda jids, schedd_name, do_forcex=False: {
+                jid: "not found" if jid[1] == 1 else None for jid in jids
+            }
+            removed = removeGlideins("schedd1", jid_list, log=self.log, factoryConfig=self.factoryConfig)
+        # One condor_rm for the first max_removes jobs, one more to replace the failed one
+        self.assertEqual([(12, 0), (12, 2), (12, 3), (12, 4)], removed)
+        self.assertEqual(2, m_remove.call_count)
+        m_remove.assert_any_call(jid_list[:4], "schedd1")
+        m_remove.assert_any_call(jid_list[4:5], "schedd1")
+
+    def test_remove_glideins_force(self):
+        jid_list = [(12, i) for i in range(3)]
+        with mock.patch("glideinwms.lib.condorManager.condorRemoveMany") as m_remove:
+            m_remove.side_effect = lambda jids, schedd_name, do_forcex=False: dict.fromkeys(jids)
+            removed = removeGlideins("schedd1", jid_list, force=True, log=self.log, factoryConfig=self.factoryConfig)
+        self.assertEqual(jid_list, removed)
+        self.assertEqual(
+            [mock.call(jid_list, "schedd1"), mock.call(jid_list, "schedd1", do_forcex=True)], m_remove.call_args_list
+        )
 
 
 class TestReleaseGlideins(unittest.TestCase):
-    @unittest.skip("for now")
     def test_release_glideins(self):
-        # self.assertEqual(
-        #     expected,
-        #     releaseGlideins(
-        #         schedd_name,
-        #         jid_list,
-        #         log,
-        #         factoryConfig))
-        # # assert False # TODO: implement your test here
-        assert False
+        factoryConfig = FactoryConfig()
+        factoryConfig.max_releases = 4
+        factoryConfig.release_sleep = 0
+        jid_list = [(12, i) for i in range(10)]
+        with mock.patch("glideinwms.lib.condorManager.condorReleaseMany") as m_release:
+            m_release.side_effect = lambda jids, schedd_name: dict.fromkeys(jids)
+            released = releaseGlideins("schedd1", jid_list, log=FakeLogger(), factoryConfig=factoryConfig)
+        # Same limit as the job by job release: max_releases + 1
+        self.assertEqual(jid_list[:5], released)
+        m_release.assert_called_once_with(jid_list[:5], "schedd1")
 
 
 class TestInSubmitEnvironment(unittest.TestCase):
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for the incremental aggregation in glideinwms/factory/glideFactoryMonitorAggregator.py"""
+
+
+import io
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+from unittest import mock
+
+import xmlrunner
+
+from glideinwms.factory import glideFactoryMonitorAggregator, glideFactoryMonitoring
+from glideinwms.factory.glideFactoryMonitorAggregator import IncrementalTotal, MonitorFileCache
+from glideinwms.lib import xmlFormat, xmlParse
+
+STATUS_XML = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<glideFactoryEntryQStats>
+<downtime status="False"/>
+<frontends>
+%(frontends)s</frontends>
+<total>
+   <Status Idle="%(idle)i" Running="%(running)i"/>
+   <Requested Idle="3" MaxGlideins="10"/>
+   <ClientMonitor InfoAge="%(age)i" JobsIdle="4"/>
+</total>
+</glideFactoryEntryQStats>
+"""
+
+FRONTEND_XML = """   <frontend name="%(fe)s">
+      <Downtime status="%(downtime)s"/>
+      <Status Idle="%(idle)i" Running="%(running)i"/>
+      <Requested Idle="3" MaxGlideins="10"><Parameters></Parameters></Requested>
+      <ClientMonitor InfoAge="%(age)i" JobsIdle="4"/>
+   </frontend>
+"""
+
+
+def written_xml(write_xml_file):
+    """Return the XML written by the last call of a mock MonitoringConfig.write_xml_file"""
+    fd = io.StringIO()
+    write_xml_file.call_args[0][1](fd)
+    return fd.getvalue()
+
+
+def write_file(fname, content):
+    # Replace the file like the Factory does
+    with open(fname + ".tmp", "w") as f:
+        f.write(content)
+    os.replace(fname + ".tmp", fname)
+
+
+class TestIncrementalTotal(unittest.TestCase):
+    def test_update(self):
+        totals = IncrementalTotal()
+        contribution_a = {"total": {"Idle": 1, "Running": 2}, "frontends": {"fe1": {"Idle": 1}}}
+        totals.update("a", contribution_a)
+        totals.update("b", {"total": {"Idle": 10}, "frontends": {"fe1": {"Idle": 3}, "fe2": {}}})
+        self.assertEqual({"Idle": 11, "Running": 2}, totals.nested(("total",)))
+        self.assertEqual({"fe1": {"Idle": 4}, "fe2": {}}, totals.nested(("frontends",)))
+        self.assertEqual(2, totals.count(("total",)))
+        self.assertEqual(1, totals.count(("total", "Running")))
+        self.assertEqual(1, totals.count(("frontends", "fe2")))
+
+        # The old contribution is subtracted
+        totals.update("b", {"total": {"Idle": 20}})
+        self.assertEqual({"Idle": 21, "Running": 2}, totals.nested(("total",)))
+        self.assertEqual({"fe1": {"Idle": 1}}, totals.nested(("frontends",)))
+        self.assertEqual(0, totals.count(("frontends", "fe2")))
+
+        # Same object, nothing changes
+        totals.update("a", contribution_a)
+        self.assertEqual({"Idle": 21, "Running": 2}, totals.nested(("total",)))
+
+        totals.retain({"b"})
+        self.assertEqual({"total": {"Idle": 20}}, totals.nested())
+        totals.remove("b")
+        totals.remove("c")
+        self.assertEqual({}, totals.nested())
+        self.assertEqual({}, totals.counts)
+        self.assertEqual({}, totals.sums)
+
+
+class TestMonitorFileCache(unittest.TestCase):
+    def test_load(self):
+        cache = MonitorFileCache()
+        parse = mock.Mock(side_effect=lambda fname: {"parsed": fname})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "a.json")
+            write_file(fname, "1")
+            data = cache.load(fname, parse)
+            self.assertIs(data, cache.load(fname, parse))
+            self.assertEqual(1, parse.call_count)
+            self.assertEqual((1, 1), (cache.parsed, cache.reused))
+            write_file(fname, "2")
+            self.assertIsNot(data, cache.load(fname, parse))
+            self.assertEqual(2, parse.call_count)
+            os.unlink(fname)
+            with self.assertRaises(OSError):
+                cache.load(fname, parse)
+            self.assertEqual({}, cache.files)
+
+
+class TestAggregateStatus(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.entries = ["e1", "e2", "e3"]
+        for entry in self.entries:
+            os.mkdir(os.path.join(self.tmpdir.name, f"entry_{entry}"))
+            self.write_entry(entry, 1)
+        self.patchers = [
+            mock.patch.object(glideFactoryMonitorAggregator, "monitorFileCache", MonitorFileCache()),
+            mock.patch.object(glideFactoryMonitorAggregator, "statusTotals", IncrementalTotal()),
+            mock.patch.object(glideFactoryMonitorAggregator.monitorAggregatorConfig, "monitor_dir", self.tmpdir.name),
+            mock.patch.object(glideFactoryMonitorAggregator.monitorAggregatorConfig, "entries", self.entries),
+            mock.patch.object(glideFactoryMonitorAggregator.glideFactoryMonitoring, "monitoringConfig"),
+            mock.patch.object(glideFactoryMonitorAggregator.logSupport, "log"),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        self.tmpdir.cleanup()
+
+    def write_entry(self, entry, factor, frontends=("fe1", "fe2"), downtime="False"):
+        entry_dir = os.path.join(self.tmpdir.name, f"entry_{entry}")
+        frontends_xml = "".join(
+            FRONTEND_XML % {"fe": fe, "downtime": downtime, "idle": factor, "running": 2 * factor, "age": 10 * factor}
+            for fe in frontends
+        )
+        write_file(
+            os.path.join(entry_dir, "schedd_status.xml"),
+            STATUS_XML % {"frontends": frontends_xml, "idle": factor, "running": 2 * factor, "age": 10 * factor},
+        )
+        write_file(os.path.join(entry_dir, "completed_data.json"), json.dumps({"stats": {"factor": factor}}))
+
+    def aggregate(self):
+        monitoring_config = glideFactoryMonitorAggregator.glideFactoryMonitoring.monitoringConfig
+        status = glideFactoryMonitorAggregator.aggregateStatus(False)
+        xml_data = xmlParse.xmlstring2dict(written_xml(monitoring_config.write_xml_file))
+        completed_data = monitoring_config.write_completed_json.call_args[0][2]
+        return status, xml_data["frontends"], completed_data
+
+    def test_incremental(self):
+        status, frontends, completed_data = self.aggregate()
+        self.assertEqual(
+            {"Status": {"Idle": 3, "Running": 6}, "Requested": {"Idle": 9, "MaxGlideins": 30}},
+            {k: status["total"][k] for k in ("Status", "Requested")},
+        )
+        # InfoAge is averaged
+        self.assertEqual({"InfoAge": 10, "JobsIdle": 12}, status["total"]["ClientMonitor"])
+        self.assertEqual({"Idle": "3", "Running": "6"}, frontends["fe2"]["Status"])
+        self.assertEqual("False", frontends["fe1"]["Downtime"]["status"])
+        self.assertEqual({"e1": {"factor": 1}, "e2": {"factor": 1}, "e3": {"factor": 1}}, completed_data["entries"])
+        self.assertEqual(6, glideFactoryMonitorAggregator.monitorFileCache.parsed)
+
+        # Only the changed entry is parsed again
+        self.write_entry("e2", 4, frontends=("fe1",), downtime="True")
+        status, frontends, completed_data = self.aggregate()
+        self.assertEqual(8, glideFactoryMonitorAggregator.monitorFileCache.parsed)
+        self.assertEqual({"Idle": 6, "Running": 12}, status["total"]["Status"])
+        self.assertEqual({"InfoAge": 20, "JobsIdle": 12}, status["total"]["ClientMonitor"])
+        self.assertEqual({"Idle": "6", "Running": "12"}, frontends["fe1"]["Status"])
+        self.assertEqual({"InfoAge": "20", "JobsIdle": "12"}, frontends["fe1"]["ClientMonitor"])
+        self.assertEqual({"Idle": "2", "Running": "4"}, frontends["fe2"]["Status"])
+        # Logical AND of the entries downtime
+        self.assertEqual("False", frontends["fe1"]["Downtime"]["status"])
+        self.assertEqual({"factor": 4}, completed_data["entries"]["e2"])
+
+        # Entries without files are removed from the totals
+        os.unlink(os.path.join(self.tmpdir.name, "entry_e1", "schedd_status.xml"))
+        status, frontends, completed_data = self.aggregate()
+        self.assertEqual(["e2", "e3"], sorted(status["entries"]))
+        self.assertEqual({"Idle": 5, "Running": 10}, status["total"]["Status"])
+        self.assertEqual({"Idle": "1", "Running": "2"}, frontends["fe2"]["Status"])
+
+        # The incremental totals are the same of a new aggregation
+        incremental = (status, frontends, completed_data)
+        with mock.patch.object(glideFactoryMonitorAggregator, "monitorFileCache", MonitorFileCache()):
+            with mock.patch.object(glideFactoryMonitorAggregator, "statusTotals", IncrementalTotal()):
+                self.assertEqual(incremental, self.aggregate())
+
+    def test_intersection(self):
+        # Attributes not in all the entries are not in the totals
+        entry_dir = os.path.join(self.tmpdir.name, "entry_e3")
+        with open(os.path.join(entry_dir, "schedd_status.xml")) as f:
+            xml_str = f.read()
+        write_file(os.path.join(entry_dir, "schedd_status.xml"), xml_str.replace(' Running="2"', ""))
+        status, frontends, _ = self.aggregate()
+        self.assertEqual({"Idle": 3}, status["total"]["Status"])
+        self.assertEqual({"Idle": "3"}, frontends["fe1"]["Status"])
+        self.assertEqual({"Idle": "9", "MaxGlideins": "30"}, frontends["fe1"]["Requested"])
+
+    def test_snapshot(self):
+        # The snapshot is used instead of the XML file
+        status_fname = os.path.join(self.tmpdir.name, "entry_e3", "schedd_status.xml")
+        entry_data = xmlParse.xmlfile2dict(status_fname)
+        entry_data["total"]["Status"]["Idle"] = "101"
+        write_file(status_fname, open(status_fname).read())
+        with open(xmlParse.snapshot_fname(status_fname), "wb") as f:
+            f.write(xmlParse.snapshot_dumps(entry_data))
+        status, _, _ = self.aggregate()
+        self.assertEqual({"Idle": 103, "Running": 6}, status["total"]["Status"])
+
+
+RRD_STATS_XML = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<glideFactoryEntryRRDStats>
+%(updated)s
+<total>
+%(total)s
+</total>
+<frontends>
+<frontend name="frontend_fe1">
+%(fe1)s
+</frontend></frontends>
+</glideFactoryEntryRRDStats>"""
+
+
+class TestAggregateRRDStats(unittest.TestCase):
+    def test_snapshot(self):
+        monitoring_config = mock.Mock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for entry, factor in (("e1", 1), ("e2", 2)):
+                os.mkdir(os.path.join(tmpdir, f"entry_{entry}"))
+                periods = {7200: {"Idle": 0.5 * factor, "Running": factor}, 86400: {"Idle": factor / 3}}
+                xml_periods = xmlFormat.dict2string(periods, "periods", "period", subtypes_params={"class": {}})
+                write_file(
+                    os.path.join(tmpdir, f"entry_{entry}", "rrd_Status_Attributes.xml"),
+                    RRD_STATS_XML
+                    % {"updated": xmlFormat.time2xml(0, "updated"), "total": xml_periods, "fe1": xml_periods},
+                )
+            with mock.patch.object(glideFactoryMonitorAggregator, "monitorFileCache", MonitorFileCache()):
+                with mock.patch.object(glideFactoryMonitorAggregator.monitorAggregatorConfig, "monitor_dir", tmpdir):
+                    with mock.patch.object(
+                        glideFactoryMonitorAggregator.monitorAggregatorConfig, "entries", ["e1", "e2"]
+                    ):
+                        with mock.patch.object(glideFactoryMonitoring, "monitoringConfig", monitoring_config):
+                            glideFactoryMonitorAggregator.aggregateRRDStats(log=mock.Mock())
+
+        xml_str = monitoring_config.write_file.call_args[0][1]
+        snapshot_args = monitoring_config.write_snapshot.call_args[0]
+        self.assertEqual("rrd_Status_Attributes.xml", snapshot_args[0])
+        self.assertEqual(xmlParse.xmlstring2dict(xml_str, always_singular_list=snapshot_args[2]), snapshot_args[1])
+        self.assertEqual({"Idle": "1.5", "Running": "3"}, snapshot_args[1]["total"]["total"]["periods"]["7200"])
+        self.assertEqual({"Idle": "1", "Running": "2"}, snapshot_args[1]["entries"]["e2"]["total"]["periods"]["7200"])
+        # The snapshot is in the file written by write_snapshot
+        snapshot = pickle.loads(xmlParse.snapshot_dumps(snapshot_args[1], snapshot_args[2]))
+        self.assertEqual(["timezone"], snapshot["always_singular_list"])
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for the monitoring snapshots in glideinwms/factory/glideFactoryMonitoring.py"""
+
+
+import io
+import pickle
+import time
+import unittest
+
+from unittest import mock
+
+import xmlrunner
+
+from glideinwms.factory.glideFactoryMonitoring import condorQStats, MonitoringConfig
+from glideinwms.lib import xmlParse
+
+
+class TestCondorQStatsSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.monitoring_config = MonitoringConfig(log=mock.Mock())
+        self.monitoring_config.rrd_obj = mock.Mock()
+        self.files = {}
+        self.monitoring_config.write_file = lambda fname, content: self.files.__setitem__(fname, content)
+        self.monitoring_config.write_xml_file = self.write_xml_file
+        self.monitoring_config.establish_dir = mock.Mock()
+
+    def write_xml_file(self, fname, write_func):
+        fd = io.StringIO()
+        write_func(fd)
+        self.files[fname] = fd.getvalue()
+
+    def test_write_file(self):
+        qc_stats = condorQStats(log=mock.Mock(), cores=4)
+        qc_stats.set_downtime(False)
+        qc_stats.logRequest("fe1@front.end", {"IdleGlideins": 3, "MaxGlideins": 10})
+        qc_stats.logSchedd("fe1@front.end", {1: 3, 2: 1}, {"entry_a": {1: 3, 2: 1}})
+        qc_stats.logClientMonitor("fe1@front.end", {"Idle": 7, "Running": 2}, {"LastHeardFrom": time.time() - 30})
+        qc_stats.logSchedd("fe2@front.end", {5: 1}, {"entry_a": {5: 1}})
+        qc_stats.write_file(monitoringConfig=self.monitoring_config)
+
+        snapshot = pickle.loads(self.files[xmlParse.snapshot_fname("schedd_status.xml")])
+        self.assertEqual([], snapshot["always_singular_list"])
+        self.assertEqual(xmlParse.xmlstring2dict(self.files["schedd_status.xml"]), snapshot["data"])
+        self.assertEqual("3", snapshot["data"]["frontends"]["fe1@front.end"]["Requested"]["Idle"])
+        self.assertEqual("12", snapshot["data"]["frontends"]["fe1@front.end"]["Requested"]["IdleCores"])
+
+    def test_disabled(self):
+        self.monitoring_config.write_snapshots = False
+        qc_stats = condorQStats(log=mock.Mock())
+        qc_stats.logRequest("fe1@front.end", {"IdleGlideins": 3, "MaxGlideins": 10})
+        qc_stats.write_file(monitoringConfig=self.monitoring_config)
+        self.assertEqual(["schedd_status.xml"], list(self.files))
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
@@ -10,6 +10,7 @@
 
 import dis
 import io
+import pickle
 import re
 import sys
 import unittest
@@ -58,12 +59,42 @@ def compareLambdas(func1, func2):
     return code1 == code2
 
 
+def synthetic_status_dict():
+    """Slots of the "fe.grp" Frontend group, and of other clients, in two collectors"""
+
+    def slot(client, entry, cred, state, activity, **attrs):
+        el = {"GLIDECLIENT_Name": client, "State": state, "Activity": activity, "Cpus": 2, "Memory": 4000}
+        if entry:
+            el.update({"GLIDEIN_Entry_Name": entry, "GLIDEIN_Name": "v3_0", "GLIDEIN_Factory": "factory1"})
+        if cred:
+            el["GLIDEIN_CredentialIdentifier"] = cred
+        el.update(attrs)
+        return el
+
+    slots = [
+        slot("fe.grp", "Site1", "cred1", "Claimed", "Busy", SlotType="Static"),
+        slot("fe.grp", "Site1", "cred2", "Unclaimed", "Idle", SlotType="Static"),
+        slot("fe.grp", "Site1", "cred1", "Drained", "Retiring", SlotType="Static"),
+        slot("fe.grp", "Site1", "cred1", "Claimed", "Busy", SlotType="Dynamic", Cpus=1),
+        slot("fe.grp", "Site1", "cred1", "Unclaimed", "Idle", PartitionableSlot=True, TotalSlots=2, Cpus=3),
+        slot("fe.grp", "Site1", "cred1", "Unclaimed", "Idle", PartitionableSlot=True, TotalSlotCpus=8, Memory=1),
+        slot("fe.grp", "Site2", None, "Claimed", "Retiring", SlotType="Static"),
+        slot("Site2@v3_0@factory1@fe.grp", None, "cred2", "Unclaimed", "Idle", SlotType="Static"),
+        slot("fe.other", "Site1", "cred1", "Claimed", "Busy", SlotType="Static"),
+    ]
+    status = condorMonitor.CondorStatus()
+    status.stored_data = {f"slot{i}@host{i}": el for i, el in enumerate(slots)}
+    status2 = condorMonitor.CondorStatus()
+    status2.stored_data = {"slot1@other": slot("fe.grp", "Site2", "cred1", "Claimed", "Busy", SlotType="Static")}
+    return {"coll1": status, "coll2": status2}
+
+
 class FETestCaseBase(unittest.TestCase):
     def setUp(self):
         glideinwms.frontend.glideinFrontendLib.logSupport.log = FakeLogger()
         # Only condor clients are mocked, not the python bindings
         condorMonitor.USE_HTCONDOR_PYTHON_BINDINGS = False
-        with mock.patch("glideinwms.lib.condorExe.exe_cmd") as m_exe_cmd:
+        with mock.patch("glideinwms.lib.condorExe.exe_cmd_iter") as m_exe_cmd:
             f = open("cs.fixture")
             m_exe_cmd.return_value = f.readlines()
             self.status_dict = glideinFrontendLib.getCondorStatus(["coll1"])
@@ -106,7 +137,7 @@ class FETestCaseBase(unittest.TestCase):
         with mock.patch("glideinwms.lib.condorMonitor.LocalScheddCache.iGetEnv") as m_iGetEnv:  # noqa: F841
             cq = condorMonitor.CondorQ(schedd_name="sched1", pool_name="pool1")
 
-        with mock.patch("glideinwms.lib.condorExe.exe_cmd") as m_exe_cmd:
+        with mock.patch("glideinwms.lib.condorExe.exe_cmd_iter") as m_exe_cmd:
             f = open("cq.fixture")
             m_exe_cmd.return_value = f.readlines()
             cq.load()
@@ -206,6 +237,31 @@ class FETestCaseCount(FETestCaseBase):
             (0, 8, 4, 5),
         )
 
+    def test_countMatchMatrix(self):
+        match_expr = 'not "DESIRED_Sites" in job or glidein["attrs"].get("GLIDEIN_Site") in job["DESIRED_Sites"]'
+        match_obj = compile(match_expr, "<string>", "eval")
+        for ignore_down_entries in (False, True):
+            self.glidein_dict[self.glidein_dict_k1]["attrs"]["GLIDEIN_In_Downtime"] = ignore_down_entries
+            expected = glideinFrontendLib.countMatch(
+                match_obj, self.condorq_dict, self.glidein_dict, {}, ignore_down_entries
+            )
+            actual = glideinFrontendLib.countMatchMatrix(
+                match_obj, self.condorq_dict, self.glidein_dict, {}, ignore_down_entries
+            )
+            self.assertEqual(expected, actual)
+
+    def test_countMatchMatrix_missingKey(self):
+        with mock.patch.object(glideinwms.frontend.glideinFrontendLib.logSupport.log, "debug") as m_debug:
+            match_obj = compile('glidein["attrs"]["FOO"] == 3', "<string>", "eval")
+            match_counts = glideinFrontendLib.countMatchMatrix(
+                match_obj, self.condorq_dict, self.glidein_dict, {}, False
+            )
+            m_debug.assert_called_with(
+                "Failed to evaluate resource match in countMatchMatrix. Possibly match_expr has "
+                "errors and trying to reference job or site attribute(s) ''FOO'' in an inappropriate way."
+            )
+            self.assertEqual(match_counts[0][(None, None, None)], len(self.condorq_dict["sched1"].fetchStored()))
+
     def test_countRealRunning_match(self):
         cq_run_dict = glideinFrontendLib.getRunningCondorQ(self.condorq_dict)
         glideinFrontendLib.appendRealRunning(cq_run_dict, self.status_dict)
@@ -235,6 +291,23 @@ class FETestCaseCount(FETestCaseBase):
         )
         self.assertEqual(expected, actual)
 
+    def test_countRealRunning_same_entry_string(self):
+        # Entries differing only by the collector port share the RunningOn string and are counted the same
+        cq_run_dict = glideinFrontendLib.getRunningCondorQ(self.condorq_dict)
+        glideinFrontendLib.appendRealRunning(cq_run_dict, self.status_dict)
+        glidein_k2_port = ("submit.local:9618", self.glidein_dict_k2[1], self.glidein_dict_k2[2])
+        glidein_dict = dict(self.glidein_dict)
+        glidein_dict[glidein_k2_port] = self.glidein_dict[self.glidein_dict_k2]
+
+        match_obj = compile("True", "<string>", "eval")
+        actual = glideinFrontendLib.countRealRunning(match_obj, cq_run_dict, glidein_dict, {}, ["RemoteHost"])
+        expected = (
+            {self.glidein_dict_k1: 1, self.glidein_dict_k2: 4, self.glidein_dict_k3: 0, glidein_k2_port: 4},
+            {self.glidein_dict_k1: 1, self.glidein_dict_k2: 3, self.glidein_dict_k3: 0, glidein_k2_port: 3},
+        )
+        self.assertEqual(expected, actual)
+        self.assertEqual(list(glidein_dict), list(actual[0]))
+
     def test_countRealRunning_missingKey(self):
         cq_run_dict = glideinFrontendLib.getRunningCondorQ(self.condorq_dict)
         glideinFrontendLib.appendRealRunning(cq_run_dict, self.status_dict)
@@ -261,7 +334,7 @@ class FETestCaseCount(FETestCaseBase):
 
 class FETestCaseCondorStatus(FETestCaseBase):
     def test_getCondorStatus(self):
-        with mock.patch("glideinwms.lib.condorExe.exe_cmd") as m_exe_cmd:
+        with mock.patch("glideinwms.lib.condorExe.exe_cmd_iter") as m_exe_cmd:
             f = open("cs.fixture")
             m_exe_cmd.return_value = f.readlines()
             condorStatus = glideinFrontendLib.getCondorStatus(
@@ -318,6 +391,112 @@ class FETestCaseCondorStatus(FETestCaseBase):
     def test_countCondorStatus(self):
         self.assertEqual(glideinFrontendLib.countCondorStatus(self.status_dict), 6)
 
+    def test_SlotStatusIndex(self):
+        status_dict = synthetic_status_dict()
+        for min_memory in (2500, 8000):
+            self.check_SlotStatusIndex(status_dict, min_memory)
+        index = glideinFrontendLib.SlotStatusIndex(status_dict, "fe", "grp", 8000)
+        # IdleCores uses the default min memory, as getIdleCoresCondorStatus
+        self.assertEqual(
+            {"Total": 6, "Idle": 1, "Running": 2, "Failed": 1, "TotalCores": 14, "IdleCores": 5, "RunningCores": 3},
+            index.getCounts("Site1@v3_0@factory1"),
+        )
+        index = glideinFrontendLib.SlotStatusIndex(status_dict, "fe", "grp", 2500)
+        self.assertEqual(
+            {"Total": 6, "Idle": 2, "Running": 2, "Failed": 1, "TotalCores": 14, "IdleCores": 5, "RunningCores": 3},
+            index.getCounts("Site1@v3_0@factory1"),
+        )
+
+    def check_SlotStatusIndex(self, status_dict, min_memory):
+        index = glideinFrontendLib.SlotStatusIndex(status_dict, "fe", "grp", min_memory)
+        for request_name in ("Site1@v3_0@factory1", "Site2@v3_0@factory1", "Site3@v3_0@factory1"):
+            # Same counts as the original per request scans
+            total_req_dict = glideinFrontendLib.getClientCondorStatus(status_dict, "fe", "grp", request_name)
+            req_dict_types = {
+                "Total": total_req_dict,
+                "Idle": glideinFrontendLib.getIdleCondorStatus(total_req_dict, min_memory),
+                "Running": glideinFrontendLib.getRunningCondorStatus(total_req_dict),
+                "Failed": glideinFrontendLib.getFailedCondorStatus(total_req_dict),
+                "TotalCores": glideinFrontendLib.getCondorStatusNonDynamic(total_req_dict),
+                "IdleCores": glideinFrontendLib.getIdleCoresCondorStatus(total_req_dict),
+                "RunningCores": glideinFrontendLib.getRunningCoresCondorStatus(total_req_dict),
+            }
+
+            def count(st, req_dict):
+                if st in ("TotalCores", "IdleCores", "RunningCores"):
+                    return glideinFrontendLib.countCoresCondorStatus(req_dict, st)
+                elif st == "Running":
+                    return glideinFrontendLib.countRunningCondorStatus(req_dict)
+                return glideinFrontendLib.countCondorStatus(req_dict)
+
+            expected = {st: count(st, req_dict) for st, req_dict in req_dict_types.items()}
+            self.assertEqual(expected, index.getCounts(request_name))
+            for cred_id in ("cred1", "cred2", "cred3"):
+                expected = {
+                    st: count(st, getClientCondorStatusCredIdOnly(req_dict, cred_id))
+                    for st, req_dict in req_dict_types.items()
+                }
+                self.assertEqual(expected, index.getCredCounts(request_name, cred_id))
+
+    def test_getGroupCondorStatus(self):
+        status_dict = synthetic_status_dict()
+        group_status = glideinFrontendLib.getGroupCondorStatus(status_dict, "fe", "grp")
+        self.assertEqual(["coll1", "coll2"], sorted(group_status))
+        self.assertEqual(
+            sorted([f"slot{i}@host{i}" for i in range(7)] + ["slot1@other"]),
+            sorted(k for c in group_status for k in group_status[c].fetchStored()),
+        )
+        # Copies of the original queries, picklable to be returned by the forked processes
+        self.assertIsInstance(group_status["coll1"], condorMonitor.CondorStatus)
+        self.assertEqual(9, len(status_dict["coll1"].fetchStored()))
+        pickle.dumps(group_status)
+
+    def test_QueryClassifier_status(self):
+        for status_dict in (synthetic_status_dict(), self.status_dict):
+            classifier = glideinFrontendLib.QueryClassifier(
+                status_dict,
+                lambda el: glideinFrontendLib.getCondorStatusSlotMask(el, 2500),
+                glideinFrontendLib.getCondorStatusSlotCores,
+                3,
+            )
+            for bits, expected in (
+                (
+                    glideinFrontendLib.CONDORSTATUS_NON_DYNAMIC,
+                    glideinFrontendLib.getCondorStatusNonDynamic(status_dict),
+                ),
+                (glideinFrontendLib.CONDORSTATUS_IDLE, glideinFrontendLib.getIdleCondorStatus(status_dict, 2500)),
+                (
+                    glideinFrontendLib.CONDORSTATUS_RUNNING | glideinFrontendLib.CONDORSTATUS_RUNNING_PSLOT,
+                    glideinFrontendLib.getRunningCondorStatus(status_dict),
+                ),
+                (glideinFrontendLib.CONDORSTATUS_RUNNING, glideinFrontendLib.getRunningJobsCondorStatus(status_dict)),
+                (
+                    glideinFrontendLib.CONDORSTATUS_RUNNING_PSLOT,
+                    glideinFrontendLib.getRunningPSlotCondorStatus(status_dict),
+                ),
+                (glideinFrontendLib.CONDORSTATUS_FAILED, glideinFrontendLib.getFailedCondorStatus(status_dict)),
+            ):
+                view = classifier.getQueryDict(bits)
+                self.assertEqual(expected.keys(), view.keys())
+                for coll in expected:
+                    self.assertEqual(expected[coll].fetchStored(), view[coll].fetchStored())
+                self.assertEqual(glideinFrontendLib.countCondorStatus(expected), classifier.count(bits))
+            self.assertEqual(glideinFrontendLib.countCondorStatus(status_dict), classifier.count())
+            self.assertEqual(
+                [
+                    glideinFrontendLib.countTotalCoresCondorStatus(
+                        glideinFrontendLib.getCondorStatusNonDynamic(status_dict)
+                    ),
+                    glideinFrontendLib.countIdleCoresCondorStatus(
+                        glideinFrontendLib.getIdleCondorStatus(status_dict, 2500)
+                    ),
+                    glideinFrontendLib.countRunningCoresCondorStatus(
+                        glideinFrontendLib.getRunningCondorStatus(status_dict)
+                    ),
+                ],
+                classifier.sum(),
+            )
+
     def test_getFactoryEntryList(self):
         entries = glideinFrontendLib.getFactoryEntryList(self.status_dict)
         expected = [("Site_Name%s@v3_0@factory1" % (x), "frontend%s.local" % x) for x in range(1, 5)]
@@ -325,7 +504,7 @@ class FETestCaseCondorStatus(FETestCaseBase):
         self.assertCountEqual(entries, expected)
 
     def test_getCondorStatusSchedds(self):
-        with mock.patch("glideinwms.lib.condorExe.exe_cmd") as m_exe_cmd:
+        with mock.patch("glideinwms.lib.condorExe.exe_cmd_iter") as m_exe_cmd:
             f = open("cs.schedd.fixture")
             m_exe_cmd.return_value = f.readlines()
             condorStatus = glideinFrontendLib.getCondorStatusSchedds(["coll1"])
@@ -426,6 +605,20 @@ class FETestCaseMisc(FETestCaseBase):
 
         self.assertCountEqual(expected, glideinFrontendLib.uniqueSets(input))
 
+    def test_uniqueSetsBySignature(self):
+        input = [set(range(1, 11)), set(range(1, 11)), set(range(1, 36)), set(range(11, 31)), set()]
+        expected = [
+            ({0, 1, 2}, set(range(1, 11))),
+            ({2}, set(range(31, 36))),
+            ({2, 3}, set(range(11, 31))),
+        ]
+        outvals, all_values = glideinFrontendLib.uniqueSetsBySignature(input)
+        self.assertEqual(set(range(1, 36)), all_values)
+        self.assertCountEqual(expected, outvals)
+        # Same partition as uniqueSets
+        self.assertCountEqual(glideinFrontendLib.uniqueSets(input)[0], outvals)
+        self.assertEqual(([], set()), glideinFrontendLib.uniqueSetsBySignature([]))
+
     def test_hashJob(self):
         in1 = {1: "a", 2: "b", 3: "c"}
         in2 = [1, 3]
@@ -440,6 +633,23 @@ class FETestCaseMisc(FETestCaseBase):
 
         self.assertCountEqual([x["RunningOn"] for x in list(cq_run_dict["sched1"].fetchStored().values())], expected)
 
+    def test_getRunningOnIndex(self):
+        index = glideinFrontendLib.getRunningOnIndex(self.status_dict)
+        self.assertEqual(len(self.status_dict["coll1"].fetchStored()), len(index))
+        self.assertIn("Site_Name1@v3_0@factory1@submit.local", index.values())
+        self.assertIn("Site_Name2@v3_0@factory1@submit.local", index.values())
+
+        # The first collector with the slot is used, slots without the Glidein attributes are not indexed
+        slot_name, slot = list(self.status_dict["coll1"].fetchStored().items())[0]
+        coll0 = mock.Mock()
+        coll0.fetchStored.return_value = {
+            slot_name: dict(slot, GLIDEIN_Entry_Name="Entry0"),
+            "slot1@glidein_1@host": {"GLIDEIN_Entry_Name": "Entry0"},
+        }
+        index = glideinFrontendLib.getRunningOnIndex({"coll0": coll0, "coll1": self.status_dict["coll1"]})
+        self.assertEqual("Entry0@v3_0@factory1@submit.local", index[slot_name])
+        self.assertNotIn("slot1@glidein_1@host", index)
+
     def test_getGlideinCpusNum(self):
         self.assertEqual(glideinFrontendLib.getGlideinCpusNum(self.glidein_dict[self.glidein_dict_k1]), 1)
         self.assertEqual(glideinFrontendLib.getGlideinCpusNum(self.glidein_dict[self.glidein_dict_k2]), 4)
@@ -479,18 +689,62 @@ class FETestCaseCondorQ(FETestCaseBase):
         schedd_names = ["test_sched1", "test_sched2"]
 
         glideinFrontendLib.getCondorQ(schedd_names, job_status_filter=None)
-        m_getCondorQConstrained.assert_called_with(schedd_names, "True", None, None)
+        m_getCondorQConstrained.assert_called_with(schedd_names, "True", None, None, None)
 
         glideinFrontendLib.getCondorQ(schedd_names)
-        m_getCondorQConstrained.assert_called_with(schedd_names, "(JobStatus=?=1)||(JobStatus=?=2)", None, None)
+        m_getCondorQConstrained.assert_called_with(schedd_names, "(JobStatus=?=1)||(JobStatus=?=2)", None, None, None)
 
         glideinFrontendLib.getCondorQ(schedd_names, job_status_filter=[5])
-        m_getCondorQConstrained.assert_called_with(schedd_names, "(JobStatus=?=5)", None, None)
+        m_getCondorQConstrained.assert_called_with(schedd_names, "(JobStatus=?=5)", None, None, None)
 
         constraint = "(JobStatus=?=1)||(JobStatus=?=2)"
         format_list = list((("x509UserProxyFirstFQAN", "s"),))
         glideinFrontendLib.getCondorQ(schedd_names, "True", format_list)
-        m_getCondorQConstrained.assert_called_with(schedd_names, constraint, "True", format_list + self.default_format)
+        m_getCondorQConstrained.assert_called_with(
+            schedd_names, constraint, "True", format_list + self.default_format, None
+        )
+
+        glideinFrontendLib.getCondorQ(schedd_names, use_bindings=False)
+        m_getCondorQConstrained.assert_called_with(schedd_names, constraint, None, None, False)
+
+    def test_QueryClassifier_condorq(self):
+        jobs = {
+            (1, 0): {"JobStatus": 1, "ServerTime": 5000, "EnteredCurrentStatus": 4900},
+            (1, 1): {"JobStatus": 1, "ServerTime": 5000, "EnteredCurrentStatus": 4000},
+            (1, 2): {
+                "JobStatus": 1,
+                "ServerTime": 5000,
+                "EnteredCurrentStatus": 1000,
+                "x509UserProxyFirstFQAN": "/cms",
+            },
+            (1, 3): {"JobStatus": 1, "x509UserProxyFirstFQAN": "/cms"},
+            (2, 0): {"JobStatus": 2, "ServerTime": 5000, "EnteredCurrentStatus": 1000},
+            (3, 0): {"JobStatus": 5},
+            (3, 1): {},
+        }
+        with mock.patch("glideinwms.lib.condorMonitor.LocalScheddCache.iGetEnv"):
+            cq = condorMonitor.CondorQ(schedd_name="sched2")
+        cq.stored_data = jobs
+        condorq_dict = {"sched1": self.condorq_dict["sched1"], "sched2": cq}
+        classifier = glideinFrontendLib.QueryClassifier(condorq_dict, glideinFrontendLib.getCondorQJobMask)
+        idle = glideinFrontendLib.getIdleCondorQ(condorq_dict)
+        for bits, expected in (
+            (glideinFrontendLib.CONDORQ_IDLE, idle),
+            (glideinFrontendLib.CONDORQ_OLD_IDLE_600, glideinFrontendLib.getOldCondorQ(idle, 600)),
+            (glideinFrontendLib.CONDORQ_OLD_IDLE_3600, glideinFrontendLib.getOldCondorQ(idle, 3600)),
+            (glideinFrontendLib.CONDORQ_VOMS_IDLE, glideinFrontendLib.getIdleVomsCondorQ(idle)),
+            (glideinFrontendLib.CONDORQ_RUNNING, glideinFrontendLib.getRunningCondorQ(condorq_dict)),
+        ):
+            view = classifier.getQueryDict(bits)
+            for schedd in condorq_dict:
+                self.assertEqual(expected[schedd].fetchStored(), view[schedd].fetchStored())
+            self.assertEqual(glideinFrontendLib.countCondorQ(expected), classifier.count(bits))
+        self.assertEqual(
+            [(1, 0), (1, 1), (1, 2), (1, 3)],
+            sorted(classifier.getQueryDict(glideinFrontendLib.CONDORQ_IDLE)["sched2"].fetchStored()),
+        )
+        self.assertEqual(2, classifier.count(glideinFrontendLib.CONDORQ_OLD_IDLE_600, ["sched2"]))
+        self.assertEqual(self.total_jobs + len(jobs), classifier.count())
 
     @mock.patch.object(glideinFrontendLib.condorMonitor, "SubQuery")
     def test_oldCondorQ(self, m_SubQuery):
@@ -542,7 +796,7 @@ class FETestCaseCondorQ(FETestCaseBase):
         self.assertCountEqual(users, ["user1@fnal.gov", "user2@fnal.gov"])
 
     @mock.patch("glideinwms.lib.condorMonitor.LocalScheddCache.iGetEnv")
-    @mock.patch("glideinwms.lib.condorExe.exe_cmd")
+    @mock.patch("glideinwms.lib.condorExe.exe_cmd_iter")
     def test_getCondorQ(self, m_exe_cmd, m_iGetEnv):
         f = open("cq.fixture")
         m_exe_cmd.return_value = f.readlines()
@@ -7,6 +7,7 @@
 
 
 import os
+import tempfile
 import unittest
 
 from unittest import mock
@@ -18,6 +19,7 @@ import glideinwms.lib.condorExe
 import glideinwms.lib.condorMonitor as condorMonitor
 
 from glideinwms.frontend import glideinFrontendInterface, glideinFrontendMonitoring
+from glideinwms.lib.disk_cache import CachedError, DiskCache
 from glideinwms.lib.fork import ForkManager
 from glideinwms.lib.util import safe_boolcomp
 from glideinwms.unittests.unittest_utils import FakeLogger, TestImportError
@@ -218,13 +220,102 @@ class FEElementTestCase(unittest.TestCase):
 
     def test_get_condor_q(self):
         with mock.patch("glideinwms.lib.condorMonitor.LocalScheddCache.iGetEnv"):
-            with mock.patch("glideinwms.lib.condorExe.exe_cmd") as m_exe_cmd:
+            with mock.patch("glideinwms.lib.condorExe.exe_cmd_iter") as m_exe_cmd:
                 f = open("cq.fixture")
                 m_exe_cmd.return_value = f.readlines()
                 cq = self.gfe.get_condor_q("schedd1")
 
         self.assertCountEqual(list(cq["schedd1"].fetchStored().keys()), [(12345, x) for x in range(0, 13)])
 
+    def test_shared_query(self):
+        query_func = mock.Mock(return_value={"schedd1": "jobs"})
+        # No cache: the query runs every time
+        self.assertIsNone(self.gfe.query_cache)
+        self.gfe.shared_query(("key",), query_func, "arg", kw="kw")
+        self.gfe.shared_query(("key",), query_func, "arg", kw="kw")
+        self.assertEqual(2, query_func.call_count)
+        query_func.assert_called_with("arg", kw="kw")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            query_func.reset_mock()
+            self.gfe.query_cache = DiskCache(cache_dir, 60)
+            self.assertEqual({"schedd1": "jobs"}, self.gfe.shared_query(("key",), query_func, "arg"))
+            # Another group (new cache object on the same directory) uses the saved result
+            self.gfe.query_cache = DiskCache(cache_dir, 60)
+            self.assertEqual({"schedd1": "jobs"}, self.gfe.shared_query(("key",), query_func, "arg"))
+            self.assertEqual(1, query_func.call_count)
+            self.gfe.shared_query(("other key",), query_func, "arg")
+            self.assertEqual(2, query_func.call_count)
+
+            # Query errors are not retried, and are shared with the other groups
+            query_func.side_effect = RuntimeError("query failed")
+            with self.assertRaises(RuntimeError):
+                self.gfe.shared_query(("failing key",), query_func)
+            self.assertEqual(3, query_func.call_count)
+            self.gfe.query_cache = DiskCache(cache_dir, 60)
+            with self.assertRaises(CachedError):
+                self.gfe.shared_query(("failing key",), query_func)
+            self.assertEqual(3, query_func.call_count)
+
+        # Cache errors (the directory is gone) fall back to the direct query
+        query_func.side_effect = None
+        self.assertEqual({"schedd1": "jobs"}, self.gfe.shared_query(("new key",), query_func))
+        self.assertEqual(4, query_func.call_count)
+
+    def test_get_condor_status_group_fallback(self):
+        group_constraint = f'(GLIDECLIENT_Name=?="{self.gfe.frontend_name}.{self.gfe.group_name}")'
+        group_status = {None: mock.Mock(fetchStored=mock.Mock(return_value={"slot1@host1": {}}))}
+
+        def get_condor_status(collector_names, constraint=None, **kwargs):
+            if constraint == group_constraint:
+                return group_status
+            raise RuntimeError("Frontend slots query failed")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.gfe.query_cache = DiskCache(cache_dir, 60)
+            with mock.patch.object(
+                glideinFrontendElement.glideinFrontendLib, "getCondorStatus", side_effect=get_condor_status
+            ), mock.patch.object(self.gfe, "get_condor_status_schedds", return_value={}):
+                status_dict, fe_counts, global_counts, _ = self.gfe.get_condor_status()
+        # The Frontend-wide query failed: the group slots are queried directly and the counts default
+        self.assertIs(group_status, status_dict)
+        self.assertEqual({"Idle": 0, "Total": 0}, fe_counts)
+        self.assertEqual({"Idle": 0, "Total": 0}, global_counts)
+
+    def test_schedd_query_status(self):
+        self.gfe.history_obj.data = {}
+        self.gfe.schedd_query_timeout = 100
+        with mock.patch.object(self.gfe, "getScheddList", return_value=["s1", "s2", "s3"]):
+            self.assertEqual(["s1", "s2", "s3"], self.gfe.get_schedd_query_order())
+            schedd_keys = {("schedd", 1): "s1", ("schedd", 2): "s2", ("schedd", 3): "s3"}
+            fork_stats = {
+                ("schedd", 1): {"wall_time": 10},
+                ("schedd", 2): {"wall_time": 100, "timed_out": True},
+                ("schedd", 3): {"wall_time": 1},
+            }
+            self.gfe.update_schedd_query_status(schedd_keys, fork_stats, [("schedd", 2), ("schedd", 3)])
+            self.assertEqual(
+                {
+                    "s1": {"status": "ok", "time": 10},
+                    "s2": {"status": "timeout", "time": 100},
+                    "s3": {"status": "failed", "time": 1},
+                },
+                self.gfe.schedd_query_status,
+            )
+            # The failed query is not used for the average query time
+            self.assertEqual({"s1": 10, "s2": 100}, self.gfe.history_obj["schedd_latency"])
+            self.assertEqual(["s2", "s1", "s3"], self.gfe.get_schedd_query_order())
+            self.assertEqual(200, self.gfe.get_schedd_query_timeout("s2"))
+            self.assertEqual(100, self.gfe.get_schedd_query_timeout("s3"))
+
+            # Moving average, capped timeout and schedds removed from the configuration
+            fork_stats = {("schedd", 1): {"wall_time": 1000}}
+            self.gfe.update_schedd_query_status({("schedd", 1): "s1"}, fork_stats, [])
+            self.assertEqual({"s1": 307}, self.gfe.history_obj["schedd_latency"])
+            self.assertEqual(400, self.gfe.get_schedd_query_timeout("s1"))
+            self.gfe.schedd_query_timeout = 0
+            self.assertIsNone(self.gfe.get_schedd_query_timeout("s1"))
+
     def test_compute_glidein_max_run(self):
         self.assertEqual(self.gfe.compute_glidein_max_run({"Idle": 412}, 971, 0), 1591)
         self.assertEqual(self.gfe.compute_glidein_max_run({"Idle": 100}, 100, 0), 230)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for the advertisement of the requests in glideinwms/frontend/glideinFrontendInterface.py"""
+
+
+import os
+import tempfile
+import time
+import unittest
+
+from unittest import mock
+
+import xmlrunner
+
+from glideinwms.frontend import glideinFrontendInterface
+from glideinwms.frontend.glideinFrontendInterface import frontendConfig, MultiAdvertizeWork
+from glideinwms.lib import condorExe
+from glideinwms.unittests.unittest_utils import FakeLogger
+
+
+class TestDoAdvertizeBatchOne(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.files = []
+        for i in range(3):
+            fname = os.path.join(self.tmpdir.name, f"gfi_ad_{i}")
+            with open(fname, "w") as fd:
+                fd.write('MyType = "glideclient"\n')
+            self.files.append(fname)
+        self.advertizer = MultiAdvertizeWork(mock.Mock())
+        self.saved_timeout = frontendConfig.advertise_timeout
+        self.timeouts = []
+        patcher = mock.patch.object(glideinFrontendInterface.logSupport, "log", FakeLogger())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        frontendConfig.advertise_timeout = self.saved_timeout
+        self.tmpdir.cleanup()
+
+    def advertise(self, fname, command, pool, is_multi=False, timeout=None):
+        self.timeouts.append(timeout)
+        if fname.endswith("_0") and pool == "slow.pool":
+            time.sleep(0.3)
+            raise condorExe.ExeError("Timeout running condor_advertise")
+        if pool == "bad.pool":
+            raise condorExe.ExeError("Failed condor command")
+
+    def test_no_timeout(self):
+        frontendConfig.advertise_timeout = 0
+        with mock.patch.object(glideinFrontendInterface, "exe_condor_advertise", side_effect=self.advertise):
+            stats = self.advertizer.do_advertize_batch_one("fact.pool", self.files)
+        self.assertEqual({"files": 3, "failed": 0, "timed_out": False}, {k: stats[k] for k in stats if k != "latency"})
+        self.assertGreaterEqual(stats["latency"], 0)
+        self.assertEqual([None] * 3, self.timeouts)
+        self.assertEqual([], os.listdir(self.tmpdir.name))
+
+    def test_failures(self):
+        frontendConfig.advertise_timeout = 60
+        with mock.patch.object(glideinFrontendInterface, "exe_condor_advertise", side_effect=self.advertise):
+            stats = self.advertizer.do_advertize_batch_one("bad.pool", self.files, remove_files=False)
+        self.assertEqual(3, stats["failed"])
+        self.assertFalse(stats["timed_out"])
+        # The files share the pool timeout
+        self.assertTrue(all(0 < i <= 60 for i in self.timeouts))
+        self.assertEqual(3, len(os.listdir(self.tmpdir.name)))
+
+    def test_timeout(self):
+        frontendConfig.advertise_timeout = 0.2
+        with mock.patch.object(glideinFrontendInterface, "exe_condor_advertise", side_effect=self.advertise):
+            stats = self.advertizer.do_advertize_batch_one("slow.pool", self.files)
+        # The files left after the timeout are not advertised, and removed
+        self.assertEqual(1, len(self.timeouts))
+        self.assertEqual(3, stats["failed"])
+        self.assertTrue(stats["timed_out"])
+        self.assertGreaterEqual(stats["latency"], 0.3)
+        self.assertEqual([], os.listdir(self.tmpdir.name))
+
+        stats = self.advertizer.do_advertize_batch({"fact.pool": [], "bad.pool": []})
+        self.assertEqual({"fact.pool", "bad.pool"}, set(stats))
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
@@ -11,6 +11,8 @@ import os
 import time
 import unittest
 
+from unittest import mock
+
 import xmlrunner
 
 from glideinwms.factory import glideFactoryDowntimeLib
@@ -149,6 +151,32 @@ class TestDowntimes(unittest.TestCase):
             )
         )
 
+    def test_index_reload(self):
+        now = int(time.time())
+        self.downtime.add_period(now - 60, now + 3600, entry="EntryA", comment="first")
+        self.downtime.add_period(now - 120, None, entry="All", frontend="FE", comment="second")
+        self.assertTrue(self.downtime.check_downtime(entry="EntryA"))
+        # The first active period in the file gives the comment
+        self.assertEqual("first", self.downtime.downtime_comment)
+        self.assertTrue(self.downtime.check_downtime(entry="EntryB", frontend="FE"))
+        self.assertEqual("second", self.downtime.downtime_comment)
+        self.assertFalse(self.downtime.check_downtime(entry="factory", frontend="FE"))
+
+        # The file is not parsed again if it did not change
+        with mock.patch.object(glideFactoryDowntimeLib, "_read") as m_read:
+            self.assertTrue(self.downtime.check_downtime(entry="EntryA", check_time=now + 60))
+            self.assertFalse(self.downtime.check_downtime(entry="EntryA", check_time=now + 7200))
+            m_read.assert_not_called()
+
+        # Changes by other processes are detected by inode, modification time, or size
+        with open(self.file_loc, "w") as fd:
+            fd.write("# empty\n")
+        self.assertFalse(self.downtime.check_downtime(entry="EntryA"))
+        os.remove(self.file_loc)
+        self.assertFalse(self.downtime.check_downtime(entry="EntryA"))
+        self.downtime.start_downtime(entry="EntryA")
+        self.assertTrue(self.downtime.check_downtime(entry="EntryA"))
+
 
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
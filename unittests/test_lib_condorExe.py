@@ -13,7 +13,7 @@ import unittest
 import xmlrunner
 
 from glideinwms.lib import condorExe
-from glideinwms.lib.condorExe import exe_cmd, exe_cmd_sbin, ExeError, iexe_cmd
+from glideinwms.lib.condorExe import exe_cmd, exe_cmd_iter, exe_cmd_sbin, ExeError, iexe_cmd
 
 
 class TestCondorExe(unittest.TestCase):
@@ -95,6 +95,23 @@ class TestCondorExe(unittest.TestCase):
         for script in self.abnormal_exit_scripts:
             self.assertRaises(ExeError, exe_cmd_sbin, script, self.dummy_args)
 
+    def test_exe_cmd_iter(self):
+        """
+        exe_cmd_iter yields the same output of exe_cmd, in chunks.
+        Errors are raised at the end of the iteration.
+        """
+        for script in self.normal_exit_scripts:
+            chunks = list(exe_cmd_iter(script, self.dummy_args, chunk_size=4096))
+            self.assertTrue(len(chunks) > 1)
+            self.assertEqual(exe_cmd(script, self.dummy_args), b"".join(chunks).decode().splitlines())
+
+        for script in self.abnormal_exit_scripts:
+            self.assertRaises(ExeError, list, exe_cmd_iter(script, self.dummy_args))
+
+        # Nothing is executed until the iteration starts
+        exe_cmd_iter("not_existing_command", self.dummy_args)
+        self.assertRaises(ExeError, list, exe_cmd_iter("not_existing_command", self.dummy_args))
+
 
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
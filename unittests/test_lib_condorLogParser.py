@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for glideinwms/lib/condorLogParser.py"""
+
+
+import os
+import tempfile
+import unittest
+
+import xmlrunner
+
+from glideinwms.lib import condorLogParser
+from glideinwms.lib.condorLogParser import (
+    logCounts,
+    logSummaryTimings,
+    parseSubmitLogFastRaw,
+    parseSubmitLogFastRawIncremental,
+    parseSubmitLogFastRawTimings,
+    parseSubmitLogFastRawTimingsIncremental,
+)
+
+
+def log_event(status, cluster, proc, minute):
+    """Return a HTCondor submit log event"""
+    return (
+        f"{status:03d} ({cluster:03d}.{proc:03d}.000) 09/28 01:{minute:02d}:53 Event text\n"
+        "\tsome detail line\n"
+        "...\n"
+    ).encode()
+
+
+def log_events(nr_jobs=20):
+    """Return the events of some jobs: submit, execute, disconnect/reconnect, terminate or hold"""
+    events = []
+    for proc in range(nr_jobs):
+        events.append(log_event(0, 12, proc, proc % 60))
+    for proc in range(nr_jobs):
+        events.append(log_event(1, 12, proc, proc % 60))
+        if proc % 4 == 0:
+            events.append(log_event(22, 12, proc, proc % 60))
+            events.append(log_event(23, 12, proc, proc % 60))
+        events.append(log_event(5 if proc % 3 else 12, 12, proc, (proc + 1) % 60))
+    return events
+
+
+class TestIncrementalParse(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logname = os.path.join(self.tmpdir.name, "condor_activity_test.log")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, data, mode="ab"):
+        with open(self.logname, mode) as f:
+            f.write(data)
+
+    def check_resume(self, parse_function, incremental_function):
+        data = b"".join(log_events())
+        self.write(b"", "wb")
+        state = None
+        # Append in pieces also splitting the events
+        for i in range(0, len(data), 97):
+            self.write(data[i : i + 97])
+            result, state = incremental_function(self.logname, state)
+            self.assertEqual(parse_function(self.logname), result)
+            self.assertTrue(state["offset"] <= i + 97)
+        self.assertEqual(len(data), state["offset"])
+        return state
+
+    def test_resume(self):
+        self.check_resume(parseSubmitLogFastRaw, parseSubmitLogFastRawIncremental)
+
+    def test_resume_timings(self):
+        self.check_resume(parseSubmitLogFastRawTimings, parseSubmitLogFastRawTimingsIncremental)
+
+    def test_only_tail_parsed(self):
+        events = log_events()
+        self.write(b"".join(events[:10]), "wb")
+        jobs, state = parseSubmitLogFastRawIncremental(self.logname)
+        self.assertEqual(10, len(jobs))
+        # A corrupted job ID in the parsed part is not seen again: the old events are not parsed
+        with open(self.logname, "r+b") as f:
+            f.seek(len(b"".join(events[:9])) + 5)
+            f.write(b"999")
+        self.write(b"".join(events[10:]))
+        jobs, state = parseSubmitLogFastRawIncremental(self.logname, state)
+        self.assertNotIn(b"999.009", jobs)
+
+    def test_truncation(self):
+        events = log_events()
+        self.write(b"".join(events), "wb")
+        jobs, state = parseSubmitLogFastRawIncremental(self.logname)
+        self.assertEqual(20, len(jobs))
+        # Truncated in place, same inode
+        self.write(log_event(0, 13, 0, 0), "wb")
+        jobs, state = parseSubmitLogFastRawIncremental(self.logname, state)
+        self.assertEqual({b"013.000": b"000"}, jobs)
+
+    def test_rotation(self):
+        self.write(b"".join(log_events()), "wb")
+        jobs, state = parseSubmitLogFastRawTimingsIncremental(self.logname)
+        # Replaced by a new file longer than the old one, with different content
+        new_logname = self.logname + ".new"
+        with open(new_logname, "wb") as f:
+            f.write(b"".join(log_events(30)).replace(b"(012.", b"(014."))
+        os.replace(new_logname, self.logname)
+        result, state = parseSubmitLogFastRawTimingsIncremental(self.logname, state)
+        self.assertEqual(parseSubmitLogFastRawTimings(self.logname), result)
+        self.assertEqual(30, len(result[0]))
+
+    def test_empty(self):
+        self.write(b"", "wb")
+        self.assertEqual(({}, None, None), parseSubmitLogFastRawTimingsIncremental(self.logname)[0])
+        self.assertEqual({}, parseSubmitLogFastRawIncremental(self.logname)[0])
+
+
+class TestCachedLogIncremental(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logname = os.path.join(self.tmpdir.name, "condor_activity_test.log")
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+        os.mkdir(self.cache_dir)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def append_and_load(self, log_class, data, mtime):
+        with open(self.logname, "ab") as f:
+            f.write(data)
+        # The log must look newer than the cache
+        os.utime(self.logname, (mtime, mtime))
+        obj = log_class(self.logname, self.cache_dir)
+        obj.load()
+        return obj
+
+    def test_load(self):
+        events = log_events()
+        for log_class in (logCounts, logSummaryTimings):
+            if os.path.exists(self.logname):
+                os.unlink(self.logname)
+            for fname in os.listdir(self.cache_dir):
+                os.unlink(os.path.join(self.cache_dir, fname))
+            mtime = 2000000000
+            for i in range(0, len(events), 7):
+                mtime += 10
+                obj = self.append_and_load(log_class, b"".join(events[i : i + 7]), mtime)
+                full_obj = log_class(self.logname, self.cache_dir)
+                full_obj.incremental = False
+                full_obj.loadFromLog()
+                self.assertEqual(full_obj.data, obj.data)
+                self.assertTrue(os.path.isfile(obj.statename))
+            self.assertEqual(full_obj.data, condorLogParser.loadCache(obj.cachename))
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for glideinwms/lib/condorManager.py"""
+
+
+import os
+import tempfile
+import unittest
+
+import xmlrunner
+
+from glideinwms.lib import condorExe
+from glideinwms.lib.condorManager import condorReleaseMany, condorRemoveMany, parse_job_action_output
+
+# Stub condor_rm and condor_release, jobs of cluster 999 do not exist
+WORKER_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker_scripts")
+
+
+class TestJobActions(unittest.TestCase):
+    def setUp(self):
+        self.saved_bin_path = condorExe.condor_bin_path
+        condorExe.condor_bin_path = WORKER_SCRIPTS
+        self.stub_log = tempfile.NamedTemporaryFile(mode="r", suffix=".log")
+        os.environ["STUB_CONDOR_LOG"] = self.stub_log.name
+
+    def tearDown(self):
+        condorExe.condor_bin_path = self.saved_bin_path
+        del os.environ["STUB_CONDOR_LOG"]
+        self.stub_log.close()
+
+    def invocations(self):
+        return [line.split() for line in self.stub_log.read().splitlines()]
+
+    def test_parse_job_action_output(self):
+        lines = [
+            "Job 12.0 marked for removal",
+            "Job 12.1 not found",
+            "Job 13.0 released",
+            "Job 13.1 not held to be released",
+            "Couldn't find/remove all jobs matching your request",
+        ]
+        self.assertEqual(
+            {(12, 0): None, (12, 1): "not found", (13, 0): None, (13, 1): "not held to be released"},
+            parse_job_action_output(lines),
+        )
+
+    def test_remove_many(self):
+        jid_list = [(12, i) for i in range(7)]
+        outcomes = condorRemoveMany(jid_list, batch_size=3, schedd_lookup_cache=None)
+        self.assertEqual(dict.fromkeys(jid_list), outcomes)
+        calls = self.invocations()
+        self.assertEqual(3, len(calls))
+        self.assertEqual(["condor_rm", "12.0", "12.1", "12.2"], calls[0])
+        self.assertEqual(["condor_rm", "12.6"], calls[2])
+
+    def test_remove_many_forcex(self):
+        outcomes = condorRemoveMany([(12, 0), (12, 1)], do_forcex=True, schedd_lookup_cache=None)
+        self.assertEqual({(12, 0): None, (12, 1): None}, outcomes)
+        self.assertEqual([["condor_rm", "12.0", "12.1", "-forcex"]], self.invocations())
+
+    def test_partial_failure(self):
+        # The command fails but only some of the jobs
+        outcomes = condorReleaseMany([(12, 0), (999, 0), (12, 1)], schedd_lookup_cache=None)
+        self.assertEqual({(12, 0): None, (999, 0): "not found", (12, 1): None}, outcomes)
+        self.assertEqual(1, len(self.invocations()))
+
+    def test_command_failure(self):
+        # Jobs not in the output of a failed command are failed
+        condorExe.condor_bin_path = os.path.join(WORKER_SCRIPTS, "missing")
+        outcomes = condorRemoveMany([(12, 0), (12, 1)], schedd_lookup_cache=None)
+        self.assertEqual({(12, 0), (12, 1)}, set(outcomes))
+        for err in outcomes.values():
+            self.assertIsInstance(err, str)
+
+    def test_empty(self):
+        self.assertEqual({}, condorRemoveMany([], schedd_lookup_cache=None))
+        self.assertEqual([], self.invocations())
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for glideinwms/lib/condorMonitor.py"""
+
+
+import os
+import threading
+import unittest
+
+from unittest import mock
+
+import xmlrunner
+
+from glideinwms.lib import condorMonitor
+from glideinwms.lib.condorMonitor import (
+    ClassadXMLParser,
+    CondorStatus,
+    list2dict,
+    load_concurrently,
+    MaskedSubQuery,
+    PBError,
+    QueryError,
+    xml2dict,
+    xml2list,
+)
+
+XML_TYPES = """<?xml version="1.0"?>
+<!DOCTYPE classads SYSTEM "classads.dtd">
+<classads>
+<c>
+    <a n="Name"><s>slot1@host1</s></a>
+    <a n="Cpus"><i>8</i></a>
+    <a n="LoadAvg"><r>0.5</r></a>
+    <a n="PartitionableSlot"><b v="t"/></a>
+    <a n="Dynamic"><b>f</b></a>
+    <a n="Start"><e>TRUE</e></a>
+    <a n="Escaped"><s>a \\"quoted\\" string</s></a>
+    <a n="Empty"><s></s></a>
+    <a n="Undefined"><un/></a>
+</c>
+</classads>
+"""
+
+
+def read_chunks(fname, chunk_size):
+    with open(fname, "rb") as f:
+        data = f.read()
+    return [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+class TestClassadXMLParser(unittest.TestCase):
+    def test_same_as_xml2list(self):
+        for fname, group_attribute in (("cq.fixture", ["ClusterId", "ProcId"]), ("cs.fixture", "Name")):
+            with open(fname) as f:
+                lines = f.readlines()
+            expected = list2dict(xml2list(lines), group_attribute)
+            self.assertTrue(len(expected) > 0)
+            self.assertEqual(expected, xml2dict(lines, group_attribute))
+            # Chunks split everywhere, also in the middle of the XML header and of the tags
+            for chunk_size in (1, 3, 7, 4096):
+                self.assertEqual(expected, xml2dict(read_chunks(fname, chunk_size), group_attribute))
+
+    def test_types(self):
+        classad = xml2dict([XML_TYPES], "Name")["slot1@host1"]
+        self.assertEqual(
+            {
+                "Cpus": 8,
+                "LoadAvg": 0.5,
+                "PartitionableSlot": True,
+                "Dynamic": False,
+                "Start": "TRUE",
+                "Escaped": 'a "quoted" string',
+                "Empty": "",
+                "Undefined": None,
+            },
+            classad,
+        )
+        self.assertEqual(list2dict(xml2list([XML_TYPES]), "Name"), xml2dict([XML_TYPES], "Name"))
+
+    def test_projection(self):
+        data = xml2dict(read_chunks("cq.fixture", 100), ["ClusterId", "ProcId"], [("jobstatus", "i"), ("User", "s")])
+        self.assertEqual(13, len(data))
+        for key, classad in data.items():
+            self.assertEqual(12345, key[0])
+            self.assertEqual({"JobStatus", "User"}, set(classad.keys()))
+
+    def test_no_xml(self):
+        self.assertEqual({}, xml2dict([b"Warning: nothing to see\n", b""], "Name"))
+        parser = ClassadXMLParser("Name")
+        parser.feed("garbage <?x")
+        parser.feed("ml version='1.0'?><classads></classads>")
+        self.assertEqual({}, parser.close())
+
+    def test_errors(self):
+        with self.assertRaises(RuntimeError):
+            xml2dict([XML_TYPES.replace("<un/>", "<unknown/>")], "Name")
+        with self.assertRaises(RuntimeError):
+            xml2dict([XML_TYPES[:-20]], "Name")
+
+    def test_concurrent_parsers(self):
+        with open("cq.fixture", "rb") as f:
+            data = f.read()
+        expected = xml2dict([data], ["ClusterId", "ProcId"])
+        results = []
+
+        def parse():
+            results.append(xml2dict(read_chunks("cq.fixture", 11), ["ClusterId", "ProcId"]))
+
+        threads = [threading.Thread(target=parse) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([expected] * 8, results)
+
+
+class TestBindingsBackend(unittest.TestCase):
+    def setUp(self):
+        self.saved_use_bindings = condorMonitor.USE_HTCONDOR_PYTHON_BINDINGS
+
+    def tearDown(self):
+        condorMonitor.USE_HTCONDOR_PYTHON_BINDINGS = self.saved_use_bindings
+
+    def test_uses_bindings(self):
+        condorMonitor.USE_HTCONDOR_PYTHON_BINDINGS = True
+        self.assertTrue(CondorStatus().uses_bindings())
+        self.assertTrue(CondorStatus(use_bindings=True).uses_bindings())
+        self.assertFalse(CondorStatus(use_bindings=False).uses_bindings())
+        condorMonitor.USE_HTCONDOR_PYTHON_BINDINGS = False
+        self.assertFalse(CondorStatus().uses_bindings())
+        # Cannot use the bindings if they are not available
+        self.assertFalse(CondorStatus(use_bindings=True).uses_bindings())
+
+    def test_load_concurrently(self):
+        condorMonitor.USE_HTCONDOR_PYTHON_BINDINGS = True
+        barrier = threading.Barrier(3, timeout=10)
+        calls = []
+
+        def query_bindings(query, constraint=None, format_list=None):
+            calls.append((query.pool_name, os.environ.get("_CONDOR_SEC_CLIENT_INTEGRITY"), format_list))
+            if query.get_requested_integrity():
+                # All the queries of the group are running at the same time
+                barrier.wait()
+            if query.pool_name == "bad":
+                raise PBError("query failed")
+            return {query.pool_name: {"State": "Idle"}}
+
+        queries = []
+        for pool_name in ("coll1", "coll2", "coll3"):
+            queries.append(CondorStatus(pool_name=pool_name, use_bindings=True))
+            queries[-1].require_integrity(True)
+        queries.append(CondorStatus(pool_name="bad", use_bindings=True))
+        queries.append(CondorStatus(pool_name="exe", use_bindings=False))
+
+        with open("cs.fixture") as f:
+            cs_lines = f.readlines()
+        with mock.patch.object(CondorStatus, "query_bindings", autospec=True, side_effect=query_bindings):
+            with mock.patch.object(condorMonitor, "htcondor_full_reload") as m_reload:
+                with mock.patch("glideinwms.lib.condorExe.exe_cmd_iter", return_value=cs_lines):
+                    errors = load_concurrently(queries, "True", [("State", "s")])
+
+        # One configuration reload for each security environment
+        self.assertEqual(2, m_reload.call_count)
+        self.assertEqual([None, None, None], errors[:3])
+        self.assertIsInstance(errors[3], QueryError)
+        self.assertIsNone(errors[4])
+        for i in range(3):
+            self.assertEqual({f"coll{i + 1}": {"State": "Idle"}}, queries[i].fetchStored())
+        self.assertTrue(len(queries[4].fetchStored()) > 0)
+        calls.sort(key=lambda x: x[0])
+        self.assertEqual(["bad", "coll1", "coll2", "coll3"], [i[0] for i in calls])
+        self.assertEqual([None, "REQUIRED", "REQUIRED", "REQUIRED"], [i[1] for i in calls])
+        for call in calls:
+            self.assertEqual([("State", "s"), ("Name", "s")], call[2])
+        self.assertNotIn("_CONDOR_SEC_CLIENT_INTEGRITY", os.environ)
+
+
+class TestMaskedSubQuery(unittest.TestCase):
+    def test_lazy_selection(self):
+        query = CondorStatus()
+        query.stored_data = {"a": {"State": "Idle"}, "b": {"State": "Claimed"}, "c": {"State": "Owner"}}
+        masks = {"a": 1, "b": 2, "c": 3}
+        with mock.patch.object(query, "fetchStored", wraps=query.fetchStored) as m_fetch:
+            sub = MaskedSubQuery(query, masks, 2)
+            self.assertEqual(0, m_fetch.call_count)
+            self.assertEqual(["b", "c"], sorted(sub.fetchStored()))
+            self.assertEqual(["b", "c"], sorted(sub.fetch()))
+            self.assertEqual(1, m_fetch.call_count)
+        self.assertEqual(["a", "c"], sorted(MaskedSubQuery(query, masks, 1).fetchStored()))
+        self.assertEqual({}, MaskedSubQuery(query, masks, 4).fetchStored())
+        query.stored_data["d"] = {"State": "Claimed"}
+        masks["d"] = 2
+        sub.load()
+        self.assertEqual(["b", "c", "d"], sorted(sub.fetchStored()))
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
@@ -21,7 +21,7 @@ import unittest
 
 import xmlrunner
 
-from glideinwms.lib.disk_cache import DiskCache
+from glideinwms.lib.disk_cache import CachedError, DiskCache
 
 
 class TestDiskCache(unittest.TestCase):
@@ -81,6 +81,51 @@ class TestDiskCache(unittest.TestCase):
         cached_obj = cache.get(self.objid)
         self.assertEqual(self.obj, cached_obj)
 
+    def test_get_or_save(self):
+        """The object is computed only when missing or expired"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return self.obj
+
+        self.assertEqual(self.obj, self.cache.get_or_save(self.objid, compute))
+        self.assertEqual(self.obj, self.cache.get_or_save(self.objid, compute))
+        # Another cache (e.g., from another process) gets the object from file
+        self.assertEqual(self.obj, DiskCache(".").get_or_save(self.objid, compute))
+        self.assertEqual(1, len(calls))
+
+        # Errors are propagated and saved as failures, expiring like the objects
+        def fail():
+            calls.append(1)
+            raise RuntimeError("query failed")
+
+        cache = DiskCache(".", cache_duration=0)
+        with self.assertRaises(RuntimeError):
+            cache.get_or_save(self.objid, fail)
+        self.assertEqual(self.obj, self.cache.get(self.objid))
+        self.assertIsNone(DiskCache(".").get(self.objid))
+
+        # Expired objects are computed again
+        self.assertEqual(self.obj, cache.get_or_save(self.objid, compute))
+        self.assertEqual(3, len(calls))
+
+        # The other processes fail fast while the failure is not expired
+        with self.assertRaises(RuntimeError):
+            DiskCache(".", cache_duration=0).get_or_save(self.objid, fail)
+        with self.assertRaises(CachedError) as context:
+            DiskCache(".").get_or_save(self.objid, compute)
+        self.assertEqual("RuntimeError: query failed", str(context.exception))
+        self.assertEqual(4, len(calls))
+
+    def test_get_or_save_truncated(self):
+        """A truncated cache file is computed again, and no temporary file is left"""
+        with open(self.objid, "wb") as fdesc:
+            fdesc.write(b"\x80\x04\x95")
+        self.assertEqual(self.obj, self.cache.get_or_save(self.objid, lambda: self.obj))
+        self.assertEqual(self.obj, DiskCache(".").get(self.objid))
+        self.assertEqual([], [i for i in os.listdir(".") if i.startswith(self.objid) and i.endswith(".tmp")])
+
 
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
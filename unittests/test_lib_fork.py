@@ -22,9 +22,12 @@ from glideinwms.lib.fork import (
     fetch_fork_result,
     fetch_fork_result_list,
     fetch_ready_fork_result_list,
+    FetchError,
     fork_in_bg,
     ForkManager,
     ForkResultError,
+    ForkScheduler,
+    ForkWorkerPool,
     wait_for_pids,
 )
 from glideinwms.unittests.unittest_utils import create_temp_file, FakeLogger
@@ -103,6 +106,48 @@ class TestFetchForkResult(unittest.TestCase):
         expected = fetch_fork_result(results["r"], results["pid"])
         self.assertEqual(expected, sleep_arg)
 
+    def test_fetch_fork_result_stats(self):
+        init_log("TestFetchForkRslt")
+        results = fork_in_bg(sleep_fn, "0.1")
+        stats = {}
+        self.assertEqual("0.1", fetch_fork_result(results["r"], results["pid"], stats=stats))
+        self.assertEqual("pipe", stats["transport"])
+        self.assertTrue(stats["size"] > 0)
+        self.assertTrue("deserialize" in stats)
+
+
+@unittest.skipUnless(hasattr(os, "memfd_create"), "memfd_create not available")
+class TestFetchForkResultShm(unittest.TestCase):
+    def test_fetch_fork_result_shm(self):
+        init_log("TestFetchForkRsltShm")
+        big_result = {i: str(i) * 20 for i in range(30000)}
+        results = fork_in_bg(lambda: big_result, use_shm=True)
+        self.assertTrue("shm" in results)
+        stats = {}
+        self.assertEqual(big_result, fetch_fork_result(results["r"], results["pid"], results["shm"], stats))
+        self.assertEqual("shm", stats["transport"])
+        self.assertTrue(stats["size"] > 1000000)
+        for timing in ("serialize", "transfer", "deserialize"):
+            self.assertTrue(stats[timing] >= 0)
+
+    def test_fetch_fork_result_shm_failure(self):
+        init_log("TestFetchForkRsltShm")
+        results = fork_in_bg(sleep_fn, "not a number", use_shm=True)
+        with self.assertRaises(FetchError):
+            fetch_fork_result(results["r"], results["pid"], results["shm"])
+
+    def test_fork_and_collect_shm(self):
+        init_log("TestFetchForkRsltShm")
+        fork_manager = ForkManager(use_shm=True)
+        expected = {}
+        for i in range(10):
+            expected[i] = "0.1"
+            fork_manager.add_fork(i, sleep_fn, "0.1")
+        self.assertEqual(expected, fork_manager.fork_and_collect())
+        self.assertEqual(set(expected), set(fork_manager.fork_stats))
+        self.assertTrue(all(i["transport"] == "shm" for i in fork_manager.fork_stats.values()))
+        self.assertTrue(fork_manager.fork_stats_summary().startswith("10 results"))
+
 
 class TestFetchForkResultList(unittest.TestCase):
     def test_fetch_fork_result_list(self):
@@ -237,6 +282,108 @@ class TestForkManager(unittest.TestCase):
         self.assertTrue("module 'select' has no attribute 'poll'" in log_contents)
 
 
+def exit_fn(fork_grandchild=False):
+    """Exit without writing a result, optionally leaving a grandchild holding the result pipe"""
+    if fork_grandchild and os.fork() == 0:
+        time.sleep(5)
+        os._exit(0)
+    os._exit(1)
+
+
+class TestForkScheduler(unittest.TestCase):
+    def setUp(self):
+        init_log("TestForkScheduler")
+
+    def test_run_stats(self):
+        functions = {i: (sleep_fn, "0.2") for i in range(3)}
+        scheduler = ForkScheduler(1)
+        results = scheduler.run(functions, [0, 1, 2])
+        self.assertEqual({0: "0.2", 1: "0.2", 2: "0.2"}, results)
+        self.assertTrue(scheduler.fork_stats[2]["queue_wait"] >= 0.4)
+        for i in range(3):
+            self.assertTrue(scheduler.fork_stats[i]["wall_time"] >= 0.2)
+            self.assertTrue(scheduler.fork_stats[i]["size"] > 0)
+
+    def test_run_child_failure(self):
+        functions = {"good": (sleep_fn, "0.1"), "bad": (exit_fn,)}
+        with self.assertRaises(ForkResultError) as cm:
+            ForkScheduler(2).run(functions, ["good", "bad"])
+        self.assertEqual(["bad"], cm.exception.failed)
+        self.assertEqual({"good": "0.1"}, cm.exception.good_results)
+
+    def test_run_timeout(self):
+        functions = {"slow": (sleep_fn, "30"), "fast": (sleep_fn, "0.1"), "no_timeout": (sleep_fn, "1")}
+        t_begin = time.time()
+        scheduler = ForkScheduler(3)
+        with self.assertRaises(ForkResultError) as cm:
+            scheduler.run(functions, ["slow", "fast", "no_timeout"], {"slow": 0.5, "fast": 5})
+        self.assertTrue(time.time() - t_begin < 10)
+        self.assertEqual(["slow"], cm.exception.failed)
+        self.assertEqual({"fast": "0.1", "no_timeout": "1"}, cm.exception.good_results)
+        self.assertTrue(scheduler.fork_stats["slow"]["timed_out"])
+        self.assertTrue(scheduler.fork_stats["slow"]["wall_time"] >= 0.5)
+        self.assertNotIn("timed_out", scheduler.fork_stats["no_timeout"])
+
+    def test_fork_and_collect_timeouts(self):
+        forkm_obj = ForkManager()
+        forkm_obj.add_fork("a", sleep_fn, "0.1")
+        forkm_obj.add_fork("b", sleep_fn, "0.2")
+        self.assertEqual({"a": "0.1", "b": "0.2"}, forkm_obj.fork_and_collect(timeouts={"a": None}))
+        self.assertTrue(forkm_obj.fork_stats["b"]["wall_time"] >= 0.2)
+
+    @unittest.skipUnless(hasattr(os, "pidfd_open"), "pidfd not available")
+    def test_run_child_failure_pipe_held(self):
+        t_begin = time.time()
+        with self.assertRaises(ForkResultError) as cm:
+            ForkScheduler(2).run({"bad": (exit_fn, True)}, ["bad"])
+        self.assertEqual(["bad"], cm.exception.failed)
+        # Detected via the pidfd, without waiting for the grandchild to close the pipe
+        self.assertTrue(time.time() - t_begin < 4)
+
+
+def pid_fn(value=None):
+    return os.getpid(), value
+
+
+def raise_fn():
+    raise ValueError("failing on purpose")
+
+
+class TestForkWorkerPool(unittest.TestCase):
+    def setUp(self):
+        init_log("TestForkWorkerPool")
+
+    def test_run_reuses_workers(self):
+        functions = {i: (pid_fn, i) for i in range(20)}
+        pool = ForkWorkerPool(3)
+        results = pool.run(functions, list(range(20)))
+        self.assertEqual(list(range(20)), [results[i][1] for i in range(20)])
+        pids = {results[i][0] for i in range(20)}
+        self.assertTrue(1 <= len(pids) <= 3)
+        self.assertNotIn(os.getpid(), pids)
+        for i in range(20):
+            self.assertEqual("pool", pool.fork_stats[i]["transport"])
+            self.assertTrue(pool.fork_stats[i]["size"] > 0)
+            self.assertTrue(pool.fork_stats[i]["run_time"] >= 0)
+
+    def test_run_failures(self):
+        functions = {"good": (sleep_fn, "0.1"), "raise": (raise_fn,), "exit": (exit_fn,), "after": (sleep_fn, "0")}
+        with self.assertRaises(ForkResultError) as cm:
+            ForkWorkerPool(1).run(functions, ["good", "raise", "exit", "after"])
+        # The worker died running "exit", "after" was run by its replacement
+        self.assertEqual(["raise", "exit"], cm.exception.failed)
+        self.assertEqual({"good": "0.1", "after": "0"}, cm.exception.good_results)
+
+    def test_fork_manager(self):
+        forkm_obj = ForkManager()
+        for i in range(5):
+            forkm_obj.add_fork(i, sleep_fn, str(i / 10))
+        results = forkm_obj.pool_fork_and_collect(2)
+        self.assertEqual({i: str(i / 10) for i in range(5)}, results)
+        self.assertEqual(5, len(forkm_obj.fork_stats))
+        self.assertTrue(forkm_obj.fork_stats_summary().startswith("5 results"))
+
+
 class TestWaitForPids(unittest.TestCase):
     def test_wait_for_pids(self):
         init_log("TestWaitForPids")
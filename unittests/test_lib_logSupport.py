@@ -23,7 +23,7 @@ import yaml
 
 # use tesfixtures.mock_time to speed up clock so test takes less elapsed time
 # This was formerly named test_time, name deprecated since testfixtures 7.0.0
-from testfixtures import mock_time, Replacer
+from testfixtures import mock_time, not_there, Replacer
 
 from glideinwms.lib import logSupport
 from glideinwms.unittests.unittest_utils import create_random_string
@@ -209,5 +209,149 @@ class TestLogSupport(unittest.TestCase):
         self.assertTrue(len(file_list) == len(gzip_list) + 1, "Log file rotate didn't compress the files.")
 
 
+class TestAsyncGlideinHandler(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.plog = {
+            "structured": "False",
+            "extension": "all",
+            "msg_types": "INFO,WARN,ERR",
+            "max_days": "0",
+            "min_days": "0",
+            "max_mbytes": "1",
+            "backup_count": "5",
+            "compression": "",
+            "asynchronous": "True",
+        }
+
+    def tearDown(self):
+        logSupport.stop_async_logs()
+        logger = logging.getLogger("test_async")
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+            if handler in logSupport.async_handlers:
+                logSupport.async_handlers.remove(handler)
+                for target in handler.target_handlers:
+                    logSupport.handlers.remove(target)
+                    target.close()
+        shutil.rmtree(self.log_dir)
+
+    def get_logger(self):
+        log = logSupport.get_logger_with_handlers("test_async", self.log_dir, {"ProcessLogs": str([self.plog])})
+        self.assertEqual(1, len(log.handlers))
+        self.assertIsInstance(log.handlers[0], logSupport.AsyncGlideinHandler)
+        return log, os.path.join(self.log_dir, "test_async.all.log")
+
+    def read_log(self, log_file):
+        with open(log_file) as f:
+            return f.read()
+
+    def test_write(self):
+        log, log_file = self.get_logger()
+        handler = log.handlers[0]
+        args = ["queued"]
+        log.info("message %s", args)
+        args.append("changed")
+        log.info("non-ASCII message \u00e8\u00e8")
+        log.debug("filtered message")
+        try:
+            raise ValueError("test exception")
+        except ValueError:
+            log.exception("error message")
+        logSupport.stop_async_logs()
+        # Stopped, records are written synchronously
+        log.warning("synchronous message")
+        lines = self.read_log(log_file)
+        self.assertIn("INFO: message ['queued']\n", lines)
+        self.assertIn("INFO: non-ASCII message \u00e8\u00e8\n", lines)
+        self.assertNotIn("filtered message", lines)
+        self.assertIn("ERROR: error message\nTraceback", lines)
+        self.assertIn("ValueError: test exception", lines)
+        self.assertTrue(lines.endswith("WARNING: synchronous message\n"))
+        self.assertEqual(os.path.getsize(log_file), handler.target_handlers[0].stream_size)
+
+    def test_no_register_at_fork(self):
+        # Python 3.6 has no os.register_at_fork
+        with Replacer() as replace:
+            replace("glideinwms.lib.logSupport.os.register_at_fork", not_there)
+            with self.assertRaises(ValueError):
+                logSupport.AsyncGlideinHandler([])
+
+    def test_shared_writer(self):
+        log, log_file = self.get_logger()
+        thread = logSupport.async_writer.thread
+        log2 = logSupport.get_logger_with_handlers("test_async2", self.log_dir, {"ProcessLogs": str([self.plog])})
+        handler2 = log2.handlers[0]
+        try:
+            self.assertIs(thread, logSupport.async_writer.thread)
+            log.info("first logger")
+            log2.info("second logger")
+            logSupport.stop_async_logs()
+            self.assertIn("INFO: first logger\n", self.read_log(log_file))
+            self.assertIn("INFO: second logger\n", self.read_log(os.path.join(self.log_dir, "test_async2.all.log")))
+        finally:
+            log2.removeHandler(handler2)
+            logSupport.async_handlers.remove(handler2)
+            for target in handler2.target_handlers:
+                logSupport.handlers.remove(target)
+                target.close()
+
+    def test_queue_full(self):
+        logSupport.async_writer.maxsize = 5
+        try:
+            log, log_file = self.get_logger()
+        finally:
+            logSupport.async_writer.maxsize = logSupport.ASYNC_QUEUE_SIZE
+        handler = log.handlers[0]
+        target = handler.target_handlers[0]
+        # The writer thread blocks on the first record until the lock is released
+        target.acquire()
+        try:
+            for i in range(20):
+                log.info("message %d", i)
+        finally:
+            target.release()
+        logSupport.stop_async_logs()
+        lines = self.read_log(log_file).splitlines()
+        self.assertTrue(handler.dropped > 0)
+        self.assertEqual(handler.dropped, handler.dropped_reported)
+        warnings = [i for i in lines if "log records dropped" in i]
+        self.assertEqual(1, len(warnings))
+        self.assertIn(
+            f"WARNING: {handler.dropped} log records dropped, the asynchronous log queue was full", warnings[0]
+        )
+        self.assertEqual(20, handler.dropped + len([i for i in lines if "INFO: message " in i]))
+
+    def test_size_rotate(self):
+        self.plog["max_mbytes"] = "0.01"
+        log, log_file = self.get_logger()
+        for i in range(300):
+            log.info("%04d %s", i, create_random_string(length=100))
+        logSupport.stop_async_logs()
+        rotated = [i for i in os.listdir(self.log_dir) if i != "test_async.all.log"]
+        self.assertTrue(len(rotated) > 0, "Log file did not rotate.")
+        self.assertLess(os.path.getsize(log_file), 0.01 * 1024 * 1024 + 200)
+        self.assertIn("INFO: 0299 ", self.read_log(log_file).splitlines()[-1])
+
+    def test_fork(self):
+        log, log_file = self.get_logger()
+        for i in range(100):
+            log.info("parent before fork %d", i)
+        pid = os.fork()
+        if pid == 0:
+            logSupport.disable_rotate = True
+            for i in range(100):
+                log.info("child %d", i)
+            logSupport.stop_async_logs()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        log.info("parent after fork")
+        logSupport.roll_all_logs()
+        logSupport.stop_async_logs()
+        lines = [i.split(": ", 1)[1] for i in self.read_log(log_file).splitlines()]
+        expected = [f"parent before fork {i}" for i in range(100)] + [f"child {i}" for i in range(100)]
+        self.assertEqual(sorted(expected + ["parent after fork"]), sorted(lines))
+
+
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
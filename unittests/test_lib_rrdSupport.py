@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for the batched RRD updates in glideinwms/lib/rrdSupport.py"""
+
+
+import os
+import socketserver
+import subprocess
+import tempfile
+import threading
+import unittest
+
+from unittest import mock
+
+import xmlrunner
+
+from glideinwms.lib import rrdSupport
+from glideinwms.lib.rrdSupport import BaseRRDSupport, BatchRRDSupport, RRDCachedClient, rrdtool_exe
+
+
+class FakeRRDCachedHandler(socketserver.StreamRequestHandler):
+    """Implements the rrdcached commands used by RRDCachedClient: INFO and BATCH with UPDATE"""
+
+    def respond(self, text):
+        self.wfile.write(text.encode("utf-8"))
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        for line in self.rfile:
+            cmd = line.decode("utf-8").rstrip("\n")
+            if cmd.startswith("INFO "):
+                fname = cmd[5:]
+                server.info_requests.append(fname)
+                ds_names = server.ds_names.get(fname)
+                if ds_names is None:
+                    self.respond("-1 No such file: %s\n" % fname)
+                    continue
+                lines = ["filename 2 %s" % fname, "step 1 300"]
+                lines += ["ds[%s].index 1 %i" % (ds_name, i) for i, ds_name in enumerate(ds_names)]
+                self.respond("%i Info for %s follows\n" % (len(lines), fname) + "".join(f"{i}\n" for i in lines))
+            elif cmd == "BATCH":
+                self.respond("0 Go ahead.  End with dot '.' on its own line.\n")
+                errors = []
+                nr = 0
+                for batch_line in self.rfile:
+                    batch_cmd = batch_line.decode("utf-8").rstrip("\n")
+                    if batch_cmd == ".":
+                        break
+                    nr += 1
+                    server.updates.append(batch_cmd)
+                    if "bad" in batch_cmd:
+                        errors.append("%i illegal attempt to update" % nr)
+                server.batches += 1
+                self.respond("%i errors\n" % len(errors) + "".join(f"{i}\n" for i in errors))
+            else:
+                self.respond("-1 Unknown command: %s\n" % cmd)
+
+
+class FakeRRDCached(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, address, ds_names):
+        super().__init__(address, FakeRRDCachedHandler)
+        self.ds_names = ds_names
+        self.info_requests = []
+        self.updates = []
+        self.batches = 0
+        self.connections = 0
+
+
+class TestBatchRRDSupport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.tmpdir.name, "rrdcached.sock")
+        self.server = FakeRRDCached(
+            self.address, {"/mon/a.rrd": ["Idle", "Running"], "/mon/b.rrd": ["val"], "/mon/bad.rrd": ["val"]}
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.rrd_obj = mock.Mock()
+        self.rrd_support = BaseRRDSupport(self.rrd_obj)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_rrdcached(self):
+        batch = BatchRRDSupport(self.rrd_support, rrdcached_address="unix:" + self.address)
+        batch.update_rrd_multi("/mon/a.rrd", 1000, {"Running": 2, "Idle": 1})
+        # Missing and None values are unknown
+        batch.update_rrd_multi("/mon/a.rrd", 1300, {"Running": 3, "Idle": None})
+        batch.update_rrd_multi("/mon/a.rrd", 1600, {"Idle": None})
+        batch.update_rrd("/mon/b.rrd", 1000, 7)
+        batch.update_rrd("/mon/bad.rrd", 1000, 7)
+        self.assertEqual(0, self.server.batches)
+
+        stats = batch.flush()
+        self.assertEqual(
+            [
+                "UPDATE /mon/a.rrd 1000:1:2",
+                "UPDATE /mon/a.rrd 1300:U:3",
+                "UPDATE /mon/b.rrd 1000:7",
+                "UPDATE /mon/bad.rrd 1000:7",
+            ],
+            self.server.updates,
+        )
+        self.assertEqual("rrdcached", stats["channel"])
+        self.assertEqual(4, stats["updates"])
+        self.assertEqual(3, stats["files"])
+        self.assertEqual([("/mon/bad.rrd", "illegal attempt to update")], stats["errors"])
+        self.assertGreaterEqual(stats["time"], 0)
+        self.assertEqual(["/mon/a.rrd"], self.server.info_requests)
+        self.rrd_obj.update.assert_not_called()
+
+        # The connection and the data source names are reused by the next flushes
+        batch.update_rrd_multi("/mon/a.rrd", 1900, {"Running": 4, "Idle": 0})
+        stats = batch.flush()
+        self.assertEqual("UPDATE /mon/a.rrd 1900:0:4", self.server.updates[-1])
+        self.assertEqual(2, self.server.batches)
+        self.assertEqual(1, self.server.connections)
+        self.assertEqual(["/mon/a.rrd"], self.server.info_requests)
+
+        # Nothing to do
+        stats = batch.flush()
+        self.assertEqual(0, stats["updates"])
+        self.assertEqual(2, self.server.batches)
+
+    def test_rrdcached_failure(self):
+        # Unknown file for INFO: the whole batch is written locally
+        batch = BatchRRDSupport(self.rrd_support, rrdcached_address=self.address)
+        batch.update_rrd_multi("/mon/c.rrd", 1000, {"Running": 2, "Idle": 1})
+        stats = batch.flush()
+        self.assertEqual("module", stats["channel"])
+        self.assertIn("No such file", stats["rrdcached_error"])
+        self.rrd_obj.update.assert_called_once_with("/mon/c.rrd", "-t", "Idle:Running", "1000:1:2")
+        self.assertEqual(0, self.server.batches)
+
+        # Daemon not running
+        batch = BatchRRDSupport(self.rrd_support, rrdcached_address=self.address + ".missing")
+        batch.update_rrd("/mon/b.rrd", 1000, 7)
+        stats = batch.flush()
+        self.assertEqual("module", stats["channel"])
+        self.rrd_obj.update.assert_called_with("/mon/b.rrd", "1000:7")
+
+    def test_local(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop("RRDCACHED_ADDRESS", None)
+            batch = BatchRRDSupport(self.rrd_support)
+        self.assertIsNone(batch.rrdcached)
+        self.rrd_obj.update.side_effect = [None, RuntimeError("illegal attempt to update")]
+        batch.update_rrd_multi("/mon/a.rrd", 1000, {"Running": 2, "Idle": None})
+        batch.update_rrd_multi("/mon/a.rrd", 1000, {"Running": 2})
+        self.rrd_obj.update.assert_not_called()
+        stats = batch.flush()
+        self.assertEqual("module", stats["channel"])
+        self.assertEqual([("/mon/a.rrd", "illegal attempt to update")], stats["errors"])
+        self.assertEqual(2, self.rrd_obj.update.call_count)
+        self.rrd_obj.update.assert_called_with("/mon/a.rrd", "-t", "Running", "1000:2")
+
+    def test_rrdtool_pipe(self):
+        rrd_exe = rrdtool_exe.__new__(rrdtool_exe)
+        rrd_exe.rrd_bin = "/usr/bin/rrdtool"
+        batch = BatchRRDSupport(BaseRRDSupport(rrd_exe), rrdcached_address="")
+        batch.update_rrd_multi("/mon/a.rrd", 1000, {"Running": 2, "Idle": 1})
+        batch.update_rrd("/mon/bad.rrd", 1000, 7)
+        batch.update_rrd("/mon/b.rrd", 1000, 7)
+        output = "OK u:0.00 s:0.00 r:0.00\nERROR: illegal attempt to update\nOK u:0.00 s:0.00 r:0.00\n"
+        with mock.patch.object(rrdSupport.subprocessSupport, "iexe_cmd", return_value=output) as m_iexe_cmd:
+            stats = batch.flush()
+        # A single rrdtool process for all the updates
+        m_iexe_cmd.assert_called_once_with(
+            "/usr/bin/rrdtool -",
+            stdin_data='update "/mon/a.rrd" "-t" "Idle:Running" "1000:1:2"\n'
+            'update "/mon/bad.rrd" "1000:7"\nupdate "/mon/b.rrd" "1000:7"\n',
+        )
+        self.assertEqual("rrdtool", stats["channel"])
+        self.assertEqual([("/mon/bad.rrd", "ERROR: illegal attempt to update")], stats["errors"])
+
+    def test_rrdtool_pipe_failure(self):
+        rrd_exe = rrdtool_exe.__new__(rrdtool_exe)
+        rrd_exe.rrd_bin = "/usr/bin/rrdtool"
+        rrd_exe.update = mock.Mock()
+        rrd_support = BaseRRDSupport(rrd_exe)
+        rrd_support.get_disk_lock = mock.Mock()
+        batch = BatchRRDSupport(rrd_support, rrdcached_address="")
+        batch.update_rrd("/mon/b.rrd", 1000, 7)
+        batch.update_rrd("/mon/a.rrd", 1000, 8)
+        batch.update_rrd("/mon/b.rrd", 1300, 9)
+        error = subprocess.CalledProcessError(1, "/usr/bin/rrdtool -", output="OK u:0.00 s:0.00 r:0.00\n")
+        with mock.patch.object(rrdSupport.subprocessSupport, "iexe_cmd", side_effect=error):
+            stats = batch.flush()
+        self.assertEqual([], stats["errors"])
+        # The files are locked while rrdtool runs, and the updates without a response are written one by one
+        self.assertEqual(
+            [mock.call("/mon/a.rrd"), mock.call("/mon/b.rrd"), mock.call("/mon/a.rrd"), mock.call("/mon/b.rrd")],
+            rrd_support.get_disk_lock.call_args_list,
+        )
+        self.assertEqual(4, rrd_support.get_disk_lock.return_value.close.call_count)
+        self.assertEqual(
+            [mock.call("/mon/a.rrd", "1000:8"), mock.call("/mon/b.rrd", "1300:9")], rrd_exe.update.call_args_list
+        )
+
+    def test_rrd_batch(self):
+        log = mock.Mock()
+        config = mock.Mock(rrd_obj=self.rrd_support, rrd_batch_obj=None)
+        with rrdSupport.rrd_batch(config, log):
+            self.assertIsInstance(config.rrd_obj, BatchRRDSupport)
+            config.rrd_obj.update_rrd("/mon/b.rrd", 1000, 7)
+            with rrdSupport.rrd_batch(config, log):
+                config.rrd_obj.update_rrd("/mon/a.rrd", 1000, 8)
+            self.rrd_obj.update.assert_not_called()
+        self.assertIs(self.rrd_support, config.rrd_obj)
+        self.assertEqual(2, self.rrd_obj.update.call_count)
+        log.info.assert_called_once()
+        log.error.assert_not_called()
+
+    def test_rrdcached_env(self):
+        with mock.patch.dict(os.environ, {"RRDCACHED_ADDRESS": "localhost:1234"}):
+            batch = BatchRRDSupport(self.rrd_support)
+        self.assertIsInstance(batch.rrdcached, RRDCachedClient)
+        self.assertEqual("localhost:1234", batch.rrdcached.address)
+
+    def test_dummy(self):
+        batch = BatchRRDSupport(BaseRRDSupport(None), rrdcached_address=self.address)
+        self.assertTrue(batch.isDummy())
+        batch.update_rrd("/mon/b.rrd", 1000, 7)
+        self.assertEqual(0, batch.flush()["updates"])
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
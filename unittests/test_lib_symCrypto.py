@@ -21,6 +21,7 @@ from glideinwms.lib.symCrypto import (
     Sym3DESKey,
     SymAES128Key,
     SymAES256Key,
+    SymKeyCache,
 )
 from glideinwms.unittests.unittest_utils import TestImportError
 
@@ -156,6 +157,47 @@ class TestSym3DESKey(unittest.TestCase):
         self.assertEqual(data, sk2.decrypt_base64(self.key.encrypt_base64(data)))
 
 
+class TestSymKeyCache(unittest.TestCase):
+    def setUp(self):
+        self.key = SymAES256Key()
+        self.key.new()
+        self.cache = SymKeyCache(max_entries=2)
+
+    def test_encrypt_decrypt(self):
+        encrypted = self.cache.encrypt_hex(self.key, "identity")
+        self.assertEqual(self.key.encrypt_hex("identity"), encrypted)
+        self.assertEqual(encrypted, self.cache.encrypt_hex(self.key, b"identity"))
+        self.assertEqual(b"identity", self.cache.decrypt_hex(self.key, encrypted))
+        self.assertEqual(b"identity", self.cache.decrypt_hex(AutoSymKey(self.key.get_code()), encrypted.decode()))
+        # The same key code has the same key id
+        self.assertEqual(
+            {"hits": 2, "misses": 2, "hit_rate": 0.5, "bytes_saved": len(b"identity") + len(encrypted), "entries": 2},
+            self.cache.get_stats(),
+        )
+        self.cache.reset_stats()
+        self.assertEqual(0, self.cache.get_stats()["hits"])
+        self.assertEqual(2, self.cache.get_stats()["entries"])
+
+    def test_new_key(self):
+        # A new key, or only a new IV, never reuses the old results
+        encrypted = self.cache.encrypt_hex(self.key, "identity")
+        old_iv = self.key.iv_str
+        self.key.load(key_str=self.key.key_str, iv_str=b"1" * len(old_iv))
+        self.assertNotEqual(encrypted, self.cache.encrypt_hex(self.key, "identity"))
+        self.key.new()
+        self.assertEqual(self.key.encrypt_hex("identity"), self.cache.encrypt_hex(self.key, "identity"))
+        self.assertEqual(0, self.cache.hits)
+        # Bounded, the least recently used is evicted
+        self.assertEqual(2, len(self.cache.entries))
+
+    def test_errors(self):
+        with self.assertRaises(KeyError):
+            self.cache.encrypt_hex(SymAES256Key(), "identity")
+        with self.assertRaises(Exception):
+            self.cache.decrypt_hex(self.key, "not hex")
+        self.assertEqual(0, len(self.cache.entries))
+
+
 if __name__ == "__main__":
     OFL = "unittests-reports"
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output=OFL))
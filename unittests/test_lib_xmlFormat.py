@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2009 Fermi Research Alliance, LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Unit tests for the streaming writers in glideinwms/lib/xmlFormat.py"""
+
+
+import gzip
+import io
+import os
+import tempfile
+import time
+import unittest
+
+import xmlrunner
+
+from glideinwms.lib import xmlFormat
+
+ENTRIES = {
+    "entry_a": {
+        "frontends": {
+            "fe1": {"Status": {"Idle": 3, "Running": 2}, "Requested": {"Idle": 1, "Parameters": {"GLIDEIN_X": "a<b"}}},
+            "fe2": {"Status": {"Idle": 0, "Running": None}, "Requested": {"Idle": 0.5, "Parameters": {}}},
+        },
+        "total": {"Status": {"Idle": 3, "Running": 2}, "Downtime": {"status": "False"}},
+    },
+    "entry_b": {"frontends": {}, "total": {"Status": {"Idle": 1, "Running": 0}}},
+}
+ENTRIES_PARAMS = {
+    "class": {
+        "dicts_params": {
+            "frontends": {
+                "el_name": "frontend",
+                "subtypes_params": {
+                    "class": {
+                        "subclass_params": {
+                            "Requested": {
+                                "dicts_params": {
+                                    "Parameters": {"el_name": "Parameter", "subtypes_params": {"class": {}}}
+                                }
+                            }
+                        }
+                    }
+                },
+            }
+        }
+    }
+}
+
+
+class TestXml2file(unittest.TestCase):
+    def test_same_as_string(self):
+        # The file functions write the same XML as the string ones, terminated by a newline
+        fd = io.StringIO()
+        xmlFormat.dict2file(
+            fd, ENTRIES, "entries", "entry", subtypes_params=ENTRIES_PARAMS, leading_tab=xmlFormat.DEFAULT_TAB
+        )
+        expected = xmlFormat.dict2string(
+            ENTRIES, "entries", "entry", subtypes_params=ENTRIES_PARAMS, leading_tab=xmlFormat.DEFAULT_TAB
+        )
+        self.assertEqual(expected + "\n", fd.getvalue())
+
+        fd = io.StringIO()
+        xmlFormat.class2file(fd, ENTRIES["entry_a"]["total"], "total")
+        self.assertEqual(xmlFormat.class2string(ENTRIES["entry_a"]["total"], "total") + "\n", fd.getvalue())
+
+        now = time.time()
+        fd = io.StringIO()
+        xmlFormat.time2file(fd, now, "updated", leading_tab=xmlFormat.DEFAULT_TAB)
+        self.assertEqual(xmlFormat.time2xml(now, "updated", leading_tab=xmlFormat.DEFAULT_TAB) + "\n", fd.getvalue())
+
+    def test_open_xml_file(self):
+        expected = xmlFormat.dict2string(ENTRIES, "entries", "entry", subtypes_params=ENTRIES_PARAMS) + "\n"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "entries.xml")
+            with xmlFormat.open_xml_file(fname, buffering=16) as fd:
+                xmlFormat.dict2file(fd, ENTRIES, "entries", "entry", subtypes_params=ENTRIES_PARAMS)
+            with open(fname) as fd:
+                self.assertEqual(expected, fd.read())
+
+            with xmlFormat.open_xml_file(fname + ".gz", compress=True) as fd:
+                xmlFormat.dict2file(fd, ENTRIES, "entries", "entry", subtypes_params=ENTRIES_PARAMS)
+            with gzip.open(fname + ".gz", "rt") as fd:
+                self.assertEqual(expected, fd.read())
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))
@@ -15,20 +15,29 @@
 #
 
 
+import os
+import tempfile
+import time
 import unittest
 import xml
 
 import xmlrunner
 
+from glideinwms.lib import xmlFormat
+
 # TODO: should OrderedDict be removed, it is the one from the stdlib. But tests are texting XML conversion as well
 #       should be directly: from collections import OrderedDict
 from glideinwms.lib.xmlParse import (
+    CorruptXML,
     domel2dict,
     getXMLAttributes,
     getXMLElements,
     is_singular_of,
     OrderedDict,
+    snapshot_dumps,
+    snapshot_fname,
     xmlfile2dict,
+    xmlsnapshot2dict,
     xmlstring2dict,
 )
 
@@ -170,5 +179,154 @@ class TestDomel2dict(unittest.TestCase):
         self.assertTrue(isinstance(domel2dict(doc.documentElement), dict))
 
 
+class TestExpatDictBuilder(unittest.TestCase):
+    def test_same_as_domel2dict(self):
+        # The event driven loaders build the same dictionaries and lists as domel2dict, in the same order
+        nested = (
+            '<entries a="1"><entry name="e1"><frontends><frontend name="f1" x="1"/><frontend/></frontends></entry>'
+            '<entry name="e2"><params><param/><param v="2"/></params><total/></entry><entry n="3"/></entries>'
+        )
+        for instr in (xmlstr, nested, "<a/>"):
+            for use_ord_dict in (False, True):
+                for singular_list in ([], ["entry", "total"]):
+                    doc = xml.dom.minidom.parseString(instr)
+                    expected = domel2dict(doc.documentElement, use_ord_dict, singular_list)
+                    actual = xmlstring2dict(instr, use_ord_dict, singular_list)
+                    self.assertEqual(expected, actual)
+                    self.assertEqual(repr(expected), repr(actual))
+                    with tempfile.TemporaryDirectory() as tmpdir:
+                        fname = os.path.join(tmpdir, "test.xml")
+                        with open(fname, "w") as f:
+                            f.write(instr)
+                        self.assertEqual(repr(expected), repr(xmlfile2dict(fname, use_ord_dict, singular_list)))
+                        with open(fname, "rb") as f:
+                            self.assertEqual(expected, xmlfile2dict(f, use_ord_dict, singular_list))
+                        with open(fname) as f:
+                            self.assertEqual(expected, xmlfile2dict(f, use_ord_dict, singular_list))
+        self.assertIsInstance(xmlstring2dict(xmlstr, use_ord_dict=True)["params"], OrderedDict)
+
+    def test_corrupt(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "test.xml")
+            with open(fname, "w") as f:
+                f.write(xmlstr[:-20])
+            with self.assertRaises(CorruptXML):
+                xmlfile2dict(fname)
+            with open(fname) as f:
+                with self.assertRaises(CorruptXML):
+                    xmlfile2dict(f)
+        with self.assertRaises(xml.parsers.expat.ExpatError):
+            xmlstring2dict("<a><b></a>")
+
+    def test_file_object_chunks(self):
+        # Documents larger than a chunk, with multi-byte characters, from text and binary file objects
+        instr = "<bs>" + "".join(f'<b n="{i}" v="\u00e8\u00e8"/>' for i in range(10000)) + "</bs>"
+        expected = xmlstring2dict(instr)
+        self.assertEqual(10000, len(expected))
+        self.assertEqual({"n": "9999", "v": "\u00e8\u00e8"}, expected[-1])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "test.xml")
+            with open(fname, "w", encoding="utf-8") as f:
+                f.write(instr)
+            with open(fname, encoding="utf-8") as f:
+                self.assertEqual(expected, xmlfile2dict(f))
+            with open(fname, "rb") as f:
+                self.assertEqual(expected, xmlfile2dict(f))
+
+
+COMPLETED_COUNTS_DESC = {
+    "dicts_params": {"Lasted": {"el_name": "TimeRange"}, "JobsNr": {"el_name": "Range"}},
+    "subclass_params": {"Waste": {"dicts_params": {"idle": {"el_name": "Fraction"}}}},
+}
+
+FRONTENDS_DATA = {
+    "fe1": {
+        "Downtime": {"status": "False"},
+        "Status": {"Idle": 3, "Running": 0, "Ratio": 0.25, "Name": 'a "quoted" <name>', "Missing": None},
+        "Requested": {"Idle": 1, "Parameters": {"GLIDEIN_Param": "x", "Other": 7}},
+        "Empty": {},
+        "CompletedCounts": {
+            "Sum": {"Glideins": 2},
+            "Lasted": {"Unknown": 0, "3600": 2},
+            "JobsNr": {"1": 4},
+            "Waste": {"idle": {"None": 1, "All": 0}},
+        },
+    },
+    "fe2": {"Status": {"Idle": 1}, "Requested": {"Idle": 0, "Parameters": {}}},
+}
+
+FRONTENDS_PARAMS = {
+    "class": {
+        "subclass_params": {
+            "Requested": {"dicts_params": {"Parameters": {"el_name": "Parameter"}}},
+            "CompletedCounts": COMPLETED_COUNTS_DESC,
+        }
+    }
+}
+
+
+class TestXmldict(unittest.TestCase):
+    def test_same_as_parsed(self):
+        updated = time.time()
+        singular_list = ["Fraction", "TimeRange", "Range"]
+        xml_str = (
+            "<glideFactoryEntryQStats>\n"
+            + xmlFormat.time2xml(updated, "updated")
+            + xmlFormat.dict2string(FRONTENDS_DATA, "frontends", "frontend", subtypes_params=FRONTENDS_PARAMS)
+            + xmlFormat.class2string(
+                FRONTENDS_DATA["fe1"], "total", subclass_params=FRONTENDS_PARAMS["class"]["subclass_params"]
+            )
+            + xmlFormat.dict2string({7200: {"a": 1.5}, 86400: {}}, "periods", "period", subtypes_params={"class": {}})
+            + xmlFormat.dict2string({"x": 1, "y": None}, "values", "value")
+            + "</glideFactoryEntryQStats>\n"
+        )
+        data = {
+            "updated": xmlFormat.time2xmldict(updated),
+            "frontends": xmlFormat.dict2xmldict(FRONTENDS_DATA, subtypes_params=FRONTENDS_PARAMS),
+            "total": xmlFormat.class2xmldict(FRONTENDS_DATA["fe1"], FRONTENDS_PARAMS["class"]["subclass_params"]),
+            "periods": xmlFormat.dict2xmldict({7200: {"a": 1.5}, 86400: {}}, subtypes_params={"class": {}}),
+            "values": xmlFormat.dict2xmldict({"x": 1, "y": None}),
+        }
+        self.assertEqual(xmlstring2dict(xml_str, always_singular_list=singular_list), data)
+        self.assertEqual("0.25", data["frontends"]["fe1"]["Status"]["Ratio"])
+        self.assertEqual({"val": "4"}, data["total"]["CompletedCounts"]["JobsNr"]["1"])
+        # The timezone elements are kept only if timezone is always singular
+        data["updated"] = xmlFormat.time2xmldict(updated, ["timezone"])
+        self.assertEqual(["Local", "UTC"], sorted(data["updated"]))
+        self.assertEqual(xmlstring2dict(xml_str, always_singular_list=singular_list + ["timezone"]), data)
+
+    def test_unsupported(self):
+        with self.assertRaises(RuntimeError):
+            xmlFormat.class2xmldict({"a": [1, 2]})
+        with self.assertRaises(RuntimeError):
+            xmlFormat.dict2xmldict({"a": {"b": 1}})
+
+
+class TestXmlsnapshot2dict(unittest.TestCase):
+    def test_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "status.xml")
+            with open(fname, "w") as f:
+                f.write(xmlstr)
+            self.assertEqual("status.snapshot.pkl", os.path.basename(snapshot_fname(fname)))
+            # No snapshot
+            self.assertEqual(xmlfile2dict(fname), xmlsnapshot2dict(fname))
+            with open(snapshot_fname(fname), "wb") as f:
+                f.write(snapshot_dumps({"from": "snapshot"}, ["param"]))
+            self.assertEqual({"from": "snapshot"}, xmlsnapshot2dict(fname, always_singular_list=["param"]))
+            # Different always_singular_list
+            self.assertEqual(xmlfile2dict(fname), xmlsnapshot2dict(fname))
+            # Snapshot older than the XML file
+            os.utime(fname, ns=(os.stat(fname).st_atime_ns, os.stat(snapshot_fname(fname)).st_mtime_ns + 1000))
+            self.assertEqual(xmlfile2dict(fname, always_singular_list=["param"]), xmlsnapshot2dict(fname, ["param"]))
+            # Corrupted snapshot
+            with open(snapshot_fname(fname), "wb") as f:
+                f.write(b"garbage")
+            self.assertEqual(xmlfile2dict(fname), xmlsnapshot2dict(fname))
+            os.unlink(fname)
+            with self.assertRaises(OSError):
+                xmlsnapshot2dict(fname)
+
+
 if __name__ == "__main__":
     unittest.main(testRunner=xmlrunner.XMLTestRunner(output="unittests-reports"))